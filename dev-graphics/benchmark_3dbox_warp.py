@@ -0,0 +1,204 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Benchmark of the 3D Box perspective warp engine.
+#
+# Compares the time to compute the perspective coefficients of the 6 faces of a 3D Box with
+# the old normal equations and cofactor matrix inverse, the Gaussian elimination used now,
+# NumPy (if installed) and the cached unit square coefficients of the warp engine.
+# It also compares the time to project all the faces of a 3D Box with and without the cached
+# face masks and background layer.
+# The new code is the warp engine in resources/graphics.py, only the old code is copied here.
+# The Kodi modules are replaced by empty modules. Needs Pillow.
+#
+# Usage: run from the dev-graphics directory, benchmark_3dbox_warp.py [number_of_boxes]
+
+# Copyright (c) 2020 Wintermute0110 <wintermute0110@gmail.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# --- Python standard library ---
+import json
+import os
+import sys
+import time
+import types
+
+# --- Kodi modules ---
+for m in ['xbmc', 'xbmcgui', 'xbmcplugin', 'xbmcaddon', 'xbmcvfs']:
+    sys.modules[m] = types.ModuleType(m)
+xbmc = sys.modules['xbmc']
+xbmc.log = lambda *args, **kwargs: None
+xbmc.executeJSONRPC = lambda query: '{"result" : {"version" : {"major" : 19}}}'
+xbmc.LOGDEBUG = xbmc.LOGINFO = xbmc.LOGWARNING = xbmc.LOGERROR = 0
+
+# --- Addon modules ---
+sys.path.insert(0, os.path.abspath('..'))
+from resources import graphics
+from PIL import Image
+from PIL import ImageDraw
+
+CANVAS_SIZE = (1000, 1500)
+FACES = ['Frontbox', 'Spine', 'Flyer', 'Clearlogo', 'Clearlogo_MAME', 'Front_Title']
+# Typical source image sizes of every face. Clearlogos are rotated 90 degrees.
+SOURCE_SIZES = {
+    'Frontbox' : CANVAS_SIZE, 'Spine' : CANVAS_SIZE, 'Flyer' : (600, 800),
+    'Clearlogo' : (200, 600), 'Clearlogo_MAME' : (300, 800), 'Front_Title' : (1000, 100),
+}
+
+# --- Old pure Python code (graphics.py before the warp engine) ---
+def math_MatrixTranspose(X):
+    return [[X[j][i] for j in range(len(X))] for i in range(len(X[0]))]
+
+def math_MatrixMinor(m, i, j):
+    return [row[:j] + row[j+1:] for row in (m[:i]+m[i+1:])]
+
+def math_MatrixDeterminant(m):
+    if len(m) == 2: return m[0][0]*m[1][1]-m[0][1]*m[1][0]
+    return sum(((-1)**c)*m[0][c]*math_MatrixDeterminant(math_MatrixMinor(m,0,c)) for c in range(len(m)))
+
+def math_MatrixInverse(m):
+    determinant = math_MatrixDeterminant(m)
+    cofactors = []
+    for r in range(len(m)):
+        cofactorRow = []
+        for c in range(len(m)):
+            cofactorRow.append(((-1)**(r+c)) * math_MatrixDeterminant(math_MatrixMinor(m,r,c)))
+        cofactors.append(cofactorRow)
+    cofactors = math_MatrixTranspose(cofactors)
+    return [[c / determinant for c in row] for row in cofactors]
+
+def math_MatrixProduct(A, B):
+    return [[sum(a*b for a,b in zip(A_row, B_col)) for B_col in zip(*B)] for A_row in A]
+
+def math_MatrixProduct_Column(A, B):
+    return [sum(a*b for a,b in zip(A_row, B)) for A_row in A]
+
+def build_system(source_coords, target_coords):
+    A = []
+    for s, t in zip(source_coords, target_coords):
+        A.append([t[0], t[1], 1, 0, 0, 0, -s[0]*t[0], -s[0]*t[1]])
+        A.append([0, 0, 0, t[0], t[1], 1, -s[1]*t[0], -s[1]*t[1]])
+    B = [float(item) for sublist in source_coords for item in sublist]
+    return A, B
+
+def coeffs_old(source_coords, target_coords):
+    A, B = build_system(source_coords, target_coords)
+    A_T = math_MatrixTranspose(A)
+    A_T_A_inv_A_T = math_MatrixProduct(math_MatrixInverse(math_MatrixProduct(A_T, A)), A_T)
+    return math_MatrixProduct_Column(A_T_A_inv_A_T, B)
+
+# --- New code (resources/graphics.py) ---
+# math_SolveLinearSystem() uses NumPy if available. Gaussian elimination is timed with NumPy
+# disabled.
+def coeffs_gauss(source_coords, target_coords):
+    numpy_available = graphics.NUMPY_AVAILABLE
+    graphics.NUMPY_AVAILABLE = False
+    coeffs = graphics.perspective_coeffs(source_coords, target_coords)
+    graphics.NUMPY_AVAILABLE = numpy_available
+    return coeffs
+
+def coeffs_cached(size, target_coords):
+    c, mask = graphics.warp_get_face(target_coords, CANVAS_SIZE)
+    w, h = size
+    return [c[0]*w, c[1]*w, c[2]*w, c[3]*h, c[4]*h, c[5]*h, c[6], c[7]]
+
+def source_rect(size):
+    return [(0, 0), (size[0], 0), (size[0], size[1]), (0, size[1])]
+
+def time_coeffs(name, num_boxes, coeffs_func, face_coords):
+    t_start = time.time()
+    for i in range(num_boxes):
+        for face in FACES:
+            coeffs_func(SOURCE_SIZES[face], face_coords[face])
+    t = (time.time() - t_start) / num_boxes
+    print('{:<28} {:>12.3f}'.format(name, t * 1000))
+    return t
+
+# --- Pillow face projection ---
+# Old code, the coefficients are computed with Gaussian elimination as in the new code.
+def project_old(img, coords):
+    coeffs = coeffs_gauss(source_rect(img.size), coords)
+    img_t = img.transform(CANVAS_SIZE, Image.PERSPECTIVE, coeffs, Image.BICUBIC)
+    mask = Image.new('L', CANVAS_SIZE, color = 0)
+    ImageDraw.Draw(mask).polygon(coords, fill = 255)
+    img_t.putalpha(mask)
+    return img_t
+
+def project_cached(img, coords):
+    return graphics.project_texture(img, coords, CANVAS_SIZE)
+
+def render_box(face_coords, source_dic, cached, background = None):
+    project = project_cached if cached else project_old
+    if background:
+        canvas = background.copy()
+    else:
+        canvas = Image.new('RGBA', CANVAS_SIZE, (0, 0, 0))
+        for face in ['Frontbox', 'Spine']:
+            img_t = project(source_dic[face], face_coords[face])
+            canvas.paste(img_t, mask = img_t)
+    for face in ['Flyer', 'Clearlogo', 'Clearlogo_MAME', 'Front_Title']:
+        img_t = project(source_dic[face], face_coords[face])
+        canvas.paste(img_t, mask = img_t)
+    return canvas
+
+# --- Main ----------------------------------------------------------------------------------------
+num_boxes = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+with open('../templates/3dbox_angleY_60.json') as json_file:
+    coord_dic = json.load(json_file)
+face_coords = {face : [(int(c[0]), int(c[1])) for c in coord_dic[face]] for face in FACES}
+
+print('Perspective coefficients of {} faces, average of {} boxes'.format(len(FACES), num_boxes))
+print('{:<28} {:>12}'.format('Method', 'ms per box'))
+t_old = time_coeffs('Normal equations (old)', num_boxes,
+    lambda size, coords: coeffs_old(source_rect(size), coords), face_coords)
+t_gauss = time_coeffs('Gaussian elimination', num_boxes,
+    lambda size, coords: coeffs_gauss(source_rect(size), coords), face_coords)
+if graphics.NUMPY_AVAILABLE:
+    time_coeffs('NumPy linalg.solve', num_boxes,
+        lambda size, coords: graphics.perspective_coeffs(source_rect(size), coords), face_coords)
+else:
+    print('{:<28} {:>12}'.format('NumPy linalg.solve', 'n/a'))
+# The first box computes the faces and masks, time the rest of the boxes.
+for face in FACES: coeffs_cached(SOURCE_SIZES[face], face_coords[face])
+t_cached = time_coeffs('Cached unit square', num_boxes, coeffs_cached, face_coords)
+
+# Check the cached coefficients map the source corners to the same points.
+max_error = 0.0
+for face in FACES:
+    c_old = coeffs_old(source_rect(SOURCE_SIZES[face]), face_coords[face])
+    c_new = coeffs_cached(SOURCE_SIZES[face], face_coords[face])
+    max_error = max(max_error, max(abs(a - b) / max(1.0, abs(a)) for a, b in zip(c_old, c_new)))
+print('Max relative difference between old and cached coefficients {:.2e}'.format(max_error))
+
+source_dic = {
+    'Frontbox' : Image.new('RGBA', CANVAS_SIZE, (200, 100, 100)),
+    'Spine' : Image.new('RGBA', CANVAS_SIZE, (100, 200, 100)),
+    'Flyer' : Image.open('../media/SL_assets/sonic3_boxfront.png'),
+    'Clearlogo' : Image.open('../media/SL_assets/sonic3_clearlogo.png').rotate(-90, expand = True),
+    'Clearlogo_MAME' : Image.open('../media/MAME_clearlogo.png').rotate(-90, expand = True),
+    'Front_Title' : Image.new('RGBA', (1000, 100), (0, 0, 0)),
+}
+for img in source_dic.values(): img.load()
+background = Image.new('RGBA', CANVAS_SIZE, (0, 0, 0))
+for face in ['Frontbox', 'Spine']:
+    img_t = project_cached(source_dic[face], face_coords[face])
+    background.paste(img_t, mask = img_t)
+
+print('\nProjection of all faces of a 3D Box, average of {} boxes'.format(num_boxes))
+t_start = time.time()
+for i in range(num_boxes): render_box(face_coords, source_dic, False)
+t_render_old = (time.time() - t_start) / num_boxes
+t_start = time.time()
+for i in range(num_boxes): render_box(face_coords, source_dic, True, background)
+t_render_new = (time.time() - t_start) / num_boxes
+print('{:<28} {:>12.1f}'.format('Uncached masks and faces', t_render_old * 1000))
+print('{:<28} {:>12.1f}'.format('Warp engine', t_render_new * 1000))
+print('\nEstimated time per 3D Box (ms): old {:.1f}, new {:.1f}'.format(
+    (t_old - t_gauss + t_render_old) * 1000, t_render_new * 1000))
@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Benchmark of the image extraction of PDF manuals in resources/manuals.py.
+#
+# Compares the old extraction (decode every image with PIL and save it as PNG with the default
+# compression level) with the new one (JPEG streams written to disk as they are, Flate and
+# CCITT images saved as PNG with compression level 1) on synthetic scanned pages.
+# Needs Pillow.
+#
+# Usage: run from the dev-manuals directory, benchmark_image_extraction.py [number_of_pages]
+
+# Copyright (c) 2020 Wintermute0110 <wintermute0110@gmail.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# --- Python standard library ---
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from PIL import Image
+from PIL import ImageDraw
+
+# A4 page scanned at 200 DPI.
+PAGE_SIZE = (1654, 2339)
+PNG_COMPRESS_LEVEL = 1
+
+# Synthetic scanned page: text like lines of boxes on a noisy background.
+def make_page(mode):
+    random.seed(0)
+    img = Image.effect_noise(PAGE_SIZE, 12).point(lambda v: 230 + v // 16).convert(mode)
+    draw = ImageDraw.Draw(img)
+    ink = 0 if mode != 'RGB' else (20, 20, 60)
+    for y in range(150, PAGE_SIZE[1] - 150, 40):
+        x = 120
+        while x < PAGE_SIZE[0] - 200:
+            w = random.randint(20, 90)
+            draw.rectangle([x, y, x + w, y + 22], fill = ink)
+            x += w + random.randint(10, 25)
+    return img
+
+# --- Old code (decoded by PIL and saved as PNG) ---
+def extract_old(stream, kind, img_path):
+    if kind == 'JPEG':
+        img = Image.open(io.BytesIO(stream))
+    elif kind == 'Flate RGB':
+        img = Image.frombytes('RGB', PAGE_SIZE, zlib.decompress(stream))
+    else:
+        img = Image.frombytes('1', PAGE_SIZE, zlib.decompress(stream))
+    img.save(img_path + '.png', 'PNG')
+
+# --- New code ---
+def extract_new(stream, kind, img_path):
+    if kind == 'JPEG':
+        with io.open(img_path + '.jpg', 'wb') as img_file:
+            img_file.write(memoryview(stream))
+        return
+    elif kind == 'Flate RGB':
+        img = Image.frombuffer('RGB', PAGE_SIZE, zlib.decompress(stream), 'raw', 'RGB', 0, 1)
+    else:
+        img = Image.frombuffer('1', PAGE_SIZE, zlib.decompress(stream), 'raw', '1', 0, 1)
+    img.save(img_path + '.png', 'PNG', compress_level = PNG_COMPRESS_LEVEL)
+
+def time_extraction(extract_func, stream, kind, num_pages, out_dir):
+    t_start = time.time()
+    for i in range(num_pages):
+        extract_func(stream, kind, os.path.join(out_dir, 'Image_page{:02d}_img00'.format(i)))
+    t = (time.time() - t_start) / num_pages
+    size = sum(os.path.getsize(os.path.join(out_dir, f)) for f in os.listdir(out_dir)) / num_pages
+    for f in os.listdir(out_dir): os.remove(os.path.join(out_dir, f))
+    return t, size
+
+# --- Main ----------------------------------------------------------------------------------------
+num_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+rgb_page = make_page('RGB')
+memory_f = io.BytesIO()
+rgb_page.save(memory_f, 'JPEG', quality = 85)
+streams = [
+    ('JPEG', memory_f.getvalue()),
+    ('Flate RGB', zlib.compress(rgb_page.tobytes())),
+    ('Flate 1 bit', zlib.compress(make_page('1').tobytes())),
+]
+
+out_dir = tempfile.mkdtemp()
+print('Extraction of a {}x{} page, average of {} pages'.format(PAGE_SIZE[0], PAGE_SIZE[1], num_pages))
+print('{:<14} {:>10} {:>10} {:>8} {:>10} {:>10}'.format(
+    'Image', 'Old ms', 'New ms', 'Speedup', 'Old KiB', 'New KiB'))
+for kind, stream in streams:
+    t_old, size_old = time_extraction(extract_old, stream, kind, num_pages, out_dir)
+    t_new, size_new = time_extraction(extract_new, stream, kind, num_pages, out_dir)
+    print('{:<14} {:>10.1f} {:>10.1f} {:>7.1f}x {:>10.0f} {:>10.0f}'.format(
+        kind, t_old * 1000, t_new * 1000, t_old / t_new, size_old / 1024, size_new / 1024))
+shutil.rmtree(out_dir)
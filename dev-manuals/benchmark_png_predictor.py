@@ -0,0 +1,165 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Benchmark of the PNG predictor decoding of Flate streams in pdfrw/uncompress.py.
+#
+# Compares the old byte by byte loops with the row decoders of flate_png_impl(), using the
+# integer and the NumPy (if installed) Sub and Up decoders. The output of every decoder is
+# checked to be identical to the output of the old loops.
+#
+# Usage: run from the dev-manuals directory, benchmark_png_predictor.py [number_of_rows]
+
+# Copyright (c) 2020 Wintermute0110 <wintermute0110@gmail.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# --- Python standard library ---
+import array
+import math
+import random
+import sys
+import time
+
+sys.path.insert(0, '../pdfrw')
+from pdfrw import uncompress
+
+# --- Old code (pdfrw/uncompress.py before the row decoders) ---
+def flate_png_old(data, predictor=1, columns=1, colors=1, bpc=8):
+    def subfilter(data, prior_row_data, start, length, pixel_size):
+        for i in range(pixel_size, length):
+            left = data[start + i - pixel_size]
+            data[start + i] = (data[start + i] + left) % 256
+
+    def upfilter(data, prior_row_data, start, length, pixel_size):
+        for i in range(length):
+            up = prior_row_data[i]
+            data[start + i] = (data[start + i] + up) % 256
+
+    def avgfilter(data, prior_row_data, start, length, pixel_size):
+        for i in range(length):
+            left = data[start + i - pixel_size] if i >= pixel_size else 0
+            up = prior_row_data[i]
+            floor = math.floor((left + up) / 2)
+            data[start + i] = (data[start + i] + int(floor)) % 256
+
+    def paethfilter(data, prior_row_data, start, length, pixel_size):
+        def paeth_predictor(a, b, c):
+            p = a + b - c
+            pa = abs(p - a)
+            pb = abs(p - b)
+            pc = abs(p - c)
+            if pa <= pb and pa <= pc:
+                return a
+            elif pb <= pc:
+                return b
+            else:
+                return c
+        for i in range(length):
+            left = data[start + i - pixel_size] if i >= pixel_size else 0
+            up = prior_row_data[i]
+            up_left = prior_row_data[i - pixel_size] if i >= pixel_size else 0
+            data[start + i] = (data[start + i] + paeth_predictor(left, up, up_left)) % 256
+
+    columnbytes = ((columns * colors * bpc) + 7) // 8
+    pixel_size = (colors * bpc + 7) // 8
+    data = array.array('B', data)
+    rowlen = columnbytes + 1
+    if predictor == 15:
+        padding = (rowlen - len(data)) % rowlen
+        data.extend([0] * padding)
+    assert len(data) % rowlen == 0
+    rows = range(0, len(data), rowlen)
+    prior_row_data = [ 0 for i in range(columnbytes) ]
+    filters = {1 : subfilter, 2 : upfilter, 3 : avgfilter, 4 : paethfilter}
+    for row_index in rows:
+        filter_type = data[row_index]
+        if filter_type:
+            filters[filter_type](data, prior_row_data, row_index + 1, columnbytes, pixel_size)
+        prior_row_data = data[row_index + 1 : row_index + 1 + columnbytes]
+    for row_index in reversed(rows):
+        data.pop(row_index)
+    return data.tobytes()
+
+# Filtered data with random bytes. filter_types is the list of row filter types to use.
+def make_data(num_rows, columnbytes, filter_types):
+    data = bytearray()
+    for i in range(num_rows):
+        data.append(random.choice(filter_types))
+        data.extend(random.getrandbits(8) for j in range(columnbytes))
+    return bytes(data)
+
+def decode_new(data, predictor, columns, colors, bpc):
+    d, e = uncompress.flate_png(data, predictor, columns, colors, bpc)
+    return d
+
+def time_decoder(decode_func, data, params, repeat):
+    t_start = time.time()
+    for i in range(repeat):
+        output = decode_func(data, *params)
+    return (time.time() - t_start) / repeat, output
+
+def use_row_decoders(subfilter, upfilter):
+    uncompress.png_filters[1] = subfilter
+    uncompress.png_filters[2] = upfilter
+
+# --- Main ----------------------------------------------------------------------------------------
+num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+random.seed(0)
+decoders = [('Row decoders, integers', uncompress.subfilter_int, uncompress.upfilter_int)]
+if uncompress.numpy is not None:
+    decoders.append(('Row decoders, NumPy', uncompress.subfilter_numpy, uncompress.upfilter_numpy))
+
+# --- Check the output is identical ---
+# Odd widths, bit depths smaller than 8 and predictor 15 padding.
+num_checks = 0
+for (columns, colors, bpc) in [(1, 1, 8), (7, 3, 8), (13, 1, 1), (5, 3, 4), (9, 4, 16), (33, 2, 8)]:
+    columnbytes = ((columns * colors * bpc) + 7) // 8
+    for predictor in (10, 15):
+        data = make_data(20, columnbytes, [0, 1, 2, 3, 4])
+        if predictor == 15: data = data[:-1]
+        expected = flate_png_old(data, predictor, columns, colors, bpc)
+        for name, subfilter, upfilter in decoders:
+            use_row_decoders(subfilter, upfilter)
+            if decode_new(data, predictor, columns, colors, bpc) != expected:
+                print('ERROR {} output differs, columns {} colors {} bpc {} predictor {}'.format(
+                    name, columns, colors, bpc, predictor))
+                sys.exit(1)
+            num_checks += 1
+print('Output of the row decoders identical to the old loops in {} tests'.format(num_checks))
+
+# --- Benchmark ---
+# Xref streams are a few bytes wide with the Up filter. Scanned pages are 1 bit monochrome
+# or 8 bit RGB images.
+cases = [
+    ('Xref stream, Up', (12, 5, 1, 8), [2], 50),
+    ('1 bit page, Up', (12, 2400, 1, 1), [2], 1),
+    ('RGB page, Sub', (11, 1200, 3, 8), [1], 1),
+    ('RGB page, Up', (12, 1200, 3, 8), [2], 1),
+    ('RGB page, Avg', (13, 1200, 3, 8), [3], 1),
+    ('RGB page, Paeth', (14, 1200, 3, 8), [4], 1),
+    ('RGB page, mixed', (15, 1200, 3, 8), [0, 1, 2, 3, 4], 1),
+]
+print('\nDecoding time of {} rows in ms'.format(num_rows))
+header = '{:<20} {:>10}'.format('Data', 'Old loops')
+for name, subfilter, upfilter in decoders: header += ' {:>24}'.format(name)
+print(header)
+for case_name, params, filter_types, rows_factor in cases:
+    predictor, columns, colors, bpc = params
+    columnbytes = ((columns * colors * bpc) + 7) // 8
+    data = make_data(num_rows * rows_factor, columnbytes, filter_types)
+    t_old, expected = time_decoder(flate_png_old, data, params, 1)
+    line = '{:<20} {:>10.1f}'.format(case_name, t_old * 1000)
+    for name, subfilter, upfilter in decoders:
+        use_row_decoders(subfilter, upfilter)
+        t_new, output = time_decoder(decode_new, data, params, 3)
+        if output != expected:
+            print('ERROR {} output differs in {}'.format(name, case_name))
+            sys.exit(1)
+        line += ' {:>14.1f} ({:>5.1f}x)'.format(t_new * 1000, t_old / t_new)
+    print(line)
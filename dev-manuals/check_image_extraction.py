@@ -0,0 +1,166 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Check of the image extraction of PDF manuals in resources/manuals.py.
+#
+# Calls _extract_image_from_XObject() on synthetic image XObjects and checks the saved file
+# or that the image is skipped. Images with an array /ColorSpace (/ICCBased, /Indexed),
+# CCITT images that cannot be decoded and images that cannot be saved must be skipped, not
+# raise an exception. The Kodi modules are replaced by empty modules. Needs Pillow with libtiff.
+#
+# Usage: run from the dev-manuals directory, check_image_extraction.py
+
+# Copyright (c) 2020 Wintermute0110 <wintermute0110@gmail.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# --- Python standard library ---
+import io
+import os
+import shutil
+import sys
+import tempfile
+import types
+import zlib
+from PIL import Image
+
+ADDON_DIR = os.path.abspath('..')
+IMG_SIZE = (64, 48)
+
+# --- Fake Kodi modules ---
+# manuals.py loads pdfrw from special://home/addons/plugin.program.AML/pdfrw
+addons_dir = tempfile.mkdtemp()
+os.symlink(ADDON_DIR, os.path.join(addons_dir, 'plugin.program.AML'))
+for m in ['xbmc', 'xbmcgui', 'xbmcplugin', 'xbmcaddon', 'xbmcvfs']:
+    sys.modules[m] = types.ModuleType(m)
+xbmc = sys.modules['xbmc']
+xbmc.log = lambda *args, **kwargs: None
+xbmc.executeJSONRPC = lambda query: '{"result" : {"version" : {"major" : 19}}}'
+xbmc.LOGDEBUG = xbmc.LOGINFO = xbmc.LOGWARNING = xbmc.LOGERROR = 0
+sys.modules['xbmcvfs'].translatePath = lambda path: path.replace('special://home/addons', addons_dir)
+class Addon(object):
+    def getAddonInfo(self, info): return 'plugin.program.AML'
+sys.modules['xbmcaddon'].Addon = Addon
+class WindowDialog(object): pass
+sys.modules['xbmcgui'].WindowDialog = WindowDialog
+sys.path.insert(0, ADDON_DIR)
+from resources.utils import FileName
+from resources import manuals
+from pdfrw import PdfArray, PdfDict, PdfName
+from pdfrw.py23_diffs import convert_load
+
+def make_XObject(filter_name, color_space, bpc, stream, decode_parms = None):
+    xobj_dic = PdfDict(Type = PdfName.XObject, Subtype = PdfName.Image,
+        Filter = filter_name, ColorSpace = color_space, BitsPerComponent = bpc,
+        Width = IMG_SIZE[0], Height = IMG_SIZE[1], DecodeParms = decode_parms)
+    xobj_dic.stream = convert_load(stream)
+    return xobj_dic
+
+# Group 4 CCITT stream of a monochrome image, the strip of a TIFF file written by PIL.
+def make_CCITT_stream(img):
+    memory_f = io.BytesIO()
+    img.save(memory_f, 'TIFF', compression = 'group4', tiffinfo = {278 : IMG_SIZE[1]})
+    tiff_img = Image.open(io.BytesIO(memory_f.getvalue()))
+    offset = tiff_img.tag_v2[273][0]
+    return memory_f.getvalue()[offset:offset + tiff_img.tag_v2[279][0]]
+
+# --- Main ----------------------------------------------------------------------------------------
+rgb_img = Image.new('RGB', IMG_SIZE, (200, 40, 10))
+memory_f = io.BytesIO()
+rgb_img.save(memory_f, 'JPEG')
+jpeg_stream = memory_f.getvalue()
+rgb_stream = zlib.compress(rgb_img.tobytes())
+gray_stream = zlib.compress(rgb_img.convert('L').tobytes())
+ICC_space = PdfArray([PdfName.ICCBased, PdfDict(N = 3)])
+indexed_space = PdfArray([PdfName.Indexed, PdfName.DeviceRGB, 1, 'palette'])
+mono_img = Image.new('1', IMG_SIZE, 1)
+mono_img.paste(0, (10, 10, 40, 30))
+G4_stream = make_CCITT_stream(mono_img)
+G4_parms = PdfDict(K = -1, Columns = IMG_SIZE[0], Rows = IMG_SIZE[1])
+G3_2D_parms = PdfDict(K = 1, Columns = IMG_SIZE[0], Rows = IMG_SIZE[1])
+
+# (description, XObject, expected file extension or None if the image is skipped)
+test_list = [
+    ('Flate /DeviceRGB', make_XObject(PdfName.FlateDecode, PdfName.DeviceRGB, 8, rgb_stream), '.png'),
+    ('Flate /DeviceGray', make_XObject(PdfName.FlateDecode, PdfName.DeviceGray, 8, gray_stream), '.png'),
+    ('Flate /ICCBased', make_XObject(PdfName.FlateDecode, ICC_space, 8, rgb_stream), None),
+    ('Flate /Indexed', make_XObject(PdfName.FlateDecode, indexed_space, 8, gray_stream), None),
+    ('JPEG /DeviceRGB', make_XObject(PdfName.DCTDecode, PdfName.DeviceRGB, 8, jpeg_stream), '.jpg'),
+    ('JPEG /ICCBased', make_XObject(PdfName.DCTDecode, ICC_space, 8, jpeg_stream), '.jpg'),
+    ('CCITT G4', make_XObject(PdfName.CCITTFaxDecode, PdfName.DeviceGray, 1, G4_stream, G4_parms), '.png'),
+    ('CCITT G4 corrupt', make_XObject(PdfName.CCITTFaxDecode, PdfName.DeviceGray, 1,
+        b'\x00' * 64, G4_parms), None),
+    ('CCITT G4 empty', make_XObject(PdfName.CCITTFaxDecode, PdfName.DeviceGray, 1, b'', G4_parms), None),
+    ('CCITT G3 corrupt', make_XObject(PdfName.CCITTFaxDecode, PdfName.DeviceGray, 1,
+        b'\xff' * 64, G3_2D_parms), None),
+]
+
+img_dir_FN = FileName(tempfile.mkdtemp())
+num_errors = 0
+for i, (desc, xobj_dic, expected_ext) in enumerate(test_list):
+    try:
+        img_basename_str = manuals._extract_image_from_XObject(xobj_dic, img_dir_FN, 'img{:02d}'.format(i))
+    except Exception as ex:
+        img_basename_str = 'Exception {}: {}'.format(type(ex).__name__, ex)
+    if expected_ext is None:
+        passed = img_basename_str is None
+    else:
+        passed = img_basename_str == 'img{:02d}{}'.format(i, expected_ext) and \
+            Image.open(img_dir_FN.pjoin(img_basename_str).getPath()).size == IMG_SIZE
+    if not passed: num_errors += 1
+    print('{:<20} {:<6} {}'.format(desc, 'OK' if passed else 'FAIL', img_basename_str))
+    if expected_ext is None and os.listdir(img_dir_FN.getPath()):
+        num_errors += 1
+        print('{:<20} FAIL   files left {}'.format('', os.listdir(img_dir_FN.getPath())))
+    for f in os.listdir(img_dir_FN.getPath()): os.remove(img_dir_FN.pjoin(f).getPath())
+
+# PIL without the libtiff decoder cannot decode CCITT images, the image must be skipped.
+getdecoder = Image._getdecoder
+def getdecoder_no_libtiff(mode, decoder_name, *args, **kwargs):
+    if decoder_name == 'libtiff': raise IOError('decoder libtiff not available')
+    return getdecoder(mode, decoder_name, *args, **kwargs)
+Image._getdecoder = getdecoder_no_libtiff
+xobj_dic = make_XObject(PdfName.CCITTFaxDecode, PdfName.DeviceGray, 1, G4_stream, G4_parms)
+try:
+    img_basename_str = manuals._extract_image_from_XObject(xobj_dic, img_dir_FN, 'img')
+except Exception as ex:
+    img_basename_str = 'Exception {}: {}'.format(type(ex).__name__, ex)
+Image._getdecoder = getdecoder
+passed = img_basename_str is None and not os.listdir(img_dir_FN.getPath())
+if not passed: num_errors += 1
+print('{:<20} {:<6} {}'.format('CCITT no libtiff', 'OK' if passed else 'FAIL', img_basename_str))
+
+# Saving to a directory that does not exist fails, the image must be skipped.
+xobj_dic = make_XObject(PdfName.FlateDecode, PdfName.DeviceRGB, 8, rgb_stream)
+try:
+    img_basename_str = manuals._extract_image_from_XObject(xobj_dic, img_dir_FN.pjoin('missing'), 'img')
+except Exception as ex:
+    img_basename_str = 'Exception {}: {}'.format(type(ex).__name__, ex)
+if img_basename_str is not None: num_errors += 1
+print('{:<20} {:<6} {}'.format('Save error', 'OK' if img_basename_str is None else 'FAIL', img_basename_str))
+
+# A PNG partly written when saving fails must be deleted.
+image_save = Image.Image.save
+def image_save_partly(img, fp, *args, **kwargs):
+    with open(fp, 'wb') as img_file: img_file.write(b'\x89PNG')
+    raise IOError('No space left on device')
+Image.Image.save = image_save_partly
+xobj_dic = make_XObject(PdfName.FlateDecode, PdfName.DeviceRGB, 8, rgb_stream)
+try:
+    img_basename_str = manuals._extract_image_from_XObject(xobj_dic, img_dir_FN, 'img')
+except Exception as ex:
+    img_basename_str = 'Exception {}: {}'.format(type(ex).__name__, ex)
+Image.Image.save = image_save
+passed = img_basename_str is None and not os.listdir(img_dir_FN.getPath())
+if not passed: num_errors += 1
+print('{:<20} {:<6} {}'.format('Save partly written', 'OK' if passed else 'FAIL', img_basename_str))
+shutil.rmtree(img_dir_FN.getPath())
+shutil.rmtree(addons_dir)
+print('\n{} errors'.format(num_errors))
+sys.exit(1 if num_errors else 0)
@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Benchmark of the transparent JSON database compression.
+#
+# Writes a synthetic MAME render database in every compression format supported by
+# utils_write_JSON_file(), measures file size and decoding time and computes the load time
+# for some typical storage types. The break-even throughput is the storage speed below which
+# the compressed file loads faster than the uncompressed one.
+# Files are written and loaded with the addon functions in resources/utils.py. The Kodi
+# modules are replaced by empty modules.
+#
+# Usage: run from the dev-misc directory, benchmark_JSON_compression.py [number_of_machines]
+
+# Copyright (c) 2020 Wintermute0110 <wintermute0110@gmail.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# --- Python standard library ---
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+
+# --- Kodi modules ---
+for m in ['xbmc', 'xbmcgui', 'xbmcplugin', 'xbmcaddon', 'xbmcvfs']:
+    sys.modules[m] = types.ModuleType(m)
+xbmc = sys.modules['xbmc']
+xbmc.log = lambda *args, **kwargs: None
+xbmc.executeJSONRPC = lambda query: '{"result" : {"version" : {"major" : 19}}}'
+xbmc.LOGDEBUG = xbmc.LOGINFO = xbmc.LOGWARNING = xbmc.LOGERROR = 0
+
+# --- Addon modules ---
+sys.path.insert(0, os.path.abspath('..'))
+from resources.utils import *
+
+# Typical sustained read throughput in MB/s.
+STORAGE_TYPES = [
+    ('SMB share (WiFi)',   5),
+    ('SD card (class 10)', 20),
+    ('USB 2.0 stick',      30),
+    ('Hard disk',          100),
+    ('SATA SSD',           500),
+]
+NUM_REPETITIONS = 3
+COMPRESSION_LEVEL = 6
+COMPRESSION_METHODS = [
+    ('none', JSON_COMPRESSION_NONE),
+    ('zlib', JSON_COMPRESSION_ZLIB),
+    ('gzip', JSON_COMPRESSION_GZIP),
+    ('lzma', JSON_COMPRESSION_LZMA),
+]
+
+def make_render_db(num_machines):
+    manufacturers = ['Capcom', 'Konami', 'Namco', 'Sega', 'Taito', 'SNK', 'Irem', 'Data East']
+    genres = ['Shooter / Flying Vertical', 'Fighter / Versus', 'Platform / Run Jump', 'Sports / Soccer']
+    db = {}
+    for i in range(num_machines):
+        db['machine{:05d}'.format(i)] = {
+            'cloneof' : 'machine{:05d}'.format(i - 1) if i % 3 else '',
+            'isBIOS' : False,
+            'isDevice' : False,
+            'description' : 'Synthetic machine number {} (World, rev {})'.format(i, i % 7),
+            'year' : '19{}'.format(80 + i % 20),
+            'manufacturer' : random.choice(manufacturers),
+            'driver_status' : random.choice(['good', 'imperfect', 'preliminary']),
+            'isMature' : False,
+            'nplayers' : '2P alt',
+            'genre' : random.choice(genres),
+        }
+    return db
+
+# --- Main ----------------------------------------------------------------------------------------
+num_machines = int(sys.argv[1]) if len(sys.argv) > 1 else 40000
+print('Building synthetic render DB with {} machines...'.format(num_machines))
+render_db = make_render_db(num_machines)
+temp_dir = tempfile.mkdtemp()
+
+# File is read from the page cache here so the measured time is the CPU decoding time only.
+results = []
+for method, json_compression in COMPRESSION_METHODS:
+    if json_compression == JSON_COMPRESSION_LZMA and not UTILS_LZMA_AVAILABLE: continue
+    filename = os.path.join(temp_dir, 'MAME_renderdb_{}.json'.format(method))
+    utils_set_JSON_compression(json_compression, COMPRESSION_LEVEL)
+    utils_write_JSON_file(filename, render_db, verbose = False)
+    size_MB = os.path.getsize(filename) / 1e6
+    t_list = []
+    for i in range(NUM_REPETITIONS):
+        t_start = time.time()
+        utils_load_JSON_file_dic(filename, verbose = False)
+        t_list.append(time.time() - t_start)
+    results.append((method, size_MB, min(t_list)))
+    os.unlink(filename)
+os.rmdir(temp_dir)
+
+print('\n{:<6} {:>10} {:>12} {:>18}'.format('Method', 'Size (MB)', 'Decode (s)', 'Break-even (MB/s)'))
+_, plain_size, plain_t = results[0]
+for method, size_MB, decode_t in results:
+    if method == 'none':
+        break_even = '-'
+    elif decode_t <= plain_t:
+        break_even = 'always'
+    else:
+        break_even = '{:.1f}'.format((plain_size - size_MB) / (decode_t - plain_t))
+    print('{:<6} {:>10.2f} {:>12.4f} {:>18}'.format(method, size_MB, decode_t, break_even))
+
+print('\nEstimated load time (s) = size / throughput + decode time')
+header = '{:<20}'.format('Storage') + ''.join('{:>9}'.format(r[0]) for r in results)
+print(header)
+for storage_name, throughput in STORAGE_TYPES:
+    times = [size_MB / throughput + decode_t for _, size_MB, decode_t in results]
+    best = times.index(min(times))
+    row = '{:<20}'.format(storage_name)
+    for i, t in enumerate(times):
+        row += '{:>9}'.format('{:.3f}{}'.format(t, '*' if i == best else ' '))
+    print(row)
+print('(*) Fastest method for the storage type.')
@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# Benchmark of the plugin startup import time.
+#
+# Every run is a new Python interpreter, like every addon call in Kodi without the Python
+# invoker reuse. Measures the import time of resources.main, which imports only the modules
+# needed to render the listings, and the time to import the lazy loaded modules (mame, filters,
+# manuals with pdfrw and graphics with Pillow). The old startup imported all of them.
+# The Kodi modules are replaced by empty modules. Install Pillow to include it in the results.
+#
+# Usage: run from the dev-misc directory, benchmark_import_time.py [number_of_runs]
+
+# Copyright (c) 2020 Wintermute0110 <wintermute0110@gmail.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# --- Python standard library ---
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ADDON_DIR = os.path.abspath('..')
+LAZY_MODULES = ['mame', 'filters', 'manuals', 'graphics']
+
+# Code run in the child interpreter. Prints a JSON dictionary with the times in seconds.
+CHILD_CODE = '''
+import json, sys, time, types
+for m in ['xbmc', 'xbmcgui', 'xbmcplugin', 'xbmcaddon', 'xbmcvfs']:
+    sys.modules[m] = types.ModuleType(m)
+xbmc = sys.modules['xbmc']
+xbmc.log = lambda *args, **kwargs: None
+xbmc.executeJSONRPC = lambda query: '{"result" : {"version" : {"major" : 19}}}'
+xbmc.LOGDEBUG = xbmc.LOGINFO = xbmc.LOGWARNING = xbmc.LOGERROR = 0
+sys.modules['xbmcvfs'].translatePath = lambda path: path.replace('special://home/addons', ADDONS_DIR)
+class Addon(object):
+    def getAddonInfo(self, info): return 'plugin.program.AML'
+sys.modules['xbmcaddon'].Addon = Addon
+class WindowDialog(object): pass
+sys.modules['xbmcgui'].WindowDialog = WindowDialog
+sys.path.insert(0, ADDON_DIR)
+t_kodi = time.time()
+import resources.main
+t_main = time.time()
+loaded = sorted(m for m in sys.modules if m.startswith('resources.'))
+times = {}
+for module_name in LAZY_MODULES:
+    t = time.time()
+    resources.main.lazy_import_module(module_name)
+    times[module_name] = time.time() - t
+print(json.dumps({'main' : t_main - t_kodi, 'lazy' : times, 'loaded' : loaded,
+    'PIL' : 'PIL' in sys.modules}))
+'''
+
+def run_child(addons_dir):
+    code = 'ADDON_DIR = {!r}\nADDONS_DIR = {!r}\nLAZY_MODULES = {!r}\n'.format(
+        ADDON_DIR, addons_dir, LAZY_MODULES) + CHILD_CODE
+    output = subprocess.check_output([sys.executable, '-c', code])
+    return json.loads(output.decode('utf-8').strip().split('\n')[-1])
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+# --- Main ----------------------------------------------------------------------------------------
+num_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+# manuals.py loads pdfrw from special://home/addons/plugin.program.AML/pdfrw
+addons_dir = tempfile.mkdtemp()
+os.symlink(ADDON_DIR, os.path.join(addons_dir, 'plugin.program.AML'))
+
+# First run compiles the PYC files.
+result = run_child(addons_dir)
+print('Modules imported by resources.main: {}'.format(', '.join(result['loaded'])))
+print('Pillow available: {}'.format(result['PIL']))
+results = [run_child(addons_dir) for i in range(num_runs)]
+shutil.rmtree(addons_dir)
+
+t_main = median([r['main'] for r in results])
+t_lazy_dic = {m : median([r['lazy'][m] for r in results]) for m in LAZY_MODULES}
+t_old = t_main + sum(t_lazy_dic.values())
+print('\nImport time, median of {} runs'.format(num_runs))
+print('{:<40} {:>10}'.format('Modules', 'ms'))
+print('{:<40} {:>10.1f}'.format('resources.main (lazy loading)', t_main * 1000))
+for module_name in LAZY_MODULES:
+    print('{:<40} {:>10.1f}'.format('  on demand: ' + module_name, t_lazy_dic[module_name] * 1000))
+print('{:<40} {:>10.1f}'.format('All modules (old startup)', t_old * 1000))
+print('\nStartup speedup {:.1f}x'.format(t_old / t_main))
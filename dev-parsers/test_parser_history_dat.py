@@ -36,6 +36,8 @@ def misc_build_db_str_3(str1, str2, str3):
     return '{}|{}|{}'.format(str1, str2, str3)
 
 # --- BEGIN code in dev-parsers/test_parser_history_dat.py ----------------------------------------
+MAME_HISTORY_VERSION_RE = re.compile(r'## REVISION\: ([0-9\.]+)$')
+
 # Loads History.dat
 #
 # One description can be for several MAME machines:
@@ -83,7 +85,6 @@ def mame_load_History_DAT(filename):
     version_str = 'Not found'
     history_idx_dic = {}
     history_dic = {}
-    __debug_function = False
     line_number = 0
     num_header_line = 0
     # Due to syntax errors in History.dat m_data may have invalid data, for example
@@ -100,8 +101,8 @@ def mame_load_History_DAT(filename):
     # check if the data is OK before adding it to the index and the DB.
     # 0 -> Looking for '$info=machine_name_1,machine_name_2,' or '$SL_name=item_1,item_2,'
     #      If '$bio' found go to 1.
-    # 1 -> Reading information. If '$end' found go to 2.
-    # 2 -> Add information to database if no errors. Then go to 0.
+    # 1 -> Reading information. If '$end' found add information to database if no errors
+    #      and go to 0.
     read_status = 0
     try:
         f = io.open(filename, 'rt', encoding = 'utf-8')
@@ -111,120 +112,52 @@ def mame_load_History_DAT(filename):
     for file_line in f:
         line_number += 1
         line_uni = file_line.strip()
-        if __debug_function: log_debug('Line "{}"'.format(line_uni))
-        if read_status == 0:
+        if read_status == 1:
+            # Most lines in History.dat are biography lines.
+            if line_uni != '$end':
+                info_str_list.append(line_uni)
+                continue
+            read_status = 0
+            mame_history_add_entry(history_idx_dic, history_dic, m_data, info_str_list, line_number)
+            num_header_line = 0
+            m_data = []
+            continue
+        if not line_uni: continue
+        first_char = line_uni[0]
+        if first_char == '#':
             # Skip comments: lines starting with '##'
             # Look for version string in comments
-            if re.search(r'^##', line_uni):
-                m = re.search(r'## REVISION\: ([0-9\.]+)$', line_uni)
+            if line_uni.startswith('##'):
+                m = MAME_HISTORY_VERSION_RE.search(line_uni)
                 if m: version_str = m.group(1)
                 continue
-            if line_uni == '': continue
+        elif first_char == '$':
+            if line_uni == '$bio':
+                read_status = 1
+                info_str_list = []
+                continue
             # Machine list line
             # Parses lines like "$info=99lstwar,99lstwara,99lstwarb,"
             # Parses lines like "$info=99lstwar,99lstwara,99lstwarb"
             # History.dat has syntactic errors like "$dc=,".
             # History.dat has syntactic errors like "$megadriv=".
-            m = re.search(r'^\$(.+?)=(.*?),?$', line_uni)
-            if m:
+            eq_idx = line_uni.find('=', 2)
+            if eq_idx > 0:
                 num_header_line += 1
-                list_name = m.group(1)
-                machine_name_raw = m.group(2)
+                list_name = line_uni[1:eq_idx]
+                machine_name_raw = line_uni[eq_idx+1:]
+                if machine_name_raw and machine_name_raw[-1] == ',':
+                    machine_name_raw = machine_name_raw[:-1]
                 # Remove trailing ',' to fix history.dat syntactic errors like
                 # "$snes_bspack=bsfami,,"
                 if len(machine_name_raw) > 1 and machine_name_raw[-1] == ',':
                     machine_name_raw = machine_name_raw[:-1]
                 # Transform some special list names
                 if list_name in {'info', 'info,megatech', 'info,stv'}: list_name = 'mame'
-                mname_list = machine_name_raw.split(',')
-                m_data.append([num_header_line, list_name, mname_list])
+                m_data.append([num_header_line, list_name, machine_name_raw.split(',')])
                 continue
-            if line_uni == '$bio':
-                read_status = 1
-                info_str_list = []
-                continue
-            # If we reach this point it's an error.
-            raise TypeError('Wrong header "{}" (line {:,})'.format(line_uni, line_number))
-        elif read_status == 1:
-            if line_uni == '$end':
-                # Generate biography text.
-                bio_str = '\n'.join(info_str_list)
-                if bio_str[0] == '\n': bio_str = bio_str[1:]
-                if bio_str[-1] == '\n': bio_str = bio_str[:-1]
-
-                # Clean m_data of bad data due to History.dat syntax errors, for example
-                # empty machine names.
-                # clean_m_data = [
-                #     (list_name, [machine_name_1, machine_name_2, ...] ),
-                #     ...,
-                # ]
-                clean_m_data = []
-                for dtuple in m_data:
-                    line_num, list_name, mname_list = dtuple
-                    # If list_name is empty drop the full line
-                    if not list_name: continue
-                    # Clean empty machine names.
-                    clean_mname_list = []
-                    for machine_name in mname_list:
-                        # Skip bad/wrong machine names.
-                        if not machine_name: continue
-                        if machine_name == ',': continue
-                        clean_mname_list.append(machine_name)
-                    clean_m_data.append((list_name, clean_mname_list))
-
-                # Reset FSM status
-                read_status = 2
-                num_header_line = 0
-                m_data = []
-                info_str_list = []
-            else:
-                info_str_list.append(line_uni)
-        elif read_status == 2:
-            # Go to state 0 of the FSM.
-            read_status = 0
-
-            # Ignore machine if no valid data at all.
-            if len(clean_m_data) == 0:
-                log_warning('On History.dat line {:,}'.format(line_number))
-                log_warning('clean_m_data is empty.')
-                log_warning('Ignoring entry in History.dat database')
-                continue
-            # Ignore if empty list name.
-            if not clean_m_data[0][0]:
-                log_warning('On History.dat line {:,}'.format(line_number))
-                log_warning('clean_m_data empty list name.')
-                log_warning('Ignoring entry in History.dat database')
-                continue
-            # Ignore if empty machine list.
-            if not clean_m_data[0][1]:
-                log_warning('On History.dat line {:,}'.format(line_number))
-                log_warning('Empty machine name list.')
-                log_warning('db_list_name "{}"'.format(clean_m_data[0][0]))
-                log_warning('Ignoring entry in History.dat database')
-                continue
-            if not clean_m_data[0][1][0]:
-                log_warning('On History.dat line {:,}'.format(line_number))
-                log_warning('Empty machine name first element.')
-                log_warning('db_list_name "{}"'.format(clean_m_data[0][0]))
-                log_warning('Ignoring entry in History.dat database')
-                continue
-            db_list_name = clean_m_data[0][0]
-            db_machine_name = clean_m_data[0][1][0]
-
-            # Add list and machine names to index database.
-            for dtuple in clean_m_data:
-                list_name, machine_name_list = dtuple
-                if list_name not in history_idx_dic:
-                    history_idx_dic[list_name] = {'name' : list_name, 'machines' : {}}
-                for machine_name in machine_name_list:
-                    m_str = misc_build_db_str_3(machine_name, db_list_name, db_machine_name)
-                    history_idx_dic[list_name]['machines'][machine_name] = m_str
-
-            # Add biography string to main database.
-            if db_list_name not in history_dic: history_dic[db_list_name] = {}
-            history_dic[db_list_name][db_machine_name] = bio_str
-        else:
-            raise TypeError('Wrong read_status = {} (line {:,})'.format(read_status, line_number))
+        # If we reach this point it's an error.
+        raise TypeError('Wrong header "{}" (line {:,})'.format(line_uni, line_number))
     # Close file
     f.close()
     log_info('mame_load_History_DAT() Version "{}"'.format(version_str))
@@ -232,6 +165,55 @@ def mame_load_History_DAT(filename):
     log_info('mame_load_History_DAT() Rows in history_dic {}'.format(len(history_dic)))
 
     return (history_idx_dic, history_dic, version_str)
+
+# Adds a History.dat entry to the index and the database once the '$end' line is found.
+def mame_history_add_entry(history_idx_dic, history_dic, m_data, info_str_list, line_number):
+    # Generate biography text.
+    bio_str = '\n'.join(info_str_list)
+    if bio_str and bio_str[0] == '\n': bio_str = bio_str[1:]
+    if bio_str and bio_str[-1] == '\n': bio_str = bio_str[:-1]
+
+    # Clean m_data of bad data due to History.dat syntax errors, for example
+    # empty machine names.
+    # clean_m_data = [
+    #     (list_name, [machine_name_1, machine_name_2, ...] ),
+    #     ...,
+    # ]
+    clean_m_data = []
+    for line_num, list_name, mname_list in m_data:
+        # If list_name is empty drop the full line
+        if not list_name: continue
+        # Clean empty machine names.
+        clean_mname_list = [m_name for m_name in mname_list if m_name and m_name != ',']
+        clean_m_data.append((list_name, clean_mname_list))
+
+    # Ignore machine if no valid data at all.
+    if len(clean_m_data) == 0:
+        log_warning('On History.dat line {:,}'.format(line_number))
+        log_warning('clean_m_data is empty.')
+        log_warning('Ignoring entry in History.dat database')
+        return
+    # Ignore if empty machine list.
+    if not clean_m_data[0][1]:
+        log_warning('On History.dat line {:,}'.format(line_number))
+        log_warning('Empty machine name list.')
+        log_warning('db_list_name "{}"'.format(clean_m_data[0][0]))
+        log_warning('Ignoring entry in History.dat database')
+        return
+    db_list_name = clean_m_data[0][0]
+    db_machine_name = clean_m_data[0][1][0]
+
+    # Add list and machine names to index database.
+    for list_name, machine_name_list in clean_m_data:
+        if list_name not in history_idx_dic:
+            history_idx_dic[list_name] = {'name' : list_name, 'machines' : {}}
+        idx_machines = history_idx_dic[list_name]['machines']
+        for machine_name in machine_name_list:
+            idx_machines[machine_name] = misc_build_db_str_3(machine_name, db_list_name, db_machine_name)
+
+    # Add biography string to main database.
+    if db_list_name not in history_dic: history_dic[db_list_name] = {}
+    history_dic[db_list_name][db_machine_name] = bio_str
 # --- END code in dev-parsers/test_parser_history_dat.py ------------------------------------------
 
 # --- main code -----------------------------------------------------------------------------------
@@ -13,6 +13,8 @@ def log_info(str): print(str)
 def log_debug(str): print(str)
 
 # --- BEGIN code in dev-parsers/test_parser_mameinfo_dat.py ---------------------------------------
+MAME_MAMEINFO_VERSION_RE = re.compile(r'# MAMEINFO.DAT v([0-9\.]+)')
+
 # mameinfo.dat has information for both MAME machines and MAME drivers.
 #
 # idx_dic  = { 
@@ -44,7 +46,6 @@ def mame_load_MameInfo_DAT(filename):
         'drv' : {},
     }
     data_dic = {}
-    __debug_function = False
     line_counter = 0
 
     # --- read_status FSM values ---
@@ -61,23 +62,25 @@ def mame_load_MameInfo_DAT(filename):
     for file_line in f:
         line_counter += 1
         line_uni = file_line.strip()
-        # if __debug_function: log_debug('Line "{}"'.format(line_uni))
-        if read_status == 0:
+        if read_status == 2:
+            if line_uni == '$end':
+                if list_name not in data_dic: data_dic[list_name] = {}
+                data_dic[list_name][machine_name] = '\n'.join(info_str_list).strip()
+                read_status = 0
+            else:
+                info_str_list.append(line_uni)
+        elif read_status == 0:
+            if not line_uni: continue
             # Skip comments: lines starting with '#'
             # Look for version string in comments
-            if re.search(r'^#', line_uni):
-                m = re.search(r'# MAMEINFO.DAT v([0-9\.]+)', line_uni)
+            if line_uni[0] == '#':
+                m = MAME_MAMEINFO_VERSION_RE.search(line_uni)
                 if m: version_str = m.group(1)
-                continue
-            if line_uni == '': continue
             # New machine or driver information
-            m = re.search(r'^\$info=(.+?)$', line_uni)
-            if m:
-                machine_name = m.group(1)
-                if __debug_function: log_debug('Machine "{}"'.format(machine_name))
+            elif line_uni.startswith('$info=') and len(line_uni) > 6:
+                machine_name = line_uni[6:]
                 read_status = 1
         elif read_status == 1:
-            if __debug_function: log_debug('Second line "{}"'.format(line_uni))
             if line_uni == '$mame':
                 read_status = 2
                 info_str_list = []
@@ -93,13 +96,6 @@ def mame_load_MameInfo_DAT(filename):
                 continue
             else:
                 raise TypeError('Wrong second line = "{}" (line {:,})'.format(line_uni, line_counter))
-        elif read_status == 2:
-            if line_uni == '$end':
-                if list_name not in data_dic: data_dic[list_name] = {}
-                data_dic[list_name][machine_name] = '\n'.join(info_str_list).strip()
-                read_status = 0
-            else:
-                info_str_list.append(line_uni)
         else:
             raise TypeError('Wrong read_status = {} (line {:,})'.format(read_status, line_counter))
     f.close()
@@ -9,11 +9,20 @@ parses the top-level container objects.  (It does not parse
 into streams.)  The object subclasses PdfDict, and the
 document pages are stored in a list in the pages attribute
 of the object.
+
+With lazy=True the pages and the objects inside compressed
+object streams are only parsed when they are first accessed,
+so opening a file only parses the cross-reference sections.
+On Python 2 the file is also memory mapped instead of read
+into memory, so only the parts of the file used by the
+accessed objects are read.  (On Python 3 the file data must
+be a decoded string, so it is still read into memory.)
 '''
 import gc
 import binascii
 import collections
 import itertools
+import mmap
 
 from .errors import PdfParseError, log
 from .tokens import PdfTokens
@@ -22,6 +31,87 @@ from .uncompress import uncompress
 from . import crypt
 from .py23_diffs import convert_load, convert_store, iteritems
 
+# mmap objects can stand in for the file data string only when
+# the data is not decoded (Python 2).
+MMAP_COMPATIBLE = isinstance('', bytes)
+
+
+class PdfLazyPages(object):
+    ''' Page list of a PdfReader in lazy mode.  A page is found
+        in the page tree when it is first accessed, using the
+        /Count of the /Pages nodes to skip the subtrees before it,
+        so only the kids before the page on the path to the page
+        are loaded.  The /Count of a node cannot be used to index
+        its /Kids directly because a kid may be a /Pages node with
+        any number of pages, even zero.
+        If the page tree is broken the whole tree is read with
+        PdfReader.readpages().
+    '''
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.pages = {}
+        self.pagelist = None
+        try:
+            self.count = int(reader.Root.Pages.Count)
+        except (AttributeError, TypeError, ValueError):
+            self.readall()
+
+    def readall(self):
+        log.warning('Invalid /Count in page tree, reading all pages')
+        self.pagelist = self.reader.readpages(self.reader.Root)
+        self.count = len(self.pagelist)
+
+    def findpage(self, index, listget=list.__getitem__):
+        pagesname = PdfName.Pages
+        pagename = PdfName.Page
+        node = self.reader.Root.Pages
+        while node.Type == pagesname:
+            kids = node.Kids
+            # Do not resolve the kids after the page.
+            for kid_index in range(len(kids)):
+                kid = listget(kids, kid_index)
+                if isinstance(kid, PdfIndirect):
+                    kid = kid.real_value()
+                if kid.Type == pagename:
+                    kidcount = 1
+                else:
+                    kidcount = int(kid.Count)
+                if index < kidcount:
+                    break
+                index -= kidcount
+            else:
+                raise IndexError
+            node = kid
+        if node.Type != pagename:
+            raise TypeError
+        return node
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError('page index out of range')
+        if self.pagelist is not None:
+            return self.pagelist[index]
+        page = self.pages.get(index)
+        if page is None:
+            try:
+                page = self.pages[index] = self.findpage(index)
+            except (AttributeError, TypeError, ValueError, IndexError):
+                self.readall()
+                return self[index]
+        return page
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
 
 class PdfReader(PdfDict):
 
@@ -183,6 +273,16 @@ class PdfReader(PdfDict):
         if not isinstance(result, PdfIndirect):
             return result
         source = self.source
+        objstm_num = self.compressed_objects.get(key)
+        if objstm_num is not None:
+            self.load_stream_objects([objstm_num],
+                                     self.compressed_objects)
+            result = self.indirect_objects.get(key)
+            if not isinstance(result, PdfIndirect):
+                return result
+            source.warning("Did not find PDF object %s in object "
+                           "stream %s", key, objstm_num)
+            return None
         offset = int(self.source.obj_offsets.get(key, '0'))
         if not offset:
             source.warning("Did not find PDF object %s", key)
@@ -279,7 +379,11 @@ class PdfReader(PdfDict):
 
         uncompress(self.indirect_objects.values())
 
-    def load_stream_objects(self, object_streams):
+    def load_stream_objects(self, object_streams, only=None):
+        ''' Read the objects in the object streams.  If only
+            is given, read just the objects it maps to the
+            object stream they are read from.
+        '''
         # read object streams
         objs = []
         for num in object_streams:
@@ -305,6 +409,9 @@ class PdfReader(PdfDict):
                 while objsource.floc < firstoffset:
                     offsets.append((int(next()), firstoffset + int(next())))
                 for num, offset in offsets:
+                    if only is not None and \
+                            only.get((num, 0)) != obj.indirect[0]:
+                        continue
                     # Read the object, and call special code if it starts
                     # an array or dictionary
                     objsource.floc = offset
@@ -317,11 +424,27 @@ class PdfReader(PdfDict):
                     self.indirect_objects[key] = sobj
                     if key in self.deferred_objects:
                         self.deferred_objects.remove(key)
+                    if only is not None:
+                        del only[key]
 
                     # Mark the object as indirect, and
                     # add it to the list of streams if it starts a stream
                     sobj.indirect = key
 
+    def defer_stream_objects(self, object_streams, obj_offsets):
+        ''' Lazy mode: remember the object stream of every
+            compressed object instead of reading the streams.
+            Objects in newer sections replace the old ones.
+        '''
+        compressed = self.compressed_objects
+        for key in obj_offsets:
+            compressed.pop(key, None)
+        for num, objlist in iteritems(object_streams):
+            for objnum, index in objlist:
+                key = objnum, 0
+                compressed[key] = num
+                self.source.obj_offsets.pop(key, None)
+
     def findxref(self, fdata):
         ''' Find the cross reference section at the end of a file
         '''
@@ -422,7 +545,9 @@ class PdfReader(PdfDict):
         try:
             # Table formatted incorrectly.
             # See if we can figure it out anyway.
-            end = source.fdata.rindex('trailer', start)
+            end = source.fdata.rfind('trailer', start)
+            if end < 0:
+                raise ValueError
             table = source.fdata[start:end].splitlines()
             for line in table:
                 tokens = line.split()
@@ -549,7 +674,8 @@ class PdfReader(PdfDict):
                 'Unsupported Encrypt version: {}'.format(version))
 
     def __init__(self, fname=None, fdata=None, decompress=False,
-                 decrypt=False, password='', disable_gc=True, verbose=True):
+                 decrypt=False, password='', disable_gc=True, verbose=True,
+                 lazy=False):
         self.private.verbose = verbose
 
         # Runs a lot faster with GC off.
@@ -566,7 +692,15 @@ class PdfReader(PdfDict):
                 else:
                     try:
                         f = open(fname, 'rb')
-                        fdata = f.read()
+                        if lazy and MMAP_COMPATIBLE:
+                            try:
+                                fdata = mmap.mmap(f.fileno(), 0,
+                                                  access=mmap.ACCESS_READ)
+                            except (ValueError, EnvironmentError):
+                                # Empty file or mmap not supported
+                                fdata = f.read()
+                        else:
+                            fdata = f.read()
                         f.close()
                     except IOError:
                         raise PdfParseError('Could not read PDF file %s' %
@@ -575,12 +709,12 @@ class PdfReader(PdfDict):
             assert fdata is not None
             fdata = convert_load(fdata)
 
-            if not fdata.startswith('%PDF-'):
+            if fdata[:5] != '%PDF-':
                 startloc = fdata.find('%PDF-')
                 if startloc >= 0:
                     log.warning('PDF header not at beginning of file')
                 else:
-                    lines = fdata.lstrip().splitlines()
+                    lines = fdata[:].lstrip().splitlines()
                     if not lines:
                         raise PdfParseError('Empty PDF file!')
                     raise PdfParseError('Invalid PDF header: %s' %
@@ -594,13 +728,16 @@ class PdfReader(PdfDict):
                                     repr(fdata[-20:]))
             endloc += 6
             junk = fdata[endloc:]
-            fdata = fdata[:endloc]
+            if junk:
+                # Copies a memory mapped file, but that is rare.
+                fdata = fdata[:endloc]
             if junk.rstrip('\00').strip():
                 log.warning('Extra data at end of file')
 
             private = self.private
             private.indirect_objects = {}
             private.deferred_objects = set()
+            private.compressed_objects = {}
             private.special = {'<<': self.readdict,
                                '[': self.readarray,
                                'endobj': self.empty_obj,
@@ -644,15 +781,26 @@ class PdfReader(PdfDict):
 
                 self._parse_encrypt_info(source, password, trailer)
 
+            # In lazy mode the newer sections must be recorded before
+            # trailer.update() resolves the objects of the trailer.
             if is_stream:
-                self.load_stream_objects(trailer.object_streams)
+                if lazy:
+                    self.defer_stream_objects(trailer.object_streams, {})
+                else:
+                    self.load_stream_objects(trailer.object_streams)
 
             while xref_list:
                 later_offsets, later_trailer, is_stream = xref_list.pop()
                 source.obj_offsets.update(later_offsets)
+                if lazy:
+                    self.defer_stream_objects(
+                        later_trailer.object_streams if is_stream else {},
+                        later_offsets)
                 if is_stream:
                     trailer.update(later_trailer)
-                    self.load_stream_objects(later_trailer.object_streams)
+                    if not lazy:
+                        self.load_stream_objects(
+                            later_trailer.object_streams)
                 else:
                     trailer = later_trailer
 
@@ -676,7 +824,10 @@ class PdfReader(PdfDict):
                 self.update(trailer)
 
             # self.read_all_indirect(source)
-            private.pages = self.readpages(self.Root)
+            if lazy:
+                private.pages = PdfLazyPages(self)
+            else:
+                private.pages = self.readpages(self.Root)
             if decompress:
                 self.uncompress()
 
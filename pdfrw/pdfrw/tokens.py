@@ -19,6 +19,8 @@ from .py23_diffs import nextattr, intern
 
 
 def linepos(fdata, loc):
+    # Memory mapped files do not have count()
+    fdata = fdata[:loc]
     line = fdata.count('\n', 0, loc) + 1
     line += fdata.count('\r', 0, loc) - fdata.count('\r\n', 0, loc)
     col = loc - max(fdata.rfind('\n', 0, loc), fdata.rfind('\r', 0, loc))
@@ -11,11 +11,14 @@ I believe, after looking at the code, that portions of the flate
 PNG predictor were originally transcribed from PyPDF2, which is
 probably an excellent source of additional filters.
 '''
-import array
+import binascii
 from .objects import PdfDict, PdfName, PdfArray
 from .errors import log
-from .py23_diffs import zlib, xrange, from_array, convert_load, convert_store
-import math
+from .py23_diffs import zlib, xrange, convert_load, convert_store
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 def streamobjects(mylist, isinstance=isinstance, PdfDict=PdfDict):
     for obj in mylist:
@@ -81,98 +84,163 @@ def uncompress(mylist, leave_raw=False, warnings=set(),
                 ok = False
     return ok
 
-def flate_png_impl(data, predictor=1, columns=1, colors=1, bpc=8):
+# Row decoders for the PNG predictors.  Each function receives the
+# filtered row and the previous reconstructed row as bytearrays
+# and returns the reconstructed row.
+#
+# http://www.libpng.org/pub/png/spec/1.2/PNG-Filters.html
+# https://www.w3.org/TR/2003/REC-PNG-20031110/#9Filters
+# Reconstruction functions
+# x: the byte being filtered;
+# a: the byte corresponding to x in the pixel immediately before the pixel containing x (or the byte immediately before x, when the bit depth is less than 8);
+# b: the byte corresponding to x in the previous scanline;
+# c: the byte corresponding to b in the pixel immediately before the pixel containing b (or the byte immediately before b, when the bit depth is less than 8).
+#
+# Sub and Up only depend on bytes of the filtered row or the previous
+# row, so whole rows are decoded at once with NumPy if available, or
+# else with bytewise additions on Python integers (every byte of the
+# row is a digit of the integer and the carries are masked out).
 
-    # http://www.libpng.org/pub/png/spec/1.2/PNG-Filters.html
-    # https://www.w3.org/TR/2003/REC-PNG-20031110/#9Filters
-    # Reconstruction functions
-    # x: the byte being filtered;
-    # a: the byte corresponding to x in the pixel immediately before the pixel containing x (or the byte immediately before x, when the bit depth is less than 8);
-    # b: the byte corresponding to x in the previous scanline;
-    # c: the byte corresponding to b in the pixel immediately before the pixel containing b (or the byte immediately before b, when the bit depth is less than 8).
-
-    def subfilter(data, prior_row_data, start, length, pixel_size):
-        # filter type 1: Sub
-        # Recon(x) = Filt(x) + Recon(a)
-        for i in xrange(pixel_size, length):
-            left = data[start + i - pixel_size]
-            data[start + i] = (data[start + i] + left) % 256
-
-    def upfilter(data, prior_row_data, start, length, pixel_size):
-        # filter type 2: Up
-        # Recon(x) = Filt(x) + Recon(b)
-        for i in xrange(length):
-            up = prior_row_data[i]
-            data[start + i] = (data[start + i] + up) % 256
-
-    def avgfilter(data, prior_row_data, start, length, pixel_size):
-        # filter type 3: Avg
-        # Recon(x) = Filt(x) + floor((Recon(a) + Recon(b)) / 2)
-        for i in xrange(length):
-            left = data[start + i - pixel_size] if i >= pixel_size else 0
-            up = prior_row_data[i]
-            floor = math.floor((left + up) / 2)
-            data[start + i] = (data[start + i] + int(floor)) % 256
-
-    def paethfilter(data, prior_row_data, start, length, pixel_size):
-        # filter type 4: Paeth
-        # Recon(x) = Filt(x) + PaethPredictor(Recon(a), Recon(b), Recon(c))
-        def paeth_predictor(a, b, c):
-            p = a + b - c
-            pa = abs(p - a)
-            pb = abs(p - b)
-            pc = abs(p - c)
-            if pa <= pb and pa <= pc:
-                return a
-            elif pb <= pc:
-                return b
-            else:
-                return c
-        for i in xrange(length):
-            left = data[start + i - pixel_size] if i >= pixel_size else 0
-            up = prior_row_data[i]
-            up_left = prior_row_data[i - pixel_size] if i >= pixel_size else 0
-            data[start + i] = (data[start + i] + paeth_predictor(left, up, up_left)) % 256
+def _row_to_int(row, hexlify=binascii.hexlify):
+    return int(hexlify(row), 16) if row else 0
 
-    columnbytes = ((columns * colors * bpc) + 7) // 8
-    pixel_size = (colors * bpc + 7) // 8
-    data = array.array('B', data)
-    rowlen = columnbytes + 1
-    if predictor == 15:
-        padding = (rowlen - len(data)) % rowlen
-        data.extend([0] * padding)
-    assert len(data) % rowlen == 0
+def _int_to_row(value, length, unhexlify=binascii.unhexlify):
+    if not length:
+        return bytearray()
+    return bytearray(unhexlify(('%0*x' % (2 * length, value)).encode('ascii')))
+
+def _add_bytes(x, y, low7, high1):
+    # Adds every byte of x and y modulo 256.
+    return ((x & low7) + (y & low7)) ^ ((x ^ y) & high1)
 
-    rows = xrange(0, len(data), rowlen)
-    prior_row_data = [ 0 for i in xrange(columnbytes) ]
-    for row_index in rows:
+def _byte_masks(length):
+    return _row_to_int(b'\x7f' * length), _row_to_int(b'\x80' * length)
 
-        filter_type = data[row_index]
+def subfilter_int(row, prior_row, pixel_size):
+    # filter type 1: Sub
+    # Recon(x) = Filt(x) + Recon(a)
+    # Prefix sum of the bytes pixel_size apart, doubling the
+    # distance of the added bytes on every step.
+    length = len(row)
+    low7, high1 = _byte_masks(length)
+    x = _row_to_int(row)
+    shift = 8 * pixel_size
+    while shift < 8 * length:
+        x = _add_bytes(x, x >> shift, low7, high1)
+        shift *= 2
+    return _int_to_row(x, length)
 
-        if filter_type == 0: # None filter
-            pass
+def upfilter_int(row, prior_row, pixel_size):
+    # filter type 2: Up
+    # Recon(x) = Filt(x) + Recon(b)
+    length = len(row)
+    low7, high1 = _byte_masks(length)
+    x = _add_bytes(_row_to_int(row), _row_to_int(prior_row), low7, high1)
+    return _int_to_row(x, length)
 
-        elif filter_type == 1: # Sub filter
-            subfilter(data, prior_row_data, row_index + 1, columnbytes, pixel_size)
+def subfilter_numpy(row, prior_row, pixel_size):
+    # filter type 1: Sub
+    # Cumulative sum of every byte of the pixels, modulo 256.
+    length = len(row)
+    padding = -length % pixel_size
+    pixels = numpy.frombuffer(bytes(row + bytearray(padding)), numpy.uint8)
+    pixels = pixels.reshape(-1, pixel_size).cumsum(axis=0, dtype=numpy.uint8)
+    return bytearray(pixels.tobytes()[:length])
 
-        elif filter_type == 2: # Up filter
-            upfilter(data, prior_row_data, row_index + 1, columnbytes, pixel_size)
+def upfilter_numpy(row, prior_row, pixel_size):
+    # filter type 2: Up
+    x = numpy.frombuffer(bytes(row), numpy.uint8)
+    x = x + numpy.frombuffer(bytes(prior_row), numpy.uint8)
+    return bytearray(x.tobytes())
 
-        elif filter_type == 3: # Average filter
-            avgfilter(data, prior_row_data, row_index + 1, columnbytes, pixel_size)
+if numpy is None:
+    subfilter, upfilter = subfilter_int, upfilter_int
+else:
+    subfilter, upfilter = subfilter_numpy, upfilter_numpy
 
-        elif filter_type == 4: # Paeth filter
-            paethfilter(data, prior_row_data, row_index + 1, columnbytes, pixel_size)
+def avgfilter(row, prior_row, pixel_size):
+    # filter type 3: Avg
+    # Recon(x) = Filt(x) + floor((Recon(a) + Recon(b)) / 2)
+    for i in xrange(min(pixel_size, len(row))):
+        row[i] = (row[i] + (prior_row[i] >> 1)) & 255
+    for i in xrange(pixel_size, len(row)):
+        row[i] = (row[i] + ((row[i - pixel_size] + prior_row[i]) >> 1)) & 255
+    return row
 
+def paethfilter(row, prior_row, pixel_size):
+    # filter type 4: Paeth
+    # Recon(x) = Filt(x) + PaethPredictor(Recon(a), Recon(b), Recon(c))
+    # The predictor is inlined, with p = a + b - c.  Without a
+    # pixel to the left a = c = 0 and the predictor is b.
+    for i in xrange(min(pixel_size, len(row))):
+        row[i] = (row[i] + prior_row[i]) & 255
+    for i in xrange(pixel_size, len(row)):
+        a = row[i - pixel_size]
+        b = prior_row[i]
+        c = prior_row[i - pixel_size]
+        pa = abs(b - c)
+        pb = abs(a - c)
+        pc = abs(a + b - c - c)
+        if pa <= pb and pa <= pc:
+            row[i] = (row[i] + a) & 255
+        elif pb <= pc:
+            row[i] = (row[i] + b) & 255
         else:
-            return None, 'Unsupported PNG filter %d' % filter_type
+            row[i] = (row[i] + c) & 255
+    return row
 
-        prior_row_data = data[row_index + 1 : row_index + 1 + columnbytes] # without filter_type
+png_filters = {1: subfilter, 2: upfilter, 3: avgfilter, 4: paethfilter}
 
-    for row_index in reversed(rows):
-        data.pop(row_index)
+def flate_png_impl(data, predictor=1, columns=1, colors=1, bpc=8):
+    ''' Undo the PNG predictors row by row.  Returns the data
+        without the filter type bytes as a bytearray, and an
+        error string or None.
+    '''
+    columnbytes = ((columns * colors * bpc) + 7) // 8
+    pixel_size = (colors * bpc + 7) // 8
+    data = bytearray(data)
+    rowlen = columnbytes + 1
+    if predictor == 15:
+        padding = (rowlen - len(data)) % rowlen
+        data.extend(bytearray(padding))
+    assert len(data) % rowlen == 0
+
+    # Consecutive rows with no filter or with the Up filter are
+    # decoded together.  A run of Up rows is the prefix sum of the
+    # rows, starting with the previous row, which is the Sub
+    # filter with the row length as the pixel size.  Xref streams
+    # usually have narrow rows with the Up filter.
+    filter_types = data[::rowlen]
+    num_rows = len(filter_types)
+    result = bytearray()
+    prior_row_data = bytearray(columnbytes)
+    row_index = 0
+    while row_index < num_rows:
+        filter_type = filter_types[row_index]
+        if filter_type in (0, 2) and columnbytes:
+            end_index = row_index + 1
+            while (end_index < num_rows and
+                   filter_types[end_index] == filter_type):
+                end_index += 1
+            run_data = data[row_index * rowlen:end_index * rowlen]
+            del run_data[::rowlen]
+            if filter_type == 2:
+                run_data = png_filters[1](prior_row_data + run_data, None,
+                                          columnbytes)[columnbytes:]
+            result += run_data
+            prior_row_data = run_data[-columnbytes:]
+            row_index = end_index
+            continue
+        png_filter = png_filters.get(filter_type)
+        if png_filter is None:
+            return None, 'Unsupported PNG filter %d' % filter_type
+        start = row_index * rowlen + 1
+        row_data = data[start:start + columnbytes]
+        prior_row_data = png_filter(row_data, prior_row_data, pixel_size)
+        result += prior_row_data
+        row_index += 1
 
-    return data, None
+    return result, None
 
 def flate_png(data, predictor=1, columns=1, colors=1, bpc=8):
     ''' PNG prediction is used to make certain kinds of data
@@ -189,6 +257,6 @@ def flate_png(data, predictor=1, columns=1, colors=1, bpc=8):
     '''
     d, e = flate_png_impl(data, predictor, columns, colors, bpc)
     if d is not None:
-        d = from_array(d)
+        d = bytes(d)
     return d, e
 
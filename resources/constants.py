@@ -180,6 +180,7 @@ COLOR_MAME_CUSTOM_FILTERS = '[COLOR darkgray]'
 COLOR_AEL_ROLS = '[COLOR blue]'
 COLOR_MAME_SPECIAL = '[COLOR silver]'
 COLOR_SL_SPECIAL = '[COLOR gold]'
+COLOR_SEARCH = '[COLOR lightskyblue]'
 COLOR_UTILITIES = '[COLOR limegreen]'
 COLOR_GLOBAL_REPORTS = '[COLOR darkorange]'
 COLOR_DEFAULT = '[COLOR white]'
@@ -21,6 +21,7 @@ from .constants import *
 from .utils import *
 
 # --- Python standard library ---
+import bisect
 import copy
 import hashlib
 import io
@@ -138,6 +139,8 @@ def db_new_machine_render_dic():
         # Genre used in AML for the skin
         # Taken from Genre.ini or Catver.ini or Catlist.ini
         'genre'          : '',
+        # Compact data used to generate the plot when rendering, see mame_MAME_plot_facts()
+        'plot_facts'     : [],
     }
 
 #
@@ -211,6 +214,9 @@ ASSET_MAME_T_LIST  = [
     ('trailer',    'videosnaps'),
 ]
 
+# Fields of the MAME asset DB that store file paths. Used in the schema-based JSON tables.
+ASSET_MAME_PATH_FIELDS = [asset_tuple[0] for asset_tuple in ASSET_MAME_T_LIST]
+
 #
 # flags -> ROM, CHD, Samples, SoftwareLists, Pluggable Devices
 #
@@ -240,12 +246,22 @@ def db_new_MAME_asset():
         'manual'     : '',
         'marquee'    : '',
         'PCB'        : '',
-        'plot'       : '',
         'snap'       : '',
         'title'      : '',
         'trailer'    : '',
     }
 
+#
+# MAME_renderdb.json, MAME_assetdb.json and the render/asset caches are stored as schema-based
+# JSON tables (see JSON_Table in utils.py). Rows are still dictionaries created with
+# db_new_machine_render_dic() and db_new_MAME_asset().
+#
+def db_new_render_table(renderdb_dic):
+    return JSON_Table.from_dict(renderdb_dic)
+
+def db_new_asset_table(assetdb_dic):
+    return JSON_Table.from_dict(assetdb_dic, ASSET_MAME_PATH_FIELDS)
+
 # Status flags meaning:
 #   ?  SL ROM not scanned
 #   r  Missing ROM
@@ -261,7 +277,7 @@ def db_new_SL_ROM():
         'description' : '',
         'year'        : '',
         'publisher'   : '',
-        'plot'        : '', # Generated from other fields
+        'plot_facts'  : [0, 0, False], # Number of ROMs, number of disks, has History
         'cloneof'     : '',
         'parts'       : [],
         'hasROMs'     : False,
@@ -338,7 +354,6 @@ def db_new_control_dic():
         't_MAME_Catalog_build' : 0.0,
         't_MAME_ROMs_scan' : 0.0,
         't_MAME_assets_scan' : 0.0,
-        't_MAME_plots_build' : 0.0,
         't_MAME_fanart_build' : 0.0,
         't_MAME_3dbox_build' : 0.0,
         't_MAME_machine_hash' : 0.0,
@@ -349,7 +364,6 @@ def db_new_control_dic():
         't_SL_DB_build' : 0.0,
         't_SL_ROMs_scan' : 0.0,
         't_SL_assets_scan' : 0.0,
-        't_SL_plots_build' : 0.0,
         't_SL_fanart_build' : 0.0,
         't_SL_3dbox_build' : 0.0,
         # Misc
@@ -818,6 +832,10 @@ def db_get_cataloged_dic_all(cfg, catalog_name):
 
     return catalog_dic
 
+# Sorted machine order of the catalog categories. See mame_catalog_order_builder().
+def db_get_catalog_order_FN(cfg, catalog_name):
+    return cfg.CATALOG_DIR.pjoin('catalog_{}_order.pack'.format(catalog_name))
+
 #
 # Locates object index in a list of dictionaries by 'name' field.
 # Returns -1 if object cannot be found. Uses a linear search (slow!).
@@ -1026,6 +1044,92 @@ def db_get_machine_assets_hashed_db(cfg, machine_name):
 
     return hashed_db_dic[machine_name]
 
+#
+# Retrieves several machines from the distributed hashed database. Machines are grouped by
+# hashed file so every file is loaded only once. This is much faster than loading the full
+# databases when a few dozen machines are needed, for example to update the Favourites.
+# db_suffix is '_machines.json' (main and render data) or '_assets.json'.
+# Returns a dictionary { machine_name : machine_dic }. Machines not found are not included.
+#
+def db_get_machines_hashed_db(cfg, machine_name_list, db_suffix):
+    log_debug('db_get_machines_hashed_db() {} machines, DB suffix {}'.format(
+        len(machine_name_list), db_suffix))
+    db_prefix_dic = {}
+    for machine_name in machine_name_list:
+        md5_str = hashlib.md5(machine_name.encode('utf-8')).hexdigest()
+        db_prefix_dic.setdefault(md5_str[0:2], []).append(machine_name)
+    machines_dic = {}
+    for db_prefix in sorted(db_prefix_dic):
+        hash_DB_FN = cfg.MAIN_DB_HASH_DIR.pjoin(db_prefix + db_suffix)
+        hashed_db_dic = utils_load_JSON_file_dic(hash_DB_FN.getPath(), verbose = False)
+        for machine_name in db_prefix_dic[db_prefix]:
+            if machine_name in hashed_db_dic:
+                machines_dic[machine_name] = hashed_db_dic[machine_name]
+    log_debug('db_get_machines_hashed_db() Loaded {} hashed files'.format(len(db_prefix_dic)))
+
+    return machines_dic
+
+# -------------------------------------------------------------------------------------------------
+# Search index
+# Inverted index used to search MAME machines and SL items. Tokens are stored sorted so
+# prefixes are searched with a binary search on the token list. Every token has a posting list
+# with the positions of the items in the item list, delta encoded to keep the file small.
+# Posting lists are stored as strings because JSON decodes one string much faster than a list
+# of integers and only the posting lists of the searched tokens are decoded.
+#
+# search_index_dic = {
+#     'items'    : [ item_key, ... ],     Machine names or 'SL_name/ROM_name' strings.
+#     'tokens'   : [ token, ... ],        Sorted.
+#     'postings' : [ 'id,delta,...', ... ],
+# }
+# -------------------------------------------------------------------------------------------------
+SEARCH_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+def db_search_tokenize(text):
+    return SEARCH_TOKEN_RE.findall(text.lower())
+
+# item_list is a list of tuples (item_key, [ field_string, ... ]).
+def db_build_search_index(item_list):
+    postings_dic = {}
+    for item_id, (item_key, field_list) in enumerate(item_list):
+        for field_str in field_list:
+            for token in db_search_tokenize(field_str):
+                id_list = postings_dic.setdefault(token, [])
+                # Items are processed in order so duplicated ids are always at the end.
+                if not id_list or id_list[-1] != item_id: id_list.append(item_id)
+    search_index_dic = {
+        'items' : [item_key for item_key, field_list in item_list],
+        'tokens' : sorted(postings_dic),
+        'postings' : [],
+    }
+    for token in search_index_dic['tokens']:
+        id_list = postings_dic[token]
+        delta_list = [id_list[0]] + [id_list[i] - id_list[i-1] for i in range(1, len(id_list))]
+        search_index_dic['postings'].append(','.join([text_type(delta) for delta in delta_list]))
+
+    return search_index_dic
+
+# Returns the list of items that match all the words in the query. Every word in the query
+# matches the tokens starting with that word.
+def db_search_index_query(search_index_dic, query_str):
+    tokens = search_index_dic['tokens']
+    postings = search_index_dic['postings']
+    result_set = None
+    for word in db_search_tokenize(query_str):
+        word_set = set()
+        token_idx = bisect.bisect_left(tokens, word)
+        while token_idx < len(tokens) and tokens[token_idx].startswith(word):
+            item_id = 0
+            for delta in postings[token_idx].split(','):
+                item_id += int(delta)
+                word_set.add(item_id)
+            token_idx += 1
+        result_set = word_set if result_set is None else result_set & word_set
+        if not result_set: return []
+    if result_set is None: return []
+
+    return [search_index_dic['items'][item_id] for item_id in sorted(result_set)]
+
 # -------------------------------------------------------------------------------------------------
 # MAME machine render cache
 # Creates a separate MAME render and assets databases for each catalog to speed up
@@ -1034,6 +1138,124 @@ def db_get_machine_assets_hashed_db(cfg, machine_name):
 def db_cache_get_key(catalog_name, category_name):
     return hashlib.md5('{} - {}'.format(catalog_name, category_name).encode('utf-8')).hexdigest()
 
+# Every machine render/asset row is stored once in a JSON record store shared by all catalogs.
+# The render and asset caches of every catalog are stored in one JSON pack file. Documents in the
+# pack are the categories of the catalog, the key of each document is the category hash and
+# the document is { 'store' : store_id, 'spans' : [...] }, the spans of the category rows in
+# the record store. Big categories also have one document per chunk of the catalog order,
+# with the same key as the order chunk (see mame_catalog_order_builder()), so a page of the
+# category is read without reading the whole category.
+def db_get_render_cache_FN(cfg, catalog_name):
+    return cfg.CACHE_DIR.pjoin('{}_render.pack'.format(catalog_name))
+
+def db_get_asset_cache_FN(cfg, catalog_name):
+    return cfg.CACHE_DIR.pjoin('{}_assets.pack'.format(catalog_name))
+
+def db_get_render_store_FN(cfg):
+    return cfg.CACHE_DIR.pjoin('MAME_render.store')
+
+def db_get_asset_store_FN(cfg):
+    return cfg.CACHE_DIR.pjoin('MAME_assets.store')
+
+# Old versions of the addon stored one JSON file per category. Delete them if found.
+def db_clean_cache_legacy_files(cfg, file_suffix):
+    file_list = [f for f in os.listdir(cfg.CACHE_DIR.getPath()) if f.endswith(file_suffix)]
+    if not file_list: return
+    log_info('Deleting {} legacy "*{}" files in "{}"'.format(
+        len(file_list), file_suffix, cfg.CACHE_DIR.getPath()))
+    pDialog = KodiProgressDialog()
+    pDialog.startProgress('Cleaning legacy cache JSON files...', len(file_list))
+    for file in file_list:
+        pDialog.updateProgressInc()
+        os.unlink(os.path.join(cfg.CACHE_DIR.getPath(), file))
+    pDialog.endProgress()
+
+# Returns the order of the machines in the record store so the rows of a category are stored
+# together. Machines are sorted by the category they belong to in every catalog, catalogs with
+# more categories first. Categories of the first catalogs are contiguous in the store, the
+# bigger categories of the last catalogs are read in a few large spans.
+def db_cache_store_order(catalog_all_dic):
+    catalog_list = sorted(catalog_all_dic, key = lambda c: (-len(catalog_all_dic[c]), c))
+    num_catalogs = len(catalog_list)
+    key_dic = {}
+    for i, catalog_name in enumerate(catalog_list):
+        catalog_all = catalog_all_dic[catalog_name]
+        for j, category_name in enumerate(sorted(catalog_all)):
+            for machine_name in catalog_all[category_name]:
+                key = key_dic.get(machine_name)
+                if key is None:
+                    key = key_dic[machine_name] = [-1] * num_catalogs
+                # Machines in several categories of a catalog are sorted by the first one.
+                if key[i] < 0: key[i] = j
+
+    return sorted(key_dic, key = lambda m: (key_dic[m], m))
+
+# Writes the record store and the cache pack of every catalog.
+# table is the JSON_Table with the rows of all machines.
+def db_build_cache_store(cfg, cache_index_dic, table, store_FN, get_cache_FN, cache_name):
+    pDialog = KodiProgressDialog()
+    num_catalogs = len(cache_index_dic)
+    pDialog.startProgress('Loading MAME catalogs', num_catalogs)
+    catalog_all_dic = {}
+    for catalog_name in sorted(cache_index_dic):
+        pDialog.updateProgressInc()
+        catalog_all_dic[catalog_name] = db_get_cataloged_dic_all(cfg, catalog_name)
+
+    # The record store and the packs are written to new files and then renamed. If the build is
+    # interrupted the old store and packs are not modified. If the renaming is interrupted the
+    # store id of the packs does not match and the caches are not used, see db_load_cache_rows().
+    pDialog.resetProgress('Writing MAME {} record store'.format(cache_name))
+    key_list = [m for m in db_cache_store_order(catalog_all_dic) if m in table]
+    new_file_list = [(store_FN.getPath() + '.new', store_FN.getPath())]
+    store_id, location_dic = utils_write_JSON_record_store(new_file_list[0][0], table, key_list)
+
+    pDialog.resetProgress('Building MAME {} cache'.format(cache_name), num_catalogs)
+    for catalog_name in sorted(cache_index_dic):
+        pDialog.updateProgressInc()
+        catalog_index_dic = cache_index_dic[catalog_name]
+        catalog_all = catalog_all_dic[catalog_name]
+        pack_dic = {}
+        for catalog_key in catalog_index_dic:
+            hash_str = catalog_index_dic[catalog_key]['hash']
+            machine_list = [m for m in catalog_all[catalog_key] if m in location_dic]
+            pack_dic[hash_str] = {
+                'store' : store_id,
+                'spans' : utils_JSON_record_store_spans(location_dic, machine_list),
+            }
+        # Catalog order documents are chunks if the key is not a category hash.
+        order_dic = utils_load_JSON_pack(db_get_catalog_order_FN(cfg, catalog_name).getPath(), verbose = False)
+        for chunk_key in order_dic:
+            if chunk_key in pack_dic: continue
+            machine_list = [m for m in order_dic[chunk_key] if m in location_dic]
+            pack_dic[chunk_key] = {
+                'store' : store_id,
+                'spans' : utils_JSON_record_store_spans(location_dic, machine_list),
+            }
+        cache_filename = get_cache_FN(cfg, catalog_name).getPath()
+        new_file_list.append((cache_filename + '.new', cache_filename))
+        utils_write_JSON_pack(new_file_list[-1][0], pack_dic, verbose = False)
+    for new_filename, filename in new_file_list:
+        os.replace(new_filename, filename)
+    pDialog.endProgress()
+
+# Returns a JSON_Table { machine_name : row, ... } or None if not found or outdated.
+def db_load_cache_row(store_FN, cache_FN, hash_str):
+    return db_load_cache_rows(store_FN, cache_FN, [hash_str])
+
+# Returns a JSON_Table with the rows of several documents of the cache pack or None if any
+# document is not found or the cache is outdated.
+def db_load_cache_rows(store_FN, cache_FN, key_list):
+    span_list = []
+    store_id = None
+    for doc_dic in utils_load_JSON_pack_documents(cache_FN.getPath(), key_list):
+        if 'spans' not in doc_dic or store_id not in (None, doc_dic['store']):
+            log_warning('db_load_cache_rows() Outdated cache "{}"'.format(cache_FN.getPath()))
+            return None
+        store_id = doc_dic['store']
+        span_list.extend(doc_dic['spans'])
+
+    return utils_load_JSON_record_store(store_FN.getPath(), store_id, span_list)
+
 def db_build_render_cache(cfg, control_dic, cache_index_dic, machines_render, force_build = False):
     log_info('db_build_render_cache() Initialising...')
     log_debug('debug_enable_MAME_render_cache is {}'.format(cfg.settings['debug_enable_MAME_render_cache']))
@@ -1047,58 +1269,33 @@ def db_build_render_cache(cfg, control_dic, cache_index_dic, machines_render, fo
         log_info(t)
         kodi_dialog_OK(t)
 
-    # --- Clean 'cache' directory JSON ROM files ---
-    log_info('Cleaning dir "{}"'.format(cfg.CACHE_DIR.getPath()))
-    pDialog = KodiProgressDialog()
-    pDialog.startProgress('Listing render cache JSON files...')
-    file_list = os.listdir(cfg.CACHE_DIR.getPath())
-    log_info('Found {} files'.format(len(file_list)))
-    deleted_items = 0
-    pDialog.resetProgress('Cleaning render cache JSON files...', len(file_list))
-    for file in file_list:
-        pDialog.updateProgressInc()
-        if not file.endswith('_render.json'): continue
-        full_path = os.path.join(cfg.CACHE_DIR.getPath(), file)
-        # log_debug('UNLINK "{}"'.format(full_path))
-        os.unlink(full_path)
-        deleted_items += 1
-    pDialog.endProgress()
-    log_info('Deleted {} files'.format(deleted_items))
+    db_clean_cache_legacy_files(cfg, '_render.json')
 
     # --- Build ROM cache ---
-    num_catalogs = len(cache_index_dic)
-    catalog_count = 1
-    pDialog.startProgress('Building MAME render cache')
-    for catalog_name in sorted(cache_index_dic):
-        catalog_index_dic = cache_index_dic[catalog_name]
-        catalog_all = db_get_cataloged_dic_all(cfg, catalog_name)
-        diag_t = 'Building MAME [COLOR orange]{}[/COLOR] render cache ({} of {})...'.format(
-            catalog_name, catalog_count, num_catalogs)
-        pDialog.resetProgress(diag_t, len(catalog_index_dic))
-        for catalog_key in catalog_index_dic:
-            pDialog.updateProgressInc()
-            hash_str = catalog_index_dic[catalog_key]['hash']
-            # log_verb('db_build_ROM_cache() Catalog "{}" --- Key "{}"'.format(catalog_name, catalog_key))
-            # log_verb('db_build_ROM_cache() hash {}'.format(hash_str))
-
-            # Build all machines cache
-            m_render_all_dic = {}
-            for machine_name in catalog_all[catalog_key]:
-                m_render_all_dic[machine_name] = machines_render[machine_name]
-            ROMs_all_FN = cfg.CACHE_DIR.pjoin(hash_str + '_render.json')
-            utils_write_JSON_file(ROMs_all_FN.getPath(), m_render_all_dic, verbose = False)
-        catalog_count += 1
-    pDialog.endProgress()
+    db_build_cache_store(cfg, cache_index_dic, db_new_render_table(machines_render),
+        db_get_render_store_FN(cfg), db_get_render_cache_FN, 'render')
 
     # --- Timestamp ---
     db_safe_edit(control_dic, 't_MAME_render_cache_build', time.time())
     utils_write_JSON_file(cfg.MAIN_CONTROL_PATH.getPath(), control_dic)
 
+# If the cache is outdated, for example if building it was interrupted, the render database
+# is loaded.
 def db_get_render_cache_row(cfg, cache_index_dic, catalog_name, category_name):
     hash_str = cache_index_dic[catalog_name][category_name]['hash']
-    ROMs_all_FN = cfg.CACHE_DIR.pjoin(hash_str + '_render.json')
+    render_db_dic = db_load_cache_row(db_get_render_store_FN(cfg),
+        db_get_render_cache_FN(cfg, catalog_name), hash_str)
+    if render_db_dic is None:
+        log_warning('db_get_render_cache_row() Outdated cache. Loading the render database.')
+        kodi_notify_warn('MAME render cache is outdated. Rebuild the MAME render cache.')
+        render_db_dic = utils_load_JSON_file_dic(cfg.RENDER_DB_PATH.getPath())
 
-    return utils_load_JSON_file_dic(ROMs_all_FN.getPath())
+    return render_db_dic
+
+# chunk_key_list are the catalog order chunks of a page. See mame_catalog_order_builder().
+def db_get_render_cache_page(cfg, catalog_name, chunk_key_list):
+    return db_load_cache_rows(db_get_render_store_FN(cfg),
+        db_get_render_cache_FN(cfg, catalog_name), chunk_key_list)
 
 # -------------------------------------------------------------------------------------------------
 # MAME asset cache
@@ -1116,48 +1313,11 @@ def db_build_asset_cache(cfg, control_dic, cache_index_dic, assets_dic, force_bu
         log_info(t)
         kodi_dialog_OK(t)
 
-    # --- Clean 'cache' directory JSON Asset files ---
-    log_info('Cleaning dir "{}"'.format(cfg.CACHE_DIR.getPath()))
-    pDialog = KodiProgressDialog()
-    pDialog.startProgress('Listing asset cache JSON files...')
-    file_list = os.listdir(cfg.CACHE_DIR.getPath())
-    log_info('Found {} files'.format(len(file_list)))
-    deleted_items = 0
-    pDialog.resetProgress('Cleaning asset cache JSON files...', len(file_list))
-    for file in file_list:
-        pDialog.updateProgressInc()
-        if not file.endswith('_assets.json'): continue
-        full_path = os.path.join(cfg.CACHE_DIR.getPath(), file)
-        # log_debug('UNLINK "{}"'.format(full_path))
-        os.unlink(full_path)
-        deleted_items += 1
-    pDialog.endProgress()
-    log_info('Deleted {} files'.format(deleted_items))
+    db_clean_cache_legacy_files(cfg, '_assets.json')
 
     # --- Build MAME asset cache ---
-    num_catalogs = len(cache_index_dic)
-    catalog_count = 1
-    pDialog.startProgress('Building MAME asset cache')
-    for catalog_name in sorted(cache_index_dic):
-        catalog_index_dic = cache_index_dic[catalog_name]
-        catalog_all = db_get_cataloged_dic_all(cfg, catalog_name)
-        diag_t = 'Building MAME [COLOR orange]{}[/COLOR] asset cache ({} of {})...'.format(
-            catalog_name, catalog_count, num_catalogs)
-        pDialog.resetProgress(diag_t, len(catalog_index_dic))
-        for catalog_key in catalog_index_dic:
-            pDialog.updateProgressInc()
-            hash_str = catalog_index_dic[catalog_key]['hash']
-            # log_verb('db_build_asset_cache() Catalog "{}" --- Key "{}"'.format(catalog_name, catalog_key))
-            # log_verb('db_build_asset_cache() hash {}'.format(hash_str))
-
-            # Build all machines cache
-            m_assets_all_dic = {}
-            for machine_name in catalog_all[catalog_key]:
-                m_assets_all_dic[machine_name] = assets_dic[machine_name]
-            ROMs_all_FN = cfg.CACHE_DIR.pjoin(hash_str + '_assets.json')
-            utils_write_JSON_file(ROMs_all_FN.getPath(), m_assets_all_dic, verbose = False)
-        catalog_count += 1
-    pDialog.endProgress()
+    db_build_cache_store(cfg, cache_index_dic, db_new_asset_table(assets_dic),
+        db_get_asset_store_FN(cfg), db_get_asset_cache_FN, 'asset')
 
     # Update timestamp and save control_dic.
     db_safe_edit(control_dic, 't_MAME_asset_cache_build', time.time())
@@ -1165,9 +1325,18 @@ def db_build_asset_cache(cfg, control_dic, cache_index_dic, assets_dic, force_bu
 
 def db_get_asset_cache_row(cfg, cache_index_dic, catalog_name, category_name):
     hash_str = cache_index_dic[catalog_name][category_name]['hash']
-    ROMs_all_FN = cfg.CACHE_DIR.pjoin(hash_str + '_assets.json')
-
-    return utils_load_JSON_file_dic(ROMs_all_FN.getPath())
+    assets_db_dic = db_load_cache_row(db_get_asset_store_FN(cfg),
+        db_get_asset_cache_FN(cfg, catalog_name), hash_str)
+    if assets_db_dic is None:
+        log_warning('db_get_asset_cache_row() Outdated cache. Loading the asset database.')
+        kodi_notify_warn('MAME asset cache is outdated. Rebuild the MAME asset cache.')
+        assets_db_dic = utils_load_JSON_file_dic(cfg.ASSET_DB_PATH.getPath())
+
+    return assets_db_dic
+
+def db_get_asset_cache_page(cfg, catalog_name, chunk_key_list):
+    return db_load_cache_rows(db_get_asset_store_FN(cfg),
+        db_get_asset_cache_FN(cfg, catalog_name), chunk_key_list)
 
 # -------------------------------------------------------------------------------------------------
 # Load and save a bunch of JSON files
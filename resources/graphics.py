@@ -20,6 +20,10 @@ from .db import *
 
 # --- Python standard library ---
 import collections
+import hashlib
+import io
+import os
+import threading
 import time
 import xml.etree.ElementTree as ET
 try:
@@ -29,6 +33,15 @@ try:
     PILLOW_AVAILABLE = True
 except:
     PILLOW_AVAILABLE = False
+try:
+    import numpy
+    NUMPY_AVAILABLE = True
+except:
+    NUMPY_AVAILABLE = False
+if ADDON_RUNNING_PYTHON_3:
+    import queue
+else:
+    import Queue as queue
 
 # ------------------------------------------------------------------------------------------------
 # ETA
@@ -38,17 +51,21 @@ ETA_total_items = 0
 ETA_actual_processed_items = 0
 ETA_total_build_time = 0.0
 ETA_average_build_time = 0.0
+ETA_num_workers = 1
 
 #
 # Returns initial ETA_str
+# num_workers is the number of images built in parallel by graphs_build_pool().
 #
-def ETA_reset(total_items):
+def ETA_reset(total_items, num_workers = 1):
     global ETA_total_items
     global ETA_actual_processed_items
     global ETA_total_build_time
     global ETA_average_build_time
+    global ETA_num_workers
 
     ETA_total_items = total_items
+    ETA_num_workers = max(1, num_workers)
     ETA_actual_processed_items = 0
     ETA_total_build_time = 0.0
     ETA_average_build_time = 0.0
@@ -74,7 +91,7 @@ def ETA_update(build_OK_flag, total_processed_items, build_time):
     # log_debug('total_processed_items      {}'.format(total_processed_items))
     # log_debug('remaining items            {}'.format(remaining_items))
     if ETA_average_build_time > 0:
-        ETA_s = remaining_items * ETA_average_build_time
+        ETA_s = remaining_items * ETA_average_build_time / ETA_num_workers
         hours, minutes, seconds = int(ETA_s // 3600), int((ETA_s % 3600) // 60), int(ETA_s % 60)
         ETA_str = '{0:02d}:{1:02d}:{2:02d}'.format(hours, minutes, seconds)
     else:
@@ -82,63 +99,120 @@ def ETA_update(build_OK_flag, total_processed_items, build_time):
 
     return ETA_str
 
+# ------------------------------------------------------------------------------------------------
+# Graphics build worker pool
+# ------------------------------------------------------------------------------------------------
+# Kodi runs addons in an embedded interpreter where multiprocessing cannot start new processes
+# (sys.executable is Kodi itself), so the pool uses threads. Pillow releases the GIL when
+# decoding, resampling, transforming and encoding images so the workers run on several cores.
+#
+# Calls build_func(item) for every item in item_list and yields (item, build_OK_flag, build_time)
+# tuples in completion order. build_func() is called in the worker threads and must only modify
+# the database rows of its own item. Call close() on the generator to stop the workers, for
+# example when the user cancels the progress dialog. Exceptions in the workers are raised
+# in the caller thread.
+#
+def graphs_build_pool(item_list, build_func, num_workers):
+    # Single worker runs in the caller thread, same as the old sequential loops.
+    if num_workers <= 1:
+        for item in item_list:
+            build_time_start = time.time()
+            build_OK_flag = build_func(item)
+            yield (item, build_OK_flag, time.time() - build_time_start)
+        return
+
+    item_iter = iter(item_list)
+    iter_lock = threading.Lock()
+    stop_event = threading.Event()
+    result_queue = queue.Queue()
+    def build_worker():
+        try:
+            while not stop_event.is_set():
+                with iter_lock:
+                    item = next(item_iter, None)
+                if item is None: break
+                build_time_start = time.time()
+                build_OK_flag = build_func(item)
+                result_queue.put((item, build_OK_flag, time.time() - build_time_start))
+        except Exception as ex:
+            result_queue.put(ex)
+        finally:
+            # None signals the caller that this worker has finished.
+            result_queue.put(None)
+    thread_list = [threading.Thread(target = build_worker) for i in range(num_workers)]
+    for w_thread in thread_list:
+        w_thread.daemon = True
+        w_thread.start()
+    try:
+        running_workers = len(thread_list)
+        while running_workers:
+            result = result_queue.get()
+            if result is None:
+                running_workers -= 1
+            elif isinstance(result, Exception):
+                raise result
+            else:
+                yield result
+    finally:
+        # Workers finish the image they are building and then exit.
+        stop_event.set()
+        for w_thread in thread_list: w_thread.join()
+
+# ------------------------------------------------------------------------------------------------
+# Source fingerprints
+# ------------------------------------------------------------------------------------------------
+# In BUILD_MISSING mode a generated image is rebuilt if it is missing or if its fingerprint has
+# changed. The fingerprint hashes the layout template and the path, size and modification time
+# of every source image, so replacing a Snap or a Flyer refreshes the Fanarts that use it.
+# Fingerprints are stored in one JSON file per kind of image, {m_name : fingerprint} for MAME and
+# {SL_name : {m_name : fingerprint}} for Software Lists.
+
+# Returns the hash of the contents of the template files as a string.
+def graphs_get_template_hash(FN_list):
+    h = hashlib.md5()
+    for file_FN in FN_list:
+        with io.open(file_FN.getPath(), 'rb') as f: h.update(f.read())
+    return h.hexdigest()
+
+# Source images that do not exist are also hashed, so the image is rebuilt when they appear.
+def graphs_get_fingerprint(template_hash, path_list):
+    h = hashlib.md5(template_hash.encode('utf-8'))
+    for path in path_list:
+        try:
+            st = os.stat(path)
+            h.update('{}|{}|{}\n'.format(path, st.st_size, int(st.st_mtime)).encode('utf-8'))
+        except OSError:
+            h.update('{}|-\n'.format(path).encode('utf-8'))
+    return h.hexdigest()
+
+# Decides whether the image of m_name must be built. Called in the worker threads.
+# Images that exist and were built before fingerprints were recorded are considered up to date
+# so the first incremental build after upgrading the addon does not rebuild everything.
+def graphs_is_image_outdated(fp_dic, m_name, fingerprint, image_FN, BUILD_MISSING):
+    if not BUILD_MISSING or not image_FN.exists(): return True
+    return fp_dic.setdefault(m_name, fingerprint) != fingerprint
+
 # ------------------------------------------------------------------------------------------------
 # Math functions
 # ------------------------------------------------------------------------------------------------
-# Here is a more elegant and scalable solution, imo. It'll work for any nxn matrix and 
-# you may find use for the other methods. Note that getMatrixInverse(m) takes in an 
-# array of arrays as input.
-def math_MatrixTranspose(X):
-    # return map(list, zip(*X))
-    return [[X[j][i] for j in range(len(X))] for i in range(len(X[0]))]
-
-def math_MatrixMinor(m, i, j):
-    return [row[:j] + row[j+1:] for row in (m[:i]+m[i+1:])]
-
-def math_MatrixDeterminant(m):
-    # Base case for 2x2 matrix
-    if len(m) == 2:
-        return m[0][0]*m[1][1]-m[0][1]*m[1][0]
-
-    determinant = 0
-    for c in range(len(m)):
-        determinant += ((-1)**c)*m[0][c]*math_MatrixDeterminant(math_MatrixMinor(m,0,c))
-
-    return determinant
-
-def math_MatrixInverse(m):
-    determinant = math_MatrixDeterminant(m)
-
-    # Special case for 2x2 matrix:
-    if len(m) == 2:
-        return [
-            [m[1][1]/determinant, -1*m[0][1]/determinant],
-            [-1*m[1][0]/determinant, m[0][0]/determinant],
-        ]
-
-    # Find matrix of cofactors
-    cofactors = []
-    for r in range(len(m)):
-        cofactorRow = []
-        for c in range(len(m)):
-            minor = math_MatrixMinor(m,r,c)
-            cofactorRow.append(((-1)**(r+c)) * math_MatrixDeterminant(minor))
-        cofactors.append(cofactorRow)
-    cofactors = math_MatrixTranspose(cofactors)
-    for r in range(len(cofactors)):
-        for c in range(len(cofactors)):
-            cofactors[r][c] = cofactors[r][c]/determinant
-
-    return cofactors
-
-# Both A and B have sizes NxM where N, M >= 2 (list of lists of floats).
-def math_MatrixProduct(A, B):
-    return [[sum(a*b for a,b in zip(A_row, B_col)) for B_col in zip(*B)] for A_row in A]
-
-# A is a MxN matrix, B is a Nx1 matrix, result is a Mx1 matrix given as a list.
-# Returns a list with the result. Note that this list corresponds to a column matrix.
-def math_MatrixProduct_Column(A, B):
-    return [sum(a*b for a,b in zip(A_row, B)) for A_row in A]
+# Linear systems are solved with NumPy if available, otherwise in pure Python with Gaussian
+# elimination with partial pivoting.
+def math_SolveLinearSystem(A, B):
+    if NUMPY_AVAILABLE:
+        return numpy.linalg.solve(numpy.array(A, dtype = float), numpy.array(B, dtype = float)).tolist()
+    n = len(A)
+    M = [[float(a) for a in row] + [float(b)] for row, b in zip(A, B)]
+    for col in range(n):
+        pivot = max(range(col, n), key = lambda r: abs(M[r][col]))
+        M[col], M[pivot] = M[pivot], M[col]
+        for r in range(col + 1, n):
+            factor = M[r][col] / M[col][col]
+            for c in range(col, n + 1):
+                M[r][c] -= factor * M[col][c]
+    X = [0.0] * n
+    for r in range(n - 1, -1, -1):
+        X[r] = (M[r][n] - sum(M[r][c] * X[c] for c in range(r + 1, n))) / M[r][r]
+    return X
 
 # ------------------------------------------------------------------------------------------------
 # Auxiliar functions
@@ -213,15 +287,47 @@ def perspective_coeffs(source_coords, target_coords):
     B = [float(item) for sublist in source_coords for item in sublist]
     # print('B =\n{}'.format(pprint.pformat(B)))
 
-    A_T = math_MatrixTranspose(A)
-    A_T_A = math_MatrixProduct(A_T, A)
-    A_T_A_inv = math_MatrixInverse(A_T_A)
-    A_T_A_inv_A_T = math_MatrixProduct(A_T_A_inv, A_T)
-    res = math_MatrixProduct_Column(A_T_A_inv_A_T, B)
+    # 8 equations and 8 unknowns, A is square.
+    res = math_SolveLinearSystem(A, B)
     # print('res =\n{}'.format(pprint.pformat(res)))
 
     return res
 
+# ------------------------------------------------------------------------------------------------
+# 3D Box warp engine
+# ------------------------------------------------------------------------------------------------
+# The 3D Box faces come from a fixed template so the perspective transformation of every face
+# is computed only once. Coefficients are computed for a unit square source and scaled to the
+# size of each source image. The alpha mask of every face and the layers that are equal in all
+# boxes are also cached. Cached objects are shared by the worker threads, do not modify them.
+warp_face_cache = {}
+warp_layer_cache = {}
+
+def warp_face_key(coordinates):
+    return tuple((int(c[0]), int(c[1])) for c in coordinates)
+
+# Returns a tuple (unit_coeffs, mask) for the face with coordinates.
+def warp_get_face(coordinates, CANVAS_SIZE):
+    key = (warp_face_key(coordinates), tuple(CANVAS_SIZE))
+    face = warp_face_cache.get(key)
+    if face is None:
+        n_coords = list(key[0])
+        # top/left, top/right, bottom/right, bottom/left
+        unit_coeffs = perspective_coeffs([(0, 0), (1, 0), (1, 1), (0, 1)], n_coords)
+        # In the alpha channel 0 means transparent and 255 opaque.
+        mask = Image.new('L', CANVAS_SIZE, color = 0)
+        draw = ImageDraw.Draw(mask)
+        draw.polygon(n_coords, fill = 255)
+        face = warp_face_cache[key] = (unit_coeffs, mask)
+    return face
+
+# Returns the cached layer_key layer, build_func() is called to build it the first time.
+def warp_get_layer(layer_key, build_func):
+    layer = warp_layer_cache.get(layer_key)
+    if layer is None:
+        layer = warp_layer_cache[layer_key] = build_func()
+    return layer
+
 def project_texture(img_boxfront, coordinates, CANVAS_SIZE, rotate = False):
     # print('project_texture() BEGIN ...')
 
@@ -231,37 +337,112 @@ def project_texture(img_boxfront, coordinates, CANVAS_SIZE, rotate = False):
         img_boxfront = img_boxfront.rotate(-90, expand = True)
         # img_boxfront.save('rotated.png')
 
-    # --- Info ---
-    width, height = img_boxfront.size
-    # print('Image width {}, height {}'.format(width, height))
-
     # --- Transform ---
-    # Conver list of lists to list of tuples
-    n_coords = [(int(c[0]), int(c[1])) for c in coordinates]
-    # top/left, top/right, bottom/right, bottom/left
-    coeffs = perspective_coeffs([(0, 0), (width, 0), (width, height), (0, height)], n_coords)
-    # print(coeffs)
+    # Scale the unit square coefficients to the source image size. Image.PERSPECTIVE
+    # maps canvas coordinates to source coordinates, so the x rows are scaled by the
+    # width and the y rows by the height.
+    width, height = img_boxfront.size
+    c, mask = warp_get_face(coordinates, CANVAS_SIZE)
+    coeffs = [c[0] * width, c[1] * width, c[2] * width,
+        c[3] * height, c[4] * height, c[5] * height, c[6], c[7]]
     img_t = img_boxfront.transform(CANVAS_SIZE, Image.PERSPECTIVE, coeffs, Image.BICUBIC)
 
     # --- Add polygon with alpha channel for blending ---
-    # In the alpha channel 0 means transparent and 255 opaque.
-    mask = Image.new('L', CANVAS_SIZE, color = 0)
-    draw = ImageDraw.Draw(mask)
-    # print(n_coords)
-    draw.polygon(n_coords, fill = 255)
     img_t.putalpha(mask)
 
     return img_t
 
+# ------------------------------------------------------------------------------------------------
+# Decoded image cache
+# ------------------------------------------------------------------------------------------------
+# After mame_scan_MAME_assets() substitutes parent artwork for clones many machines use the
+# same image files. The graphs_build_*_all() functions enable a LRU cache of decoded and resized
+# images shared by all the workers so the same artwork is decoded and resampled only once.
+# Memory budget of the cache in bytes.
+GRAPHS_IMAGE_CACHE_BUDGET = 128 * 1024 * 1024
+
+image_cache = collections.OrderedDict()
+image_cache_lock = threading.Lock()
+image_cache_budget = 0
+image_cache_size = 0
+image_cache_hits = 0
+image_cache_misses = 0
+
+# budget = 0 disables the cache.
+def graphs_image_cache_reset(budget = 0):
+    global image_cache
+    global image_cache_budget
+    global image_cache_size
+    global image_cache_hits
+    global image_cache_misses
+
+    with image_cache_lock:
+        if image_cache_hits or image_cache_misses:
+            log_debug('graphs_image_cache_reset() {} hits, {} misses, {} images, {:.1f} MB'.format(
+                image_cache_hits, image_cache_misses, len(image_cache), image_cache_size / 1048576.0))
+        image_cache = collections.OrderedDict()
+        image_cache_budget = budget
+        image_cache_size = 0
+        image_cache_hits = 0
+        image_cache_misses = 0
+
+#
+# Returns the decoded image in path. If layout is not None the image is scaled into the
+# layout[dic_key] box with resize_proportional().
+# Images returned may be shared with other machines and threads and must not be modified.
+#
+def graphs_load_image(path, layout = None, dic_key = None, CANVAS_COLOR = (0, 0, 0)):
+    global image_cache_size
+    global image_cache_hits
+    global image_cache_misses
+
+    if layout: key = (path, layout[dic_key]['width'], layout[dic_key]['height'], CANVAS_COLOR)
+    else:      key = (path,)
+    if image_cache_budget:
+        with image_cache_lock:
+            img = image_cache.pop(key, None)
+            if img is not None:
+                # Reinsert the image as the most recently used.
+                image_cache[key] = img
+                image_cache_hits += 1
+                return img
+            image_cache_misses += 1
+
+    # Decoding and resizing is done outside the lock, so workers decode images in parallel.
+    img = Image.open(path)
+    if layout:
+        img = resize_proportional(img, layout, dic_key, CANVAS_COLOR)
+    else:
+        img.load()
+
+    img_size = img.size[0] * img.size[1] * len(img.getbands())
+    if image_cache_budget and img_size <= image_cache_budget:
+        with image_cache_lock:
+            if key not in image_cache:
+                image_cache[key] = img
+                image_cache_size += img_size
+            # Evict least recently used images.
+            while image_cache_size > image_cache_budget:
+                old_key, old_img = image_cache.popitem(last = False)
+                image_cache_size -= old_img.size[0] * old_img.size[1] * len(old_img.getbands())
+
+    return img
+
 # ------------------------------------------------------------------------------------------------
 # Default templates and cached data
 # ------------------------------------------------------------------------------------------------
-# Cache font objects in global variables.
-# Used in mame.py, mame_build_fanart() and mame_build_SL_fanart()
-font_mono = None
-font_mono_SL = None
-font_mono_item = None
-font_mono_debug = None
+# Font objects are cached per thread and size, so every worker of graphs_build_pool() has its
+# own FreeType fonts.
+font_cache = threading.local()
+
+def graphs_get_font(cfg, font_size):
+    font_dic = getattr(font_cache, 'font_dic', None)
+    if font_dic is None:
+        font_dic = font_cache.font_dic = {}
+    if font_size not in font_dic:
+        log_debug('graphs_get_font() Loading "{}" size {}'.format(cfg.MONO_FONT_PATH.getPath(), font_size))
+        font_dic[font_size] = ImageFont.truetype(cfg.MONO_FONT_PATH.getPath(), font_size)
+    return font_dic[font_size]
 
 # --- Fanart layout ---
 MAME_layout_example = {
@@ -312,8 +493,6 @@ SL_layout_assets = {
 #
 def graphs_build_MAME_Fanart(cfg, layout, m_name, assets_dic, Fanart_FN,
     CANVAS_COLOR = (0, 0, 0), test_flag = False):
-    global font_mono
-    global font_mono_debug
     canvas_size = (1920, 1080)
     canvas_bg_color = (0, 0, 0)
     color_white = (255, 255, 255)
@@ -330,15 +509,9 @@ def graphs_build_MAME_Fanart(cfg, layout, m_name, assets_dic, Fanart_FN,
             break
     if not machine_has_valid_assets: return False
 
-    # --- If font object does not exists open font an cache it. ---
-    if not font_mono:
-        log_debug('graphs_build_MAME_Fanart() Creating font_mono object')
-        log_debug('graphs_build_MAME_Fanart() Loading "{}"'.format(cfg.MONO_FONT_PATH.getPath()))
-        font_mono = ImageFont.truetype(cfg.MONO_FONT_PATH.getPath(), layout['MachineName']['fontsize'])
-    if not font_mono_debug:
-        log_debug('graphs_build_MAME_Fanart() Creating font_mono_debug object')
-        log_debug('graphs_build_MAME_Fanart() Loading "{}"'.format(cfg.MONO_FONT_PATH.getPath()))
-        font_mono_debug = ImageFont.truetype(cfg.MONO_FONT_PATH.getPath(), 44)
+    # --- Get cached font objects ---
+    font_mono = graphs_get_font(cfg, layout['MachineName']['fontsize'])
+    font_mono_debug = graphs_get_font(cfg, 44)
 
     # --- Create fanart canvas ---
     fanart_img = Image.new('RGB', canvas_size, canvas_bg_color)
@@ -381,8 +554,7 @@ def graphs_build_MAME_Fanart(cfg, layout, m_name, assets_dic, Fanart_FN,
             # If so, report the machine that produces the fail and do not generate the
             # Fanart.
             try:
-                img_asset = Image.open(Asset_FN.getPath())
-                img_asset = resize_proportional(img_asset, layout, asset_key, CANVAS_COLOR)
+                img_asset = graphs_load_image(Asset_FN.getPath(), layout, asset_key, CANVAS_COLOR)
             except AttributeError:
                 a = 'graphs_build_MAME_Fanart() Exception AttributeError'
                 b = 'in m_name {}, asset_key {}'.format(m_name, asset_key)
@@ -418,9 +590,6 @@ def graphs_build_MAME_Fanart(cfg, layout, m_name, assets_dic, Fanart_FN,
 #
 def graphs_build_SL_Fanart(cfg, layout, SL_name, m_name, assets_dic, Fanart_FN,
     CANVAS_COLOR = (0, 0, 0), test_flag = False):
-    global font_mono_SL
-    global font_mono_item
-    global font_mono_debug
     canvas_size = (1920, 1080)
     canvas_bg_color = (0, 0, 0)
     color_white = (255, 255, 255)
@@ -437,19 +606,10 @@ def graphs_build_SL_Fanart(cfg, layout, SL_name, m_name, assets_dic, Fanart_FN,
             break
     if not machine_has_valid_assets: return False
 
-    # If font object does not exists open font an cache it.
-    if not font_mono_SL:
-        log_debug('graphs_build_SL_Fanart() Creating font_mono_SL object')
-        log_debug('graphs_build_SL_Fanart() Loading "{}"'.format(cfg.MONO_FONT_PATH.getPath()))
-        font_mono_SL = ImageFont.truetype(cfg.MONO_FONT_PATH.getPath(), layout['SLName']['fontsize'])
-    if not font_mono_item:
-        log_debug('graphs_build_SL_Fanart() Creating font_mono_item object')
-        log_debug('graphs_build_SL_Fanart() Loading "{}"'.format(cfg.MONO_FONT_PATH.getPath()))
-        font_mono_item = ImageFont.truetype(cfg.MONO_FONT_PATH.getPath(), layout['ItemName']['fontsize'])
-    if not font_mono_debug:
-        log_debug('graphs_build_SL_Fanart() Creating font_mono_debug object')
-        log_debug('graphs_build_SL_Fanart() Loading "{}"'.format(cfg.MONO_FONT_PATH.getPath()))
-        font_mono_debug = ImageFont.truetype(cfg.MONO_FONT_PATH.getPath(), 44)
+    # --- Get cached font objects ---
+    font_mono_SL = graphs_get_font(cfg, layout['SLName']['fontsize'])
+    font_mono_item = graphs_get_font(cfg, layout['ItemName']['fontsize'])
+    font_mono_debug = graphs_get_font(cfg, 44)
 
     # --- Create fanart canvas ---
     fanart_img = Image.new('RGB', canvas_size, canvas_bg_color)
@@ -479,8 +639,7 @@ def graphs_build_SL_Fanart(cfg, layout, SL_name, m_name, assets_dic, Fanart_FN,
                 # log_debug('{0:<10} file not found'.format(asset_db_name))
                 continue
             # log_debug('{0:<10} found'.format(asset_db_name))
-            img_asset = Image.open(Asset_FN.getPath())
-            img_asset = resize_proportional(img_asset, layout, asset_key, CANVAS_COLOR)
+            img_asset = graphs_load_image(Asset_FN.getPath(), layout, asset_key, CANVAS_COLOR)
             fanart_img = paste_image(fanart_img, img_asset, layout, asset_key)
             # In debug mode print asset name and draw order.
             if test_flag:
@@ -508,8 +667,6 @@ def graphs_build_SL_Fanart(cfg, layout, SL_name, m_name, assets_dic, Fanart_FN,
 #
 def graphs_build_MAME_3DBox(cfg, coord_dic, SL_name, m_name, assets_dic, image_FN,
     CANVAS_COLOR = (0, 0, 0), test_flag = False):
-    global font_mono
-    global font_mono_debug
     FONT_SIZE = 90
     CANVAS_SIZE = (1000, 1500)
     # CANVAS_BG_COLOR = (50, 50, 75) if test_flag else (0, 0, 0)
@@ -518,15 +675,9 @@ def graphs_build_MAME_3DBox(cfg, coord_dic, SL_name, m_name, assets_dic, image_F
     SPINE_BG_COLOR = (100, 200, 100)
     MAME_logo_FN = cfg.ADDON_CODE_DIR.pjoin('media/MAME_clearlogo.png')
 
-    # --- If font object does not exists open font an cache it. ---
-    if not font_mono:
-        log_debug('graphs_build_MAME_3DBox() Creating font_mono object')
-        log_debug('graphs_build_MAME_3DBox() Loading "{}"'.format(cfg.MONO_FONT_PATH.getPath()))
-        font_mono = ImageFont.truetype(cfg.MONO_FONT_PATH.getPath(), 90)
-    if test_flag and not font_mono_debug:
-        log_debug('graphs_build_MAME_3DBox() Creating font_mono_debug object')
-        log_debug('graphs_build_MAME_3DBox() Loading "{}"'.format(cfg.MONO_FONT_PATH.getPath()))
-        font_mono_debug = ImageFont.truetype(cfg.MONO_FONT_PATH.getPath(), 40)
+    # --- Get cached font objects ---
+    font_mono = graphs_get_font(cfg, FONT_SIZE)
+    if test_flag: font_mono_debug = graphs_get_font(cfg, 40)
 
     # --- Open assets ---
     # MAME 3D Box requires Flyer and (Clearlogo or Marquee)
@@ -539,15 +690,15 @@ def graphs_build_MAME_3DBox(cfg, coord_dic, SL_name, m_name, assets_dic, image_F
             return False
         # Try to open the Flyer.
         try:
-            img_flyer = Image.open(assets_dic[m_name]['flyer'])
+            img_flyer = graphs_load_image(assets_dic[m_name]['flyer'])
         except:
             return False
         # Try to open the Clearlogo or Marquee if Clearlogo not available.
         try:
-            img_clearlogo = Image.open(assets_dic[m_name]['clearlogo'])
+            img_clearlogo = graphs_load_image(assets_dic[m_name]['clearlogo'])
         except:
             try:
-                img_clearlogo = Image.open(assets_dic[m_name]['marquee'])
+                img_clearlogo = graphs_load_image(assets_dic[m_name]['marquee'])
             except:
                 return False
     else:
@@ -555,24 +706,26 @@ def graphs_build_MAME_3DBox(cfg, coord_dic, SL_name, m_name, assets_dic, image_F
         if not assets_dic[m_name]['boxfront']: return False
         # Try to open the Boxfront as flyer.
         try:
-            img_flyer = Image.open(assets_dic[m_name]['boxfront'])
+            img_flyer = graphs_load_image(assets_dic[m_name]['boxfront'])
         except:
             return False
 
-    # --- Create 3dbox canvas ---
+    # --- Create 3dbox canvas with Frontbox and Spine ---
     # Create RGB image with alpha channel.
     # Canvas size of destination transformation must have the same size as the final canvas.
-    canvas = Image.new('RGBA', CANVAS_SIZE, CANVAS_BG_COLOR)
-
-    # --- Frontbox ---
-    img_front = Image.new('RGBA', CANVAS_SIZE, FRONTBOX_BG_COLOR)
-    img_t = project_texture(img_front, coord_dic['Frontbox'], CANVAS_SIZE)
-    canvas.paste(img_t, mask = img_t)
-
-    # --- Spine ---
-    img_spine = Image.new('RGBA', CANVAS_SIZE, SPINE_BG_COLOR)
-    img_t = project_texture(img_spine, coord_dic['Spine'], CANVAS_SIZE)
-    canvas.paste(img_t, mask = img_t)
+    # The background is the same in all boxes so it is built once and copied.
+    def build_background():
+        canvas = Image.new('RGBA', CANVAS_SIZE, CANVAS_BG_COLOR)
+        img_front = Image.new('RGBA', CANVAS_SIZE, FRONTBOX_BG_COLOR)
+        img_t = project_texture(img_front, coord_dic['Frontbox'], CANVAS_SIZE)
+        canvas.paste(img_t, mask = img_t)
+        img_spine = Image.new('RGBA', CANVAS_SIZE, SPINE_BG_COLOR)
+        img_t = project_texture(img_spine, coord_dic['Spine'], CANVAS_SIZE)
+        canvas.paste(img_t, mask = img_t)
+        return canvas
+    layer_key = ('background', warp_face_key(coord_dic['Frontbox']), warp_face_key(coord_dic['Spine']),
+        CANVAS_SIZE, CANVAS_BG_COLOR, FRONTBOX_BG_COLOR, SPINE_BG_COLOR)
+    canvas = warp_get_layer(layer_key, build_background).copy()
 
     # --- Flyer image ---
     # At this point img_flyer is present and opened.
@@ -594,8 +747,11 @@ def graphs_build_MAME_3DBox(cfg, coord_dic, SL_name, m_name, assets_dic, image_F
             log_error('SL_name = {}, m_name = {}'.format(SL_name, m_name))
 
     # --- MAME background ---
-    img_mame = Image.open(MAME_logo_FN.getPath())
-    img_t = project_texture(img_mame, coord_dic['Clearlogo_MAME'], CANVAS_SIZE, rotate = True)
+    def build_MAME_logo():
+        img_mame = graphs_load_image(MAME_logo_FN.getPath())
+        return project_texture(img_mame, coord_dic['Clearlogo_MAME'], CANVAS_SIZE, rotate = True)
+    layer_key = ('MAME_logo', MAME_logo_FN.getPath(), warp_face_key(coord_dic['Clearlogo_MAME']), CANVAS_SIZE)
+    img_t = warp_get_layer(layer_key, build_MAME_logo)
     canvas.paste(img_t, mask = img_t)
 
     # --- Machine name ---
@@ -705,6 +861,8 @@ def graphs_load_MAME_Fanart_stuff(cfg, st_dic, BUILD_MISSING):
         kodi_set_error_status(st_dic, 'Error loading XML MAME Fanart layout.')
         return
     data_dic['layout'] = layout
+    data_dic['template_hash'] = graphs_get_template_hash([Template_FN, cfg.MONO_FONT_PATH])
+    data_dic['fingerprints'] = utils_load_JSON_file_dic(cfg.MAME_FANART_FP_PATH.getPath())
 
     # --- Load Assets DB ---
     pDialog = KodiProgressDialog()
@@ -718,42 +876,48 @@ def graphs_load_MAME_Fanart_stuff(cfg, st_dic, BUILD_MISSING):
 # Builds or rebuilds missing MAME Fanarts.
 # Caller code is responsible for updating caches.
 def graphs_build_MAME_Fanart_all(cfg, st_dic, data_dic):
+    # Called in the worker threads. Only modifies the asset DB row of m_name.
+    fp_dic = data_dic['fingerprints']
+    def build_fanart(m_name):
+        # If build missing Fanarts was chosen only build fanart if file is missing or outdated.
+        Fanart_FN = data_dic['Fanart_path_FN'].pjoin('{}.png'.format(m_name))
+        m_assets = data_dic['assetdb'][m_name]
+        fingerprint = graphs_get_fingerprint(data_dic['template_hash'],
+            [m_assets[asset_db_name] for asset_db_name in sorted(MAME_layout_assets.values())])
+        if not graphs_is_image_outdated(fp_dic, m_name, fingerprint, Fanart_FN, data_dic['BUILD_MISSING']):
+            m_assets['fanart'] = Fanart_FN.getPath()
+            return False
+        fp_dic[m_name] = fingerprint
+        return graphs_build_MAME_Fanart(cfg, data_dic['layout'], m_name, data_dic['assetdb'], Fanart_FN)
+
     # Traverse all machines and build fanart from other pieces of artwork
+    num_workers = cfg.settings['graphics_num_workers']
+    log_debug('graphs_build_MAME_Fanart_all() Using {} workers'.format(num_workers))
     pDialog_canceled = False
     pDialog = KodiProgressDialog()
     total_machines, processed_machines = len(data_dic['assetdb']), 0
-    ETA_str = ETA_reset(total_machines)
+    ETA_str = ETA_reset(total_machines, num_workers)
     diag_t = 'Building MAME machine Fanarts...'
     pDialog.startProgress(diag_t, total_machines)
-    for m_name in sorted(data_dic['assetdb']):
-        build_time_start = time.time()
+    graphs_image_cache_reset(GRAPHS_IMAGE_CACHE_BUDGET)
+    build_pool = graphs_build_pool(sorted(data_dic['assetdb']), build_fanart, num_workers)
+    for m_name, build_OK_flag, build_time in build_pool:
+        processed_machines += 1
+        # Only update ETA if Fanart was successfully build.
+        ETA_str = ETA_update(build_OK_flag, processed_machines, build_time)
         pDialog.updateProgress(processed_machines, '{}\nETA {} machine {}'.format(diag_t, ETA_str, m_name))
         if pDialog.isCanceled():
             pDialog_canceled = True
             # kodi_dialog_OK('Fanart generation was canceled by the user.')
             break
-        # If build missing Fanarts was chosen only build fanart if file cannot be found.
-        Fanart_FN = data_dic['Fanart_path_FN'].pjoin('{}.png'.format(m_name))
-        if data_dic['BUILD_MISSING']:
-            if Fanart_FN.exists():
-                data_dic['assetdb'][m_name]['fanart'] = Fanart_FN.getPath()
-                build_OK_flag = False
-            else:
-                build_OK_flag = graphs_build_MAME_Fanart(cfg,
-                    data_dic['layout'], m_name, data_dic['assetdb'], Fanart_FN)
-        else:
-            build_OK_flag = graphs_build_MAME_Fanart(cfg,
-                data_dic['layout'], m_name, data_dic['assetdb'], Fanart_FN)
-        processed_machines += 1
-        build_time_end = time.time()
-        build_time = build_time_end - build_time_start
-        # Only update ETA if Fanart was successfully build.
-        ETA_str = ETA_update(build_OK_flag, processed_machines, build_time)
+    build_pool.close()
+    graphs_image_cache_reset()
     pDialog.endProgress()
 
-    # Save MAME assets DB
+    # Save MAME assets DB and Fanart fingerprints
     pDialog.startProgress('Saving MAME asset database...')
     utils_write_JSON_file(cfg.ASSET_DB_PATH.getPath(), data_dic['assetdb'])
+    utils_write_JSON_file(cfg.MAME_FANART_FP_PATH.getPath(), fp_dic)
     pDialog.endProgress()
 
     # Update MAME Fanart build timestamp
@@ -837,6 +1001,8 @@ def graphs_load_SL_Fanart_stuff(cfg, st_dic, BUILD_MISSING):
         kodi_set_error_status(st_dic, 'Error loading XML Software List Fanart layout.')
         return
     data_dic['layout'] = layout
+    data_dic['template_hash'] = graphs_get_template_hash([Template_FN, cfg.MONO_FONT_PATH])
+    data_dic['fingerprints'] = utils_load_JSON_file_dic(cfg.SL_FANART_FP_PATH.getPath())
 
     # --- Load SL index ---
     SL_index = utils_load_JSON_file_dic(cfg.SL_INDEX_PATH.getPath())
@@ -849,12 +1015,15 @@ def graphs_build_SL_Fanart_all(cfg, st_dic, data_dic):
     control_dic = utils_load_JSON_file_dic(cfg.MAIN_CONTROL_PATH.getPath())
 
     # Traverse all SL and on each SL every item
+    num_workers = cfg.settings['graphics_num_workers']
+    log_debug('graphs_build_SL_Fanart_all() Using {} workers'.format(num_workers))
     pDialog_canceled = False
     pDialog = KodiProgressDialog()
     SL_number, SL_count = len(data_dic['SL_index']), 1
     total_SL_items, total_processed_SL_items = control_dic['stats_SL_software_items'], 0
-    ETA_str = ETA_reset(total_SL_items)
+    ETA_str = ETA_reset(total_SL_items, num_workers)
     log_debug('graphs_build_SL_Fanart_all() total_SL_items = {}'.format(total_SL_items))
+    graphs_image_cache_reset(GRAPHS_IMAGE_CACHE_BUDGET)
     pDialog.startProgress('Building Software List Fanarts...')
     for SL_name in sorted(data_dic['SL_index']):
         # Update progres dialog
@@ -874,44 +1043,47 @@ def graphs_build_SL_Fanart_all(cfg, st_dic, data_dic):
         SL_asset_DB_FN = cfg.SL_DB_DIR.pjoin(assets_file_name)
         SL_assets_dic = utils_load_JSON_file_dic(SL_asset_DB_FN.getPath())
 
+        # Called in the worker threads. Only modifies the asset DB row of m_name.
+        fp_dic = data_dic['fingerprints'].setdefault(SL_name, {})
+        def build_fanart(m_name):
+            # If build missing Fanarts was chosen only build fanart if file is missing or outdated.
+            Fanart_FN = Fanart_path_FN.pjoin('{}.png'.format(m_name))
+            m_assets = SL_assets_dic[m_name]
+            fingerprint = graphs_get_fingerprint(data_dic['template_hash'],
+                [m_assets[asset_db_name] for asset_db_name in sorted(SL_layout_assets.values())])
+            if not graphs_is_image_outdated(fp_dic, m_name, fingerprint, Fanart_FN, data_dic['BUILD_MISSING']):
+                m_assets['fanart'] = Fanart_FN.getPath()
+                return False
+            fp_dic[m_name] = fingerprint
+            return graphs_build_SL_Fanart(cfg, data_dic['layout'], SL_name, m_name, SL_assets_dic, Fanart_FN)
+
         # Traverse all SL items and build fanart from other pieces of artwork
         # Last slot of the progress bar is to save the JSON database.
         total_SL_items, processed_SL_items = len(SL_assets_dic) + 1, 0
         pDialog.resetProgress(dtext, total_SL_items)
-        for m_name in sorted(SL_assets_dic):
-            build_time_start = time.time()
+        build_pool = graphs_build_pool(sorted(SL_assets_dic), build_fanart, num_workers)
+        for m_name, build_OK_flag, build_time in build_pool:
+            processed_SL_items += 1
+            total_processed_SL_items += 1 # For total ETA calculation
+            # Only update ETA if Fanart was sucesfully build.
+            ETA_str = ETA_update(build_OK_flag, total_processed_SL_items, build_time)
             pDialog.updateProgress(processed_SL_items, '{}\nETA {} SL item {}'.format(dtext, ETA_str, m_name))
             if pDialog.isCanceled():
                 pDialog_canceled = True
                 # kodi_dialog_OK('SL Fanart generation was cancelled by the user.')
                 break
-            # If build missing Fanarts was chosen only build fanart if file cannot be found.
-            Fanart_FN = Fanart_path_FN.pjoin('{}.png'.format(m_name))
-            if data_dic['BUILD_MISSING']:
-                if Fanart_FN.exists():
-                    SL_assets_dic[m_name]['fanart'] = Fanart_FN.getPath()
-                    build_OK_flag = False
-                else:
-                    build_OK_flag = graphs_build_SL_Fanart(cfg,
-                        data_dic['layout'], SL_name, m_name, SL_assets_dic, Fanart_FN)
-            else:
-                build_OK_flag = graphs_build_SL_Fanart(cfg,
-                    data_dic['layout'], SL_name, m_name, SL_assets_dic, Fanart_FN)
-            processed_SL_items += 1
-            total_processed_SL_items += 1 # For total ETA calculation
-            build_time_end = time.time()
-            build_time = build_time_end - build_time_start
-            # Only update ETA if 3DBox was sucesfully build.
-            ETA_str = ETA_update(build_OK_flag, total_processed_SL_items, build_time)
+        build_pool.close()
         # Save SL assets DB.
         pDialog.updateProgress(processed_SL_items, '{}\nSaving SL {} asset database'.format(dtext, SL_name))
         utils_write_JSON_file(SL_asset_DB_FN.getPath(), SL_assets_dic)
         # Update progress.
         SL_count += 1
         if pDialog_canceled: break
+    graphs_image_cache_reset()
     pDialog.endProgress()
 
-    # Update SL Fanart build timestamp
+    # Save SL Fanart fingerprints and update SL Fanart build timestamp
+    utils_write_JSON_file(cfg.SL_FANART_FP_PATH.getPath(), data_dic['fingerprints'])
     db_safe_edit(control_dic, 't_SL_fanart_build', time.time())
     utils_write_JSON_file(cfg.MAIN_CONTROL_PATH.getPath(), control_dic)
 
@@ -949,6 +1121,9 @@ def graphs_load_MAME_3DBox_stuff(cfg, st_dic, BUILD_MISSING):
         kodi_set_error_status(st_dic, 'Error loading JSON 3dbox projection data.')
         return
     data_dic['t_projection'] = t_projection
+    data_dic['template_hash'] = graphs_get_template_hash([TProjection_FN, cfg.MONO_FONT_PATH,
+        cfg.ADDON_CODE_DIR.pjoin('media/MAME_clearlogo.png')])
+    data_dic['fingerprints'] = utils_load_JSON_file_dic(cfg.MAME_3DBOX_FP_PATH.getPath())
 
     # --- Load Assets DB ---
     pDialog = KodiProgressDialog()
@@ -961,42 +1136,50 @@ def graphs_load_MAME_3DBox_stuff(cfg, st_dic, BUILD_MISSING):
 
 # Builds or rebuilds missing MAME Fanarts.
 def graphs_build_MAME_3DBox_all(cfg, st_dic, data_dic):
-    # Traverse all machines and build 3D boxes from other pieces of artwork
     SL_name = 'MAME'
+
+    # Called in the worker threads. Only modifies the asset DB row of m_name.
+    fp_dic = data_dic['fingerprints']
+    def build_3dbox(m_name):
+        Image_FN = data_dic['Boxes_path_FN'].pjoin('{}.png'.format(m_name))
+        m_assets = data_dic['assetdb'][m_name]
+        fingerprint = graphs_get_fingerprint(data_dic['template_hash'],
+            [m_assets['flyer'], m_assets['clearlogo'], m_assets['marquee']])
+        if not graphs_is_image_outdated(fp_dic, m_name, fingerprint, Image_FN, data_dic['BUILD_MISSING']):
+            m_assets['3dbox'] = Image_FN.getPath()
+            return False
+        fp_dic[m_name] = fingerprint
+        return graphs_build_MAME_3DBox(cfg,
+            data_dic['t_projection'], SL_name, m_name, data_dic['assetdb'], Image_FN)
+
+    # Traverse all machines and build 3D boxes from other pieces of artwork
+    num_workers = cfg.settings['graphics_num_workers']
+    log_debug('graphs_build_MAME_3DBox_all() Using {} workers'.format(num_workers))
     total_machines, processed_machines = len(data_dic['assetdb']), 0
-    ETA_str = ETA_reset(total_machines)
+    ETA_str = ETA_reset(total_machines, num_workers)
     pDialog_canceled = False
     pDialog = KodiProgressDialog()
     d_text = 'Building MAME machine 3D Boxes...'
     pDialog.startProgress(d_text, total_machines)
-    for m_name in sorted(data_dic['assetdb']):
-        build_time_start = time.time()
+    graphs_image_cache_reset(GRAPHS_IMAGE_CACHE_BUDGET)
+    build_pool = graphs_build_pool(sorted(data_dic['assetdb']), build_3dbox, num_workers)
+    for m_name, build_OK_flag, build_time in build_pool:
+        processed_machines += 1
+        # Only update ETA if 3DBox was successfully build.
+        ETA_str = ETA_update(build_OK_flag, processed_machines, build_time)
         d_str = '{}\nETA {} machine {}'.format(d_text, ETA_str, m_name)
         pDialog.updateProgress(processed_machines, d_str)
         if pDialog.isCanceled():
             pDialog_canceled = True
             break
-        Image_FN = data_dic['Boxes_path_FN'].pjoin('{}.png'.format(m_name))
-        if data_dic['BUILD_MISSING']:
-            if Image_FN.exists():
-                data_dic['assetdb'][m_name]['3dbox'] = Image_FN.getPath()
-                build_OK_flag = False
-            else:
-                build_OK_flag = graphs_build_MAME_3DBox(cfg,
-                    data_dic['t_projection'], SL_name, m_name, data_dic['assetdb'], Image_FN)
-        else:
-            build_OK_flag = graphs_build_MAME_3DBox(cfg,
-                data_dic['t_projection'], SL_name, m_name, data_dic['assetdb'], Image_FN)
-        processed_machines += 1
-        build_time_end = time.time()
-        build_time = build_time_end - build_time_start
-        # Only update ETA if 3DBox was successfully build.
-        ETA_str = ETA_update(build_OK_flag, processed_machines, build_time)
+    build_pool.close()
+    graphs_image_cache_reset()
     pDialog.endProgress()
 
-    # --- Save assets DB ---
+    # --- Save assets DB and 3D Box fingerprints ---
     pDialog.startProgress('Saving MAME asset database...')
     utils_write_JSON_file(cfg.ASSET_DB_PATH.getPath(), data_dic['assetdb'])
+    utils_write_JSON_file(cfg.MAME_3DBOX_FP_PATH.getPath(), fp_dic)
     pDialog.endProgress()
 
     # --- MAME Fanart build timestamp ---
@@ -1030,6 +1213,9 @@ def graphs_load_SL_3DBox_stuff(cfg, st_dic, BUILD_MISSING):
         kodi_set_error_status(st_dic, 'Error loading JSON SL 3dbox projection data.')
         return
     data_dic['t_projection'] = t_projection
+    data_dic['template_hash'] = graphs_get_template_hash([TProjection_FN, cfg.MONO_FONT_PATH,
+        cfg.ADDON_CODE_DIR.pjoin('media/MAME_clearlogo.png')])
+    data_dic['fingerprints'] = utils_load_JSON_file_dic(cfg.SL_3DBOX_FP_PATH.getPath())
 
     # --- Load SL index ---
     SL_index = utils_load_JSON_file_dic(cfg.SL_INDEX_PATH.getPath())
@@ -1042,10 +1228,13 @@ def graphs_build_SL_3DBox_all(cfg, st_dic, data_dic):
     control_dic = utils_load_JSON_file_dic(cfg.MAIN_CONTROL_PATH.getPath())
 
     # Traverse all SL and on each SL every item
+    num_workers = cfg.settings['graphics_num_workers']
+    log_debug('graphs_build_SL_3DBox_all() Using {} workers'.format(num_workers))
     SL_number, SL_count = len(data_dic['SL_index']), 1
     total_SL_items, total_processed_SL_items = control_dic['stats_SL_software_items'], 0
-    ETA_str = ETA_reset(total_SL_items)
+    ETA_str = ETA_reset(total_SL_items, num_workers)
     log_debug('graphs_build_SL_3DBox_all() total_SL_items = {}'.format(total_SL_items))
+    graphs_image_cache_reset(GRAPHS_IMAGE_CACHE_BUDGET)
     pDialog_canceled = False
     pDialog = KodiProgressDialog()
     pDialog.startProgress('Advanced MAME Launcher')
@@ -1066,43 +1255,46 @@ def graphs_build_SL_3DBox_all(cfg, st_dic, data_dic):
         SL_asset_DB_FN = cfg.SL_DB_DIR.pjoin(assets_file_name)
         SL_assets_dic = utils_load_JSON_file_dic(SL_asset_DB_FN.getPath())
 
+        # Called in the worker threads. Only modifies the asset DB row of m_name.
+        fp_dic = data_dic['fingerprints'].setdefault(SL_name, {})
+        def build_3dbox(m_name):
+            Image_FN = Boxes_path_FN.pjoin('{}.png'.format(m_name))
+            m_assets = SL_assets_dic[m_name]
+            fingerprint = graphs_get_fingerprint(data_dic['template_hash'], [m_assets['boxfront']])
+            if not graphs_is_image_outdated(fp_dic, m_name, fingerprint, Image_FN, data_dic['BUILD_MISSING']):
+                m_assets['3dbox'] = Image_FN.getPath()
+                return False
+            fp_dic[m_name] = fingerprint
+            return graphs_build_MAME_3DBox(cfg,
+                data_dic['t_projection'], SL_name, m_name, SL_assets_dic, Image_FN)
+
         # Traverse all SL items and build fanart from other pieces of artwork
         # Last slot of the progress bar is to save the JSON database.
         processed_SL_items = 0
         pDialog.resetProgress(d_text, len(SL_assets_dic))
-        for m_name in sorted(SL_assets_dic):
-            build_time_start = time.time()
+        build_pool = graphs_build_pool(sorted(SL_assets_dic), build_3dbox, num_workers)
+        for m_name, build_OK_flag, build_time in build_pool:
+            processed_SL_items += 1 # For current list progress dialog
+            total_processed_SL_items += 1 # For total ETA calculation
+            # Only update ETA if 3DBox was sucesfully build.
+            ETA_str = ETA_update(build_OK_flag, total_processed_SL_items, build_time)
             d_str = d_text + '\n' + 'ETA {} SL item {}'.format(ETA_str, m_name)
             pDialog.updateProgress(processed_SL_items, d_str)
             if pDialog.isCanceled():
                 pDialog_canceled = True
                 break
-            Image_FN = Boxes_path_FN.pjoin('{}.png'.format(m_name))
-            if data_dic['BUILD_MISSING']:
-                if Image_FN.exists():
-                    SL_assets_dic[m_name]['3dbox'] = Image_FN.getPath()
-                    build_OK_flag = False
-                else:
-                    build_OK_flag = graphs_build_MAME_3DBox(cfg,
-                        data_dic['t_projection'], SL_name, m_name, SL_assets_dic, Image_FN)
-            else:
-                build_OK_flag = graphs_build_MAME_3DBox(cfg,
-                    data_dic['t_projection'], SL_name, m_name, SL_assets_dic, Image_FN)
-            processed_SL_items += 1 # For current list progress dialog
-            total_processed_SL_items += 1 # For total ETA calculation
-            build_time_end = time.time()
-            build_time = build_time_end - build_time_start
-            # Only update ETA if 3DBox was sucesfully build.
-            ETA_str = ETA_update(build_OK_flag, total_processed_SL_items, build_time)
+        build_pool.close()
         # Save SL assets DB.
         pDialog.updateMessage(d_text + '\n' + 'Saving SL {} asset database'.format(SL_name))
         utils_write_JSON_file(SL_asset_DB_FN.getPath(), SL_assets_dic)
         # Update progress.
         SL_count += 1
         if pDialog_canceled: break
+    graphs_image_cache_reset()
     pDialog.endProgress()
 
-    # --- SL Fanart build timestamp ---
+    # --- SL 3D Box fingerprints and build timestamp ---
+    utils_write_JSON_file(cfg.SL_3DBOX_FP_PATH.getPath(), data_dic['fingerprints'])
     db_safe_edit(control_dic, 't_SL_3dbox_build', time.time())
     utils_write_JSON_file(cfg.MAIN_CONTROL_PATH.getPath(), control_dic)
 
@@ -23,14 +23,15 @@
 #   mame <-- filters <-- misc, utils, constants
 #   manuals <- misc, utils, constants
 #   graphics <- misc, utils, constants
+# Only the modules needed to render the listings are imported here. mame, filters, manuals
+# (pdfrw) and graphics (Pillow) are imported when one of their functions is called for the
+# first time, see LAZY_IMPORT_DIC below.
 from .constants import *
 from .assets import *
 from .utils import *
 from .db import *
-from .filters import *
-from .mame import *
-from .manuals import *
-from .graphics import *
+from .misc import *
+from .mame_misc import *
 
 # --- Kodi stuff ---
 import xbmc
@@ -41,8 +42,11 @@ import xbmcaddon
 # --- Python standard library ---
 import copy
 import datetime
+import hashlib
+import importlib
 import os
 import subprocess
+import threading
 if ADDON_RUNNING_PYTHON_2:
     import urlparse
 elif ADDON_RUNNING_PYTHON_3:
@@ -50,6 +54,75 @@ elif ADDON_RUNNING_PYTHON_3:
 else:
     raise TypeError('Undefined Python runtime version.')
 
+# -------------------------------------------------------------------------------------------------
+# Lazy imported modules
+# -------------------------------------------------------------------------------------------------
+# The database builders and scanners, the filters, the manual viewer and the graphics are
+# thousands of lines and pull pdfrw and Pillow, but browsing the catalogs does not use them.
+# Every function in this dictionary is a stub at start. The first time a stub is called the
+# module is imported, the stubs of the module are replaced with the real functions and the
+# call is forwarded to the real function.
+LAZY_IMPORT_DIC = {
+    'mame' : [
+        'mame_add_MAME_play_record', 'mame_add_SL_play_record',
+        'mame_audit_MAME_all', 'mame_audit_MAME_machine',
+        'mame_audit_SL_all', 'mame_audit_SL_machine',
+        'mame_build_MAME_catalogs', 'mame_build_MAME_main_database',
+        'mame_build_ROM_audit_databases', 'mame_build_SoftwareLists_databases',
+        'mame_check_before_build_MAME_catalogs', 'mame_check_before_build_ROM_audit_databases',
+        'mame_check_before_build_SL_databases',
+        'mame_check_before_scan_MAME_ROMs', 'mame_check_before_scan_MAME_assets',
+        'mame_check_before_scan_SL_ROMs', 'mame_check_before_scan_SL_assets',
+        'mame_compact_MAME_play_journal', 'mame_compact_SL_play_journal',
+        'mame_get_MAME_exe_version', 'mame_info_MAME_print', 'mame_info_SL_print',
+        'mame_init_MAME_XML',
+        'mame_scan_MAME_ROMs', 'mame_scan_MAME_assets', 'mame_scan_SL_ROMs', 'mame_scan_SL_assets',
+        'mame_stats_audit_print_slist', 'mame_stats_main_print_slist',
+        'mame_stats_scanner_print_slist', 'mame_stats_timestamps_slist',
+        'mame_update_MAME_Fav_objects', 'mame_update_MAME_MostPlay_objects',
+        'mame_update_MAME_RecentPlay_objects', 'mame_update_SL_Fav_objects',
+        'mame_update_SL_MostPlay_objects', 'mame_update_SL_RecentPlay_objects',
+        'mame_update_all_Fav_objects',
+        'mame_write_MAME_CHD_XML_DAT', 'mame_write_MAME_ROM_Billyc999_XML',
+        'mame_write_MAME_ROM_XML_DAT',
+    ],
+    'filters' : [
+        'filter_build_custom_filters', 'filter_custom_filters_load_XML', 'filter_get_filter_DB',
+    ],
+    'manuals' : [
+        'manuals_check_img_extraction_needed', 'manuals_close_PDF_file', 'manuals_create_INFO_file',
+        'manuals_extract_PDF_file', 'manuals_open_CBZ_file', 'manuals_open_PDF_file',
+        'manuals_view_manual',
+    ],
+    'graphics' : [
+        'graphs_build_MAME_3DBox', 'graphs_build_MAME_3DBox_all',
+        'graphs_build_MAME_Fanart', 'graphs_build_MAME_Fanart_all',
+        'graphs_build_SL_3DBox_all', 'graphs_build_SL_Fanart', 'graphs_build_SL_Fanart_all',
+        'graphs_build_pool',
+        'graphs_load_MAME_3DBox_stuff', 'graphs_load_MAME_Fanart_stuff',
+        'graphs_load_MAME_Fanart_template', 'graphs_load_SL_3DBox_stuff',
+        'graphs_load_SL_Fanart_stuff', 'graphs_load_SL_Fanart_template',
+    ],
+}
+
+def lazy_import_module(module_name):
+    module = importlib.import_module('.' + module_name, __name__.rpartition('.')[0])
+    for function_name in LAZY_IMPORT_DIC[module_name]:
+        globals()[function_name] = getattr(module, function_name)
+
+    return module
+
+def _lazy_import_stub(module_name, function_name):
+    def stub(*args, **kwargs):
+        log_debug('Lazy import of module "{}" by {}()'.format(module_name, function_name))
+        module = lazy_import_module(module_name)
+        return getattr(module, function_name)(*args, **kwargs)
+    return stub
+
+for module_name in LAZY_IMPORT_DIC:
+    for function_name in LAZY_IMPORT_DIC[module_name]:
+        globals()[function_name] = _lazy_import_stub(module_name, function_name)
+
 # --- Plugin database indices ---
 # _PATH is a filename | _DIR is a directory
 class Configuration:
@@ -86,6 +159,7 @@ class Configuration:
         self.MAME_XML_CONTROL_PATH = self.ADDON_DATA_DIR.pjoin('XML_control_MAME.json')
         self.MAME_2003_PLUS_XML_CONTROL_PATH = self.ADDON_DATA_DIR.pjoin('XML_control_MAME_2003_plus.json')
         self.MAIN_CONTROL_PATH = self.ADDON_DATA_DIR.pjoin('MAME_control_dic.json')
+        self.SETTINGS_PATH = self.ADDON_DATA_DIR.pjoin('settings.xml')
         # Main MAME databases.
         self.MAIN_DB_PATH = self.ADDON_DATA_DIR.pjoin('MAME_DB_main.json')
         self.ROMS_DB_PATH = self.ADDON_DATA_DIR.pjoin('MAME_DB_roms.json')
@@ -95,26 +169,31 @@ class Configuration:
         # Databases used for rendering.
         self.RENDER_DB_PATH = self.ADDON_DATA_DIR.pjoin('MAME_renderdb.json')
         self.ASSET_DB_PATH = self.ADDON_DATA_DIR.pjoin('MAME_assetdb.json')
+        self.MAME_SEARCH_INDEX_PATH = self.ADDON_DATA_DIR.pjoin('MAME_search_index.json')
 
         # Audit and ROM Set databases.
         self.ROM_AUDIT_DB_PATH = self.ADDON_DATA_DIR.pjoin('ROM_Audit_DB.json')
         self.ROM_SET_MACHINE_FILES_DB_PATH = self.ADDON_DATA_DIR.pjoin('ROM_Set_machine_files.json')
 
         # DAT indices and databases.
+        # DAT databases are text stores, see utils_write_text_store().
         self.HISTORY_IDX_PATH  = self.ADDON_DATA_DIR.pjoin('DAT_History_index.json')
-        self.HISTORY_DB_PATH   = self.ADDON_DATA_DIR.pjoin('DAT_History_DB.json')
+        self.HISTORY_DB_PATH   = self.ADDON_DATA_DIR.pjoin('DAT_History_DB.dat')
         self.MAMEINFO_IDX_PATH = self.ADDON_DATA_DIR.pjoin('DAT_MAMEInfo_index.json')
-        self.MAMEINFO_DB_PATH  = self.ADDON_DATA_DIR.pjoin('DAT_MAMEInfo_DB.json')
+        self.MAMEINFO_DB_PATH  = self.ADDON_DATA_DIR.pjoin('DAT_MAMEInfo_DB.dat')
         self.GAMEINIT_IDX_PATH = self.ADDON_DATA_DIR.pjoin('DAT_GameInit_index.json')
-        self.GAMEINIT_DB_PATH  = self.ADDON_DATA_DIR.pjoin('DAT_GameInit_DB.json')
+        self.GAMEINIT_DB_PATH  = self.ADDON_DATA_DIR.pjoin('DAT_GameInit_DB.dat')
         self.COMMAND_IDX_PATH  = self.ADDON_DATA_DIR.pjoin('DAT_Command_index.json')
-        self.COMMAND_DB_PATH   = self.ADDON_DATA_DIR.pjoin('DAT_Command_DB.json')
+        self.COMMAND_DB_PATH   = self.ADDON_DATA_DIR.pjoin('DAT_Command_DB.dat')
 
         # Most played and Recently played
         self.MAME_MOST_PLAYED_FILE_PATH   = self.ADDON_DATA_DIR.pjoin('most_played_MAME.json')
         self.MAME_RECENT_PLAYED_FILE_PATH = self.ADDON_DATA_DIR.pjoin('recently_played_MAME.json')
         self.SL_MOST_PLAYED_FILE_PATH     = self.ADDON_DATA_DIR.pjoin('most_played_SL.json')
         self.SL_RECENT_PLAYED_FILE_PATH   = self.ADDON_DATA_DIR.pjoin('recently_played_SL.json')
+        # Play journals. Launches are appended here and compacted into the files above.
+        self.MAME_PLAY_JOURNAL_PATH       = self.ADDON_DATA_DIR.pjoin('play_journal_MAME.jsonl')
+        self.SL_PLAY_JOURNAL_PATH         = self.ADDON_DATA_DIR.pjoin('play_journal_SL.jsonl')
 
         # Disabled. Now there are global properties for this.
         # self.MAIN_PROPERTIES_PATH = self.ADDON_DATA_DIR.pjoin('MAME_properties.json')
@@ -123,6 +202,15 @@ class Configuration:
         self.CACHE_DIR = self.ADDON_DATA_DIR.pjoin('cache')
         self.CACHE_INDEX_PATH = self.ADDON_DATA_DIR.pjoin('MAME_cache_index.json')
 
+        # Parse cache of the INI and DAT files.
+        self.PARSE_CACHE_DIR = self.ADDON_DATA_DIR.pjoin('parse_cache')
+
+        # Source fingerprints of the generated Fanarts and 3D Boxes.
+        self.MAME_FANART_FP_PATH = self.ADDON_DATA_DIR.pjoin('Graphics_MAME_Fanart_fingerprints.json')
+        self.MAME_3DBOX_FP_PATH  = self.ADDON_DATA_DIR.pjoin('Graphics_MAME_3DBox_fingerprints.json')
+        self.SL_FANART_FP_PATH   = self.ADDON_DATA_DIR.pjoin('Graphics_SL_Fanart_fingerprints.json')
+        self.SL_3DBOX_FP_PATH    = self.ADDON_DATA_DIR.pjoin('Graphics_SL_3DBox_fingerprints.json')
+
         # Catalogs.
         self.CATALOG_DIR                          = self.ADDON_DATA_DIR.pjoin('catalogs')
         self.CATALOG_MAIN_PARENT_PATH             = self.CATALOG_DIR.pjoin('catalog_main_parents.json')
@@ -194,6 +282,7 @@ class Configuration:
         self.SL_INDEX_PATH         = self.ADDON_DATA_DIR.pjoin('SoftwareLists_index.json')
         self.SL_MACHINES_PATH      = self.ADDON_DATA_DIR.pjoin('SoftwareLists_machines.json')
         self.SL_PCLONE_DIC_PATH    = self.ADDON_DATA_DIR.pjoin('SoftwareLists_pclone_dic.json')
+        self.SL_SEARCH_INDEX_PATH  = self.ADDON_DATA_DIR.pjoin('SoftwareLists_search_index.json')
         # Disabled. Not used at the moment.
         # self.SL_MACHINES_PROP_PATH = self.ADDON_DATA_DIR.pjoin('SoftwareLists_properties.json')
 
@@ -254,6 +343,7 @@ class Configuration:
         self.REPORT_DEBUG_SL_ITEM_AUDIT_DATA_PATH = self.REPORTS_DIR.pjoin('debug_SL_item_Audit_DB_data.txt')
         self.REPORT_DEBUG_MAME_COLLISIONS_PATH = self.REPORTS_DIR.pjoin('debug_MAME_collisions.txt')
         self.REPORT_DEBUG_SL_COLLISIONS_PATH = self.REPORTS_DIR.pjoin('debug_SL_collisions.txt')
+        self.REPORT_MANUALS_EXTRACTION_PATH = self.REPORTS_DIR.pjoin('manuals_extraction.txt')
 
         # --- Former global variables ---
         self.settings = {}
@@ -270,6 +360,8 @@ class Configuration:
 # Use functional programming as much as possible and avoid global variables.
 # g_base_url must be a global variable because it is used in the misc_url_*() functions.
 g_base_url = ''
+# Argument appended to the listing URLs. See misc_set_cache_token().
+g_cache_token_arg = ''
 # Module loading time. This variable is read only (only modified here).
 g_time_str = text_type(datetime.datetime.now())
 
@@ -310,6 +402,7 @@ def run_plugin(addon_argv):
     get_settings_log_enabled(cfg)
     log_debug('Operation mode "{}"'.format(cfg.settings['op_mode']))
     log_debug('SL global enable is {}'.format(cfg.settings['global_enable_SL']))
+    utils_set_JSON_compression(cfg.settings['json_compression'], cfg.settings['json_compression_level'])
 
     # --- Playground and testing code ---
     # kodi_get_screensaver_mode()
@@ -317,6 +410,7 @@ def run_plugin(addon_argv):
     # --- Addon data paths creation ---
     if not cfg.ADDON_DATA_DIR.exists(): cfg.ADDON_DATA_DIR.makedirs()
     if not cfg.CACHE_DIR.exists(): cfg.CACHE_DIR.makedirs()
+    if not cfg.PARSE_CACHE_DIR.exists(): cfg.PARSE_CACHE_DIR.makedirs()
     if not cfg.CATALOG_DIR.exists(): cfg.CATALOG_DIR.makedirs()
     if not cfg.MAIN_DB_HASH_DIR.exists(): cfg.MAIN_DB_HASH_DIR.makedirs()
     if not cfg.FILTERS_DB_DIR.exists(): cfg.FILTERS_DB_DIR.makedirs()
@@ -339,6 +433,7 @@ def run_plugin(addon_argv):
     # even for the first call: 'content_type': ['game']
     cfg.content_type = args['content_type'] if 'content_type' in args else None
     log_debug('content_type = {}'.format(cfg.content_type))
+    misc_set_cache_token(cfg)
 
     # --- URL routing -------------------------------------------------------------------------
     # Show addon root window.
@@ -380,10 +475,11 @@ def run_plugin(addon_argv):
         else:
             category_name = args['category'][0] if 'category' in args else ''
             parent_name   = args['parent'][0] if 'parent' in args else ''
+            page_str      = args['page'][0] if 'page' in args else ''
             if category_name and parent_name:
                 render_catalog_clone_list(cfg, catalog_name, category_name, parent_name)
             elif category_name and not parent_name:
-                render_catalog_parent_list(cfg, catalog_name, category_name)
+                render_catalog_parent_list(cfg, catalog_name, category_name, page_str)
             else:
                 render_catalog_list(cfg, catalog_name)
 
@@ -508,6 +604,10 @@ def run_plugin(addon_argv):
         elif command == 'SETUP_CUSTOM_FILTERS':
             command_context_setup_custom_filters(cfg)
 
+        elif command == 'SHOW_SEARCH':
+            query_str = args['query'][0] if 'query' in args else ''
+            render_search(cfg, query_str)
+
         elif command == 'SHOW_UTILITIES_VLAUNCHERS':
             render_Utilities_vlaunchers(cfg)
         elif command == 'SHOW_GLOBALREPORTS_VLAUNCHERS':
@@ -583,6 +683,8 @@ def get_settings(cfg):
     settings['display_SL_items_available'] = kodi_get_bool_setting(cfg, 'display_SL_items_available')
     settings['display_MAME_flags'] = kodi_get_bool_setting(cfg, 'display_MAME_flags')
     settings['display_SL_flags'] = kodi_get_bool_setting(cfg, 'display_SL_flags')
+    settings['display_paginate'] = kodi_get_bool_setting(cfg, 'display_paginate')
+    settings['display_page_size'] = kodi_get_int_setting(cfg, 'display_page_size')
 
     # --- Display II ---
     settings['display_main_filters'] = kodi_get_bool_setting(cfg, 'display_main_filters')
@@ -598,6 +700,7 @@ def get_settings(cfg):
     settings['display_SL_favs'] = kodi_get_bool_setting(cfg, 'display_SL_favs')
     settings['display_SL_most'] = kodi_get_bool_setting(cfg, 'display_SL_most')
     settings['display_SL_recent'] = kodi_get_bool_setting(cfg, 'display_SL_recent')
+    settings['display_search'] = kodi_get_bool_setting(cfg, 'display_search')
     settings['display_utilities'] = kodi_get_bool_setting(cfg, 'display_utilities')
     settings['display_global_reports'] = kodi_get_bool_setting(cfg, 'display_global_reports')
 
@@ -607,6 +710,7 @@ def get_settings(cfg):
     settings['artwork_mame_fanart'] = kodi_get_int_setting(cfg, 'artwork_mame_fanart')
     settings['artwork_SL_icon'] = kodi_get_int_setting(cfg, 'artwork_SL_icon')
     settings['artwork_SL_fanart'] = kodi_get_int_setting(cfg, 'artwork_SL_fanart')
+    settings['graphics_num_workers'] = kodi_get_int_setting(cfg, 'graphics_num_workers')
 
     # --- Advanced ---
     settings['media_state_action'] = kodi_get_int_setting(cfg, 'media_state_action')
@@ -617,6 +721,8 @@ def get_settings(cfg):
     settings['log_level'] = kodi_get_int_setting(cfg, 'log_level')
     settings['debug_enable_MAME_render_cache'] = kodi_get_bool_setting(cfg, 'debug_enable_MAME_render_cache')
     settings['debug_enable_MAME_asset_cache'] = kodi_get_bool_setting(cfg, 'debug_enable_MAME_asset_cache')
+    settings['json_compression'] = kodi_get_int_setting(cfg, 'json_compression')
+    settings['json_compression_level'] = kodi_get_int_setting(cfg, 'json_compression_level')
     settings['debug_MAME_machine_data'] = kodi_get_bool_setting(cfg, 'debug_MAME_machine_data')
     settings['debug_MAME_ROM_DB_data'] = kodi_get_bool_setting(cfg, 'debug_MAME_ROM_DB_data')
     settings['debug_MAME_Audit_DB_data'] = kodi_get_bool_setting(cfg, 'debug_MAME_Audit_DB_data')
@@ -661,31 +767,48 @@ def get_settings_log_enabled(cfg):
 # global read-only variables using in the addon.
 # NOTE '&' must be scaped to '%26' in all URLs
 # ---------------------------------------------------------------------------------------------
+# Directory listings are cached by Kodi (cacheToDisc = True). Kodi uses the URL as the cache
+# key so the listing URLs carry a token (argument t) that changes when the databases are
+# rebuilt or rescanned (control_dic is written), the Favourites are edited or the addon
+# settings are changed. Stale cached directories are never reused.
+# The token is made of file modification times only. This runs on every plugin call so no
+# file is loaded here.
+def misc_set_cache_token(cfg):
+    global g_cache_token_arg
+
+    t_list = []
+    for token_FN in [cfg.MAIN_CONTROL_PATH, cfg.SETTINGS_PATH, cfg.FAV_MACHINES_PATH, cfg.FAV_SL_ROMS_PATH]:
+        t_list.append('{}'.format(token_FN.getmtime() if token_FN.exists() else 0))
+    cache_token = hashlib.md5('|'.join(t_list).encode('utf-8')).hexdigest()[0:8]
+    g_cache_token_arg = '&t={}'.format(cache_token)
+    log_debug('misc_set_cache_token() Cache token {}'.format(cache_token))
+
 # Functions used in xbmcplugin.addDirectoryItem()
 def misc_url(command):
     command_escaped = command.replace('&', '%26')
 
-    return '{}?command={}'.format(g_base_url, command_escaped)
+    return '{}?command={}{}'.format(g_base_url, command_escaped, g_cache_token_arg)
 
 def misc_url_1_arg(arg_name, arg_value):
     arg_value_escaped = arg_value.replace('&', '%26')
 
-    return '{}?{}={}'.format(g_base_url, arg_name, arg_value_escaped)
+    return '{}?{}={}{}'.format(g_base_url, arg_name, arg_value_escaped, g_cache_token_arg)
 
 def misc_url_2_arg(arg_name_1, arg_value_1, arg_name_2, arg_value_2):
     arg_value_1_escaped = arg_value_1.replace('&', '%26')
     arg_value_2_escaped = arg_value_2.replace('&', '%26')
 
-    return '{}?{}={}&{}={}'.format(g_base_url,
-        arg_name_1, arg_value_1_escaped, arg_name_2, arg_value_2_escaped)
+    return '{}?{}={}&{}={}{}'.format(g_base_url,
+        arg_name_1, arg_value_1_escaped, arg_name_2, arg_value_2_escaped, g_cache_token_arg)
 
 def misc_url_3_arg(arg_name_1, arg_value_1, arg_name_2, arg_value_2, arg_name_3, arg_value_3):
     arg_value_1_escaped = arg_value_1.replace('&', '%26')
     arg_value_2_escaped = arg_value_2.replace('&', '%26')
     arg_value_3_escaped = arg_value_3.replace('&', '%26')
 
-    return '{}?{}={}&{}={}&{}={}'.format(g_base_url,
-        arg_name_1, arg_value_1_escaped, arg_name_2, arg_value_2_escaped, arg_name_3, arg_value_3_escaped)
+    return '{}?{}={}&{}={}&{}={}{}'.format(g_base_url,
+        arg_name_1, arg_value_1_escaped, arg_name_2, arg_value_2_escaped, arg_name_3, arg_value_3_escaped,
+        g_cache_token_arg)
 
 def misc_url_4_arg(arg_name_1, arg_value_1, arg_name_2, arg_value_2, arg_name_3, arg_value_3, arg_name_4, arg_value_4):
     arg_value_1_escaped = arg_value_1.replace('&', '%26')
@@ -693,9 +816,9 @@ def misc_url_4_arg(arg_name_1, arg_value_1, arg_name_2, arg_value_2, arg_name_3,
     arg_value_3_escaped = arg_value_3.replace('&', '%26')
     arg_value_4_escaped = arg_value_4.replace('&', '%26')
 
-    return '{}?{}={}&{}={}&{}={}&{}={}'.format(g_base_url,
+    return '{}?{}={}&{}={}&{}={}&{}={}{}'.format(g_base_url,
         arg_name_1, arg_value_1_escaped, arg_name_2, arg_value_2_escaped,
-        arg_name_3, arg_value_3_escaped,arg_name_4, arg_value_4_escaped)
+        arg_name_3, arg_value_3_escaped,arg_name_4, arg_value_4_escaped, g_cache_token_arg)
 
 # Functions used in context menus, in listitem.addContextMenuItems()
 def misc_url_RunPlugin(command):
@@ -1440,7 +1563,12 @@ def render_root_list(cfg):
     if cfg.settings['display_SL_recent'] and cfg.settings['global_enable_SL']:
         render_root_category_row_custom_CM(cfg, *rd['root_special_CM']['SL_Recent'])
 
-    # Utilities and Reports special menus.
+    # Search, Utilities and Reports special menus.
+    if cfg.settings['display_search']:
+        Search_plot = ('Search MAME machines and Software List items by name, description, '
+            'manufacturer/publisher, year or genre.')
+        URL = misc_url_1_arg('command', 'SHOW_SEARCH')
+        render_root_category_row(cfg, 'Search', Search_plot, URL, COLOR_SEARCH)
     if cfg.settings['display_utilities']:
         Utilities_plot = ('Execute several [COLOR orange]Utilities[/COLOR]. For example, to '
             'check you AML configuration.')
@@ -1681,6 +1809,12 @@ def render_Utilities_vlaunchers(cfg):
     url_str = misc_url_2_arg('command', 'EXECUTE_UTILITY', 'which', 'CHECK_SL_COLLISIONS')
     xbmcplugin.addDirectoryItem(cfg.addon_handle, url_str, listitem, isFolder = False)
 
+    # --- Extract images of all manuals ---
+    t = 'Extract images of all manuals'
+    listitem = aux_get_generic_listitem(cfg, t, t, common_commands)
+    url_str = misc_url_2_arg('command', 'EXECUTE_UTILITY', 'which', 'EXTRACT_ALL_MANUALS')
+    xbmcplugin.addDirectoryItem(cfg.addon_handle, url_str, listitem, isFolder = False)
+
     # --- Check SL CRC hash collisions ---
     t = 'Show machines with biggest ROMs'
     listitem = aux_get_generic_listitem(cfg, t, t, common_commands)
@@ -2015,7 +2149,7 @@ def render_catalog_list(cfg, catalog_name):
             num_machines = cache_index_dic[catalog_name][catalog_key]['num_parents']
             machine_str = 'parent' if num_machines == 1 else 'parents'
         render_catalog_list_row(cfg, catalog_name, catalog_key, num_machines, machine_str)
-    xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = False)
+    xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = True)
     rendering_ticks_end = time.time()
 
     # DEBUG Data loading/rendering statistics.
@@ -2054,8 +2188,9 @@ def render_catalog_list_row(cfg, catalog_name, catalog_key, num_machines, machin
 # Renders a list of parent MAME machines knowing the catalog name and the category.
 # Also renders machine lists in flat mode.
 # Display mode: a) parents only b) all machines (flat)
+# page_str is only used when rendering big categories in pages, see render_catalog_page().
 #
-def render_catalog_parent_list(cfg, catalog_name, category_name):
+def render_catalog_parent_list(cfg, catalog_name, category_name, page_str = ''):
     # When using threads the performance gain is small: from 0.76 to 0.71, just 20 ms.
     # It's not worth it.
     log_debug('render_catalog_parent_list() catalog_name  = {}'.format(catalog_name))
@@ -2082,6 +2217,16 @@ def render_catalog_parent_list(cfg, catalog_name, category_name):
         kodi_display_status_message(st_dic)
         return
 
+    # --- Big categories are rendered in pages if enabled ---
+    # The catalog order file does not exist if catalogs were built with an older AML version.
+    cache_index_dic = None
+    if cfg.settings['display_paginate'] and db_get_catalog_order_FN(cfg, catalog_name).exists():
+        cache_index_dic = utils_load_JSON_file_dic(cfg.CACHE_INDEX_PATH.getPath())
+        num_key = 'num_machines' if view_mode_property == VIEW_MODE_FLAT else 'num_parents'
+        if cache_index_dic[catalog_name][category_name][num_key] > cfg.settings['display_page_size']:
+            render_catalog_page(cfg, catalog_name, category_name, page_str, cache_index_dic)
+            return
+
     # --- Load main MAME info databases and catalog ---
     l_cataloged_dic_start = time.time()
     if view_mode_property == VIEW_MODE_PCLONE:
@@ -2095,7 +2240,8 @@ def render_catalog_parent_list(cfg, catalog_name, category_name):
     l_cataloged_dic_end = time.time()
     l_render_db_start = time.time()
     if cfg.settings['debug_enable_MAME_render_cache']:
-        cache_index_dic = utils_load_JSON_file_dic(cfg.CACHE_INDEX_PATH.getPath())
+        if cache_index_dic is None:
+            cache_index_dic = utils_load_JSON_file_dic(cfg.CACHE_INDEX_PATH.getPath())
         render_db_dic = db_get_render_cache_row(cfg, cache_index_dic, catalog_name, category_name)
     else:
         log_debug('MAME machine cache disabled.')
@@ -2103,7 +2249,7 @@ def render_catalog_parent_list(cfg, catalog_name, category_name):
     l_render_db_end = time.time()
     l_assets_db_start = time.time()
     if cfg.settings['debug_enable_MAME_asset_cache']:
-        if 'cache_index_dic' not in locals():
+        if cache_index_dic is None:
             cache_index_dic = utils_load_JSON_file_dic(cfg.CACHE_INDEX_PATH.getPath())
         assets_db_dic = db_get_asset_cache_row(cfg, cache_index_dic, catalog_name, category_name)
     else:
@@ -2141,7 +2287,7 @@ def render_catalog_parent_list(cfg, catalog_name, category_name):
     rendering_ticks_start = time.time()
     set_Kodi_all_sorting_methods(cfg)
     render_commit_machines(cfg, r_list)
-    xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = False)
+    xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = True)
     rendering_time = time.time() - rendering_ticks_start
 
     # --- DEBUG Data loading/rendering statistics ---
@@ -2156,6 +2302,189 @@ def render_catalog_parent_list(cfg, catalog_name, category_name):
     log_debug('Rendering time      {0:.4f} s'.format(rendering_time))
     log_debug('Total time          {0:.4f} s'.format(total_time))
 
+#
+# Renders one page of a big category. Machines are rendered in the precomputed order of the
+# catalog order file so only the machines in the page are processed and committed to Kodi.
+# If no filter is enabled only the order chunks and the cache rows of the page are loaded.
+# page_str is the page number (first page if empty) or 'index' for the jump-to-letter index.
+#
+def render_catalog_page(cfg, catalog_name, category_name, page_str, cache_index_dic):
+    log_debug('render_catalog_page() catalog_name  = {}'.format(catalog_name))
+    log_debug('render_catalog_page() category_name = {}'.format(category_name))
+    log_debug('render_catalog_page() page_str      = "{}"'.format(page_str))
+    view_mode_property = cfg.settings['mame_view_mode']
+    page_size = cfg.settings['display_page_size']
+    display_hide_Mature = cfg.settings['display_hide_Mature']
+    display_hide_BIOS = cfg.settings['display_hide_BIOS']
+    if catalog_name == 'None' and category_name == 'BIOS': display_hide_BIOS = False
+    display_hide_nonworking = cfg.settings['display_hide_nonworking']
+    display_hide_imperfect  = cfg.settings['display_hide_imperfect']
+    display_rom_available = cfg.settings['display_rom_available']
+    display_chd_available = cfg.settings['display_chd_available']
+    filters_enabled = display_hide_Mature or display_hide_BIOS or display_hide_nonworking or \
+        display_hide_imperfect or display_rom_available or display_chd_available
+    order_key = 'all' if view_mode_property == VIEW_MODE_FLAT else 'parents'
+    order_FN = db_get_catalog_order_FN(cfg, catalog_name)
+    hash_str = cache_index_dic[catalog_name][category_name]['hash']
+
+    # --- Load catalog order ---
+    loading_ticks_start = time.time()
+    category_order_dic = utils_load_JSON_pack_document(order_FN.getPath(), hash_str)
+    num_machines = category_order_dic[order_key]
+    num_chunks = (num_machines + MAME_CATALOG_ORDER_CHUNK_SIZE - 1) // MAME_CATALOG_ORDER_CHUNK_SIZE
+    render_db_dic, assets_db_dic = None, None
+    processing_time = 0.0
+
+    # --- Apply filters to the sorted machine list ---
+    # Filters are applied before splitting the list in pages so all pages have the same
+    # number of machines. Letter indices are translated to the filtered list. All the
+    # machines of the category must be loaded.
+    if filters_enabled:
+        chunk_key_list = [mame_catalog_order_chunk_key(hash_str, order_key, i) for i in range(num_chunks)]
+        order_list = []
+        for chunk_list in utils_load_JSON_pack_documents(order_FN.getPath(), chunk_key_list):
+            order_list.extend(chunk_list)
+        render_db_dic, assets_db_dic = render_load_category_rows(cfg, cache_index_dic,
+            catalog_name, category_name)
+        loading_time = time.time() - loading_ticks_start
+        processing_ticks_start = time.time()
+        letter_dic = {index : letter for letter, index in category_order_dic[order_key + '_letters']}
+        machine_list, letter_list = [], []
+        for i, machine_name in enumerate(order_list):
+            if i in letter_dic:
+                # Previous letter has no machines left after filtering.
+                if letter_list and letter_list[-1][1] == len(machine_list): letter_list.pop()
+                letter_list.append([letter_dic[i], len(machine_list)])
+            machine = render_db_dic[machine_name]
+            if display_hide_Mature and machine['isMature']: continue
+            if display_hide_BIOS and machine['isBIOS']: continue
+            if display_hide_nonworking and machine['driver_status'] == 'preliminary': continue
+            if display_hide_imperfect and machine['driver_status'] == 'imperfect': continue
+            if display_rom_available or display_chd_available:
+                m_assets = assets_db_dic[machine_name]
+                if display_rom_available and m_assets['flags'][0] == 'r': continue
+                if display_chd_available and m_assets['flags'][1] == 'c': continue
+            machine_list.append(machine_name)
+        if letter_list and letter_list[-1][1] == len(machine_list): letter_list.pop()
+        num_machines = len(machine_list)
+        processing_time = time.time() - processing_ticks_start
+    else:
+        letter_list = category_order_dic[order_key + '_letters']
+        loading_time = time.time() - loading_ticks_start
+    num_pages = max(1, (num_machines + page_size - 1) // page_size)
+
+    # --- Jump-to-letter index ---
+    if page_str == 'index':
+        for letter, index in letter_list:
+            page = index // page_size + 1
+            title_str = '{} [COLOR orange](page {} of {})[/COLOR]'.format(letter, page, num_pages)
+            listitem = xbmcgui.ListItem(title_str)
+            listitem.setInfo('video', {'title' : title_str, 'overlay' : 4})
+            listitem.setArt({'icon' : cfg.ICON_FILE_PATH.getPath(), 'fanart' : cfg.FANART_FILE_PATH.getPath()})
+            URL = misc_url_3_arg('catalog', catalog_name, 'category', category_name, 'page', text_type(page))
+            xbmcplugin.addDirectoryItem(cfg.addon_handle, URL, listitem, isFolder = True)
+        xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = True)
+        return
+
+    # --- Load the order chunks and the machines of the page ---
+    page = int(page_str) if page_str.isdigit() else 1
+    page = min(max(page, 1), num_pages)
+    page_start, page_end = (page - 1) * page_size, min(page * page_size, num_machines)
+    if filters_enabled:
+        page_machine_list = machine_list[page_start:page_end]
+    else:
+        loading_ticks_start = time.time()
+        first_chunk = page_start // MAME_CATALOG_ORDER_CHUNK_SIZE
+        last_chunk = max(page_end - 1, 0) // MAME_CATALOG_ORDER_CHUNK_SIZE
+        chunk_key_list = [mame_catalog_order_chunk_key(hash_str, order_key, i)
+            for i in range(first_chunk, last_chunk + 1)]
+        order_list = []
+        for chunk_list in utils_load_JSON_pack_documents(order_FN.getPath(), chunk_key_list):
+            order_list.extend(chunk_list)
+        chunk_start = first_chunk * MAME_CATALOG_ORDER_CHUNK_SIZE
+        page_machine_list = order_list[page_start - chunk_start:page_end - chunk_start]
+        render_db_dic, assets_db_dic = render_load_category_rows(cfg, cache_index_dic,
+            catalog_name, category_name, chunk_key_list, page_machine_list)
+        loading_time += time.time() - loading_ticks_start
+    loading_ticks_start = time.time()
+    main_pclone_dic = utils_load_JSON_file_dic(cfg.MAIN_PCLONE_DB_PATH.getPath())
+    fav_machines = utils_load_JSON_file_dic(cfg.FAV_MACHINES_PATH.getPath())
+    loading_time += time.time() - loading_ticks_start
+
+    # --- Process the machines in the page ---
+    processing_ticks_start = time.time()
+    page_catalog_dic = {category_name : {}}
+    for machine_name in page_machine_list:
+        page_catalog_dic[category_name][machine_name] = render_db_dic[machine_name]['description']
+    r_list = render_process_machines(cfg, page_catalog_dic, catalog_name, category_name,
+        render_db_dic, assets_db_dic, fav_machines, True, main_pclone_dic, True)
+    processing_time += time.time() - processing_ticks_start
+
+    # --- Commit ROMs and navigation items ---
+    # SpecialSort keeps the navigation items on top/bottom whatever the sorting method.
+    rendering_ticks_start = time.time()
+    set_Kodi_all_sorting_methods(cfg)
+    render_commit_machines(cfg, r_list)
+    nav_list = [('[COLOR orange]Jump to letter[/COLOR]', 'index', 'top')]
+    if page > 1:
+        nav_list.append(('[COLOR orange]<< Previous page ({} of {})[/COLOR]'.format(page - 1, num_pages),
+            text_type(page - 1), 'top'))
+    if page < num_pages:
+        nav_list.append(('[COLOR orange]Next page ({} of {}) >>[/COLOR]'.format(page + 1, num_pages),
+            text_type(page + 1), 'bottom'))
+    for title_str, nav_page_str, special_sort in nav_list:
+        listitem = xbmcgui.ListItem(title_str)
+        listitem.setInfo('video', {'title' : title_str, 'overlay' : 4})
+        listitem.setProperty('SpecialSort', special_sort)
+        listitem.setArt({'icon' : cfg.ICON_FILE_PATH.getPath(), 'fanart' : cfg.FANART_FILE_PATH.getPath()})
+        URL = misc_url_3_arg('catalog', catalog_name, 'category', category_name, 'page', nav_page_str)
+        xbmcplugin.addDirectoryItem(cfg.addon_handle, URL, listitem, isFolder = True)
+    xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = True)
+    rendering_time = time.time() - rendering_ticks_start
+
+    # --- DEBUG Data loading/rendering statistics ---
+    total_time = loading_time + processing_time + rendering_time
+    log_debug('Page {} of {} ({} machines)'.format(page, num_pages, num_machines))
+    log_debug('Loading time        {0:.4f} s'.format(loading_time))
+    log_debug('Processing time     {0:.4f} s'.format(processing_time))
+    log_debug('Rendering time      {0:.4f} s'.format(rendering_time))
+    log_debug('Total time          {0:.4f} s'.format(total_time))
+
+#
+# Loads the render and asset rows of a category from the render and asset caches, or the full
+# databases if the caches are disabled.
+# If chunk_key_list is given only the rows of those catalog order chunks are loaded. The whole
+# category is loaded if the cache does not have all the machines of machine_list, for example
+# if the catalogs were rebuilt but the caches were not.
+# Returns (render_db_dic, assets_db_dic)
+#
+def render_load_category_rows(cfg, cache_index_dic, catalog_name, category_name,
+    chunk_key_list = None, machine_list = None):
+    if cfg.settings['debug_enable_MAME_render_cache']:
+        render_db_dic = None
+        if chunk_key_list:
+            render_db_dic = db_get_render_cache_page(cfg, catalog_name, chunk_key_list)
+            if render_db_dic is not None and not all(m in render_db_dic for m in machine_list):
+                render_db_dic = None
+        if render_db_dic is None:
+            render_db_dic = db_get_render_cache_row(cfg, cache_index_dic, catalog_name, category_name)
+    else:
+        log_debug('MAME machine cache disabled.')
+        render_db_dic = utils_load_JSON_file_dic(cfg.RENDER_DB_PATH.getPath())
+    if cfg.settings['debug_enable_MAME_asset_cache']:
+        assets_db_dic = None
+        if chunk_key_list:
+            assets_db_dic = db_get_asset_cache_page(cfg, catalog_name, chunk_key_list)
+            if assets_db_dic is not None and not all(m in assets_db_dic for m in machine_list):
+                assets_db_dic = None
+        if assets_db_dic is None:
+            assets_db_dic = db_get_asset_cache_row(cfg, cache_index_dic, catalog_name, category_name)
+    else:
+        log_debug('MAME asset cache disabled.')
+        assets_db_dic = utils_load_JSON_file_dic(cfg.ASSET_DB_PATH.getPath())
+
+    return render_db_dic, assets_db_dic
+
 #
 # Renders a list of MAME Clone machines (including parent).
 # No need to check for DB existance here. If this function is called is because parents and
@@ -2176,6 +2505,7 @@ def render_catalog_clone_list(cfg, catalog_name, category_name, parent_name):
     # --- Load main MAME info DB ---
     loading_ticks_start = time.time()
     catalog_dic = db_get_cataloged_dic_all(cfg, catalog_name)
+    cache_index_dic = None
     if cfg.settings['debug_enable_MAME_render_cache']:
         cache_index_dic = utils_load_JSON_file_dic(cfg.CACHE_INDEX_PATH.getPath())
         render_db_dic = db_get_render_cache_row(cfg, cache_index_dic, catalog_name, category_name)
@@ -2183,7 +2513,7 @@ def render_catalog_clone_list(cfg, catalog_name, category_name, parent_name):
         log_debug('MAME machine cache disabled.')
         render_db_dic = utils_load_JSON_file_dic(cfg.RENDER_DB_PATH.getPath())
     if cfg.settings['debug_enable_MAME_asset_cache']:
-        if 'cache_index_dic' not in locals():
+        if cache_index_dic is None:
             cache_index_dic = utils_load_JSON_file_dic(cfg.CACHE_INDEX_PATH.getPath())
         assets_db_dic = db_get_asset_cache_row(cfg, cache_index_dic, catalog_name, category_name)
     else:
@@ -2218,7 +2548,7 @@ def render_catalog_clone_list(cfg, catalog_name, category_name, parent_name):
     rendering_ticks_start = time.time()
     set_Kodi_all_sorting_methods(cfg)
     render_commit_machines(cfg, r_list)
-    xbmcplugin.endOfDirectory(handle = cfg.addon_handle, succeeded = True, cacheToDisc = False)
+    xbmcplugin.endOfDirectory(handle = cfg.addon_handle, succeeded = True, cacheToDisc = True)
     rendering_ticks_end = time.time()
     rendering_time = rendering_ticks_end - rendering_ticks_start
 
@@ -2229,6 +2559,89 @@ def render_catalog_clone_list(cfg, catalog_name, category_name, parent_name):
     log_debug('Rendering   {0:.4f} s'.format(rendering_time))
     log_debug('Total       {0:.4f} s'.format(total_time))
 
+#
+# Search MAME machines and SL items using the search indices built with the databases.
+# If query_str is empty asks the user for the search words and updates the container with the
+# URL of the results so the results can be refreshed without asking again.
+#
+def render_search(cfg, query_str):
+    log_debug('render_search() query_str "{}"'.format(query_str))
+    SEARCH_MAX_RESULTS = 500
+    if not query_str:
+        xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = False, cacheToDisc = False)
+        keyboard_text = kodi_dialog_keyboard('Search MAME machines and SL items')
+        if keyboard_text is None: return
+        query_str = ' '.join(db_search_tokenize(keyboard_text))
+        if not query_str: return
+        URL = misc_url_2_arg('command', 'SHOW_SEARCH', 'query', query_str.replace(' ', '+'))
+        xbmc.executebuiltin('Container.Update({})'.format(URL))
+        return
+
+    # --- General AML plugin check ---
+    control_dic = utils_load_JSON_file_dic(cfg.MAIN_CONTROL_PATH.getPath())
+    st_dic = kodi_new_status_dic()
+    check_MAME_DB_before_rendering_machines(cfg, st_dic, control_dic)
+    if kodi_is_error_status(st_dic):
+        xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = False)
+        kodi_display_status_message(st_dic)
+        return
+    if not cfg.MAME_SEARCH_INDEX_PATH.exists():
+        kodi_dialog_OK('MAME search index not found. Rebuild the MAME catalogs.')
+        xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = False)
+        return
+
+    # --- Search ---
+    search_ticks_start = time.time()
+    search_index_dic = utils_load_JSON_file_dic(cfg.MAME_SEARCH_INDEX_PATH.getPath())
+    machine_list = db_search_index_query(search_index_dic, query_str)
+    SL_item_list = []
+    if cfg.settings['global_enable_SL'] and cfg.SL_SEARCH_INDEX_PATH.exists():
+        search_index_dic = utils_load_JSON_file_dic(cfg.SL_SEARCH_INDEX_PATH.getPath())
+        SL_item_list = db_search_index_query(search_index_dic, query_str)
+    search_time = time.time() - search_ticks_start
+    log_debug('render_search() Found {} machines and {} SL items in {:.4f} s'.format(
+        len(machine_list), len(SL_item_list), search_time))
+    if not machine_list and not SL_item_list:
+        kodi_notify('No results found for "{}"'.format(query_str))
+    elif len(machine_list) > SEARCH_MAX_RESULTS or len(SL_item_list) > SEARCH_MAX_RESULTS:
+        kodi_notify('Too many results. Only the first {} are displayed.'.format(SEARCH_MAX_RESULTS))
+    machine_list = machine_list[:SEARCH_MAX_RESULTS]
+    SL_item_list = SL_item_list[:SEARCH_MAX_RESULTS]
+
+    # --- Render MAME machines ---
+    # Only the hashed database files of the machines found are loaded.
+    set_Kodi_all_sorting_methods(cfg)
+    if machine_list:
+        render_db_dic = db_get_machines_hashed_db(cfg, machine_list, '_machines.json')
+        assets_db_dic = db_get_machines_hashed_db(cfg, machine_list, '_assets.json')
+        fav_machines = utils_load_JSON_file_dic(cfg.FAV_MACHINES_PATH.getPath())
+        catalog_dic = {'Search' : {}}
+        for machine_name in machine_list:
+            if machine_name not in render_db_dic or machine_name not in assets_db_dic: continue
+            catalog_dic['Search'][machine_name] = render_db_dic[machine_name]['description']
+        r_list = render_process_machines(cfg, catalog_dic, 'Search', 'Search',
+            render_db_dic, assets_db_dic, fav_machines, False, None, False)
+        render_commit_machines(cfg, r_list)
+
+    # --- Render SL items ---
+    # SL databases are loaded once for every SL with results.
+    if SL_item_list:
+        SL_catalog_dic = utils_load_JSON_file_dic(cfg.SL_INDEX_PATH.getPath())
+        SL_rom_dic = {}
+        for SL_item_key in SL_item_list:
+            SL_name, rom_name = SL_item_key.split('/', 1)
+            SL_rom_dic.setdefault(SL_name, []).append(rom_name)
+        for SL_name in sorted(SL_rom_dic):
+            rom_DB_noext = SL_catalog_dic[SL_name]['rom_DB_noext']
+            SL_roms = utils_load_JSON_file_dic(cfg.SL_DB_DIR.pjoin(rom_DB_noext + '_items.json').getPath())
+            SL_asset_dic = utils_load_JSON_file_dic(cfg.SL_DB_DIR.pjoin(rom_DB_noext + '_assets.json').getPath())
+            for rom_name in SL_rom_dic[SL_name]:
+                ROM = SL_roms[rom_name]
+                assets = SL_asset_dic[rom_name] if rom_name in SL_asset_dic else db_new_SL_asset()
+                ROM['genre'] = SL_catalog_dic[SL_name]['display_name'] # Add the SL name as 'genre'
+                render_SL_ROM_row(cfg, SL_name, rom_name, ROM, assets)
+    xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = True)
+
 #
 # First make this function work OK, then try to optimize it.
 # "Premature optimization is the root of all evil." Donald Knuth
@@ -2329,13 +2742,13 @@ def render_process_machines(cfg, catalog_dic, catalog_name, category_name,
             r_dict['info'] = {
                 'title' : display_name, 'year' : machine['year'],
                 'genre' : machine['genre'], 'studio' : machine['manufacturer'],
-                'plot' : m_assets['plot'], 'overlay' : ICON_OVERLAY,
+                'plot' : mame_MAME_plot(machine, m_assets), 'overlay' : ICON_OVERLAY,
             }
         else:
             r_dict['info'] = {
                 'title' : display_name, 'year' : machine['year'],
                 'genre' : machine['genre'], 'studio' : machine['manufacturer'],
-                'plot' : m_assets['plot'], 'overlay' : ICON_OVERLAY,
+                'plot' : mame_MAME_plot(machine, m_assets), 'overlay' : ICON_OVERLAY,
                 'trailer' : m_assets['trailer'],
             }
         r_dict['props'] = {
@@ -2518,7 +2931,7 @@ def render_SL_list(cfg, catalog_name):
     for SL_name in SL_catalog_dic:
         SL = SL_catalog_dic[SL_name]
         render_SL_list_row(cfg, SL_name, SL)
-    xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = False)
+    xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = True)
 
 def render_SL_ROMs(cfg, SL_name):
     log_debug('render_SL_ROMs() SL_name "{}"'.format(SL_name))
@@ -2572,7 +2985,7 @@ def render_SL_ROMs(cfg, SL_name):
     else:
         kodi_dialog_OK('Wrong vm = "{}". This is a bug, please report it.'.format(prop_dic['vm']))
         return
-    xbmcplugin.endOfDirectory(handle = cfg.addon_handle, succeeded = True, cacheToDisc = False)
+    xbmcplugin.endOfDirectory(handle = cfg.addon_handle, succeeded = True, cacheToDisc = True)
 
 def render_SL_pclone_set(cfg, SL_name, parent_name):
     log_debug('render_SL_pclone_set() SL_name     "{}"'.format(SL_name))
@@ -2606,7 +3019,7 @@ def render_SL_pclone_set(cfg, SL_name, parent_name):
         assets = SL_asset_dic[clone_name] if clone_name in SL_asset_dic else db_new_SL_asset()
         ROM['genre'] = SL_proper_name # >> Add the SL name as 'genre'
         render_SL_ROM_row(cfg, SL_name, clone_name, ROM, assets)
-    xbmcplugin.endOfDirectory(handle = cfg.addon_handle, succeeded = True, cacheToDisc = False)
+    xbmcplugin.endOfDirectory(handle = cfg.addon_handle, succeeded = True, cacheToDisc = True)
 
 def render_SL_list_row(cfg, SL_name, SL):
     # --- Display number of ROMs and CHDs ---
@@ -2682,13 +3095,13 @@ def render_SL_ROM_row(cfg, SL_name, rom_name, ROM, assets, flag_parent_list = Fa
         listitem.setInfo('video', {
             'title'   : display_name,      'year'    : ROM['year'],
             'genre'   : ROM['genre'],      'studio'  : ROM['publisher'],
-            'plot'    : ROM['plot'],       'overlay' : ICON_OVERLAY
+            'plot'    : mame_SL_plot(ROM, assets), 'overlay' : ICON_OVERLAY
         })
     else:
         listitem.setInfo('video', {
             'title'   : display_name,      'year'    : ROM['year'],
             'genre'   : ROM['genre'],      'studio'  : ROM['publisher'],
-            'plot'    : ROM['plot'],       'overlay' : ICON_OVERLAY,
+            'plot'    : mame_SL_plot(ROM, assets), 'overlay' : ICON_OVERLAY,
             'trailer' : assets['trailer']
         })
     listitem.setProperty('platform', 'MAME Software List')
@@ -2811,10 +3224,10 @@ def render_DAT_list(cfg, catalog_name):
             'DAT database file "{}" not found. Check out "Setup addon" in the context menu.'.format(catalog_name))
         xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = False)
         return
-    xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = False)
+    xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = True)
 
 # Only History.dat and MAMEinfo.dat have categories.
-def render_DAT_category(catalog_name, category_name):
+def render_DAT_category(cfg, catalog_name, category_name):
     # Load Software List catalog
     if catalog_name == 'History':
         DAT_catalog_dic = utils_load_JSON_file_dic(cfg.HISTORY_IDX_PATH.getPath())
@@ -2834,13 +3247,13 @@ def render_DAT_category(catalog_name, category_name):
         category_machine_dic = DAT_catalog_dic[category_name]['machines']
         for machine_key in category_machine_dic:
             display_name, db_list, db_machine = category_machine_dic[machine_key].split('|')
-            render_DAT_category_row(catalog_name, category_name, machine_key, display_name)
+            render_DAT_category_row(cfg, catalog_name, category_name, machine_key, display_name)
     elif catalog_name == 'MAMEINFO':
         category_machine_dic = DAT_catalog_dic[category_name]
         for machine_key in category_machine_dic:
             display_name = category_machine_dic[machine_key]
-            render_DAT_category_row(catalog_name, category_name, machine_key, display_name)
-    xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = False)
+            render_DAT_category_row(cfg, catalog_name, category_name, machine_key, display_name)
+    xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = True)
 
 def render_DAT_category_row(cfg, catalog_name, category_name, machine_key, display_name):
     # --- Create listitem row ---
@@ -2863,29 +3276,28 @@ def render_DAT_machine_info(cfg, catalog_name, category_name, machine_name):
 
     if catalog_name == 'History':
         DAT_idx_dic = utils_load_JSON_file_dic(cfg.HISTORY_IDX_PATH.getPath())
-        DAT_dic = utils_load_JSON_file_dic(cfg.HISTORY_DB_PATH.getPath())
         display_name, db_list, db_machine = DAT_idx_dic[category_name]['machines'][machine_name].split('|')
         t_str = ('History for [COLOR=orange]{}[/COLOR] item [COLOR=orange]{}[/COLOR] '
             '(DB entry [COLOR=orange]{}[/COLOR] / [COLOR=orange]{}[/COLOR])')
         window_title = t_str.format(category_name, machine_name, db_list, db_machine)
-        info_text = DAT_dic[db_list][db_machine]
+        info_text = utils_load_text_store_entry(cfg.HISTORY_DB_PATH.getPath(), db_list, db_machine)
     elif catalog_name == 'MAMEINFO':
-        DAT_dic = utils_load_JSON_file_dic(cfg.MAMEINFO_DB_PATH.getPath())
         t_str = 'MAMEINFO information for [COLOR=orange]{}[/COLOR] item [COLOR=orange]{}[/COLOR]'
         window_title = t_str.format(category_name, machine_name)
-        info_text = DAT_dic[category_name][machine_name]
+        info_text = utils_load_text_store_entry(cfg.MAMEINFO_DB_PATH.getPath(), category_name, machine_name)
     elif catalog_name == 'Gameinit':
-        DAT_dic = utils_load_JSON_file_dic(cfg.GAMEINIT_DB_PATH.getPath())
         window_title = 'Gameinit information for [COLOR=orange]{}[/COLOR]'.format(machine_name)
-        info_text = DAT_dic[machine_name]
+        info_text = utils_load_text_store_entry(cfg.GAMEINIT_DB_PATH.getPath(), machine_name)
     elif catalog_name == 'Command':
-        DAT_dic = utils_load_JSON_file_dic(cfg.COMMAND_DB_PATH.getPath())
         window_title = 'Command information for [COLOR=orange]{}[/COLOR]'.format(machine_name)
-        info_text = DAT_dic[machine_name]
+        info_text = utils_load_text_store_entry(cfg.COMMAND_DB_PATH.getPath(), machine_name)
     else:
         kodi_dialog_OK(
             'Wrong catalog_name "{}". This is a bug, please report it.'.format(catalog_name))
         return
+    if info_text is None:
+        kodi_dialog_OK('DAT database entry not found. Rebuild the MAME databases.')
+        return
 
     # --- Show information window ---
     kodi_display_text_window_mono(window_title, info_text)
@@ -3062,7 +3474,6 @@ def command_context_info_utils(cfg, machine_name, SL_name, SL_ROM, location):
                 return
             m_str = History_idx_dic['mame']['machines'][machine_name]
             display_name, db_list, db_machine = m_str.split('|')
-            History_DAT_dic = utils_load_JSON_file_dic(cfg.HISTORY_DB_PATH.getPath())
             t_str = ('History DAT for MAME machine [COLOR=orange]{}[/COLOR] '
                 '(DB entry [COLOR=orange]{}[/COLOR])')
             window_title = t_str.format(machine_name, db_machine)
@@ -3075,36 +3486,48 @@ def command_context_info_utils(cfg, machine_name, SL_name, SL_ROM, location):
                 return
             m_str = History_idx_dic[SL_name]['machines'][SL_ROM]
             display_name, db_list, db_machine = m_str.split('|')
-            History_DAT_dic = utils_load_JSON_file_dic(cfg.HISTORY_DB_PATH.getPath())
             t_str = ('History DAT for SL [COLOR=orange]{}[/COLOR] item [COLOR=orange]{}[/COLOR] '
                 '(DB entry [COLOR=orange]{}[/COLOR] / [COLOR=orange]{}[/COLOR])')
             window_title = t_str.format(SL_name, SL_ROM, db_list, db_machine)
-        kodi_display_text_window_mono(window_title, History_DAT_dic[db_list][db_machine])
+        info_text = utils_load_text_store_entry(cfg.HISTORY_DB_PATH.getPath(), db_list, db_machine)
+        if info_text is None:
+            kodi_dialog_OK('History DAT entry not found. Rebuild the MAME databases.')
+            return
+        kodi_display_text_window_mono(window_title, info_text)
 
     elif action == ACTION_VIEW_MAMEINFO:
         if machine_name not in Mameinfo_idx_dic['mame']:
             kodi_dialog_OK('Machine {} not in Mameinfo DAT'.format(machine_name))
             return
-        DAT_dic = utils_load_JSON_file_dic(cfg.MAMEINFO_DB_PATH.getPath())
         t_str = 'MAMEINFO information for [COLOR=orange]{}[/COLOR] item [COLOR=orange]{}[/COLOR]'
         window_title = t_str.format('mame', machine_name)
-        kodi_display_text_window_mono(window_title, DAT_dic['mame'][machine_name])
+        info_text = utils_load_text_store_entry(cfg.MAMEINFO_DB_PATH.getPath(), 'mame', machine_name)
+        if info_text is None:
+            kodi_dialog_OK('Mameinfo DAT entry not found. Rebuild the MAME databases.')
+            return
+        kodi_display_text_window_mono(window_title, info_text)
 
     elif action == ACTION_VIEW_GAMEINIT:
         if machine_name not in Gameinit_idx_list:
             kodi_dialog_OK('Machine {} not in Gameinit DAT'.format(machine_name))
             return
-        DAT_dic = utils_load_JSON_file_dic(cfg.GAMEINIT_DB_PATH.getPath())
         window_title = 'Gameinit information for [COLOR=orange]{}[/COLOR]'.format(machine_name)
-        kodi_display_text_window_mono(window_title, DAT_dic[machine_name])
+        info_text = utils_load_text_store_entry(cfg.GAMEINIT_DB_PATH.getPath(), machine_name)
+        if info_text is None:
+            kodi_dialog_OK('Gameinit DAT entry not found. Rebuild the MAME databases.')
+            return
+        kodi_display_text_window_mono(window_title, info_text)
 
     elif action == ACTION_VIEW_COMMAND:
         if machine_name not in Command_idx_list:
             kodi_dialog_OK('Machine {} not in Command DAT'.format(machine_name))
             return
-        DAT_dic = utils_load_JSON_file_dic(cfg.COMMAND_DB_PATH.getPath())
         window_title = 'Command information for [COLOR=orange]{}[/COLOR]'.format(machine_name)
-        kodi_display_text_window_mono(window_title, DAT_dic[machine_name])
+        info_text = utils_load_text_store_entry(cfg.COMMAND_DB_PATH.getPath(), machine_name)
+        if info_text is None:
+            kodi_dialog_OK('Command DAT entry not found. Rebuild the MAME databases.')
+            return
+        kodi_display_text_window_mono(window_title, info_text)
 
     # --- View Fanart ---
     elif action == ACTION_VIEW_FANART:
@@ -3144,6 +3567,10 @@ def command_context_info_utils(cfg, machine_name, SL_name, SL_ROM, location):
     # Use the builtin function SlideShow("{}",pause) to show a set of pictures in full screen.
     # See https://forum.kodi.tv/showthread.php?tid=329349
     #
+    # The slideshow reads the directory once so all the pages must be extracted before it
+    # starts. Manuals are now displayed with ManualViewer in manuals.py, which extracts the
+    # pages when needed and prefetches the next pages in the background.
+    #
     elif action == ACTION_VIEW_MANUAL:
         # --- Slideshow DEBUG snippet ---
         # https://kodi.wiki/view/List_of_built-in_functions is outdated!
@@ -3153,13 +3580,12 @@ def command_context_info_utils(cfg, machine_name, SL_name, SL_ROM, location):
         # xbmc.executebuiltin('SlideShow("{}",pause)'.format(r'E:\\AML-stuff\\AML-assets\\fanarts\\'))
 
         # If manual found then display it.
-        # First, extract images from the PDF/CBZ.
+        # First, extract images from the PDF.
         # Put the extracted images in a directory named MANUALS_DIR/manual_name.pages/
         # Check the modification times of the PDF manual file witht the timestamp of
         # the first file to regenerate the images if PDF is newer than first extracted img.
-        # NOTE CBZ/CBR files are supported by Kodi. It can be extracted with the builtin
-        #      function extract. In addition to PDF extension, CBR and CBZ extensions must
-        #      also be searched for manuals.
+        # NOTE CBZ files are not extracted, the viewer reads the images directly from the
+        #      ZIP file. CBR files are supported only if they are actually ZIP files.
         if view_type == VIEW_MAME_MACHINE:
             log_debug('Displaying Manual for MAME machine {} ...'.format(machine_name))
             # machine = db_get_machine_main_hashed_db(cfg, machine_name)
@@ -3188,11 +3614,21 @@ def command_context_info_utils(cfg, machine_name, SL_name, SL_ROM, location):
             kodi_dialog_OK('Manual "{}" not found.'.format(man_file_FN.getPath()))
             return
 
-        # --- Only PDF files supported at the moment ---
+        # --- CBZ manuals are displayed without extracting the images ---
         man_ext = man_file_FN.getExt().lower()
         log_debug('Manual file extension "{}"'.format(man_ext))
-        if not man_ext == '.pdf':
-            kodi_dialog_OK('Only PDF files supported at the moment.')
+        if man_ext == '.cbz' or man_ext == '.cbr':
+            status_dic = manuals_open_CBZ_file(man_file_FN)
+            if status_dic['abort_extraction']:
+                kodi_dialog_OK('Cannot read manual {}. CBR (RAR) manuals are not supported, '
+                    'convert them to CBZ.'.format(man_file_FN.getPath()))
+                return
+            log_info('Rendering images in "{}"'.format(man_file_FN.getPath()))
+            if not manuals_view_manual(status_dic, man_file_FN, None):
+                kodi_dialog_OK('No images found in manual {}'.format(man_file_FN.getPath()))
+            return
+        elif man_ext != '.pdf':
+            kodi_dialog_OK('Manual format {} not supported.'.format(man_ext))
             return
 
         # --- If output directory does not exist create it ---
@@ -3208,42 +3644,29 @@ def command_context_info_utils(cfg, machine_name, SL_name, SL_ROM, location):
         # manuals_extract_pages(status_dic, man_file_FN, img_dir_FN)
 
         # Check if JSON INFO file exists. If so, read it and compare the timestamp of the
-        # extraction of the images with the timestamp of the PDF file. Do not extract
-        # the images if the images are newer than the PDF.
+        # extraction of the images with the timestamp of the PDF file. Pages already extracted
+        # are not extracted again if the images are newer than the PDF.
         status_dic = manuals_check_img_extraction_needed(man_file_FN, img_dir_FN)
         if status_dic['extraction_needed']:
-            # Disable PDF image extracion in Python 3 until the problems with the pdfrw library
-            # are solved.
-            if ADDON_RUNNING_PYTHON_3:
-                log_error('Image extraction from PDF files is disabled in Python 3. Exiting.')
-                kodi_dialog_OK('Image extraction from PDF files is disabled in Python 3. '
-                    'This feature will be ported to Python 3 as soon as possible.')
-                return
-
-            log_info('Extracting images from PDF file.')
             # --- Open manual file ---
+            # Pages are extracted by the manual viewer when needed.
+            log_info('Opening PDF file.')
             manuals_open_PDF_file(status_dic, man_file_FN, img_dir_FN)
             if status_dic['abort_extraction']:
                 kodi_dialog_OK('Cannot extract images from file {}'.format(man_file_FN.getPath()))
                 return
-            manuals_get_PDF_filter_list(status_dic, man_file_FN, img_dir_FN)
-
-            # --- Extract page by page ---
-            pDialog = KodiProgressDialog()
-            pDialog.startProgress('Extracting manual images...', status_dic['numPages'])
-            for page_index in range(status_dic['numPages']):
-                pDialog.updateProgressInc()
-                manuals_extract_PDF_page(status_dic, man_file_FN, img_dir_FN, page_index)
-            manuals_close_PDF_file()
-            pDialog.endProgress()
-
-            # --- Create JSON INFO file ---
-            manuals_create_INFO_file(status_dic, man_file_FN, img_dir_FN)
         else:
-            log_info('Extraction of PDF images skipped.')
+            log_info('All PDF pages already extracted.')
 
         # --- Display page images ---
-        if status_dic['numImages'] < 1:
+        log_info('Rendering images in "{}"'.format(img_dir_FN.getPath()))
+        manual_has_images = manuals_view_manual(status_dic, man_file_FN, img_dir_FN)
+        manuals_close_PDF_file()
+
+        # --- Create JSON INFO file with the pages extracted so far ---
+        if status_dic['extraction_needed']:
+            manuals_create_INFO_file(status_dic, man_file_FN, img_dir_FN)
+        if not manual_has_images:
             log_info('No images found. Nothing to show.')
             str_list = [
                 'Cannot find images inside the {} file. '.format(status_dic['manFormat']),
@@ -3251,8 +3674,6 @@ def command_context_info_utils(cfg, machine_name, SL_name, SL_ROM, location):
             ]
             kodi_dialog_OK(''.join(str_list))
             return
-        log_info('Rendering images in "{}"'.format(img_dir_FN.getPath()))
-        xbmc.executebuiltin('SlideShow("{}",pause)'.format(img_dir_FN.getPath()))
 
     # --- Display brother machines (same driver) ---
     elif action == ACTION_VIEW_BROTHERS:
@@ -3260,7 +3681,7 @@ def command_context_info_utils(cfg, machine_name, SL_name, SL_ROM, location):
         # Some (important) drivers have a different name
         sourcefile = machine['sourcefile']
         log_debug('Original driver "{}"'.format(sourcefile))
-        mdbn_dic = mame_driver_better_name_dic
+        mdbn_dic = lazy_import_module('mame').mame_driver_better_name_dic
         sourcefile = mdbn_dic[sourcefile] if sourcefile in mdbn_dic else sourcefile
         log_debug('Final driver    "{}"'.format(sourcefile))
 
@@ -4054,14 +4475,14 @@ def render_fav_machine_row(cfg, m_name, machine, m_assets, location):
         listitem.setInfo('video', {
             'title'   : display_name,     'year'    : machine['year'],
             'genre'   : machine['genre'], 'studio'  : machine['manufacturer'],
-            'plot'    : m_assets['plot'],
+            'plot'    : mame_MAME_plot(machine, m_assets),
             'overlay' : ICON_OVERLAY
         })
     else:
         listitem.setInfo('video', {
             'title'   : display_name,     'year'    : machine['year'],
             'genre'   : machine['genre'], 'studio'  : machine['manufacturer'],
-            'plot'    : m_assets['plot'], 'trailer' : m_assets['trailer'],
+            'plot'    : mame_MAME_plot(machine, m_assets), 'trailer' : m_assets['trailer'],
             'overlay' : ICON_OVERLAY
         })
     listitem.setProperty('nplayers', machine['nplayers'])
@@ -4258,6 +4679,7 @@ def command_context_manage_mame_fav(cfg, machine_name):
         kodi_dialog_OK(t)
 
 def command_show_mame_most_played(cfg):
+    mame_compact_MAME_play_journal(cfg)
     most_played_roms_dic = utils_load_JSON_file_dic(cfg.MAME_MOST_PLAYED_FILE_PATH.getPath())
     if not most_played_roms_dic:
         kodi_dialog_OK('No Most Played MAME machines. Play a bit and try later.')
@@ -4272,6 +4694,7 @@ def command_show_mame_most_played(cfg):
     xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = False)
 
 def command_context_manage_mame_most_played(cfg, machine_name):
+    mame_compact_MAME_play_journal(cfg)
     VIEW_ROOT_MENU   = 100
     VIEW_INSIDE_MENU = 200
 
@@ -4391,6 +4814,7 @@ def command_context_manage_mame_most_played(cfg, machine_name):
         kodi_dialog_OK(t)
 
 def command_show_mame_recently_played(cfg):
+    mame_compact_MAME_play_journal(cfg)
     recent_roms_list = utils_load_JSON_file_list(cfg.MAME_RECENT_PLAYED_FILE_PATH.getPath())
     if not recent_roms_list:
         kodi_dialog_OK('No Recently Played MAME machines. Play a bit and try later.')
@@ -4403,6 +4827,7 @@ def command_show_mame_recently_played(cfg):
     xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = False)
 
 def command_context_manage_mame_recent_played(cfg, machine_name):
+    mame_compact_MAME_play_journal(cfg)
     VIEW_ROOT_MENU   = 100
     VIEW_INSIDE_MENU = 200
 
@@ -4596,13 +5021,13 @@ def render_sl_fav_machine_row(cfg, SL_fav_key, ROM, assets, location):
         listitem.setInfo('video', {
             'title' : display_name, 'year' : ROM['year'],
             'genre' : ROM['genre'], 'studio' : ROM['publisher'],
-            'plot' : ROM['plot'], 'overlay' : ICON_OVERLAY,
+            'plot' : mame_SL_plot(ROM, assets), 'overlay' : ICON_OVERLAY,
         })
     else:
         listitem.setInfo('video', {
             'title' : display_name, 'year' : ROM['year'],
             'genre' : ROM['genre'], 'studio' : ROM['publisher'],
-            'plot' : ROM['plot'], 'overlay' : ICON_OVERLAY,
+            'plot' : mame_SL_plot(ROM, assets), 'overlay' : ICON_OVERLAY,
             'trailer' : assets['trailer'],
         })
     listitem.setProperty('platform', 'MAME Software List')
@@ -4830,6 +5255,7 @@ def command_context_manage_sl_fav(cfg, SL_name, ROM_name):
         kodi_dialog_OK(t)
 
 def command_show_SL_most_played(cfg):
+    mame_compact_SL_play_journal(cfg)
     SL_catalog_dic = utils_load_JSON_file_dic(cfg.SL_INDEX_PATH.getPath())
     most_played_roms_dic = utils_load_JSON_file_dic(cfg.SL_MOST_PLAYED_FILE_PATH.getPath())
     if not most_played_roms_dic:
@@ -4849,6 +5275,7 @@ def command_show_SL_most_played(cfg):
     xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = False)
 
 def command_context_manage_SL_most_played(cfg, SL_name, ROM_name):
+    mame_compact_SL_play_journal(cfg)
     VIEW_ROOT_MENU   = 100
     VIEW_INSIDE_MENU = 200
 
@@ -4976,6 +5403,7 @@ def command_context_manage_SL_most_played(cfg, SL_name, ROM_name):
         kodi_dialog_OK(t)
 
 def command_show_SL_recently_played(cfg):
+    mame_compact_SL_play_journal(cfg)
     SL_catalog_dic = utils_load_JSON_file_dic(cfg.SL_INDEX_PATH.getPath())
     recent_roms_list = utils_load_JSON_file_list(cfg.SL_RECENT_PLAYED_FILE_PATH.getPath())
     if not recent_roms_list:
@@ -4994,6 +5422,7 @@ def command_show_SL_recently_played(cfg):
     xbmcplugin.endOfDirectory(cfg.addon_handle, succeeded = True, cacheToDisc = False)
 
 def command_context_manage_SL_recent_played(cfg, SL_name, ROM_name):
+    mame_compact_SL_play_journal(cfg)
     VIEW_ROOT_MENU   = 100
     VIEW_INSIDE_MENU = 200
 
@@ -5540,11 +5969,11 @@ def check_SL_DB_before_rendering_machines(cfg, st_dic, control_dic):
 # -------------------------------------------------------------------------------------------------
 def command_context_setup_plugin(cfg):
     menu_item = xbmcgui.Dialog().select('Setup AML addon', [
-        'All in one (Build DB, Scan, Plots, Filters)',
-        'All in one (Build DB, Scan, Plots, Filters, Audit)',
+        'All in one (Build DB, Scan, Filters)',
+        'All in one (Build DB, Scan, Filters, Audit)',
         'Build all databases',
-        'Scan everything and build plots',
-        'Build missing Fanarts and 3D boxes',
+        'Scan everything',
+        'Build missing/outdated Fanarts and 3D boxes',
         'Audit MAME machine ROMs/CHDs',
         'Audit SL ROMs/CHDs',
         'Step by step ...',
@@ -5552,8 +5981,8 @@ def command_context_setup_plugin(cfg):
     ])
     if menu_item < 0: return
 
-    # --- All in one (Build, Scan, Plots, Filters) ---
-    # --- All in one (Build, Scan, Plots, Filters, Audit) ---
+    # --- All in one (Build, Scan, Filters) ---
+    # --- All in one (Build, Scan, Filters, Audit) ---
     if menu_item == 0 or menu_item == 1:
         DO_AUDIT = True if menu_item == 1 else False
         log_info('command_context_setup_plugin() All in one step starting ...')
@@ -5625,15 +6054,6 @@ def command_context_setup_plugin(cfg):
         else:
             log_info('SL disabled. Skipping mame_scan_SL_assets()')
 
-        # --- Build MAME machine plots ---
-        mame_build_MAME_plots(cfg, db_dic)
-
-        # --- Build Software List items plot ---
-        if cfg.settings['global_enable_SL']:
-            mame_build_SL_plots(cfg, db_dic)
-        else:
-            log_info('SL disabled. Skipping mame_build_SL_plots()')
-
         # --- Regenerate the custom filters ---
         (main_filter_dic, sets_dic) = filter_get_filter_DB(cfg, db_dic)
         (filter_list, f_st_dic) = filter_custom_filters_load_XML(cfg, db_dic, main_filter_dic, sets_dic)
@@ -5649,6 +6069,9 @@ def command_context_setup_plugin(cfg):
         db_build_render_cache(cfg, db_dic['control_dic'], db_dic['cache_index'], db_dic['renderdb'])
         db_build_asset_cache(cfg, db_dic['control_dic'], db_dic['cache_index'], db_dic['assetdb'])
 
+        # --- Update Favourites, Most Played and Recently Played ---
+        mame_update_all_Fav_objects(cfg, db_dic['control_dic'])
+
         if DO_AUDIT:
             mame_audit_MAME_all(cfg, db_dic)
             if cfg.settings['global_enable_SL']:
@@ -5733,10 +6156,6 @@ def command_context_setup_plugin(cfg):
             ['main_pclone_dic', 'MAME PClone dictionary', cfg.MAIN_PCLONE_DB_PATH.getPath()],
             ['machine_archives', 'Machine file list', cfg.ROM_SET_MACHINE_FILES_DB_PATH.getPath()],
             ['cache_index', 'MAME cache index', cfg.CACHE_INDEX_PATH.getPath()],
-            ['history_idx_dic', 'History DAT index', cfg.HISTORY_IDX_PATH.getPath()],
-            ['mameinfo_idx_dic', 'Mameinfo DAT index', cfg.MAMEINFO_IDX_PATH.getPath()],
-            ['gameinit_idx_list', 'Gameinit DAT index', cfg.GAMEINIT_IDX_PATH.getPath()],
-            ['command_idx_list', 'Command DAT index', cfg.COMMAND_IDX_PATH.getPath()],
         ]
         db_dic = db_load_files(db_files)
 
@@ -5756,9 +6175,6 @@ def command_context_setup_plugin(cfg):
             mame_scan_MAME_assets(cfg, st_dic, db_dic)
             if kodi_display_status_message(st_dic): return
 
-        # --- Build MAME machines plot (mandatory) ---
-        mame_build_MAME_plots(cfg, db_dic)
-
         # --- Regenerate asset hashed database ---
         db_build_asset_hashed_db(cfg, db_dic['control_dic'], db_dic['assetdb'])
 
@@ -5773,8 +6189,6 @@ def command_context_setup_plugin(cfg):
                 ['control_dic', 'Control dictionary', cfg.MAIN_CONTROL_PATH.getPath()],
                 ['SL_index', 'Software Lists index', cfg.SL_INDEX_PATH.getPath()],
                 ['SL_PClone_dic', 'Software Lists Parent/Clone database', cfg.SL_PCLONE_DIC_PATH.getPath()],
-                ['SL_machines', 'Software Lists machines', cfg.SL_MACHINES_PATH.getPath()],
-                ['history_idx_dic', 'History DAT index', cfg.HISTORY_IDX_PATH.getPath()],
             ]
             db_dic = db_load_files(db_files)
 
@@ -5789,11 +6203,12 @@ def command_context_setup_plugin(cfg):
             if kodi_display_status_message(st_dic): return
             mame_scan_SL_assets(cfg, st_dic, db_dic)
             if kodi_display_status_message(st_dic): return
-
-            # --- Build Software List items plot (mandatory) ---
-            mame_build_SL_plots(cfg, db_dic)
         else:
-            log_info('SL globally disabled. Skipping SL scanning and plot building.')
+            log_info('SL globally disabled. Skipping SL scanning.')
+
+        # --- Update Favourites, Most Played and Recently Played ---
+        control_dic = utils_load_JSON_file_dic(cfg.MAIN_CONTROL_PATH.getPath())
+        mame_update_all_Fav_objects(cfg, control_dic)
 
         # --- So long and thanks for all the fish ---
         kodi_notify('All ROM/asset scanning finished')
@@ -5805,7 +6220,7 @@ def command_context_setup_plugin(cfg):
         st_dic = kodi_new_status_dic()
 
         # Check if Pillow library is available. Abort if not.
-        if not PILLOW_AVAILABLE:
+        if not lazy_import_module('graphics').PILLOW_AVAILABLE:
             kodi_dialog_OK('Pillow Python library is not available. Aborting image generation.')
             return
 
@@ -5839,6 +6254,9 @@ def command_context_setup_plugin(cfg):
         else:
             log_info('SL globally disabled. Skipping SL Fanart and 3DBox generation.')
 
+        # --- Update Favourites with the new Fanarts and 3D boxes ---
+        mame_update_all_Fav_objects(cfg, utils_load_JSON_file_dic(cfg.MAIN_CONTROL_PATH.getPath()))
+
     # --- Audit MAME machine ROMs/CHDs ---
     # It is likely that this function will take a looong time. It is important that the
     # audit process can be canceled and a partial report is written.
@@ -5891,8 +6309,6 @@ def command_context_setup_plugin(cfg):
             'Scan MAME assets/artwork',
             'Scan Software List ROMs/CHDs',
             'Scan Software List assets/artwork',
-            'Build MAME machine plots',
-            'Build Software List item plots',
             'Rebuild MAME machine and asset caches',
         ])
         if submenu < 0: return
@@ -6068,6 +6484,7 @@ def command_context_setup_plugin(cfg):
             mame_scan_MAME_assets(cfg, st_dic, db_dic)
             db_build_asset_hashed_db(cfg, db_dic['control_dic'], db_dic['assetdb'])
             db_build_asset_cache(cfg, db_dic['control_dic'], db_dic['cache_index'], db_dic['assetdb'])
+            mame_update_all_Fav_objects(cfg, db_dic['control_dic'])
             kodi_notify('Scanning of assets/artwork finished')
 
         # --- Scan SL ROMs/CHDs ---
@@ -6120,58 +6537,11 @@ def command_context_setup_plugin(cfg):
             # --- Scan SL ---
             # 1) Mutates control_dic (timestamp and statistics) and saves it.
             mame_scan_SL_assets(cfg, st_dic, db_dic)
+            mame_update_all_Fav_objects(cfg, db_dic['control_dic'])
             kodi_notify('Scanning of SL assets finished')
 
-        # --- Build MAME machines plot ---
-        elif submenu == 9:
-            log_debug('Rebuilding MAME machine plots...')
-
-            # --- Load databases ---
-            db_files = [
-                ['control_dic', 'Control dictionary', cfg.MAIN_CONTROL_PATH.getPath()],
-                ['machines', 'MAME machines main', cfg.MAIN_DB_PATH.getPath()],
-                ['renderdb', 'MAME render DB', cfg.RENDER_DB_PATH.getPath()],
-                ['assetdb', 'MAME asset DB', cfg.ASSET_DB_PATH.getPath()],
-                ['cache_index', 'MAME cache index', cfg.CACHE_INDEX_PATH.getPath()],
-                ['history_idx_dic', 'History DAT index', cfg.HISTORY_IDX_PATH.getPath()],
-                ['mameinfo_idx_dic', 'Mameinfo DAT index', cfg.MAMEINFO_IDX_PATH.getPath()],
-                ['gameinit_idx_list', 'Gameinit DAT index', cfg.GAMEINIT_IDX_PATH.getPath()],
-                ['command_idx_list', 'Command DAT index', cfg.COMMAND_IDX_PATH.getPath()],
-            ]
-            db_dic = db_load_files(db_files)
-
-            # --- Check for requirements/errors ---
-
-            # --- Traverse MAME machines and build plot ---
-            # 1) Mutates and saves the assets database
-            # 2) Requires rebuilding of the MAME asset hashed DB.
-            # 3) Requires rebuilding if the MAME asset cache.
-            mame_build_MAME_plots(cfg, db_dic)
-            db_build_asset_hashed_db(cfg, db_dic['control_dic'], db_dic['assetdb'])
-            db_build_asset_cache(cfg, db_dic['control_dic'], db_dic['cache_index'], db_dic['assetdb'])
-            kodi_notify('MAME machines plot generation finished')
-
-        # --- Buils Software List items plot ---
-        elif submenu == 10:
-            log_debug('Rebuilding Software List items plots...')
-
-            # --- Load databases ---
-            db_files = [
-                ['control_dic', 'Control dictionary', cfg.MAIN_CONTROL_PATH.getPath()],
-                ['SL_index', 'Software Lists index', cfg.SL_INDEX_PATH.getPath()],
-                ['SL_machines', 'Software Lists machines', cfg.SL_MACHINES_PATH.getPath()],
-                ['history_idx_dic', 'History DAT index', cfg.HISTORY_IDX_PATH.getPath()],
-            ]
-            db_dic = db_load_files(db_files)
-
-            # --- Check for requirements/errors ---
-
-            # --- Build SL plots ---
-            mame_build_SL_plots(cfg, db_dic)
-            kodi_notify('SL item plot generation finished')
-
         # --- Regenerate MAME machine render and assets cache ---
-        elif submenu == 11:
+        elif submenu == 9:
             log_debug('Rebuilding MAME machine and assets cache ...')
 
             # --- Load databases ---
@@ -6198,12 +6568,12 @@ def command_context_setup_plugin(cfg):
             'Test Software List item Fanart',
             'Test MAME 3D Box',
             'Test Software List item 3D Box',
-            'Build all missing Fanarts',
-            'Build all missing 3D boxes',
-            'Build missing MAME Fanarts',
-            'Build missing Software Lists Fanarts',
-            'Build missing MAME 3D Boxes',
-            'Build missing Software Lists 3D Boxes',
+            'Build all missing/outdated Fanarts',
+            'Build all missing/outdated 3D boxes',
+            'Build missing/outdated MAME Fanarts',
+            'Build missing/outdated Software Lists Fanarts',
+            'Build missing/outdated MAME 3D Boxes',
+            'Build missing/outdated Software Lists 3D Boxes',
             'Rebuild all MAME Fanarts',
             'Rebuild all Software Lists Fanarts',
             'Rebuild all MAME 3D Boxes',
@@ -6212,7 +6582,7 @@ def command_context_setup_plugin(cfg):
         if submenu < 0: return
 
         # Check if Pillow library is available. Abort if not.
-        if not PILLOW_AVAILABLE:
+        if not lazy_import_module('graphics').PILLOW_AVAILABLE:
             kodi_dialog_OK('Pillow Python library is not available. Aborting Fanart generation.')
             return
 
@@ -6372,7 +6742,7 @@ def command_context_setup_plugin(cfg):
             BUILD_MISSING = True
             log_info('command_context_setup_plugin() Building all missing Fanarts...')
             st_dic = kodi_new_status_dic()
-            if not PILLOW_AVAILABLE:
+            if not lazy_import_module('graphics').PILLOW_AVAILABLE:
                 kodi_dialog_OK('Pillow Python library is not available. Aborting image generation.')
                 return
 
@@ -6401,7 +6771,7 @@ def command_context_setup_plugin(cfg):
             BUILD_MISSING = True
             log_info('command_context_setup_plugin() Building all missing 3D boxes...')
             st_dic = kodi_new_status_dic()
-            if not PILLOW_AVAILABLE:
+            if not lazy_import_module('graphics').PILLOW_AVAILABLE:
                 kodi_dialog_OK('Pillow Python library is not available. Aborting image generation.')
                 return
 
@@ -6748,15 +7118,14 @@ def command_exec_utility(cfg, which_utility):
     # be deleted by the user and a new Favourite created.
     # If the machine is found in the main database, then update the Favourite database
     # with data from the main database.
+    # Machines are taken from the MAME hashed database so the big databases are not loaded.
+    # Favourites are also updated automatically after the assets are scanned.
     elif which_utility == 'CHECK_ALL_FAV_OBJECTS':
         log_debug('command_exec_utility() Executing CHECK_ALL_FAV_OBJECTS...')
 
         # --- Load databases ---
         db_files = [
             ['control_dic', 'Control dictionary', cfg.MAIN_CONTROL_PATH.getPath()],
-            ['machines', 'MAME machines main', cfg.MAIN_DB_PATH.getPath()],
-            ['renderdb', 'MAME machines render', cfg.RENDER_DB_PATH.getPath()],
-            ['assetdb', 'MAME machine assets', cfg.ASSET_DB_PATH.getPath()],
             ['SL_index', 'Software Lists index', cfg.SL_INDEX_PATH.getPath()],
         ]
         db_dic = db_load_files(db_files)
@@ -6938,6 +7307,139 @@ def command_exec_utility(cfg, which_utility):
         log_info('Writing "{}"'.format(cfg.REPORT_DEBUG_SL_COLLISIONS_PATH.getPath()))
         utils_write_slist_to_file(cfg.REPORT_DEBUG_SL_COLLISIONS_PATH.getPath(), slist)
 
+    # Extracts the images of all MAME and SL PDF manuals so they are displayed without delay.
+    # Manuals already extracted are skipped. Manuals are extracted in parallel by the
+    # graphics worker pool.
+    elif which_utility == 'EXTRACT_ALL_MANUALS':
+        log_info('command_exec_utility() Initialising EXTRACT_ALL_MANUALS ...')
+        if not cfg.settings['assets_path']:
+            kodi_dialog_OK('Asset directory not set. Aborting.')
+            return
+        control_dic = utils_load_JSON_file_dic(cfg.MAIN_CONTROL_PATH.getPath())
+        st_dic = kodi_new_status_dic()
+        check_MAME_DB_status(st_dic, MAME_ASSETS_SCANNED, control_dic)
+        if kodi_display_status_message(st_dic): return
+        Asset_path_FN = FileName(cfg.settings['assets_path'])
+
+        # --- Make list of manuals ---
+        # manual_list is a list of (name, PDF FileName, image directory FileName) tuples.
+        # SL items are named SL_name/SL_ROM.
+        pDialog = KodiProgressDialog()
+        pDialog.startProgress('Loading MAME asset database...')
+        manual_list = []
+        assets_dic = utils_load_JSON_file_dic(cfg.ASSET_DB_PATH.getPath())
+        for m_name in sorted(assets_dic):
+            if not assets_dic[m_name]['manual']: continue
+            img_dir_FN = Asset_path_FN.pjoin('manuals').pjoin(m_name + '.pages')
+            manual_list.append((m_name, FileName(assets_dic[m_name]['manual']), img_dir_FN))
+        del assets_dic
+        SL_st_dic = kodi_new_status_dic()
+        check_SL_DB_status(SL_st_dic, SL_ASSETS_SCANNED, control_dic)
+        if cfg.settings['global_enable_SL'] and not kodi_is_error_status(SL_st_dic):
+            SL_catalog_dic = utils_load_JSON_file_dic(cfg.SL_INDEX_PATH.getPath())
+            pDialog.resetProgress('Loading SL asset databases...', len(SL_catalog_dic))
+            for SL_name in sorted(SL_catalog_dic):
+                pDialog.updateProgressInc()
+                assets_file_name = SL_catalog_dic[SL_name]['rom_DB_noext'] + '_assets.json'
+                SL_asset_dic = utils_load_JSON_file_dic(cfg.SL_DB_DIR.pjoin(assets_file_name).getPath())
+                for SL_ROM in sorted(SL_asset_dic):
+                    if not SL_asset_dic[SL_ROM]['manual']: continue
+                    img_dir_FN = Asset_path_FN.pjoin('manuals_SL').pjoin(SL_name).pjoin(SL_ROM + '.pages')
+                    manual_list.append(('{}/{}'.format(SL_name, SL_ROM),
+                        FileName(SL_asset_dic[SL_ROM]['manual']), img_dir_FN))
+
+        # --- Skip manuals already extracted ---
+        # CBZ manuals are displayed directly from the ZIP file and are not extracted.
+        pDialog.resetProgress('Checking manuals...', len(manual_list))
+        extract_list = []
+        status_dic_dic = {}
+        failed_list = []
+        num_up_to_date = 0
+        num_CBZ = 0
+        for item in manual_list:
+            pDialog.updateProgressInc()
+            name, man_file_FN, img_dir_FN = item
+            if not man_file_FN.exists():
+                failed_list.append((name, 'Manual file not found'))
+                continue
+            man_ext = man_file_FN.getExt().lower()
+            if man_ext == '.cbz' or man_ext == '.cbr':
+                num_CBZ += 1
+                continue
+            if man_ext != '.pdf':
+                failed_list.append((name, 'Manual format {} not supported'.format(man_ext)))
+                continue
+            status_dic = manuals_check_img_extraction_needed(man_file_FN, img_dir_FN)
+            if not status_dic['extraction_needed']:
+                num_up_to_date += 1
+                continue
+            status_dic_dic[name] = status_dic
+            extract_list.append(item)
+        pDialog.endProgress()
+        log_info('Found {} manuals, {} up to date, {} CBZ, {} to extract'.format(
+            len(manual_list), num_up_to_date, num_CBZ, len(extract_list)))
+
+        # --- Extract manuals ---
+        # Worker threads stop after the current page when the user cancels and the pages
+        # extracted so far are saved in the INFO file of the manual.
+        stop_event = threading.Event()
+        num_pages_dic = {}
+        def extract_manual(item):
+            name, man_file_FN, img_dir_FN = item
+            try:
+                num_pages_dic[name] = manuals_extract_PDF_file(
+                    status_dic_dic[name], man_file_FN, img_dir_FN, stop_event)
+            except Exception as ex:
+                log_error('Exception extracting manual "{}"'.format(man_file_FN.getPath()))
+                log_error('{}'.format(ex))
+                return False
+            return True
+
+        diag_t = 'Extracting manual images...'
+        pDialog.startProgress(diag_t, len(extract_list))
+        extraction_time_start = time.time()
+        num_workers = cfg.settings['graphics_num_workers']
+        build_pool = graphs_build_pool(extract_list, extract_manual, num_workers)
+        processed_manuals = 0
+        pDialog_canceled = False
+        for item, build_OK_flag, build_time in build_pool:
+            processed_manuals += 1
+            if not build_OK_flag: failed_list.append((item[0], 'Extraction error, check the log'))
+            pDialog.updateProgress(processed_manuals, '{}\nManual {}'.format(diag_t, item[0]))
+            if pDialog.isCanceled():
+                pDialog_canceled = True
+                stop_event.set()
+                break
+        build_pool.close()
+        extraction_time = time.time() - extraction_time_start
+        pDialog.endProgress()
+
+        # --- Summary report ---
+        num_pages = sum(num_pages_dic.values())
+        slist = [
+            '*** AML manual image extraction report ***',
+            'Manuals found       {:,d}'.format(len(manual_list)),
+            'Manuals up to date  {:,d}'.format(num_up_to_date),
+            'CBZ manuals         {:,d} (not extracted)'.format(num_CBZ),
+            'Manuals extracted   {:,d}'.format(len(num_pages_dic)),
+            'Pages extracted     {:,d}'.format(num_pages),
+            'Failed manuals      {:,d}'.format(len(failed_list)),
+            'Worker threads      {}'.format(num_workers),
+            'Extraction time     {:.1f} s'.format(extraction_time),
+        ]
+        if pDialog_canceled:
+            slist.append('Extraction canceled by the user. Run the utility again to resume.')
+        if failed_list:
+            table_str = []
+            table_str.append(['left', 'left'])
+            table_str.append(['Manual', 'Error'])
+            for name, error_str in failed_list: table_str.append([name, error_str])
+            slist.append('')
+            slist.extend(text_render_table_str(table_str))
+        kodi_display_text_window_mono('AML manual image extraction report', '\n'.join(slist))
+        log_info('Writing "{}"'.format(cfg.REPORT_MANUALS_EXTRACTION_PATH.getPath()))
+        utils_write_slist_to_file(cfg.REPORT_MANUALS_EXTRACTION_PATH.getPath(), slist)
+
     # Open the ROM audit database and calculate the size of all ROMs.
     # Sort the list by size and print it.
     elif which_utility == 'SHOW_BIGGEST_ROMS' or which_utility == 'SHOW_SMALLEST_ROMS':
@@ -7412,36 +7914,15 @@ def command_exec_report(cfg, which_report):
 # Example: $ mame dino
 #
 def run_machine(cfg, machine_name, location):
+    launch_start_time = time.time()
     log_info('run_machine() Launching MAME machine  "{}"'.format(machine_name))
     log_info('run_machine() Launching MAME location "{}"'.format(location))
 
-    # --- Load databases ---
-    control_dic = utils_load_JSON_file_dic(cfg.MAIN_CONTROL_PATH.getPath())
-    if location == LOCATION_STANDARD:
-        log_debug('Reading info from hashed DBs')
-        machine = db_get_machine_main_hashed_db(cfg, machine_name)
-        assets = db_get_machine_assets_hashed_db(cfg, machine_name)
-    elif location == LOCATION_MAME_FAVS:
-        log_debug('Reading info from MAME Favourites')
-        fav_machines = utils_load_JSON_file_dic(cfg.FAV_MACHINES_PATH.getPath())
-        machine = fav_machines[machine_name]
-        assets = machine['assets']
-    elif location == LOCATION_MAME_MOST_PLAYED:
-        log_debug('Reading info from MAME Most Played DB')
-        most_played_roms_dic = utils_load_JSON_file_dic(cfg.MAME_MOST_PLAYED_FILE_PATH.getPath())
-        machine = most_played_roms_dic[machine_name]
-        assets = machine['assets']
-    elif location == LOCATION_MAME_RECENT_PLAYED:
-        log_debug('Reading info from MAME Recently Played DB')
-        recent_roms_list = utils_load_JSON_file_list(cfg.MAME_RECENT_PLAYED_FILE_PATH.getPath())
-        machine_index = db_locate_idx_by_MAME_name(recent_roms_list, machine_name)
-        if machine_index < 0:
-            a = 'Machine {} cannot be located in Recently Played list. This is a bug.'
-            kodi_dialog_OK(a.format(machine_name))
-            return
-        machine = recent_roms_list[machine_index]
-        assets = machine['assets']
-    else:
+    # --- Launch record ---
+    # The MAME command line only needs the machine name and the settings, so no database is
+    # loaded. Most Played and Recently Played are updated later from the play journal.
+    if location not in [LOCATION_STANDARD, LOCATION_MAME_FAVS,
+        LOCATION_MAME_MOST_PLAYED, LOCATION_MAME_RECENT_PLAYED]:
         kodi_dialog_OK('Unknown location = "{}". This is a bug, please report it.'.format(location))
         return
 
@@ -7489,32 +7970,6 @@ def run_machine(cfg, machine_name, location):
     log_debug('run_machine() machine_name "{}"'.format(machine_name))
     log_debug('run_machine() BIOS_name    "{}"'.format(BIOS_name))
 
-    # --- Compute ROM recently played list ---
-    # If the machine is already in the list remove it and place it on the first position.
-    MAX_RECENT_PLAYED_ROMS = 100
-    recent_rom = db_get_MAME_Favourite_simple(machine_name, machine, assets, control_dic)
-    recent_roms_list = utils_load_JSON_file_list(cfg.MAME_RECENT_PLAYED_FILE_PATH.getPath())
-    # Machine names are unique in this list.
-    recent_roms_list = [machine for machine in recent_roms_list if machine_name != machine['name']]
-    recent_roms_list.insert(0, recent_rom)
-    if len(recent_roms_list) > MAX_RECENT_PLAYED_ROMS:
-        log_debug('run_machine() len(recent_roms_list) = {}'.format(len(recent_roms_list)))
-        log_debug('run_machine() Trimming list to {} ROMs'.format(MAX_RECENT_PLAYED_ROMS))
-        temp_list = recent_roms_list[:MAX_RECENT_PLAYED_ROMS]
-        recent_roms_list = temp_list
-    utils_write_JSON_file(cfg.MAME_RECENT_PLAYED_FILE_PATH.getPath(), recent_roms_list)
-
-    # --- Compute most played ROM statistics ---
-    most_played_roms_dic = utils_load_JSON_file_dic(cfg.MAME_MOST_PLAYED_FILE_PATH.getPath())
-    if recent_rom['name'] in most_played_roms_dic:
-        rom_name = recent_rom['name']
-        most_played_roms_dic[rom_name]['launch_count'] += 1
-    else:
-        # Add field launch_count to recent_rom to count how many times have been launched.
-        recent_rom['launch_count'] = 1
-        most_played_roms_dic[recent_rom['name']] = recent_rom
-    utils_write_JSON_file(cfg.MAME_MOST_PLAYED_FILE_PATH.getPath(), most_played_roms_dic)
-
     # --- Build final arguments to launch MAME ---
     if cfg.settings['op_mode'] == OP_MODE_VANILLA:
         # arg_list = [mame_prog_FN.getPath(), '-window', machine_name]
@@ -7532,17 +7987,23 @@ def run_machine(cfg, machine_name, location):
     else:
         raise TypeError('Unknown op_mode "{}"'.format(cfg.settings['op_mode']))
     log_info('arg_list = {}'.format(arg_list))
+    log_info('run_machine() Launch arguments ready in {:.1f} ms'.format(
+        (time.time() - launch_start_time) * 1000))
 
     # --- User notification ---
     if cfg.settings['display_launcher_notify']:
         kodi_notify('Launching MAME machine "{}"'.format(machine_name))
     if DISABLE_MAME_LAUNCHING:
+        mame_add_MAME_play_record(cfg, machine_name, time.time(), 0)
         log_info('run_machine() MAME launching disabled. Exiting function.')
         return
 
     # --- Run MAME ---
     run_before_execution(cfg)
-    run_process(cfg, arg_list, mame_dir)
+    start_time = time.time()
+    run_process(cfg, arg_list, mame_dir, launch_start_time)
+    # Most Played and Recently Played are updated when the play journal is compacted.
+    mame_add_MAME_play_record(cfg, machine_name, start_time, time.time() - start_time)
     run_after_execution(cfg)
     # Refresh list so Most Played and Recently played get updated.
     log_info('run_machine() Exiting function.')
@@ -7603,6 +8064,7 @@ def run_machine(cfg, machine_name, location):
 # Most common cases are A) and C).
 #
 def run_SL_machine(cfg, SL_name, SL_ROM_name, location):
+    launch_start_time = time.time()
     SL_LAUNCH_WITH_MEDIA = 100
     SL_LAUNCH_NO_MEDIA   = 200
     log_info('run_SL_machine() Launching SL machine (location = {}) ...'.format(location))
@@ -7612,99 +8074,52 @@ def run_SL_machine(cfg, SL_name, SL_ROM_name, location):
     # --- Get paths ---
     mame_prog_FN = FileName(cfg.settings['mame_prog'])
 
-    # --- Get a list of launch machine <devices> and SL ROM <parts> ---
-    # --- Load SL ROMs and SL assets databases ---
-    control_dic = utils_load_JSON_file_dic(cfg.MAIN_CONTROL_PATH.getPath())
-    if location == LOCATION_STANDARD:
-        # >> Load DBs
-        log_info('run_SL_machine() SL ROM is in Standard Location')
-        SL_catalog_dic = utils_load_JSON_file_dic(cfg.SL_INDEX_PATH.getPath())
-        SL_DB_FN = cfg.SL_DB_DIR.pjoin(SL_catalog_dic[SL_name]['rom_DB_noext'] + '_items.json')
-        log_info('run_SL_machine() SL ROMs JSON "{}"'.format(SL_DB_FN.getPath()))
-        SL_ROMs = utils_load_JSON_file_dic(SL_DB_FN.getPath())
-        SL_asset_DB_FN = cfg.SL_DB_DIR.pjoin(SL_catalog_dic[SL_name]['rom_DB_noext'] + '_assets.json')
-        SL_asset_dic = utils_load_JSON_file_dic(SL_asset_DB_FN.getPath())
-        # >> Get ROM and assets
-        SL_fav_DB_key = SL_name + '-' + SL_ROM_name
-        SL_ROM = SL_ROMs[SL_ROM_name]
-        SL_assets = SL_asset_dic[SL_ROM_name]
-        part_list = SL_ROM['parts']
-        # >> Launch machine
-        launch_machine_name = ''
-        launch_machine_desc = ''
-    elif location == LOCATION_SL_FAVS:
-        # >> Load DBs
+    # --- Load SL launch database ---
+    # It has the <part> interfaces of the SL items and the <device> interfaces of the machines
+    # that can launch the SL. The SL item and SL machines databases are not loaded.
+    SL_launch_DB_FN = cfg.SL_DB_DIR.pjoin(SL_name + '_launch.json')
+    SL_launch_dic = utils_load_JSON_file_dic(SL_launch_DB_FN.getPath())
+    if not SL_launch_dic or SL_ROM_name not in SL_launch_dic['items']:
+        kodi_dialog_OK('SL item "{}" not found in the SL launch database. '.format(SL_ROM_name) +
+            'Rebuild the Software List databases with the context menu "Setup addon".')
+        return
+    part_list = SL_launch_dic['items'][SL_ROM_name]
+
+    # --- Launch machine ---
+    # Only SL Favourites can have a launch machine configured by the user.
+    SL_fav_DB_key = SL_name + '-' + SL_ROM_name
+    if location == LOCATION_SL_FAVS:
         log_info('run_SL_machine() SL ROM is in Favourites')
         fav_SL_roms = utils_load_JSON_file_dic(cfg.FAV_SL_ROMS_PATH.getPath())
-        # >> Get ROM and assets
-        SL_fav_DB_key = SL_name + '-' + SL_ROM_name
-        SL_ROM = fav_SL_roms[SL_fav_DB_key]
-        SL_assets = SL_ROM['assets']
-        part_list = fav_SL_roms[SL_fav_DB_key]['parts']
-        # >> Launch machine
         launch_machine_name = fav_SL_roms[SL_fav_DB_key]['launch_machine']
-        launch_machine_desc = '[ Not available ]'
-    elif location == LOCATION_SL_MOST_PLAYED:
-        log_debug('Reading info from MAME Most Played DB')
-        most_played_roms_dic = utils_load_JSON_file_dic(cfg.SL_MOST_PLAYED_FILE_PATH.getPath())
-        SL_fav_DB_key = SL_name + '-' + SL_ROM_name
-        SL_ROM = most_played_roms_dic[SL_fav_DB_key]
-        SL_assets = SL_ROM['assets']
-        part_list = most_played_roms_dic[SL_fav_DB_key]['parts']
-        launch_machine_name = most_played_roms_dic[SL_fav_DB_key]['launch_machine']
-        launch_machine_desc = '[ Not available ]'
-    elif location == LOCATION_SL_RECENT_PLAYED:
-        log_debug('Reading info from MAME Recently Played DB')
-        recent_roms_list = utils_load_JSON_file_list(cfg.SL_RECENT_PLAYED_FILE_PATH.getPath())
-        machine_index = db_locate_idx_by_SL_item_name(recent_roms_list, SL_name, SL_ROM_name)
-        if machine_index < 0:
-            a = 'SL Item {} cannot be located in Recently Played list. This is a bug.'
-            kodi_dialog_OK(a.format(SL_fav_DB_key))
-            return
-        SL_fav_DB_key = SL_name + '-' + SL_ROM_name
-        SL_ROM = recent_roms_list[machine_index]
-        SL_assets = SL_ROM['assets']
-        part_list = recent_roms_list[machine_index]['parts']
-        launch_machine_name = recent_roms_list[machine_index]['launch_machine']
-        launch_machine_desc = '[ Not available ]'
+    elif location in [LOCATION_STANDARD, LOCATION_SL_MOST_PLAYED, LOCATION_SL_RECENT_PLAYED]:
+        launch_machine_name = ''
     else:
         kodi_dialog_OK('Unknown location = "{}". This is a bug, please report it.'.format(location))
         return
     log_info('run_SL_machine() launch_machine_name = "{}"'.format(launch_machine_name))
-    log_info('run_SL_machine() launch_machine_desc = "{}"'.format(launch_machine_desc))
 
-    # --- Load SL machines ---
-    SL_machines_dic = utils_load_JSON_file_dic(cfg.SL_MACHINES_PATH.getPath())
-    SL_machine_list = SL_machines_dic[SL_name]
+    SL_machine_list = SL_launch_dic['machines']
     if not launch_machine_name:
         # >> Get a list of machines that can launch this SL ROM. User chooses in a select dialog
         log_info('run_SL_machine() User selecting SL run machine ...')
-        SL_machine_names_list = []
-        SL_machine_desc_list  = []
-        SL_machine_devices    = []
-        for SL_machine in sorted(SL_machine_list, key = lambda x: x['description'].lower()):
-            SL_machine_names_list.append(SL_machine['machine'])
-            SL_machine_desc_list.append(SL_machine['description'])
-            SL_machine_devices.append(SL_machine['devices'])
+        SL_machine_desc_list = [SL_machine[1] for SL_machine in SL_machine_list]
         m_index = xbmcgui.Dialog().select('Select machine', SL_machine_desc_list)
         if m_index < 0: return
-        launch_machine_name    = SL_machine_names_list[m_index]
-        launch_machine_desc    = SL_machine_desc_list[m_index]
-        launch_machine_devices = SL_machine_devices[m_index]
+        launch_machine_name, launch_machine_desc, launch_machine_devices = SL_machine_list[m_index]
         log_info('run_SL_machine() User chose machine "{}" ({})'.format(launch_machine_name, launch_machine_desc))
     else:
         # >> User configured a machine to launch this SL item. Find the machine in the machine list.
         log_info('run_SL_machine() Searching configured SL item running machine ...')
         machine_found = False
         for SL_machine in SL_machine_list:
-            if SL_machine['machine'] == launch_machine_name:
-                selected_SL_machine = SL_machine
+            if SL_machine[0] == launch_machine_name:
                 machine_found = True
                 break
         if machine_found:
             log_info('run_SL_machine() Found machine "{}"'.format(launch_machine_name))
-            launch_machine_desc    = SL_machine['description']
-            launch_machine_devices = SL_machine['devices']
+            launch_machine_desc    = SL_machine[1]
+            launch_machine_devices = SL_machine[2]
         else:
             log_error('run_SL_machine() Machine "{}" not found'.format(launch_machine_name))
             log_error('run_SL_machine() Aborting launch')
@@ -7714,12 +8129,10 @@ def run_SL_machine(cfg, SL_name, SL_ROM_name, location):
     # --- DEBUG ---
     log_info('run_SL_machine() Machine "{}" has {} interfaces'.format(launch_machine_name, len(launch_machine_devices)))
     log_info('run_SL_machine() SL ROM  "{}" has {} parts'.format(SL_ROM_name, len(part_list)))
-    for device_dic in launch_machine_devices:
-        u = '<device type="{}" interface="{}">'.format(device_dic['att_type'], device_dic['att_interface'])
-        log_info(u)
-    for part_dic in part_list:
-        u = '<part name="{}" interface="{}">'.format(part_dic['name'], part_dic['interface'])
-        log_info(u)
+    for (interface, media) in launch_machine_devices:
+        log_info('<device interface="{}"> <instance name="{}">'.format(interface, media))
+    for interface in part_list:
+        log_info('<part interface="{}">'.format(interface))
 
     # --- Select media depending on SL launching case ---
     num_machine_interfaces = len(launch_machine_devices)
@@ -7737,7 +8150,7 @@ def run_SL_machine(cfg, SL_name, SL_ROM_name, location):
     elif num_machine_interfaces == 1 and num_SL_ROM_parts == 1:
         log_info('run_SL_machine() Launch case A)')
         launch_case = SL_LAUNCH_CASE_A
-        media_name = launch_machine_devices[0]['instance']['name']
+        media_name = launch_machine_devices[0][1]
         sl_launch_mode = SL_LAUNCH_WITH_MEDIA
 
     # >> Case B
@@ -7753,16 +8166,16 @@ def run_SL_machine(cfg, SL_name, SL_ROM_name, location):
         log_info('run_SL_machine() Launch case C)')
         launch_case = SL_LAUNCH_CASE_C
         m_interface_found = False
-        for device in launch_machine_devices:
-            if device['att_interface'] == part_list[0]['interface']:
-                media_name = device['instance']['name']
+        for (interface, media) in launch_machine_devices:
+            if interface == part_list[0]:
+                media_name = media
                 m_interface_found = True
                 break
         if not m_interface_found:
             kodi_dialog_OK('SL launch case C), not machine interface found! Aborting launch.')
             return
-        log_info('run_SL_machine() Matched machine device interface "{}" '.format(device['att_interface']) +
-                 'to SL ROM part "{}"'.format(part_list[0]['interface']))
+        log_info('run_SL_machine() Matched machine device interface "{}" '.format(interface) +
+                 'to SL ROM part "{}"'.format(part_list[0]))
         sl_launch_mode = SL_LAUNCH_WITH_MEDIA
 
     # >> Case D.
@@ -7781,8 +8194,8 @@ def run_SL_machine(cfg, SL_name, SL_ROM_name, location):
         media_name = ''
         sl_launch_mode = SL_LAUNCH_NO_MEDIA
 
-    # >> Display some DEBUG information.
-    kodi_dialog_OK('Launch case {}. '.format(launch_case) +
+    # >> Log some DEBUG information.
+    log_info('run_SL_machine() Launch case {}. '.format(launch_case) +
         'Machine has {} device interface/s and '.format(num_machine_interfaces) +
         'SL ROM has {} part/s. '.format(num_SL_ROM_parts) +
         'Media name is "{}"'.format(media_name))
@@ -7796,31 +8209,6 @@ def run_SL_machine(cfg, SL_name, SL_ROM_name, location):
     log_debug('run_SL_machine() launch_machine_desc "{}"'.format(launch_machine_desc))
     log_debug('run_SL_machine() media_name          "{}"'.format(media_name))
 
-    # --- Compute ROM recently played list ---
-    # If the machine is already in the list remove it and place it on the first position.
-    MAX_RECENT_PLAYED_ROMS = 100
-    recent_ROM = db_get_SL_Favourite(SL_name, SL_ROM_name, SL_ROM, SL_assets, control_dic)
-    recent_roms_list = utils_load_JSON_file_list(cfg.SL_RECENT_PLAYED_FILE_PATH.getPath())
-    # Machine names are unique in this list
-    recent_roms_list = [item for item in recent_roms_list if SL_fav_DB_key != item['SL_DB_key']]
-    recent_roms_list.insert(0, recent_ROM)
-    if len(recent_roms_list) > MAX_RECENT_PLAYED_ROMS:
-        log_debug('run_SL_machine() len(recent_roms_list) = {}'.format(len(recent_roms_list)))
-        log_debug('run_SL_machine() Trimming list to {} ROMs'.format(MAX_RECENT_PLAYED_ROMS))
-        temp_list = recent_roms_list[:MAX_RECENT_PLAYED_ROMS]
-        recent_roms_list = temp_list
-    utils_write_JSON_file(cfg.SL_RECENT_PLAYED_FILE_PATH.getPath(), recent_roms_list)
-
-    # --- Compute most played ROM statistics ---
-    most_played_roms_dic = utils_load_JSON_file_dic(cfg.SL_MOST_PLAYED_FILE_PATH.getPath())
-    if SL_fav_DB_key in most_played_roms_dic:
-        most_played_roms_dic[SL_fav_DB_key]['launch_count'] += 1
-    else:
-        # >> Add field launch_count to recent_ROM to count how many times have been launched.
-        recent_ROM['launch_count'] = 1
-        most_played_roms_dic[SL_fav_DB_key] = recent_ROM
-    utils_write_JSON_file(cfg.SL_MOST_PLAYED_FILE_PATH.getPath(), most_played_roms_dic)
-
     # --- Build MAME arguments ---
     if sl_launch_mode == SL_LAUNCH_WITH_MEDIA:
         arg_list = [mame_prog_FN.getPath(), launch_machine_name, '-{}'.format(media_name), SL_ROM_name]
@@ -7830,17 +8218,23 @@ def run_SL_machine(cfg, SL_name, SL_ROM_name, location):
         kodi_dialog_OK('Unknown sl_launch_mode = {}. This is a bug, please report it.'.format(sl_launch_mode))
         return
     log_info('arg_list = {}'.format(arg_list))
+    log_info('run_SL_machine() Launch arguments ready in {:.1f} ms'.format(
+        (time.time() - launch_start_time) * 1000))
 
     # --- User notification ---
     if cfg.settings['display_launcher_notify']:
         kodi_notify('Launching MAME SL item "{}"'.format(SL_ROM_name))
     if DISABLE_MAME_LAUNCHING:
+        mame_add_SL_play_record(cfg, SL_name, SL_ROM_name, time.time(), 0)
         log_info('run_machine() MAME launching disabled. Exiting function.')
         return
 
     # --- Run MAME ---
     run_before_execution(cfg)
-    run_process(cfg, arg_list, mame_dir)
+    start_time = time.time()
+    run_process(cfg, arg_list, mame_dir, launch_start_time)
+    # Most Played and Recently Played are updated when the play journal is compacted.
+    mame_add_SL_play_record(cfg, SL_name, SL_ROM_name, start_time, time.time() - start_time)
     run_after_execution(cfg)
     # Refresh list so Most Played and Recently played get updated.
     kodi_refresh_container()
@@ -7911,7 +8305,10 @@ def run_before_execution(cfg):
     xbmc.sleep(delay_tempo_ms)
     log_debug('run_before_execution() function ENDS')
 
-def run_process(cfg, arg_list, mame_dir):
+#
+# launch_start_time is the time the launch started, to log the time until MAME is spawned.
+#
+def run_process(cfg, arg_list, mame_dir, launch_start_time):
     log_info('run_process() Function BEGIN...')
 
     # --- Prevent a console window to be shown in Windows. Not working yet! ---
@@ -7940,6 +8337,8 @@ def run_process(cfg, arg_list, mame_dir):
     # --- Run MAME ---
     f = io.open(cfg.MAME_OUTPUT_PATH.getPath(), 'wb')
     p = subprocess.Popen(arg_list, cwd = mame_dir, startupinfo = _info, stdout = f, stderr = subprocess.STDOUT)
+    log_info('run_process() MAME spawned {:.1f} ms after launch'.format(
+        (time.time() - launch_start_time) * 1000))
     p.wait()
     f.close()
     log_debug('run_process() function ENDS')
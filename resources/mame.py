@@ -26,6 +26,8 @@ import xbmcgui
 
 # --- Python standard library ---
 import binascii
+import copy
+import hashlib
 import struct
 import xml.etree.ElementTree as ET
 import zipfile as z
@@ -514,6 +516,17 @@ def mame_init_MAME_XML(cfg, st_dic, force_rebuild = False):
 # -------------------------------------------------------------------------------------------------
 # Loading of data files
 # -------------------------------------------------------------------------------------------------
+# Parsers classify every line once with cheap string tests and only use the precompiled
+# regular expressions below on the few lines that may contain a version string.
+# Increment MAME_PARSER_VERSION every time the output of any parser changes so the
+# parse cache created by mame_load_cached_DAT() is invalidated.
+MAME_PARSER_VERSION = 1
+
+MAME_CATVER_VERSION_RE = re.compile(r'^;; (?:CatVer|CATVER\.ini) ([0-9\.]+) / ')
+MAME_INI_VERSION_RE = re.compile(r';; (\w+)\.ini ([0-9\.]+) / ')
+MAME_GAMEINIT_VERSION_RE = re.compile(r'# MAME GAMEINIT\.DAT v([0-9\.]+) ')
+MAME_COMMAND_VERSION_RE = re.compile(r'# Command List-[\w]+[\s]+([0-9\.]+) #')
+
 # Catver.ini is very special so it has a custom loader.
 # It provides data for two catalogs: categories and version added. In other words, it
 # has 2 folders defined in the INI file.
@@ -529,7 +542,6 @@ def mame_init_MAME_XML(cfg, st_dic, force_rebuild = False):
 # catver_dic, veradded_dic
 #
 def mame_load_Catver_ini(filename):
-    __debug_do_list_categories = False
     log_info('mame_load_Catver_ini() Parsing "{}"'.format(filename))
     catver_dic = {
         'version' : 'unknown',
@@ -563,77 +575,46 @@ def mame_load_Catver_ini(filename):
         return (catver_dic, veradded_dic)
     for cat_line in f:
         stripped_line = cat_line.strip()
-        if __debug_do_list_categories: log_debug('Line "' + stripped_line + '"')
-        if read_status == 0:
-            # >> Look for Catver version
-            m = re.search(r'^;; CatVer ([0-9\.]+) / ', stripped_line)
-            if m:
-                catver_dic['version'] = m.group(1)
-                veradded_dic['version'] = m.group(1)
-            m = re.search(r'^;; CATVER.ini ([0-9\.]+) / ', stripped_line)
-            if m:
-                catver_dic['version'] = m.group(1)
-                veradded_dic['version'] = m.group(1)
-            if stripped_line == '[Category]':
-                if __debug_do_list_categories: log_debug('Found [Category]')
-                read_status = 1
-        elif read_status == 1:
-            line_list = stripped_line.split("=")
+        if read_status == 1 or read_status == 3:
+            line_list = stripped_line.split('=')
             if len(line_list) == 1:
-                # log_debug('mame_load_Catver_ini() Reached end of categories parsing.')
-                read_status = 2
+                read_status += 1
+                continue
+            ini_dic = catver_dic if read_status == 1 else veradded_dic
+            machine_name = line_list[0]
+            current_category = line_list[1]
+            ini_dic['categories'].add(current_category)
+            if machine_name in ini_dic['data']:
+                ini_dic['unique_categories'] = False
+                ini_dic['data'][machine_name].append(current_category)
             else:
-                if __debug_do_list_categories: log_debug(line_list)
-                machine_name = line_list[0]
-                current_category = line_list[1]
-                catver_dic['categories'].add(current_category)
-                if machine_name in catver_dic['data']:
-                    catver_dic['data'][machine_name].append(current_category)
-                else:
-                    catver_dic['data'][machine_name] = [current_category]
+                ini_dic['data'][machine_name] = [current_category]
+        elif read_status == 0:
+            if stripped_line.startswith(';;'):
+                m = MAME_CATVER_VERSION_RE.match(stripped_line)
+                if m:
+                    catver_dic['version'] = m.group(1)
+                    veradded_dic['version'] = m.group(1)
+            elif stripped_line == '[Category]':
+                read_status = 1
         elif read_status == 2:
             if stripped_line == '[VerAdded]':
-                if __debug_do_list_categories: log_debug('Found [VerAdded]')
                 read_status = 3
-        elif read_status == 3:
-            line_list = stripped_line.split("=")
-            if len(line_list) == 1:
-                # log_debug('mame_load_Catver_ini() Reached end of veradded parsing.')
-                read_status = 4
-            else:
-                if __debug_do_list_categories: log_debug(line_list)
-                machine_name = line_list[0]
-                current_category = line_list[1]
-                veradded_dic['categories'].add(current_category)
-                if machine_name in veradded_dic['data']:
-                    veradded_dic['data'][machine_name].append(current_category)
-                else:
-                    veradded_dic['data'][machine_name] = [current_category]
         elif read_status == 4:
             log_debug('End parsing')
             break
         else:
             raise CriticalError('Unknown read_status FSM value')
     f.close()
-    catver_dic['single_category'] = True if len(catver_dic['categories']) == 1 else False
-    for m_name in sorted(catver_dic['data']):
-        if len(catver_dic['data'][m_name]) > 1:
-            catver_dic['unique_categories'] = False
-            break
+    # single_category is always True for Catver.ini catalogs.
     catver_dic['single_category'] = True
-    veradded_dic['single_category'] = True if len(veradded_dic['categories']) == 1 else False
-    for m_name in sorted(veradded_dic['data']):
-        if len(veradded_dic['data'][m_name]) > 1:
-            veradded_dic['unique_categories'] = False
-            break
     veradded_dic['single_category'] = True
     # If categories are unique for each machine transform lists into strings
-    if catver_dic['unique_categories']:
-        for m_name in catver_dic['data']:
-            catver_dic['data'][m_name] = catver_dic['data'][m_name][0]
-    if veradded_dic['unique_categories']:
-        for m_name in veradded_dic['data']:
-            veradded_dic['data'][m_name] = veradded_dic['data'][m_name][0]
+    for ini_dic in (catver_dic, veradded_dic):
+        if not ini_dic['unique_categories']: continue
+        m_data = ini_dic['data']
+        for m_name in m_data:
+            m_data[m_name] = m_data[m_name][0]
     log_info('mame_load_Catver_ini() Catver Machines   {:6d}'.format(len(catver_dic['data'])))
     log_info('mame_load_Catver_ini() Catver Categories {:6d}'.format(len(catver_dic['categories'])))
     log_info('mame_load_Catver_ini() Catver Version "{}"'.format(catver_dic['version']))
@@ -773,9 +754,8 @@ def mame_load_Mature_ini(filename):
         if fsm_status == FSM_HEADER:
             # Skip comments: lines starting with ';;'
             # Look for version string in comments
-            if re.search(r'^;;', stripped_line):
-                # log_debug('mame_load_Mature_ini() Comment line "{}"'.format(stripped_line))
-                m = re.search(r';; (\w+)\.ini ([0-9\.]+) / ', stripped_line)
+            if stripped_line.startswith(';;'):
+                m = MAME_INI_VERSION_RE.search(stripped_line)
                 if m:
                     ini_dic['version'] = m.group(2)
                 continue
@@ -856,8 +836,6 @@ def mame_load_INI_datfile_simple(filename):
                           # Initial status.
     FSM_FOLDER_NAME = 1   # Searching for [category_name] and/or adding machines.
 
-    # Read file and put it in a list of strings.
-    # Strings in this list are stripped.
     log_info('mame_load_INI_datfile_simple() Parsing "{}"'.format(filename))
     ini_dic = {
         'version' : 'unknown',
@@ -867,60 +845,48 @@ def mame_load_INI_datfile_simple(filename):
         'data' : {},
         'categories' : set(),
     }
-    slist = []
     try:
         f = io.open(filename, 'rt', encoding = 'utf-8', errors = 'replace')
-        for file_line in f:
-            stripped_line = file_line.strip()
-            if stripped_line == '': continue # Skip blanks
-            slist.append(stripped_line)
-        f.close()
     except IOError:
         log_info('mame_load_INI_datfile_simple() (IOError) opening "{}"'.format(filename))
         return ini_dic
 
-    # Compile regexes to increase performance => It is no necessary. According to the docs: The
-    # compiled versions of the most recent patterns passed to re.match(), re.search() or 
-    # re.compile() are cached, so programs that use only a few regular expressions at a 
-    # time needn’t worry about compiling regular expressions.
+    # Lines are processed while reading the file. Most lines are machine names so check
+    # for them first.
+    data_dic = ini_dic['data']
+    categories = ini_dic['categories']
     fsm_status = FSM_HEADER
-    for stripped_line in slist:
-        # log_debug('{}'.format(stripped_line))
-        if fsm_status == FSM_HEADER:
-            # log_debug('FSM_HEADER "{}"'.format(stripped_line))
+    for file_line in f:
+        stripped_line = file_line.strip()
+        if not stripped_line: continue # Skip blanks
+        if fsm_status == FSM_FOLDER_NAME:
+            if stripped_line[0] == '[' and stripped_line.rfind(']') > 0:
+                current_category = text_type(stripped_line[1:stripped_line.rfind(']')])
+                if current_category in categories:
+                    raise ValueError('Repeated category {}'.format(current_category))
+                categories.add(current_category)
+            elif stripped_line in data_dic:
+                ini_dic['unique_categories'] = False
+                data_dic[stripped_line].append(current_category)
+            else:
+                data_dic[stripped_line] = [current_category]
+        elif fsm_status == FSM_HEADER:
             # Skip comments: lines starting with ';;'
             # Look for version string in comments
-            if re.search(r'^;;', stripped_line):
-                m = re.search(r';; (\w+)\.ini ([0-9\.]+) / ', stripped_line)
+            if stripped_line.startswith(';;'):
+                m = MAME_INI_VERSION_RE.search(stripped_line)
                 if m: ini_dic['version'] = m.group(2)
                 continue
             if stripped_line.find('[ROOT_FOLDER]') >= 0:
                 fsm_status = FSM_FOLDER_NAME
-        elif fsm_status == FSM_FOLDER_NAME:
-            m = re.search(r'^\[(.*)\]', stripped_line)
-            if m:
-                current_category = text_type(m.group(1))
-                if current_category in ini_dic['categories']:
-                    raise ValueError('Repeated category {}'.format(current_category))
-                ini_dic['categories'].add(current_category)
-            else:
-                machine_name = stripped_line
-                if machine_name in ini_dic['data']:
-                    ini_dic['unique_categories'] = False
-                    ini_dic['data'][machine_name].append(current_category)
-                else:
-                    ini_dic['data'][machine_name] = [current_category]
         else:
             raise ValueError('Unknown FSM fsm_status {}'.format(fsm_status))
+    f.close()
     ini_dic['single_category'] = True if len(ini_dic['categories']) == 1 else False
-    for m_name in sorted(ini_dic['data']):
-        if len(ini_dic['data'][m_name]) > 1:
-            ini_dic['unique_categories'] = False
-            break
     # If categories are unique for each machine transform lists into strings
     if ini_dic['unique_categories']:
-        for m_name in ini_dic['data']:
-            ini_dic['data'][m_name] = ini_dic['data'][m_name][0]
+        for m_name in data_dic:
+            data_dic[m_name] = data_dic[m_name][0]
     log_info('mame_load_INI_datfile_simple() Machines   {0:6d}'.format(len(ini_dic['data'])))
     log_info('mame_load_INI_datfile_simple() Categories {0:6d}'.format(len(ini_dic['categories'])))
     log_info('mame_load_INI_datfile_simple() Version "{}"'.format(ini_dic['version']))
@@ -930,6 +896,8 @@ def mame_load_INI_datfile_simple(filename):
     return ini_dic
 
 # --- BEGIN code in dev-parsers/test_parser_history_dat.py ----------------------------------------
+MAME_HISTORY_VERSION_RE = re.compile(r'## REVISION\: ([0-9\.]+)$')
+
 # Loads History.dat
 #
 # One description can be for several MAME machines:
@@ -977,7 +945,6 @@ def mame_load_History_DAT(filename):
     version_str = 'Not found'
     history_idx_dic = {}
     history_dic = {}
-    __debug_function = False
     line_number = 0
     num_header_line = 0
     # Due to syntax errors in History.dat m_data may have invalid data, for example
@@ -994,8 +961,8 @@ def mame_load_History_DAT(filename):
     # check if the data is OK before adding it to the index and the DB.
     # 0 -> Looking for '$info=machine_name_1,machine_name_2,' or '$SL_name=item_1,item_2,'
     #      If '$bio' found go to 1.
-    # 1 -> Reading information. If '$end' found go to 2.
-    # 2 -> Add information to database if no errors. Then go to 0.
+    # 1 -> Reading information. If '$end' found add information to database if no errors
+    #      and go to 0.
     read_status = 0
     try:
         f = io.open(filename, 'rt', encoding = 'utf-8')
@@ -1005,120 +972,52 @@ def mame_load_History_DAT(filename):
     for file_line in f:
         line_number += 1
         line_uni = file_line.strip()
-        if __debug_function: log_debug('Line "{}"'.format(line_uni))
-        if read_status == 0:
+        if read_status == 1:
+            # Most lines in History.dat are biography lines.
+            if line_uni != '$end':
+                info_str_list.append(line_uni)
+                continue
+            read_status = 0
+            mame_history_add_entry(history_idx_dic, history_dic, m_data, info_str_list, line_number)
+            num_header_line = 0
+            m_data = []
+            continue
+        if not line_uni: continue
+        first_char = line_uni[0]
+        if first_char == '#':
             # Skip comments: lines starting with '##'
             # Look for version string in comments
-            if re.search(r'^##', line_uni):
-                m = re.search(r'## REVISION\: ([0-9\.]+)$', line_uni)
+            if line_uni.startswith('##'):
+                m = MAME_HISTORY_VERSION_RE.search(line_uni)
                 if m: version_str = m.group(1)
                 continue
-            if line_uni == '': continue
+        elif first_char == '$':
+            if line_uni == '$bio':
+                read_status = 1
+                info_str_list = []
+                continue
             # Machine list line
             # Parses lines like "$info=99lstwar,99lstwara,99lstwarb,"
             # Parses lines like "$info=99lstwar,99lstwara,99lstwarb"
             # History.dat has syntactic errors like "$dc=,".
             # History.dat has syntactic errors like "$megadriv=".
-            m = re.search(r'^\$(.+?)=(.*?),?$', line_uni)
-            if m:
+            eq_idx = line_uni.find('=', 2)
+            if eq_idx > 0:
                 num_header_line += 1
-                list_name = m.group(1)
-                machine_name_raw = m.group(2)
+                list_name = line_uni[1:eq_idx]
+                machine_name_raw = line_uni[eq_idx+1:]
+                if machine_name_raw and machine_name_raw[-1] == ',':
+                    machine_name_raw = machine_name_raw[:-1]
                 # Remove trailing ',' to fix history.dat syntactic errors like
                 # "$snes_bspack=bsfami,,"
                 if len(machine_name_raw) > 1 and machine_name_raw[-1] == ',':
                     machine_name_raw = machine_name_raw[:-1]
                 # Transform some special list names
                 if list_name in {'info', 'info,megatech', 'info,stv'}: list_name = 'mame'
-                mname_list = machine_name_raw.split(',')
-                m_data.append([num_header_line, list_name, mname_list])
-                continue
-            if line_uni == '$bio':
-                read_status = 1
-                info_str_list = []
+                m_data.append([num_header_line, list_name, machine_name_raw.split(',')])
                 continue
-            # If we reach this point it's an error.
-            raise TypeError('Wrong header "{}" (line {:,})'.format(line_uni, line_number))
-        elif read_status == 1:
-            if line_uni == '$end':
-                # Generate biography text.
-                bio_str = '\n'.join(info_str_list)
-                if bio_str[0] == '\n': bio_str = bio_str[1:]
-                if bio_str[-1] == '\n': bio_str = bio_str[:-1]
-
-                # Clean m_data of bad data due to History.dat syntax errors, for example
-                # empty machine names.
-                # clean_m_data = [
-                #     (list_name, [machine_name_1, machine_name_2, ...] ),
-                #     ...,
-                # ]
-                clean_m_data = []
-                for dtuple in m_data:
-                    line_num, list_name, mname_list = dtuple
-                    # If list_name is empty drop the full line
-                    if not list_name: continue
-                    # Clean empty machine names.
-                    clean_mname_list = []
-                    for machine_name in mname_list:
-                        # Skip bad/wrong machine names.
-                        if not machine_name: continue
-                        if machine_name == ',': continue
-                        clean_mname_list.append(machine_name)
-                    clean_m_data.append((list_name, clean_mname_list))
-
-                # Reset FSM status
-                read_status = 2
-                num_header_line = 0
-                m_data = []
-                info_str_list = []
-            else:
-                info_str_list.append(line_uni)
-        elif read_status == 2:
-            # Go to state 0 of the FSM.
-            read_status = 0
-
-            # Ignore machine if no valid data at all.
-            if len(clean_m_data) == 0:
-                log_warning('On History.dat line {:,}'.format(line_number))
-                log_warning('clean_m_data is empty.')
-                log_warning('Ignoring entry in History.dat database')
-                continue
-            # Ignore if empty list name.
-            if not clean_m_data[0][0]:
-                log_warning('On History.dat line {:,}'.format(line_number))
-                log_warning('clean_m_data empty list name.')
-                log_warning('Ignoring entry in History.dat database')
-                continue
-            # Ignore if empty machine list.
-            if not clean_m_data[0][1]:
-                log_warning('On History.dat line {:,}'.format(line_number))
-                log_warning('Empty machine name list.')
-                log_warning('db_list_name "{}"'.format(clean_m_data[0][0]))
-                log_warning('Ignoring entry in History.dat database')
-                continue
-            if not clean_m_data[0][1][0]:
-                log_warning('On History.dat line {:,}'.format(line_number))
-                log_warning('Empty machine name first element.')
-                log_warning('db_list_name "{}"'.format(clean_m_data[0][0]))
-                log_warning('Ignoring entry in History.dat database')
-                continue
-            db_list_name = clean_m_data[0][0]
-            db_machine_name = clean_m_data[0][1][0]
-
-            # Add list and machine names to index database.
-            for dtuple in clean_m_data:
-                list_name, machine_name_list = dtuple
-                if list_name not in history_idx_dic:
-                    history_idx_dic[list_name] = {'name' : list_name, 'machines' : {}}
-                for machine_name in machine_name_list:
-                    m_str = misc_build_db_str_3(machine_name, db_list_name, db_machine_name)
-                    history_idx_dic[list_name]['machines'][machine_name] = m_str
-
-            # Add biography string to main database.
-            if db_list_name not in history_dic: history_dic[db_list_name] = {}
-            history_dic[db_list_name][db_machine_name] = bio_str
-        else:
-            raise TypeError('Wrong read_status = {} (line {:,})'.format(read_status, line_number))
+        # If we reach this point it's an error.
+        raise TypeError('Wrong header "{}" (line {:,})'.format(line_uni, line_number))
     # Close file
     f.close()
     log_info('mame_load_History_DAT() Version "{}"'.format(version_str))
@@ -1126,9 +1025,60 @@ def mame_load_History_DAT(filename):
     log_info('mame_load_History_DAT() Rows in history_dic {}'.format(len(history_dic)))
 
     return (history_idx_dic, history_dic, version_str)
+
+# Adds a History.dat entry to the index and the database once the '$end' line is found.
+def mame_history_add_entry(history_idx_dic, history_dic, m_data, info_str_list, line_number):
+    # Generate biography text.
+    bio_str = '\n'.join(info_str_list)
+    if bio_str and bio_str[0] == '\n': bio_str = bio_str[1:]
+    if bio_str and bio_str[-1] == '\n': bio_str = bio_str[:-1]
+
+    # Clean m_data of bad data due to History.dat syntax errors, for example
+    # empty machine names.
+    # clean_m_data = [
+    #     (list_name, [machine_name_1, machine_name_2, ...] ),
+    #     ...,
+    # ]
+    clean_m_data = []
+    for line_num, list_name, mname_list in m_data:
+        # If list_name is empty drop the full line
+        if not list_name: continue
+        # Clean empty machine names.
+        clean_mname_list = [m_name for m_name in mname_list if m_name and m_name != ',']
+        clean_m_data.append((list_name, clean_mname_list))
+
+    # Ignore machine if no valid data at all.
+    if len(clean_m_data) == 0:
+        log_warning('On History.dat line {:,}'.format(line_number))
+        log_warning('clean_m_data is empty.')
+        log_warning('Ignoring entry in History.dat database')
+        return
+    # Ignore if empty machine list.
+    if not clean_m_data[0][1]:
+        log_warning('On History.dat line {:,}'.format(line_number))
+        log_warning('Empty machine name list.')
+        log_warning('db_list_name "{}"'.format(clean_m_data[0][0]))
+        log_warning('Ignoring entry in History.dat database')
+        return
+    db_list_name = clean_m_data[0][0]
+    db_machine_name = clean_m_data[0][1][0]
+
+    # Add list and machine names to index database.
+    for list_name, machine_name_list in clean_m_data:
+        if list_name not in history_idx_dic:
+            history_idx_dic[list_name] = {'name' : list_name, 'machines' : {}}
+        idx_machines = history_idx_dic[list_name]['machines']
+        for machine_name in machine_name_list:
+            idx_machines[machine_name] = misc_build_db_str_3(machine_name, db_list_name, db_machine_name)
+
+    # Add biography string to main database.
+    if db_list_name not in history_dic: history_dic[db_list_name] = {}
+    history_dic[db_list_name][db_machine_name] = bio_str
 # --- END code in dev-parsers/test_parser_history_dat.py ------------------------------------------
 
 # --- BEGIN code in dev-parsers/test_parser_mameinfo_dat.py ---------------------------------------
+MAME_MAMEINFO_VERSION_RE = re.compile(r'# MAMEINFO.DAT v([0-9\.]+)')
+
 # mameinfo.dat has information for both MAME machines and MAME drivers.
 #
 # idx_dic  = { 
@@ -1160,7 +1110,6 @@ def mame_load_MameInfo_DAT(filename):
         'drv' : {},
     }
     data_dic = {}
-    __debug_function = False
     line_counter = 0
 
     # --- read_status FSM values ---
@@ -1177,23 +1126,25 @@ def mame_load_MameInfo_DAT(filename):
     for file_line in f:
         line_counter += 1
         line_uni = file_line.strip()
-        # if __debug_function: log_debug('Line "{}"'.format(line_uni))
-        if read_status == 0:
+        if read_status == 2:
+            if line_uni == '$end':
+                if list_name not in data_dic: data_dic[list_name] = {}
+                data_dic[list_name][machine_name] = '\n'.join(info_str_list).strip()
+                read_status = 0
+            else:
+                info_str_list.append(line_uni)
+        elif read_status == 0:
+            if not line_uni: continue
             # Skip comments: lines starting with '#'
             # Look for version string in comments
-            if re.search(r'^#', line_uni):
-                m = re.search(r'# MAMEINFO.DAT v([0-9\.]+)', line_uni)
+            if line_uni[0] == '#':
+                m = MAME_MAMEINFO_VERSION_RE.search(line_uni)
                 if m: version_str = m.group(1)
-                continue
-            if line_uni == '': continue
             # New machine or driver information
-            m = re.search(r'^\$info=(.+?)$', line_uni)
-            if m:
-                machine_name = m.group(1)
-                if __debug_function: log_debug('Machine "{}"'.format(machine_name))
+            elif line_uni.startswith('$info=') and len(line_uni) > 6:
+                machine_name = line_uni[6:]
                 read_status = 1
         elif read_status == 1:
-            if __debug_function: log_debug('Second line "{}"'.format(line_uni))
             if line_uni == '$mame':
                 read_status = 2
                 info_str_list = []
@@ -1209,13 +1160,6 @@ def mame_load_MameInfo_DAT(filename):
                 continue
             else:
                 raise TypeError('Wrong second line = "{}" (line {:,})'.format(line_uni, line_counter))
-        elif read_status == 2:
-            if line_uni == '$end':
-                if list_name not in data_dic: data_dic[list_name] = {}
-                data_dic[list_name][machine_name] = '\n'.join(info_str_list).strip()
-                read_status = 0
-            else:
-                info_str_list.append(line_uni)
         else:
             raise TypeError('Wrong read_status = {} (line {:,})'.format(read_status, line_counter))
     f.close()
@@ -1244,7 +1188,6 @@ def mame_load_GameInit_DAT(filename):
     version_str = 'Not found'
     idx_list = {}
     data_dic = {}
-    __debug_function = False
 
     # --- read_status FSM values ---
     # 0 -> Looking for '$info=(machine_name)'
@@ -1259,41 +1202,35 @@ def mame_load_GameInit_DAT(filename):
         return (idx_list, data_dic, version_str)
     for file_line in f:
         line_uni = file_line.strip()
-        if __debug_function: log_debug('read_status {} | Line "{}"'.format(read_status, line_uni))
         # >> Note that Gameinit.dat may have a BOM 0xEF,0xBB,0xBF
         # >> See https://en.wikipedia.org/wiki/Byte_order_mark
         # >> Remove BOM if present.
         if line_uni and line_uni[0] == '\ufeff': line_uni = line_uni[1:]
-        if read_status == 0:
+        if read_status == 2:
+            if line_uni == '$end':
+                data_dic[machine_name] = '\n'.join(info_str_list)
+                info_str_list = []
+                read_status = 0
+            else:
+                info_str_list.append(line_uni)
+        elif read_status == 0:
+            if not line_uni: continue
             # >> Skip comments: lines starting with '#'
             # >> Look for version string in comments
-            if re.search(r'^#', line_uni):
-                if __debug_function: log_debug('Comment | "{}"'.format(line_uni))
-                m = re.search(r'# MAME GAMEINIT\.DAT v([0-9\.]+) ', line_uni)
+            if line_uni[0] == '#':
+                m = MAME_GAMEINIT_VERSION_RE.search(line_uni)
                 if m: version_str = m.group(1)
-                continue
-            if line_uni == '': continue
             # >> New machine or driver information
-            m = re.search(r'^\$info=(.+?)$', line_uni)
-            if m:
-                machine_name = m.group(1)
-                if __debug_function: log_debug('Machine "{}"'.format(machine_name))
+            elif line_uni.startswith('$info=') and len(line_uni) > 6:
+                machine_name = line_uni[6:]
                 idx_list[machine_name] = machine_name
                 read_status = 1
         elif read_status == 1:
-            if __debug_function: log_debug('Second line "{}"'.format(line_uni))
             if line_uni == '$mame':
                 read_status = 2
                 info_str_list = []
             else:
                 raise TypeError('Wrong second line = "{}"'.format(line_uni))
-        elif read_status == 2:
-            if line_uni == '$end':
-                data_dic[machine_name] = '\n'.join(info_str_list)
-                info_str_list = []
-                read_status = 0
-            else:
-                info_str_list.append(line_uni)
         else:
             raise TypeError('Wrong read_status = {}'.format(read_status))
     f.close()
@@ -1323,7 +1260,6 @@ def mame_load_Command_DAT(filename):
     data_dic = {}
     proper_idx_dic = {}
     proper_data_dic = {}
-    __debug_function = False
 
     # --- read_status FSM values ---
     # 0 -> Looking for '$info=(machine_name)'
@@ -1337,36 +1273,31 @@ def mame_load_Command_DAT(filename):
         return (proper_idx_dic, proper_data_dic, version_str)
     for file_line in f:
         line_uni = file_line.strip()
-        # if __debug_function: log_debug('Line "{}"'.format(line_uni))
-        if read_status == 0:
+        if read_status == 2:
+            if line_uni == '$end':
+                data_dic[machine_name] = '\n'.join(info_str_list)
+                info_str_list = []
+                read_status = 0
+            else:
+                info_str_list.append(line_uni)
+        elif read_status == 0:
+            if not line_uni: continue
             # >> Skip comments: lines starting with '#'
             # >> Look for version string in comments
-            if re.search(r'^#', line_uni):
-                m = re.search(r'# Command List-[\w]+[\s]+([0-9\.]+) #', line_uni)
+            if line_uni[0] == '#':
+                m = MAME_COMMAND_VERSION_RE.search(line_uni)
                 if m: version_str = m.group(1)
-                continue
-            if line_uni == '': continue
             # >> New machine or driver information
-            m = re.search(r'^\$info=(.+?)$', line_uni)
-            if m:
-                machine_name = m.group(1)
-                if __debug_function: log_debug('Machine "{}"'.format(machine_name))
+            elif line_uni.startswith('$info=') and len(line_uni) > 6:
+                machine_name = line_uni[6:]
                 idx_dic[machine_name] = machine_name
                 read_status = 1
         elif read_status == 1:
-            if __debug_function: log_debug('Second line "{}"'.format(line_uni))
             if line_uni == '$cmd':
                 read_status = 2
                 info_str_list = []
             else:
                 raise TypeError('Wrong second line = "{}"'.format(line_uni))
-        elif read_status == 2:
-            if line_uni == '$end':
-                data_dic[machine_name] = '\n'.join(info_str_list)
-                info_str_list = []
-                read_status = 0
-            else:
-                info_str_list.append(line_uni)
         else:
             raise TypeError('Wrong read_status = {}'.format(read_status))
     f.close()
@@ -1387,6 +1318,45 @@ def mame_load_Command_DAT(filename):
 
     return (proper_idx_dic, proper_data_dic, version_str)
 
+# Loads an INI or DAT file using parser_func(filename) and caches the parsed data in a JSON file.
+# The cache is keyed by (path, size, mtime, MAME_PARSER_VERSION) so an unchanged file is not
+# parsed again when the MAME database is rebuilt.
+# parser_func must return a dictionary or a tuple of dictionaries and strings.
+#
+# NOTE set objects are not JSON-serializable. The 'categories' sets of the INI dictionaries
+#      are transformed into lists when saving and into sets when loading.
+#
+def mame_load_cached_DAT(cfg, parser_func, filename):
+    if not os.path.isfile(filename): return parser_func(filename)
+    file_stat = os.stat(filename)
+    cache_key = '{}|{}|{}|{}|{}'.format(parser_func.__name__, filename,
+        file_stat.st_size, file_stat.st_mtime, MAME_PARSER_VERSION)
+    path_hash = hashlib.md5(filename.encode('utf-8')).hexdigest()
+    cache_FN = cfg.PARSE_CACHE_DIR.pjoin('{}_{}.json'.format(parser_func.__name__, path_hash))
+    if cache_FN.exists():
+        cache_dic = utils_load_JSON_file_dic(cache_FN.getPath())
+        if cache_dic.get('key') == cache_key:
+            log_info('mame_load_cached_DAT() Cache hit for "{}"'.format(filename))
+            data_list = cache_dic['data']
+            for data in data_list:
+                if isinstance(data, dict) and 'categories' in data:
+                    data['categories'] = set(data['categories'])
+            return tuple(data_list) if cache_dic['is_tuple'] else data_list[0]
+        log_info('mame_load_cached_DAT() Cache outdated for "{}"'.format(filename))
+
+    parsed_data = parser_func(filename)
+    is_tuple = isinstance(parsed_data, tuple)
+    data_list = []
+    for data in (parsed_data if is_tuple else (parsed_data,)):
+        if isinstance(data, dict) and isinstance(data.get('categories'), set):
+            data = dict(data)
+            data['categories'] = sorted(data['categories'])
+        data_list.append(data)
+    cache_dic = {'key' : cache_key, 'is_tuple' : is_tuple, 'data' : data_list}
+    utils_write_JSON_file(cache_FN.getPath(), cache_dic)
+
+    return parsed_data
+
 # -------------------------------------------------------------------------------------------------
 # DAT export
 # -------------------------------------------------------------------------------------------------
@@ -1447,7 +1417,7 @@ def mame_write_MAME_ROM_Billyc999_XML(cfg, out_dir_FN, db_dic):
         sl.append(XML_t('genre', render['genre']))
         sl.append(XML_t('score'))
         sl.append(XML_t('player', render['nplayers']))
-        sl.append(XML_t('story', assets['plot']))
+        sl.append(XML_t('story', mame_MAME_plot(render, assets)))
         sl.append(XML_t('enabled', 'Yes'))
         sl.append(XML_t('crc'))
         sl.append(XML_t('cloneof', render['cloneof']))
@@ -1772,6 +1742,9 @@ def mame_info_MAME_print(slist, location, machine_name, machine, assets):
     # Most Played Favourites special fields
     if 'launch_count' in machine:
         slist.append("[COLOR slateblue]launch_count[/COLOR]: {}".format(text_type(machine['launch_count'])))
+    for field in ['play_time', 'last_played', 'last_play_time']:
+        if field in machine:
+            slist.append("[COLOR slateblue]{}[/COLOR]: {}".format(field, text_type(machine[field])))
 
     # Standard fields in Render database
     slist.append("[COLOR violet]cloneof[/COLOR]: '{}'".format(machine['cloneof']))
@@ -1783,6 +1756,8 @@ def mame_info_MAME_print(slist, location, machine_name, machine, assets):
     slist.append("[COLOR skyblue]isMature[/COLOR]: {}".format(machine['isMature']))
     slist.append("[COLOR violet]manufacturer[/COLOR]: '{}'".format(machine['manufacturer']))
     slist.append("[COLOR violet]nplayers[/COLOR]: '{}'".format(machine['nplayers']))
+    if 'plot_facts' in machine:
+        slist.append("[COLOR skyblue]plot_facts[/COLOR]: {}".format(text_type(machine['plot_facts'])))
     slist.append("[COLOR violet]year[/COLOR]: '{}'".format(machine['year']))
 
     # Standard fields in Main database
@@ -1852,7 +1827,7 @@ def mame_info_MAME_print(slist, location, machine_name, machine, assets):
     slist.append("[COLOR violet]manual[/COLOR]: '{}'".format(assets['manual']))
     slist.append("[COLOR violet]marquee[/COLOR]: '{}'".format(assets['marquee']))
     slist.append("[COLOR violet]PCB[/COLOR]: '{}'".format(assets['PCB']))
-    slist.append("[COLOR violet]plot[/COLOR]: '{}'".format(assets['plot']))
+    slist.append("[COLOR violet]plot[/COLOR]: '{}'".format(mame_MAME_plot(machine, assets)))
     slist.append("[COLOR violet]snap[/COLOR]: '{}'".format(assets['snap']))
     slist.append("[COLOR violet]title[/COLOR]: '{}'".format(assets['title']))
     slist.append("[COLOR violet]trailer[/COLOR]: '{}'".format(assets['trailer']))
@@ -1872,6 +1847,9 @@ def mame_info_SL_print(slist, location, SL_name, SL_ROM, rom, assets, SL_dic, SL
     slist.append("[COLOR skyblue]hasROMs[/COLOR]: {}".format(text_type(rom['hasROMs'])))
     if 'launch_count' in rom:
         slist.append("[COLOR slateblue]launch_count[/COLOR]: '{}'".format(text_type(rom['launch_count'])))
+    for field in ['play_time', 'last_played', 'last_play_time']:
+        if field in rom:
+            slist.append("[COLOR slateblue]{}[/COLOR]: '{}'".format(field, text_type(rom[field])))
     if 'launch_machine' in rom:
         slist.append("[COLOR slateblue]launch_machine[/COLOR]: '{}'".format(rom['launch_machine']))
     if rom['parts']:
@@ -1881,7 +1859,9 @@ def mame_info_SL_print(slist, location, SL_name, SL_ROM, rom, assets, SL_dic, SL
             slist.append("  [COLOR violet]name[/COLOR]: '{}'".format(part['name']))
     else:
         slist.append('[COLOR lime]parts[/COLOR]: []')
-    slist.append("[COLOR violet]plot[/COLOR]: '{}'".format(rom['plot']))
+    if 'plot_facts' in rom:
+        slist.append("[COLOR skyblue]plot_facts[/COLOR]: {}".format(text_type(rom['plot_facts'])))
+    slist.append("[COLOR violet]plot[/COLOR]: '{}'".format(mame_SL_plot(rom, assets)))
     slist.append("[COLOR violet]publisher[/COLOR]: '{}'".format(rom['publisher']))
     slist.append("[COLOR violet]status_CHD[/COLOR]: '{}'".format(rom['status_CHD']))
     slist.append("[COLOR violet]status_ROM[/COLOR]: '{}'".format(rom['status_ROM']))
@@ -2435,16 +2415,7 @@ def mame_stats_timestamps_slist(cfg, slist, control_dic):
     else:
         slist.append("SL assets never scaned")
 
-    # Plots, Fanarts and 3D Boxes.
-    if control_dic['t_MAME_plots_build']:
-        slist.append("MAME Plots built on         {}".format(misc_time_to_str(control_dic['t_MAME_plots_build'])))
-    else:
-        slist.append("MAME Plots never built")
-    if control_dic['t_SL_plots_build']:
-        slist.append("SL Plots built on           {}".format(misc_time_to_str(control_dic['t_SL_plots_build'])))
-    else:
-        slist.append("SL Plots never built")
-
+    # Fanarts and 3D Boxes.
     if control_dic['t_MAME_fanart_build']:
         slist.append("MAME Fanarts built on       {}".format(misc_time_to_str(control_dic['t_MAME_fanart_build'])))
     else:
@@ -2500,38 +2471,85 @@ def mame_stats_timestamps_slist(cfg, slist, control_dic):
 # -------------------------------------------------------------------------------------------------
 # Check/Update/Repair Favourite ROM objects
 # -------------------------------------------------------------------------------------------------
+# Favourite objects are updated with the machines of the MAME hashed database and the SL
+# databases of the Software Lists of the Favourites, instead of the full MAME databases.
+# Only a few small JSON files are loaded so the update is fast enough to be done after every
+# database rebuild and scan.
+#
+# db_dic must have 'control_dic'. The SL functions also need 'SL_index'.
+
+#
+# Returns the machine (main and render data) and assets of a MAME Favourite. machines_dic and
+# assets_dic are created with db_get_machines_hashed_db(). If the machine is not found create
+# an empty one to update the database fields. The user can delete it later.
+#
+def mame_get_Fav_machine(fav_key, machines_dic, assets_dic):
+    if fav_key in machines_dic and fav_key in assets_dic:
+        return machines_dic[fav_key], assets_dic[fav_key]
+    log_debug('Machine "{}" not found in MAME main DB'.format(fav_key))
+    machine = db_new_machine_dic()
+    machine.update(db_new_machine_render_dic())
+    assets = db_new_MAME_asset()
+    # Change plot to warn user this machine is not found in database.
+    t = 'Machine {} missing'.format(fav_key)
+    machine['description'] = t
+    assets['plot'] = t
+
+    return machine, assets
+
+#
+# Returns the ROM and assets of a SL Favourite. The SL databases of every Software List are
+# loaded only once and stored in SL_DB_cache. If the item is not found create an empty one.
+#
+def mame_get_SL_Fav_ROM(cfg, SL_index, SL_DB_cache, fav_SL_name, fav_ROM_name):
+    if fav_SL_name not in SL_DB_cache:
+        if fav_SL_name in SL_index:
+            file_name = SL_index[fav_SL_name]['rom_DB_noext'] + '_items.json'
+            SL_DB_FN = cfg.SL_DB_DIR.pjoin(file_name)
+            assets_file_name = SL_index[fav_SL_name]['rom_DB_noext'] + '_assets.json'
+            SL_asset_DB_FN = cfg.SL_DB_DIR.pjoin(assets_file_name)
+            SL_roms = utils_load_JSON_file_dic(SL_DB_FN.getPath(), verbose = False)
+            SL_assets_dic = utils_load_JSON_file_dic(SL_asset_DB_FN.getPath(), verbose = False)
+        else:
+            log_debug('Software List "{}" not found in SL index'.format(fav_SL_name))
+            SL_roms, SL_assets_dic = {}, {}
+        SL_DB_cache[fav_SL_name] = (SL_roms, SL_assets_dic)
+    SL_roms, SL_assets_dic = SL_DB_cache[fav_SL_name]
+    if fav_ROM_name in SL_roms and fav_ROM_name in SL_assets_dic:
+        return SL_roms[fav_ROM_name], SL_assets_dic[fav_ROM_name]
+    log_debug('Machine "{}" / "{}" not found in SL main DB'.format(fav_ROM_name, fav_SL_name))
+    SL_ROM = db_new_SL_ROM()
+    SL_assets = db_new_SL_asset()
+    # Change plot to warn user this machine is not found in database.
+    t = 'Item "{}" missing'.format(fav_ROM_name)
+    SL_ROM['description'] = t
+    SL_ROM['plot'] = t
+
+    return SL_ROM, SL_assets
+
+# Old Favourites use 'ROM_name' and new ones 'SL_ROM_name'.
+def mame_get_SL_Fav_ROM_name(fav_SL_ROM):
+    if 'ROM_name' in fav_SL_ROM: return fav_SL_ROM['ROM_name']
+    elif 'SL_ROM_name' in fav_SL_ROM: return fav_SL_ROM['SL_ROM_name']
+    raise TypeError('Cannot find SL ROM name')
+
 def mame_update_MAME_Fav_objects(cfg, db_dic):
     control_dic = db_dic['control_dic']
-    machines = db_dic['machines']
-    renderdb_dic = db_dic['renderdb']
-    assets_dic = db_dic['assetdb']
     fav_machines = utils_load_JSON_file_dic(cfg.FAV_MACHINES_PATH.getPath())
     # If no MAME Favourites return
     if len(fav_machines) < 1:
-        kodi_notify('MAME Favourites empty')
+        log_info('mame_update_MAME_Fav_objects() MAME Favourites empty')
         return
     iteration = 0
     d_text = 'Checking/Updating MAME Favourites...'
     pDialog = KodiProgressDialog()
     pDialog.startProgress(d_text, len(fav_machines))
+    machines_dic = db_get_machines_hashed_db(cfg, list(fav_machines), '_machines.json')
+    assets_dic = db_get_machines_hashed_db(cfg, list(fav_machines), '_assets.json')
     for fav_key in sorted(fav_machines):
         log_debug('Checking machine "{}"'.format(fav_key))
-        if fav_key in machines:
-            machine = machines[fav_key]
-            render = renderdb_dic[fav_key]
-            assets = assets_dic[fav_key]
-        else:
-            # Machine not found in DB. Create an empty one to update the database fields.
-            # The user can delete it later.
-            log_debug('Machine "{}" not found in MAME main DB'.format(fav_key))
-            machine = db_new_machine_dic()
-            render = db_new_machine_render_dic()
-            assets = db_new_MAME_asset()
-            # Change plot to warn user this machine is not found in database.
-            t = 'Machine {} missing'.format(fav_key)
-            render['description'] = t
-            assets['plot'] = t
-        new_fav = db_get_MAME_Favourite_full(fav_key, machine, render, assets, control_dic)
+        machine, assets = mame_get_Fav_machine(fav_key, machines_dic, assets_dic)
+        new_fav = db_get_MAME_Favourite_simple(fav_key, machine, assets, control_dic)
         fav_machines[fav_key] = new_fav
         log_debug('Updated machine "{}"'.format(fav_key))
         iteration += 1
@@ -2540,37 +2558,23 @@ def mame_update_MAME_Fav_objects(cfg, db_dic):
     pDialog.endProgress()
 
 def mame_update_MAME_MostPlay_objects(cfg, db_dic):
+    mame_compact_MAME_play_journal(cfg)
     control_dic = db_dic['control_dic']
-    machines = db_dic['machines']
-    renderdb_dic = db_dic['renderdb']
-    assets_dic = db_dic['assetdb']
     most_played_roms_dic = utils_load_JSON_file_dic(cfg.MAME_MOST_PLAYED_FILE_PATH.getPath())
     if len(most_played_roms_dic) < 1:
-        kodi_notify('MAME Most Played empty')
+        log_info('mame_update_MAME_MostPlay_objects() MAME Most Played empty')
         return
     iteration = 0
     pDialog = KodiProgressDialog()
     pDialog.startProgress('Checking/Updating MAME Most Played machines...', len(most_played_roms_dic))
+    machines_dic = db_get_machines_hashed_db(cfg, list(most_played_roms_dic), '_machines.json')
+    assets_dic = db_get_machines_hashed_db(cfg, list(most_played_roms_dic), '_assets.json')
     for fav_key in sorted(most_played_roms_dic):
         log_debug('Checking machine "{}"'.format(fav_key))
-        if 'launch_count' in most_played_roms_dic[fav_key]:
-            launch_count = most_played_roms_dic[fav_key]['launch_count']
-        else:
-            launch_count = 1
-        if fav_key in machines:
-            machine = machines[fav_key]
-            render = renderdb_dic[fav_key]
-            assets = assets_dic[fav_key]
-        else:
-            log_debug('Machine "{}" not found in MAME main DB'.format(fav_key))
-            machine = db_new_machine_dic()
-            render = db_new_machine_render_dic()
-            assets = db_new_MAME_asset()
-            t = 'Machine {} missing'.format(fav_key)
-            render['description'] = t
-            assets['plot'] = t
-        new_fav = db_get_MAME_Favourite_full(fav_key, machine, render, assets, control_dic)
-        new_fav['launch_count'] = launch_count
+        machine, assets = mame_get_Fav_machine(fav_key, machines_dic, assets_dic)
+        new_fav = db_get_MAME_Favourite_simple(fav_key, machine, assets, control_dic)
+        new_fav['launch_count'] = 1
+        mame_copy_play_stats(most_played_roms_dic[fav_key], new_fav)
         most_played_roms_dic[fav_key] = new_fav
         log_debug('Updated machine "{}"'.format(fav_key))
         iteration += 1
@@ -2579,33 +2583,24 @@ def mame_update_MAME_MostPlay_objects(cfg, db_dic):
     pDialog.endProgress()
 
 def mame_update_MAME_RecentPlay_objects(cfg, db_dic):
+    mame_compact_MAME_play_journal(cfg)
     control_dic = db_dic['control_dic']
-    machines = db_dic['machines']
-    renderdb_dic = db_dic['renderdb']
-    assets_dic = db_dic['assetdb']
     recent_roms_list = utils_load_JSON_file_list(cfg.MAME_RECENT_PLAYED_FILE_PATH.getPath())
     if len(recent_roms_list) < 1:
-        kodi_notify('MAME Recently Played empty')
+        log_info('mame_update_MAME_RecentPlay_objects() MAME Recently Played empty')
         return
     iteration = 0
     pDialog = KodiProgressDialog()
     pDialog.startProgress('Checking/Updating MAME Recently Played machines...', len(recent_roms_list))
+    machine_name_list = [recent_rom['name'] for recent_rom in recent_roms_list]
+    machines_dic = db_get_machines_hashed_db(cfg, machine_name_list, '_machines.json')
+    assets_dic = db_get_machines_hashed_db(cfg, machine_name_list, '_assets.json')
     for i, recent_rom in enumerate(recent_roms_list):
         fav_key = recent_rom['name']
         log_debug('Checking machine "{}"'.format(fav_key))
-        if fav_key in machines:
-            machine = machines[fav_key]
-            render = renderdb_dic[fav_key]
-            assets = assets_dic[fav_key]
-        else:
-            log_debug('Machine "{}" not found in MAME main DB'.format(fav_key))
-            machine = db_new_machine_dic()
-            render = db_new_machine_render_dic()
-            assets = db_new_MAME_asset()
-            t = 'Machine {} missing'.format(fav_key)
-            render['description'] = t
-            assets['plot'] = t
-        new_fav = db_get_MAME_Favourite_full(fav_key, machine, render, assets, control_dic)
+        machine, assets = mame_get_Fav_machine(fav_key, machines_dic, assets_dic)
+        new_fav = db_get_MAME_Favourite_simple(fav_key, machine, assets, control_dic)
+        mame_copy_play_stats(recent_rom, new_fav)
         recent_roms_list[i] = new_fav
         log_debug('Updated machine "{}"'.format(fav_key))
         iteration += 1
@@ -2617,45 +2612,20 @@ def mame_update_SL_Fav_objects(cfg, db_dic):
     control_dic = db_dic['control_dic']
     SL_index = db_dic['SL_index']
     pDialog = KodiProgressDialog()
-    pDialog.startProgress('Loading SL Most Played JSON DB...')
+    pDialog.startProgress('Loading SL Favourites JSON DB...')
     fav_SL_roms = utils_load_JSON_file_dic(cfg.FAV_SL_ROMS_PATH.getPath())
     if len(fav_SL_roms) < 1:
-        kodi_notify_warn('SL Most Played empty')
+        pDialog.endProgress()
+        log_info('mame_update_SL_Fav_objects() SL Favourites empty')
         return
     pDialog.resetProgress('Checking SL Favourites', len(fav_SL_roms))
+    SL_DB_cache = {}
     for fav_SL_key in sorted(fav_SL_roms):
-        if 'ROM_name' in fav_SL_roms[fav_SL_key]:
-            fav_ROM_name = fav_SL_roms[fav_SL_key]['ROM_name']
-        elif 'SL_ROM_name' in fav_SL_roms[fav_SL_key]:
-            fav_ROM_name = fav_SL_roms[fav_SL_key]['SL_ROM_name']
-        else:
-            raise TypeError('Cannot find SL ROM name')
+        fav_ROM_name = mame_get_SL_Fav_ROM_name(fav_SL_roms[fav_SL_key])
         fav_SL_name = fav_SL_roms[fav_SL_key]['SL_name']
         log_debug('Checking SL Favourite "{}" / "{}"'.format(fav_SL_name, fav_ROM_name))
         pDialog.updateProgressInc('Checking SL Favourites...\nItem "{}"'.format(fav_ROM_name))
-
-        # --- Load SL ROMs DB and assets ---
-        file_name =  SL_index[fav_SL_name]['rom_DB_noext'] + '_items.json'
-        SL_DB_FN = cfg.SL_DB_DIR.pjoin(file_name)
-        assets_file_name =  SL_index[fav_SL_name]['rom_DB_noext'] + '_assets.json'
-        SL_asset_DB_FN = cfg.SL_DB_DIR.pjoin(assets_file_name)
-        SL_roms = utils_load_JSON_file_dic(SL_DB_FN.getPath(), verbose = False)
-        SL_assets_dic = utils_load_JSON_file_dic(SL_asset_DB_FN.getPath(), verbose = False)
-
-        # --- Check ---
-        if fav_ROM_name in SL_roms:
-            SL_ROM = SL_roms[fav_ROM_name]
-            SL_assets = SL_assets_dic[fav_ROM_name]
-        else:
-            # Machine not found in DB. Create an empty one to update the database fields.
-            # The user can delete it later.
-            log_debug('Machine "{}" / "{}" not found in SL main DB'.format(fav_ROM_name, fav_SL_name))
-            SL_ROM = db_new_SL_ROM()
-            SL_assets = db_new_SL_asset()
-            # Change plot to warn user this machine is not found in database.
-            t = 'Item "{}" missing'.format(fav_ROM_name)
-            SL_ROM['description'] = t
-            SL_ROM['plot'] = t
+        SL_ROM, SL_assets = mame_get_SL_Fav_ROM(cfg, SL_index, SL_DB_cache, fav_SL_name, fav_ROM_name)
         new_fav_ROM = db_get_SL_Favourite(fav_SL_name, fav_ROM_name, SL_ROM, SL_assets, control_dic)
         fav_SL_roms[fav_SL_key] = new_fav_ROM
         log_debug('Updated SL Favourite "{}" / "{}"'.format(fav_SL_name, fav_ROM_name))
@@ -2663,240 +2633,221 @@ def mame_update_SL_Fav_objects(cfg, db_dic):
     pDialog.endProgress()
 
 def mame_update_SL_MostPlay_objects(cfg, db_dic):
+    mame_compact_SL_play_journal(cfg)
     control_dic = db_dic['control_dic']
     SL_index = db_dic['SL_index']
     pDialog = KodiProgressDialog()
     pDialog.startProgress('Loading SL Most Played JSON DB...')
     most_played_roms_dic = utils_load_JSON_file_dic(cfg.SL_MOST_PLAYED_FILE_PATH.getPath())
     if len(most_played_roms_dic) < 1:
-        kodi_notify_warn('SL Most Played empty')
+        pDialog.endProgress()
+        log_info('mame_update_SL_MostPlay_objects() SL Most Played empty')
         return
     pDialog.resetProgress('Checking SL Most Played', len(most_played_roms_dic))
+    SL_DB_cache = {}
     for fav_SL_key in sorted(most_played_roms_dic):
-        if 'ROM_name' in most_played_roms_dic[fav_SL_key]:
-            fav_ROM_name = most_played_roms_dic[fav_SL_key]['ROM_name']
-        elif 'SL_ROM_name' in most_played_roms_dic[fav_SL_key]:
-            fav_ROM_name = most_played_roms_dic[fav_SL_key]['SL_ROM_name']
-        else:
-            raise TypeError('Cannot find SL ROM name')
-        if 'launch_count' in most_played_roms_dic[fav_SL_key]:
-            launch_count = most_played_roms_dic[fav_SL_key]['launch_count']
-        else:
-            launch_count = 1
+        fav_ROM_name = mame_get_SL_Fav_ROM_name(most_played_roms_dic[fav_SL_key])
         fav_SL_name = most_played_roms_dic[fav_SL_key]['SL_name']
         log_debug('Checking SL Most Played "{}" / "{}"'.format(fav_SL_name, fav_ROM_name))
-
-        # Update progress dialog.
         pDialog.updateProgressInc('Checking SL Most Played...\nItem "{}"'.format(fav_ROM_name))
-
-        # --- Load SL ROMs DB and assets ---
-        file_name = SL_index[fav_SL_name]['rom_DB_noext'] + '_items.json'
-        SL_DB_FN = cfg.SL_DB_DIR.pjoin(file_name)
-        assets_file_name =  SL_index[fav_SL_name]['rom_DB_noext'] + '_assets.json'
-        SL_asset_DB_FN = cfg.SL_DB_DIR.pjoin(assets_file_name)
-        SL_roms = utils_load_JSON_file_dic(SL_DB_FN.getPath(), verbose = False)
-        SL_assets_dic = utils_load_JSON_file_dic(SL_asset_DB_FN.getPath(), verbose = False)
-
-        # --- Check ---
-        if fav_ROM_name in SL_roms:
-            SL_ROM = SL_roms[fav_ROM_name]
-            SL_assets = SL_assets_dic[fav_ROM_name]
-        else:
-            log_debug('Machine "{}" / "{}" not found in SL main DB'.format(fav_ROM_name, fav_SL_name))
-            SL_ROM = db_new_SL_ROM()
-            SL_assets = db_new_SL_asset()
-            t = 'Item "{}" missing'.format(fav_ROM_name)
-            SL_ROM['description'] = t
-            SL_ROM['plot'] = t
+        SL_ROM, SL_assets = mame_get_SL_Fav_ROM(cfg, SL_index, SL_DB_cache, fav_SL_name, fav_ROM_name)
         new_fav_ROM = db_get_SL_Favourite(fav_SL_name, fav_ROM_name, SL_ROM, SL_assets, control_dic)
-        new_fav_ROM['launch_count'] = launch_count
+        new_fav_ROM['launch_count'] = 1
+        mame_copy_play_stats(most_played_roms_dic[fav_SL_key], new_fav_ROM)
         most_played_roms_dic[fav_SL_key] = new_fav_ROM
         log_debug('Updated SL Most Played "{}" / "{}"'.format(fav_SL_name, fav_ROM_name))
     utils_write_JSON_file(cfg.SL_MOST_PLAYED_FILE_PATH.getPath(), most_played_roms_dic)
     pDialog.endProgress()
 
 def mame_update_SL_RecentPlay_objects(cfg, db_dic):
+    mame_compact_SL_play_journal(cfg)
     control_dic = db_dic['control_dic']
     SL_index = db_dic['SL_index']
     pDialog = KodiProgressDialog()
     pDialog.startProgress('Loading SL Recently Played JSON DB...')
     recent_roms_list = utils_load_JSON_file_list(cfg.SL_RECENT_PLAYED_FILE_PATH.getPath())
     if len(recent_roms_list) < 1:
-        kodi_notify_warn('SL Recently Played empty')
+        pDialog.endProgress()
+        log_info('mame_update_SL_RecentPlay_objects() SL Recently Played empty')
         return
     pDialog.resetProgress('Checking SL Recently Played', len(recent_roms_list))
+    SL_DB_cache = {}
     for i, recent_rom in enumerate(recent_roms_list):
-        if 'ROM_name' in recent_rom:
-            fav_ROM_name = recent_rom['ROM_name']
-        elif 'SL_ROM_name' in recent_rom:
-            fav_ROM_name = recent_rom['SL_ROM_name']
-        else:
-            raise TypeError('Cannot find SL ROM name')
+        fav_ROM_name = mame_get_SL_Fav_ROM_name(recent_rom)
         fav_SL_name = recent_rom['SL_name']
         log_debug('Checking SL Recently Played "{}" / "{}"'.format(fav_SL_name, fav_ROM_name))
         pDialog.updateProgressInc('Checking SL Recently Played...\nItem "{}"'.format(fav_ROM_name))
-
-        # --- Load SL ROMs DB and assets ---
-        file_name = SL_index[fav_SL_name]['rom_DB_noext'] + '_items.json'
-        SL_DB_FN = cfg.SL_DB_DIR.pjoin(file_name)
-        assets_file_name =  SL_index[fav_SL_name]['rom_DB_noext'] + '_assets.json'
-        SL_asset_DB_FN = cfg.SL_DB_DIR.pjoin(assets_file_name)
-        SL_roms = utils_load_JSON_file_dic(SL_DB_FN.getPath(), verbose = False)
-        SL_assets_dic = utils_load_JSON_file_dic(SL_asset_DB_FN.getPath(), verbose = False)
-
-        # --- Check ---
-        if fav_ROM_name in SL_roms:
-            SL_ROM = SL_roms[fav_ROM_name]
-            SL_assets = SL_assets_dic[fav_ROM_name]
-        else:
-            log_debug('Machine "{}" / "{}" not found in SL main DB'.format(fav_ROM_name, fav_SL_name))
-            SL_ROM = db_new_SL_ROM()
-            SL_assets = db_new_SL_asset()
-            t = 'Item "{}" missing'.format(fav_ROM_name)
-            SL_ROM['description'] = t
-            SL_ROM['plot'] = t
+        SL_ROM, SL_assets = mame_get_SL_Fav_ROM(cfg, SL_index, SL_DB_cache, fav_SL_name, fav_ROM_name)
         new_fav_ROM = db_get_SL_Favourite(fav_SL_name, fav_ROM_name, SL_ROM, SL_assets, control_dic)
+        mame_copy_play_stats(recent_rom, new_fav_ROM)
         recent_roms_list[i] = new_fav_ROM
         log_debug('Updated SL Recently Played  "{}" / "{}"'.format(fav_SL_name, fav_ROM_name))
     utils_write_JSON_file(cfg.SL_RECENT_PLAYED_FILE_PATH.getPath(), recent_roms_list)
     pDialog.endProgress()
 
-# ------------------------------------------------------------------------------------------------
-# Build MAME and SL plots
-# ------------------------------------------------------------------------------------------------
-
-# Generate plot for MAME machines.
-# Line 1) Controls are {Joystick}
-# Line 2) {One Vertical Raster screen}
-# Line 3) Machine [is|is not] mechanical and driver is neogeo.hpp
-# Line 4) Machine has [no coin slots| N coin slots]
-# Line 5) Artwork, Manual, History, Info, Gameinit, Command
-# Line 6) Machine [supports|does not support] a Software List.
-def mame_MAME_plot_slits(mname, m, assets_dic,
-    history_info_set, mameinfo_info_set, gameinit_idx_dic, command_idx_dic):
-    Flag_list = []
-    if assets_dic[mname]['artwork']: Flag_list.append('Artwork')
-    if assets_dic[mname]['manual']: Flag_list.append('Manual')
-    if mname in history_info_set: Flag_list.append('History')
-    if mname in mameinfo_info_set: Flag_list.append('Info')
-    if mname in gameinit_idx_dic: Flag_list.append('Gameinit')
-    if mname in command_idx_dic: Flag_list.append('Command')
-    Flag_str = ', '.join(Flag_list)
-    if m['input']:
-        control_list = [ctrl_dic['type'] for ctrl_dic in m['input']['control_list']]
-    else:
-        control_list = []
-    if control_list:
-        controls_str = 'Controls {}'.format(misc_get_mame_control_str(control_list))
+#
+# Updates all the MAME and SL Favourite objects. Called by the utility "Check all Favourite
+# objects" and automatically after the databases are rebuilt or the assets scanned.
+# Favourites are not updated if the MAME assets are not scanned because all the Favourites
+# would lose their artwork. SL Favourites are updated only if the SL assets are scanned.
+#
+def mame_update_all_Fav_objects(cfg, control_dic):
+    if not control_dic['t_MAME_assets_scan'] > control_dic['t_MAME_ROMs_scan']:
+        log_info('mame_update_all_Fav_objects() MAME assets not scanned. Favourites not updated.')
+        return
+    db_dic = {
+        'control_dic' : control_dic,
+        'SL_index' : utils_load_JSON_file_dic(cfg.SL_INDEX_PATH.getPath()),
+    }
+    mame_update_MAME_Fav_objects(cfg, db_dic)
+    mame_update_MAME_MostPlay_objects(cfg, db_dic)
+    mame_update_MAME_RecentPlay_objects(cfg, db_dic)
+    if cfg.settings['global_enable_SL'] and db_dic['SL_index'] and \
+        control_dic['t_SL_assets_scan'] > control_dic['t_SL_ROMs_scan']:
+        mame_update_SL_Fav_objects(cfg, db_dic)
+        mame_update_SL_MostPlay_objects(cfg, db_dic)
+        mame_update_SL_RecentPlay_objects(cfg, db_dic)
     else:
-        controls_str = 'No controls'
-    mecha_str = 'Mechanical' if m['isMechanical'] else 'Non-mechanical'
-    n_coins = m['input']['att_coins'] if m['input'] else 0
-    coin_str = 'Machine has {} coin slots'.format(n_coins) if n_coins > 0 else 'Machine has no coin slots'
-    SL_str = ', '.join(m['softwarelists']) if m['softwarelists'] else ''
-
-    plot_str_list = []
-    plot_str_list.append('{}'.format(controls_str))
-    plot_str_list.append('{}'.format(misc_get_mame_screen_str(mname, m)))
-    plot_str_list.append('{} / Driver is {}'.format(mecha_str, m['sourcefile']))
-    plot_str_list.append('{}'.format(coin_str))
-    if Flag_str: plot_str_list.append('{}'.format(Flag_str))
-    if SL_str: plot_str_list.append('SL {}'.format(SL_str))
-
-    return plot_str_list
-
-# Setting id="MAME_plot" values="Info|History DAT|Info + History DAT"
-def mame_build_MAME_plots(cfg, db_dic_in):
-    log_info('mame_build_MAME_plots() Building machine plots/descriptions ...')
-    control_dic = db_dic_in['control_dic']
-    machines = db_dic_in['machines']
-    renderdb_dic = db_dic_in['renderdb']
-    assetdb_dic = db_dic_in['assetdb']
-    history_idx_dic = db_dic_in['history_idx_dic']
-    mameinfo_idx_dic = db_dic_in['mameinfo_idx_dic']
-    gameinit_idx_dic = db_dic_in['gameinit_idx_list']
-    command_idx_dic = db_dic_in['command_idx_list']
-
-    # Do not crash if DAT files are not configured.
-    history_info_set  = {m for m in history_idx_dic['mame']['machines']} if history_idx_dic else set()
-    mameinfo_info_set = {m for m in mameinfo_idx_dic['mame']} if mameinfo_idx_dic else set()
+        log_info('mame_update_all_Fav_objects() SL disabled or SL assets not scanned.')
 
-    # --- Built machine plots ---
-    pDialog = KodiProgressDialog()
-    pDialog.startProgress('Generating MAME machine plots...', len(machines))
-    for mname, m in machines.items():
-        pDialog.updateProgressInc()
-        plot_str_list = mame_MAME_plot_slits(mname, m, assetdb_dic,
-            history_info_set, mameinfo_info_set, gameinit_idx_dic, command_idx_dic)
-        assetdb_dic[mname]['plot'] = '\n'.join(plot_str_list)
-    pDialog.endProgress()
-
-    # Timestamp, save the MAME asset database. Save control_dic at the end.
-    db_safe_edit(control_dic, 't_MAME_plots_build', time.time())
-    db_files = [
-        (assetdb_dic, 'MAME machine assets', cfg.ASSET_DB_PATH.getPath()),
-        (control_dic, 'Control dictionary', cfg.MAIN_CONTROL_PATH.getPath()),
-    ]
-    db_save_files(db_files)
-
-# ---------------------------------------------------------------------------------------------
-# Generate plot for Software Lists
-# Line 1) SL item has {} parts
-# Line 2) {} ROMs and {} disks
-# Line 3) Manual, History
-# Line 4) Machines: machine list ...
-# ---------------------------------------------------------------------------------------------
-def mame_build_SL_plots(cfg, SL_dic):
-    control_dic = SL_dic['control_dic']
-    SL_index_dic = SL_dic['SL_index']
-    SL_machines_dic = SL_dic['SL_machines']
-    History_idx_dic = SL_dic['history_idx_dic']
-
-    d_text = 'Generating SL item plots ...'
-    pDialog = KodiProgressDialog()
-    pDialog.startProgress(d_text, len(SL_index_dic))
-    for SL_name in sorted(SL_index_dic):
-        pDialog.updateProgressInc('{}\nSoftware List {}'.format(d_text, SL_name))
+# -------------------------------------------------------------------------------------------------
+# Most Played and Recently Played play journal
+# -------------------------------------------------------------------------------------------------
+# Launching a machine only appends a small record { key, start, duration } to the play journal.
+# The journal is compacted into the Most Played and Recently Played JSON files before they are
+# displayed or edited, and after a launch if the journal is big. Most Played objects have the
+# total play time in seconds in 'play_time' and Recently Played objects the start time and
+# duration of the last session in 'last_played' and 'last_play_time'.
+#
+# The view files are written before the journal is removed. If Kodi crashes in between the
+# last launches are counted twice, which is harmless.
+MAX_RECENT_PLAYED_ROMS = 100
+PLAY_JOURNAL_MAX_SIZE = 16 * 1024
+
+# Fields of the Most Played and Recently Played objects kept when the objects are updated.
+PLAY_STATS_FIELDS = ['launch_count', 'play_time', 'last_played', 'last_play_time']
+
+def mame_add_MAME_play_record(cfg, machine_name, start_time, duration):
+    record = {'key' : machine_name, 'start' : int(start_time), 'duration' : int(duration)}
+    journal_size = utils_append_JSON_journal(cfg.MAME_PLAY_JOURNAL_PATH.getPath(), record)
+    log_debug('mame_add_MAME_play_record() Journal size {} bytes'.format(journal_size))
+    if journal_size > PLAY_JOURNAL_MAX_SIZE: mame_compact_MAME_play_journal(cfg)
+
+def mame_add_SL_play_record(cfg, SL_name, SL_ROM_name, start_time, duration):
+    record = {
+        'key' : SL_name + '-' + SL_ROM_name, 'SL_name' : SL_name, 'SL_ROM_name' : SL_ROM_name,
+        'start' : int(start_time), 'duration' : int(duration),
+    }
+    journal_size = utils_append_JSON_journal(cfg.SL_PLAY_JOURNAL_PATH.getPath(), record)
+    log_debug('mame_add_SL_play_record() Journal size {} bytes'.format(journal_size))
+    if journal_size > PLAY_JOURNAL_MAX_SIZE: mame_compact_SL_play_journal(cfg)
 
-        # Open database
-        SL_DB_prefix = SL_index_dic[SL_name]['rom_DB_noext']
-        SL_ROMs_FN = cfg.SL_DB_DIR.pjoin(SL_DB_prefix + '_items.json')
-        SL_assets_FN = cfg.SL_DB_DIR.pjoin(SL_DB_prefix + '_assets.json')
-        SL_ROM_audit_FN = cfg.SL_DB_DIR.pjoin(SL_DB_prefix + '_ROM_audit.json')
-        SL_roms = utils_load_JSON_file_dic(SL_ROMs_FN.getPath(), verbose = False)
-        SL_assets_dic = utils_load_JSON_file_dic(SL_assets_FN.getPath(), verbose = False)
-        SL_ROM_audit_dic = utils_load_JSON_file_dic(SL_ROM_audit_FN.getPath(), verbose = False)
-        History_SL_set  = {m for m in History_idx_dic[SL_name]['machines']} if SL_name in History_idx_dic else set()
-        # Machine_list = [ m['machine'] for m in SL_machines_dic[SL_name] ]
-        # Machines_str = 'Machines: {}'.format(', '.join(sorted(Machine_list)))
-
-        # Traverse SL ROMs and make plot.
-        for rom_key in sorted(SL_roms):
-            SL_rom = SL_roms[rom_key]
-            num_parts = len(SL_rom['parts'])
-            if num_parts == 0:   parts_str = 'SL item has no parts'
-            elif num_parts == 1: parts_str = 'SL item has {} part'.format(num_parts)
-            elif num_parts > 1:  parts_str = 'SL item has {} parts'.format(num_parts)
-            num_ROMs = 0
-            num_disks = 0
-            for SL_rom in SL_ROM_audit_dic[rom_key]:
-                if SL_rom['type'] == 'ROM': num_ROMs += 1
-                elif SL_rom['type'] == 'DISK': num_disks += 1
-            ROM_str = 'ROM' if num_ROMs == 1 else 'ROMs'
-            disk_str = 'disk' if num_disks == 1 else 'disks'
-            roms_str = '{} {} and {} {}'.format(num_ROMs, ROM_str, num_disks, disk_str)
-            Flag_list = []
-            if SL_assets_dic[rom_key]['manual']: Flag_list.append('Manual')
-            if rom_key in History_SL_set: Flag_list.append('History')
-            Flag_str = ', '.join(Flag_list)
-            # SL_roms[rom_key]['plot'] = '\n'.join([parts_str, roms_str, Flag_str, Machines_str])
-            SL_roms[rom_key]['plot'] = '\n'.join([parts_str, roms_str, Flag_str])
-        utils_write_JSON_file(SL_ROMs_FN.getPath(), SL_roms, verbose = False)
-    pDialog.endProgress()
+# Copies the play statistics of old_fav into new_fav.
+def mame_copy_play_stats(old_fav, new_fav):
+    for field in PLAY_STATS_FIELDS:
+        if field in old_fav: new_fav[field] = old_fav[field]
 
-    # --- Timestamp ---
-    db_safe_edit(control_dic, 't_SL_plots_build', time.time())
-    utils_write_JSON_file(cfg.MAIN_CONTROL_PATH.getPath(), control_dic)
+#
+# Applies the journal records to most_played_dic and recent_list.
+# recent_key is the field with the key of the Recently Played objects.
+# new_fav_dic has the objects of the machines not in most_played_dic or recent_list.
+# Returns the new Recently Played list.
+#
+def _apply_play_records(record_list, most_played_dic, recent_list, recent_key, new_fav_dic):
+    recent_dic = {fav[recent_key] : fav for fav in recent_list}
+    for record in record_list:
+        key = record['key']
+        if key in recent_dic:
+            base_fav = recent_dic[key]
+        elif key in most_played_dic:
+            base_fav = most_played_dic[key]
+        else:
+            base_fav = new_fav_dic[key]
+        # --- Most Played ---
+        if key in most_played_dic:
+            most_played_fav = most_played_dic[key]
+            most_played_fav['launch_count'] = most_played_fav.get('launch_count', 0) + 1
+            most_played_fav['play_time'] = most_played_fav.get('play_time', 0) + record['duration']
+        else:
+            most_played_fav = copy.deepcopy(base_fav)
+            most_played_fav.pop('last_played', None)
+            most_played_fav.pop('last_play_time', None)
+            most_played_fav['launch_count'] = 1
+            most_played_fav['play_time'] = record['duration']
+            most_played_dic[key] = most_played_fav
+        # --- Recently Played ---
+        if key not in recent_dic:
+            recent_fav = copy.deepcopy(base_fav)
+            recent_fav.pop('launch_count', None)
+            recent_fav.pop('play_time', None)
+            recent_dic[key] = recent_fav
+        recent_dic[key]['last_played'] = record['start']
+        recent_dic[key]['last_play_time'] = record['duration']
+
+    # Last launched first, then the old list without the launched machines.
+    key_list = []
+    key_set = set()
+    for key in [r['key'] for r in reversed(record_list)] + [fav[recent_key] for fav in recent_list]:
+        if key in key_set: continue
+        key_set.add(key)
+        key_list.append(key)
+    if len(key_list) > MAX_RECENT_PLAYED_ROMS:
+        log_debug('_apply_play_records() Trimming list to {} items'.format(MAX_RECENT_PLAYED_ROMS))
+        key_list = key_list[:MAX_RECENT_PLAYED_ROMS]
+
+    return [recent_dic[key] for key in key_list]
+
+def mame_compact_MAME_play_journal(cfg):
+    record_list = utils_load_JSON_journal(cfg.MAME_PLAY_JOURNAL_PATH.getPath())
+    if not record_list: return
+    log_info('mame_compact_MAME_play_journal() Compacting {} records'.format(len(record_list)))
+    most_played_dic = utils_load_JSON_file_dic(cfg.MAME_MOST_PLAYED_FILE_PATH.getPath())
+    recent_list = utils_load_JSON_file_list(cfg.MAME_RECENT_PLAYED_FILE_PATH.getPath())
+
+    # --- Create the objects of the machines played for the first time ---
+    recent_set = set(fav['name'] for fav in recent_list)
+    new_name_list = sorted(set(r['key'] for r in record_list
+        if r['key'] not in most_played_dic and r['key'] not in recent_set))
+    new_fav_dic = {}
+    if new_name_list:
+        control_dic = utils_load_JSON_file_dic(cfg.MAIN_CONTROL_PATH.getPath())
+        machines_dic = db_get_machines_hashed_db(cfg, new_name_list, '_machines.json')
+        assets_dic = db_get_machines_hashed_db(cfg, new_name_list, '_assets.json')
+        for m_name in new_name_list:
+            machine, assets = mame_get_Fav_machine(m_name, machines_dic, assets_dic)
+            new_fav_dic[m_name] = db_get_MAME_Favourite_simple(m_name, machine, assets, control_dic)
+
+    recent_list = _apply_play_records(record_list, most_played_dic, recent_list, 'name', new_fav_dic)
+    utils_write_JSON_file(cfg.MAME_MOST_PLAYED_FILE_PATH.getPath(), most_played_dic)
+    utils_write_JSON_file(cfg.MAME_RECENT_PLAYED_FILE_PATH.getPath(), recent_list)
+    utils_remove_JSON_journal(cfg.MAME_PLAY_JOURNAL_PATH.getPath())
+
+def mame_compact_SL_play_journal(cfg):
+    record_list = utils_load_JSON_journal(cfg.SL_PLAY_JOURNAL_PATH.getPath())
+    if not record_list: return
+    log_info('mame_compact_SL_play_journal() Compacting {} records'.format(len(record_list)))
+    most_played_dic = utils_load_JSON_file_dic(cfg.SL_MOST_PLAYED_FILE_PATH.getPath())
+    recent_list = utils_load_JSON_file_list(cfg.SL_RECENT_PLAYED_FILE_PATH.getPath())
+
+    # --- Create the objects of the items played for the first time ---
+    recent_set = set(fav['SL_DB_key'] for fav in recent_list)
+    new_record_dic = {r['key'] : r for r in record_list
+        if r['key'] not in most_played_dic and r['key'] not in recent_set}
+    new_fav_dic = {}
+    if new_record_dic:
+        control_dic = utils_load_JSON_file_dic(cfg.MAIN_CONTROL_PATH.getPath())
+        SL_index = utils_load_JSON_file_dic(cfg.SL_INDEX_PATH.getPath())
+        SL_DB_cache = {}
+        for key in sorted(new_record_dic):
+            SL_name = new_record_dic[key]['SL_name']
+            SL_ROM_name = new_record_dic[key]['SL_ROM_name']
+            SL_ROM, SL_assets = mame_get_SL_Fav_ROM(cfg, SL_index, SL_DB_cache, SL_name, SL_ROM_name)
+            new_fav_dic[key] = db_get_SL_Favourite(SL_name, SL_ROM_name, SL_ROM, SL_assets, control_dic)
+
+    recent_list = _apply_play_records(record_list, most_played_dic, recent_list, 'SL_DB_key', new_fav_dic)
+    utils_write_JSON_file(cfg.SL_MOST_PLAYED_FILE_PATH.getPath(), most_played_dic)
+    utils_write_JSON_file(cfg.SL_RECENT_PLAYED_FILE_PATH.getPath(), recent_list)
+    utils_remove_JSON_journal(cfg.SL_PLAY_JOURNAL_PATH.getPath())
 
 # -------------------------------------------------------------------------------------------------
 # MAME ROM/CHD audit code
@@ -4135,25 +4086,25 @@ def mame_build_MAME_main_database(cfg, st_dic):
     pd_line1 = 'Processing INI files...'
     pDialog.startProgress(pd_line1, num_items)
     pDialog.updateProgress(0, '{}\nFile {}'.format(pd_line1, ALLTIME_INI))
-    alltime_dic = mame_load_INI_datfile_simple(ALLTIME_FN.getPath())
+    alltime_dic = mame_load_cached_DAT(cfg, mame_load_INI_datfile_simple, ALLTIME_FN.getPath())
     pDialog.updateProgress(1, '{}\nFile {}'.format(pd_line1, ARTWORK_INI))
-    artwork_dic = mame_load_INI_datfile_simple(ARTWORK_FN.getPath())
+    artwork_dic = mame_load_cached_DAT(cfg, mame_load_INI_datfile_simple, ARTWORK_FN.getPath())
     pDialog.updateProgress(2, '{}\nFile {}'.format(pd_line1, BESTGAMES_INI))
-    bestgames_dic = mame_load_INI_datfile_simple(BESTGAMES_FN.getPath())
+    bestgames_dic = mame_load_cached_DAT(cfg, mame_load_INI_datfile_simple, BESTGAMES_FN.getPath())
     pDialog.updateProgress(3, '{}\nFile {}'.format(pd_line1, CATEGORY_INI))
-    category_dic = mame_load_INI_datfile_simple(CATEGORY_FN.getPath())
+    category_dic = mame_load_cached_DAT(cfg, mame_load_INI_datfile_simple, CATEGORY_FN.getPath())
     pDialog.updateProgress(4, '{}\nFile {}'.format(pd_line1, CATLIST_INI))
-    catlist_dic = mame_load_INI_datfile_simple(CATLIST_FN.getPath())
+    catlist_dic = mame_load_cached_DAT(cfg, mame_load_INI_datfile_simple, CATLIST_FN.getPath())
     pDialog.updateProgress(5, '{}\nFile {}'.format(pd_line1, CATVER_INI))
-    (catver_dic, veradded_dic) = mame_load_Catver_ini(CATVER_FN.getPath())
+    (catver_dic, veradded_dic) = mame_load_cached_DAT(cfg, mame_load_Catver_ini, CATVER_FN.getPath())
     pDialog.updateProgress(6, '{}\nFile {}'.format(pd_line1, GENRE_INI))
-    genre_dic = mame_load_INI_datfile_simple(GENRE_FN.getPath())
+    genre_dic = mame_load_cached_DAT(cfg, mame_load_INI_datfile_simple, GENRE_FN.getPath())
     pDialog.updateProgress(7, '{}\nFile {}'.format(pd_line1, MATURE_INI))
-    mature_dic = mame_load_Mature_ini(MATURE_FN.getPath())
+    mature_dic = mame_load_cached_DAT(cfg, mame_load_Mature_ini, MATURE_FN.getPath())
     pDialog.updateProgress(8, '{}\nFile {}'.format(pd_line1, NPLAYERS_INI))
-    nplayers_dic = mame_load_nplayers_ini(NPLAYERS_FN.getPath())
+    nplayers_dic = mame_load_cached_DAT(cfg, mame_load_nplayers_ini, NPLAYERS_FN.getPath())
     pDialog.updateProgress(9, '{}\nFile {}'.format(pd_line1, SERIES_INI))
-    series_dic = mame_load_INI_datfile_simple(SERIES_FN.getPath())
+    series_dic = mame_load_cached_DAT(cfg, mame_load_INI_datfile_simple, SERIES_FN.getPath())
     pDialog.endProgress()
 
     # --- Load DAT files to include category information ---
@@ -4161,13 +4112,13 @@ def mame_build_MAME_main_database(cfg, st_dic):
     pd_line1 = 'Processing DAT files...'
     pDialog.startProgress(pd_line1, num_items)
     pDialog.updateProgress(0, '{}\nFile {}'.format(pd_line1, COMMAND_DAT))
-    (command_idx_dic, command_dic, command_version) = mame_load_Command_DAT(COMMAND_FN.getPath())
+    (command_idx_dic, command_dic, command_version) = mame_load_cached_DAT(cfg, mame_load_Command_DAT, COMMAND_FN.getPath())
     pDialog.updateProgress(1, '{}\nFile {}'.format(pd_line1, GAMEINIT_DAT))
-    (gameinit_idx_dic, gameinit_dic, gameinit_version) = mame_load_GameInit_DAT(GAMEINIT_FN.getPath())
+    (gameinit_idx_dic, gameinit_dic, gameinit_version) = mame_load_cached_DAT(cfg, mame_load_GameInit_DAT, GAMEINIT_FN.getPath())
     pDialog.updateProgress(2, '{}\nFile {}'.format(pd_line1, HISTORY_DAT))
-    (history_idx_dic, history_dic, history_version) = mame_load_History_DAT(HISTORY_FN.getPath())
+    (history_idx_dic, history_dic, history_version) = mame_load_cached_DAT(cfg, mame_load_History_DAT, HISTORY_FN.getPath())
     pDialog.updateProgress(3, '{}\nFile {}'.format(pd_line1, MAMEINFO_DAT))
-    (mameinfo_idx_dic, mameinfo_dic, mameinfo_version) = mame_load_MameInfo_DAT(MAMEINFO_FN.getPath())
+    (mameinfo_idx_dic, mameinfo_dic, mameinfo_version) = mame_load_cached_DAT(cfg, mame_load_MameInfo_DAT, MAMEINFO_FN.getPath())
     pDialog.endProgress()
 
     # --- Verify that INIs comply with the data model ---
@@ -4708,6 +4659,17 @@ def mame_build_MAME_main_database(cfg, st_dic):
             if machine_key not in renderdb_dic: continue
             command_idx_dic[machine_key] = renderdb_dic[machine_key]['description']
 
+    # ---------------------------------------------------------------------------------------------
+    # Machine plot facts. Plots are generated when rendering, see mame_MAME_plot().
+    # ---------------------------------------------------------------------------------------------
+    log_debug('Computing MAME machine plot facts...')
+    # Do not crash if DAT files are not configured.
+    history_info_set = set(history_idx_dic['mame']['machines']) if history_idx_dic else set()
+    mameinfo_info_set = set(mameinfo_idx_dic['mame']) if mameinfo_idx_dic else set()
+    for m_name, render in renderdb_dic.items():
+        render['plot_facts'] = mame_MAME_plot_facts(m_name, machines[m_name],
+            history_info_set, mameinfo_info_set, gameinit_idx_dic, command_idx_dic)
+
     # ---------------------------------------------------------------------------------------------
     # Update/Reset MAME control dictionary
     # Create a new control_dic. This effectively resets AML status.
@@ -4779,6 +4741,10 @@ def mame_build_MAME_main_database(cfg, st_dic):
     # --- Timestamp ---
     db_safe_edit(control_dic, 't_MAME_DB_build', time.time())
 
+    # Render and asset databases are stored as schema-based tables.
+    renderdb_dic = db_new_render_table(renderdb_dic)
+    assetdb_dic = db_new_asset_table(assetdb_dic)
+
     # ---------------------------------------------------------------------------------------------
     # Build main distributed hashed database
     # ---------------------------------------------------------------------------------------------
@@ -4795,6 +4761,11 @@ def mame_build_MAME_main_database(cfg, st_dic):
     else:
         json_write_func = utils_write_JSON_file
         log_debug('Using utils_write_JSON_file() JSON writer')
+    # DAT databases are saved as text stores so a single entry can be read quickly.
+    utils_write_text_store(cfg.HISTORY_DB_PATH.getPath(), history_dic)
+    utils_write_text_store(cfg.MAMEINFO_DB_PATH.getPath(), mameinfo_dic)
+    utils_write_text_store(cfg.GAMEINIT_DB_PATH.getPath(), gameinit_dic)
+    utils_write_text_store(cfg.COMMAND_DB_PATH.getPath(), command_dic)
     db_files = [
         [machines, 'MAME machines main', cfg.MAIN_DB_PATH.getPath()],
         [renderdb_dic, 'MAME render DB', cfg.RENDER_DB_PATH.getPath()],
@@ -4805,13 +4776,9 @@ def mame_build_MAME_main_database(cfg, st_dic):
         [roms_sha1_dic, 'MAME ROMs SHA1 dictionary', cfg.SHA1_HASH_DB_PATH.getPath()],
         # --- DAT files ---
         [history_idx_dic, 'History DAT index', cfg.HISTORY_IDX_PATH.getPath()],
-        [history_dic, 'History DAT database', cfg.HISTORY_DB_PATH.getPath()],
         [mameinfo_idx_dic, 'MAMEInfo DAT index', cfg.MAMEINFO_IDX_PATH.getPath()],
-        [mameinfo_dic, 'MAMEInfo DAT database', cfg.MAMEINFO_DB_PATH.getPath()],
         [gameinit_idx_dic, 'Gameinit DAT index', cfg.GAMEINIT_IDX_PATH.getPath()],
-        [gameinit_dic, 'Gameinit DAT database', cfg.GAMEINIT_DB_PATH.getPath()],
         [command_idx_dic, 'Command DAT index', cfg.COMMAND_IDX_PATH.getPath()],
-        [command_dic, 'Command DAT database', cfg.COMMAND_DB_PATH.getPath()],
         # --- Save control_dic after everything is saved ---
         [control_dic, 'Control dictionary', cfg.MAIN_CONTROL_PATH.getPath()],
     ]
@@ -5487,536 +5454,143 @@ def mame_build_MAME_catalogs(cfg, st_dic, db_dic_in):
         'BySL'               : {},
         'Year'               : {},
     }
-    NUM_CATALOGS = len(cache_index_dic)
-
-    NORMAL_DRIVER_SET = {
-        '88games.cpp',
-        'asteroid.cpp',
-        'cball.cpp',
-    }
-    UNUSUAL_DRIVER_SET = {
-        'aristmk5.cpp',
-        'adp.cpp',
-        'cubo.cpp',
-        'mpu4vid.cpp',
-        'peplus.cpp',
-        'sfbonus.cpp',
-    }
 
     # --- Progress dialog ---
     diag_line1 = 'Building catalogs...'
     pDialog = KodiProgressDialog()
-    processed_filters = 0
+    pDialog.startProgress('{}\n{}'.format(diag_line1, 'Processing machines'))
 
-    # ---------------------------------------------------------------------------------------------
-    # Main filters (None catalog) -----------------------------------------------------------------
-    # ---------------------------------------------------------------------------------------------
-    pDialog.startProgress('{}\n{}'.format(diag_line1, 'Main catalog'), NUM_CATALOGS)
-    main_catalog_parents, main_catalog_all = {}, {}
-
-    # --- Normal and Unusual machine list ---
-    # Machines with Coin Slot and Non Mechanical and not Dead and not Device
-    log_info('Making None catalog - Coin index ...')
-    normal_parent_dic, normal_all_dic, unusual_parent_dic, unusual_all_dic = {}, {}, {}, {}
-    for parent_name in main_pclone_dic:
-        machine_main = machines[parent_name]
-        machine_render = renderdb_dic[parent_name]
-        n_coins = machine_main['input']['att_coins'] if machine_main['input'] else 0
-        if machine_main['isMechanical']: continue
-        if n_coins == 0: continue
-        if machine_main['isDead']: continue
-        if machine_render['isDevice']: continue
-
-        # Make list of machine controls.
-        if machine_main['input']:
-            control_list = [ctrl_dic['type'] for ctrl_dic in machine_main['input']['control_list']]
-        else:
-            control_list = []
-
-        # --- Determinte if machine is Normal or Unusual ----
-        # Standard machines.
-        if ('only_buttons' in control_list and len(control_list) > 1) \
-            or machine_main['sourcefile'] in NORMAL_DRIVER_SET:
-            normal_parent_dic[parent_name] = machine_render['description']
-            normal_all_dic[parent_name] = machine_render['description']
-            mame_catalog_add_clones(parent_name, main_pclone_dic, renderdb_dic, normal_all_dic)
-        #
-        # Unusual machines. Most of them you don't wanna play.
-        # No controls or control_type has "only_buttons" or "gambling" or "hanafuda" or "mahjong"
-        #
-        elif not control_list \
-            or 'only_buttons' in control_list or 'gambling' in control_list \
-            or 'hanafuda' in control_list or 'mahjong' in control_list \
-            or machine_main['sourcefile'] in UNUSUAL_DRIVER_SET:
-            unusual_parent_dic[parent_name] = machine_render['description']
-            unusual_all_dic[parent_name] = machine_render['description']
-            mame_catalog_add_clones(parent_name, main_pclone_dic, renderdb_dic, unusual_all_dic)
-        #
-        # What remains go to the Normal/Standard list.
-        #
-        else:
-            normal_parent_dic[parent_name] = machine_render['description']
-            normal_all_dic[parent_name] = machine_render['description']
-            mame_catalog_add_clones(parent_name, main_pclone_dic, renderdb_dic, normal_all_dic)
-    main_catalog_parents['Normal'] = normal_parent_dic
-    main_catalog_all['Normal'] = normal_all_dic
-    main_catalog_parents['Unusual'] = unusual_parent_dic
-    main_catalog_all['Unusual'] = unusual_all_dic
-
-    # --- NoCoin list ---
-    # A) Machines with No Coin Slot and Non Mechanical and not Dead and not Device
-    log_info('Making NoCoin index ...')
-    parent_dic, all_dic = {}, {}
-    for parent_name in main_pclone_dic:
-        machine_main = machines[parent_name]
-        machine_render = renderdb_dic[parent_name]
-        n_coins = machine_main['input']['att_coins'] if machine_main['input'] else 0
-        if machine_main['isMechanical']: continue
-        if n_coins > 0: continue
-        if machine_main['isDead']: continue
-        if machine_render['isDevice']: continue
-        parent_dic[parent_name] = machine_render['description']
-        all_dic[parent_name] = machine_render['description']
-        mame_catalog_add_clones(parent_name, main_pclone_dic, renderdb_dic, all_dic)
-    main_catalog_parents['NoCoin'] = parent_dic
-    main_catalog_all['NoCoin'] = all_dic
-
-    # --- Mechanical machines ---
-    # Mechanical machines and not Dead and not Device
-    log_info('Making Mechanical index ...')
-    parent_dic, all_dic = {}, {}
-    for parent_name in main_pclone_dic:
-        machine_main = machines[parent_name]
-        machine_render = renderdb_dic[parent_name]
-        if not machine_main['isMechanical']: continue
-        if machine_main['isDead']: continue
-        if machine_render['isDevice']: continue
-        parent_dic[parent_name] = machine_render['description']
-        all_dic[parent_name] = machine_render['description']
-        mame_catalog_add_clones(parent_name, main_pclone_dic, renderdb_dic, all_dic)
-    main_catalog_parents['Mechanical'] = parent_dic
-    main_catalog_all['Mechanical'] = all_dic
-
-    # --- Dead machines ---
-    log_info('Making Dead Machines index ...')
-    parent_dic, all_dic = {}, {}
-    for parent_name in main_pclone_dic:
-        machine_main = machines[parent_name]
-        machine_render = renderdb_dic[parent_name]
-        if not machine_main['isDead']: continue
-        parent_dic[parent_name] = machine_render['description']
-        all_dic[parent_name] = machine_render['description']
-        mame_catalog_add_clones(parent_name, main_pclone_dic, renderdb_dic, all_dic)
-    main_catalog_parents['Dead'] = parent_dic
-    main_catalog_all['Dead'] = all_dic
-
-    # --- Device machines ---
-    log_info('Making Device Machines index ...')
-    parent_dic, all_dic = {}, {}
-    for parent_name in main_pclone_dic:
-        machine_render = renderdb_dic[parent_name]
-        if not machine_render['isDevice']: continue
-        parent_dic[parent_name] = machine_render['description']
-        all_dic[parent_name] = machine_render['description']
-        mame_catalog_add_clones(parent_name, main_pclone_dic, renderdb_dic, all_dic)
-    main_catalog_parents['Devices'] = parent_dic
-    main_catalog_all['Devices'] = all_dic
-
-    # --- Build ROM cache index and save Main catalog JSON file ---
-    mame_cache_index_builder('Main', cache_index_dic, main_catalog_all, main_catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_MAIN_ALL_PATH.getPath(), main_catalog_all)
-    utils_write_JSON_file(cfg.CATALOG_MAIN_PARENT_PATH.getPath(), main_catalog_parents)
-    processed_filters += 1
-
-    # ---------------------------------------------------------------------------------------------
-    # Binary filters ------------------------------------------------------------------------------
-    # ---------------------------------------------------------------------------------------------
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Binary catalog'))
-    binary_catalog_parents, binary_catalog_all = {}, {}
-
-    # --- CHD machines ---
-    log_info('Making CHD Machines index ...')
-    parent_dic, all_dic = {}, {}
-    for parent_name in main_pclone_dic:
-        machine = machines[parent_name]
-        machine_render = renderdb_dic[parent_name]
-        if machine_render['isDevice']: continue # >> Skip device machines
-        if not machine_roms[parent_name]['disks']: continue
-        parent_dic[parent_name] = machine_render['description']
-        all_dic[parent_name] = machine_render['description']
-        mame_catalog_add_clones(parent_name, main_pclone_dic, renderdb_dic, all_dic)
-    binary_catalog_parents['CHD'] = parent_dic
-    binary_catalog_all['CHD'] = all_dic
-
-    # --- Machines with samples ---
-    log_info('Making Samples Machines index ...')
-    parent_dic, all_dic = {}, {}
-    for parent_name in main_pclone_dic:
-        machine = machines[parent_name]
-        machine_render = renderdb_dic[parent_name]
-        if machine_render['isDevice']: continue # >> Skip device machines
-        if not machine['sampleof']: continue
-        parent_dic[parent_name] = machine_render['description']
-        all_dic[parent_name] = machine_render['description']
-        mame_catalog_add_clones(parent_name, main_pclone_dic, renderdb_dic, all_dic)
-    binary_catalog_parents['Samples'] = parent_dic
-    binary_catalog_all['Samples'] = all_dic
-
-    # --- Software List machines ---
-    log_info('Making Software List Machines index ...')
-    parent_dic, all_dic = {}, {}
-    for parent_name in main_pclone_dic:
+    # --- Catalog key functions that need databases not available in mame_misc.py ---
+    # Binary filters.
+    def catalog_key_Binary(parent_name, machines, machines_render):
         machine = machines[parent_name]
-        machine_render = renderdb_dic[parent_name]
-        if machine_render['isDevice']: continue # >> Skip device machines
-        if not machine['softwarelists']: continue
-        parent_dic[parent_name] = machine_render['description']
-        all_dic[parent_name] = machine_render['description']
-        mame_catalog_add_clones(parent_name, main_pclone_dic, renderdb_dic, all_dic)
-    binary_catalog_parents['SoftwareLists'] = parent_dic
-    binary_catalog_all['SoftwareLists'] = all_dic
-
-    # --- BIOS ---
-    log_info('Making BIOS Machines index ...')
-    parent_dic, all_dic = {}, {}
-    for parent_name in main_pclone_dic:
-        machine_render = renderdb_dic[parent_name]
-        if machine_render['isDevice']: continue # Skip device machines
-        if not machine_render['isBIOS']: continue
-        parent_dic[parent_name] = machine_render['description']
-        all_dic[parent_name] = machine_render['description']
-        mame_catalog_add_clones(parent_name, main_pclone_dic, renderdb_dic, all_dic)
-    binary_catalog_parents['BIOS'] = parent_dic
-    binary_catalog_all['BIOS'] = all_dic
-
-    # Build cache index and save Binary catalog JSON file
-    mame_cache_index_builder('Binary', cache_index_dic, binary_catalog_all, binary_catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_BINARY_ALL_PATH.getPath(), binary_catalog_all)
-    utils_write_JSON_file(cfg.CATALOG_BINARY_PARENT_PATH.getPath(), binary_catalog_parents)
-    processed_filters += 1
-
-    # ---------------------------------------------------------------------------------------------
-    # Cataloged machine lists ---------------------------------------------------------------------
-    # ---------------------------------------------------------------------------------------------
-    # --- Catver catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Catver catalog'))
-    log_info('Making Catver catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Catver)
-    mame_cache_index_builder('Catver', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_CATVER_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_CATVER_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Catlist catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Catlist catalog'))
-    log_info('Making Catlist catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Catlist)
-    mame_cache_index_builder('Catlist', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_CATLIST_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_CATLIST_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Genre catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Genre catalog'))
-    log_info('Making Genre catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Genre)
-    mame_cache_index_builder('Genre', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_GENRE_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_GENRE_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Category catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Category catalog'))
-    log_info('Making Category catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Category)
-    mame_cache_index_builder('Category', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_CATEGORY_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_CATEGORY_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Nplayers catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Nplayers catalog'))
-    log_info('Making Nplayers catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        renderdb_dic, renderdb_dic, main_pclone_dic, mame_catalog_key_NPlayers)
-    mame_cache_index_builder('NPlayers', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_NPLAYERS_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_NPLAYERS_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Bestgames catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Bestgames catalog'))
-    log_info('Making Bestgames catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Bestgames)
-    mame_cache_index_builder('Bestgames', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_BESTGAMES_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_BESTGAMES_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Series catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Series catalog'))
-    log_info('Making Series catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Series)
-    mame_cache_index_builder('Series', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_SERIES_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_SERIES_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Alltime catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Alltime catalog'))
-    log_info('Making Alltime catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Alltime)
-    mame_cache_index_builder('Alltime', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_ALLTIME_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_ALLTIME_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Artwork catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Artwork catalog'))
-    log_info('Making Artwork catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Artwork)
-    mame_cache_index_builder('Artwork', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_ARTWORK_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_ARTWORK_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Version catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Version catalog'))
-    log_info('Making Version catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_VerAdded)
-    mame_cache_index_builder('Version', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_VERADDED_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_VERADDED_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Control catalog (Expanded) ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Control Expanded catalog'))
-    log_info('Making Control Expanded catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Controls_Expanded)
-    mame_cache_index_builder('Controls_Expanded', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_CONTROL_EXPANDED_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_CONTROL_EXPANDED_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Control catalog (Compact) ---
-    # In this catalog one machine may be in several categories if the machine has more than
-    # one control.
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Control Compact catalog'))
-    log_info('Making Control Compact catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Controls_Compact)
-    mame_cache_index_builder('Controls_Compact', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_CONTROL_COMPACT_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_CONTROL_COMPACT_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- <device> / Device Expanded catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, '<device> Expanded catalog'))
-    log_info('Making <device> tag Expanded catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Devices_Expanded)
-    mame_cache_index_builder('Devices_Expanded', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_DEVICE_EXPANDED_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_DEVICE_EXPANDED_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- <device> / Device Compact catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, '<device> Compact catalog'))
-    log_info('Making <device> tag Compact catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Devices_Compact)
-    mame_cache_index_builder('Devices_Compact', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_DEVICE_COMPACT_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_DEVICE_COMPACT_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Display Type catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Display Type catalog'))
-    log_info('Making Display Type catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Display_Type)
-    mame_cache_index_builder('Display_Type', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_DISPLAY_TYPE_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_DISPLAY_TYPE_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Display VSync catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Display VSync catalog'))
-    log_info('Making Display VSync catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Display_VSync)
-    mame_cache_index_builder('Display_VSync', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_DISPLAY_VSYNC_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_DISPLAY_VSYNC_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Display Resolution catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Display Resolution catalog'))
-    log_info('Making Display Resolution catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Display_Resolution)
-    mame_cache_index_builder('Display_Resolution', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_DISPLAY_RES_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_DISPLAY_RES_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- CPU catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'CPU catalog'))
-    log_info('Making CPU catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_CPU)
-    mame_cache_index_builder('CPU', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_CPU_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_CPU_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Driver catalog ---
-    # This catalog cannot use mame_build_catalog_helper() because of the driver
-    # name substitution.
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Driver catalog'))
-    log_info('Making Driver catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    # mame_build_catalog_helper(catalog_parents, catalog_all,
-    #     machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Driver)
-    for parent_name in main_pclone_dic:
-        render = renderdb_dic[parent_name]
-        if render['isDevice']: continue # Skip device machines in catalogs.
+        catalog_key_list = []
+        if machine_roms[parent_name]['disks']: catalog_key_list.append('CHD')
+        if machine['sampleof']: catalog_key_list.append('Samples')
+        if machine['softwarelists']: catalog_key_list.append('SoftwareLists')
+        if machines_render[parent_name]['isBIOS']: catalog_key_list.append('BIOS')
+        return catalog_key_list
+
+    # Some drivers get a prettier name.
+    def catalog_key_Driver(parent_name, machines, machines_render):
         c_key = machines[parent_name]['sourcefile']
-        # Some drivers get a prettier name.
-        c_key = mame_driver_better_name_dic[c_key] if c_key in mame_driver_better_name_dic else c_key
-        catalog_key_list = [c_key]
-        for catalog_key in catalog_key_list:
-            if catalog_key in catalog_parents:
-                catalog_parents[catalog_key][parent_name] = render['description']
-                catalog_all[catalog_key][parent_name] = render['description']
-            else:
-                catalog_parents[catalog_key] = { parent_name : render['description'] }
-                catalog_all[catalog_key] = { parent_name : render['description'] }
-            for clone_name in main_pclone_dic[parent_name]:
-                catalog_all[catalog_key][clone_name] = renderdb_dic[clone_name]['description']
-    mame_cache_index_builder('Driver', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_DRIVER_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_DRIVER_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Manufacturer catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Manufacturer catalog'))
-    log_info('Making Manufacturer catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Manufacturer)
-    mame_cache_index_builder('Manufacturer', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_MANUFACTURER_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_MANUFACTURER_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
+        return [mame_driver_better_name_dic[c_key] if c_key in mame_driver_better_name_dic else c_key]
 
-    # --- MAME short name catalog ---
-    # This catalog cannot use mame_build_catalog_helper() because of the special name
-    # of the catalog (it is not the plain description).
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Short name catalog'))
-    log_info('Making MAME short name catalog...')
-    catalog_parents, catalog_all = {}, {}
-    for parent_name in main_pclone_dic:
-        render = renderdb_dic[parent_name]
-        if render['isDevice']: continue
-        catalog_key = parent_name[0]
-        t = '{} "{}"'.format(parent_name, render['description'])
-        if catalog_key in catalog_parents:
-            catalog_parents[catalog_key][parent_name] = t
-            catalog_all[catalog_key][parent_name] = t
-        else:
-            catalog_parents[catalog_key] = { parent_name : t }
-            catalog_all[catalog_key] = { parent_name : t }
-        for clone_name in main_pclone_dic[parent_name]:
-            t = '{} "{}"'.format(clone_name, renderdb_dic[clone_name]['description'])
-            catalog_all[catalog_key][clone_name] = t
-    mame_cache_index_builder('ShortName', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_SHORTNAME_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_SHORTNAME_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- MAME long name catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Long name catalog'))
-    log_info('Making MAME long name catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_LongName)
-    mame_cache_index_builder('LongName', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_LONGNAME_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_LONGNAME_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Software List (BySL) catalog ---
-    # This catalog cannot use mame_build_catalog_helper() because of the name change of the SLs.
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Software List catalog'))
-    log_info('Making Software List catalog ...')
     # Load proper Software List proper names, if available
     SL_names_dic = utils_load_JSON_file_dic(cfg.SL_NAMES_PATH.getPath())
-    catalog_parents, catalog_all = {}, {}
-    for parent_name in main_pclone_dic:
-        machine = machines[parent_name]
-        render = renderdb_dic[parent_name]
-        if render['isDevice']: continue
-        for sl_name in machine['softwarelists']:
-            catalog_key = sl_name
-            if catalog_key in SL_names_dic: catalog_key = SL_names_dic[catalog_key]
-            if catalog_key in catalog_parents:
-                catalog_parents[catalog_key][parent_name] = render['description']
-                catalog_all[catalog_key][parent_name] = render['description']
-            else:
-                catalog_parents[catalog_key] = { parent_name : render['description'] }
-                catalog_all[catalog_key] = { parent_name : render['description'] }
-            mame_catalog_add_clones(parent_name, main_pclone_dic, renderdb_dic, catalog_all[catalog_key])
+    def catalog_key_BySL(parent_name, machines, machines_render):
+        return [SL_names_dic[sl_name] if sl_name in SL_names_dic else sl_name
+            for sl_name in machines[parent_name]['softwarelists']]
+
+    # --- Build all catalogs in one pass over the parent machines ---
+    # In the Controls_Compact and Devices_Compact catalogs one machine may be in several
+    # categories if the machine has more than one control/device.
+    # (catalog_name, catalog_key_function, machines, skip_devices, name_in_description,
+    #  catalog_parents_FN, catalog_all_FN)
+    catalog_list = [
+        # Virtual Main and Binary filter catalogs.
+        ('Main', mame_catalog_key_Main, machines, False, False,
+            cfg.CATALOG_MAIN_PARENT_PATH, cfg.CATALOG_MAIN_ALL_PATH),
+        ('Binary', catalog_key_Binary, machines, True, False,
+            cfg.CATALOG_BINARY_PARENT_PATH, cfg.CATALOG_BINARY_ALL_PATH),
+        # INI/DAT based catalogs.
+        ('Catver', mame_catalog_key_Catver, machines, True, False,
+            cfg.CATALOG_CATVER_PARENT_PATH, cfg.CATALOG_CATVER_ALL_PATH),
+        ('Catlist', mame_catalog_key_Catlist, machines, True, False,
+            cfg.CATALOG_CATLIST_PARENT_PATH, cfg.CATALOG_CATLIST_ALL_PATH),
+        ('Genre', mame_catalog_key_Genre, machines, True, False,
+            cfg.CATALOG_GENRE_PARENT_PATH, cfg.CATALOG_GENRE_ALL_PATH),
+        ('Category', mame_catalog_key_Category, machines, True, False,
+            cfg.CATALOG_CATEGORY_PARENT_PATH, cfg.CATALOG_CATEGORY_ALL_PATH),
+        ('NPlayers', mame_catalog_key_NPlayers, renderdb_dic, True, False,
+            cfg.CATALOG_NPLAYERS_PARENT_PATH, cfg.CATALOG_NPLAYERS_ALL_PATH),
+        ('Bestgames', mame_catalog_key_Bestgames, machines, True, False,
+            cfg.CATALOG_BESTGAMES_PARENT_PATH, cfg.CATALOG_BESTGAMES_ALL_PATH),
+        ('Series', mame_catalog_key_Series, machines, True, False,
+            cfg.CATALOG_SERIES_PARENT_PATH, cfg.CATALOG_SERIES_ALL_PATH),
+        ('Alltime', mame_catalog_key_Alltime, machines, True, False,
+            cfg.CATALOG_ALLTIME_PARENT_PATH, cfg.CATALOG_ALLTIME_ALL_PATH),
+        ('Artwork', mame_catalog_key_Artwork, machines, True, False,
+            cfg.CATALOG_ARTWORK_PARENT_PATH, cfg.CATALOG_ARTWORK_ALL_PATH),
+        ('Version', mame_catalog_key_VerAdded, machines, True, False,
+            cfg.CATALOG_VERADDED_PARENT_PATH, cfg.CATALOG_VERADDED_ALL_PATH),
+        # MAME XML extracted catalogs.
+        ('Controls_Expanded', mame_catalog_key_Controls_Expanded, machines, True, False,
+            cfg.CATALOG_CONTROL_EXPANDED_PARENT_PATH, cfg.CATALOG_CONTROL_EXPANDED_ALL_PATH),
+        ('Controls_Compact', mame_catalog_key_Controls_Compact, machines, True, False,
+            cfg.CATALOG_CONTROL_COMPACT_PARENT_PATH, cfg.CATALOG_CONTROL_COMPACT_ALL_PATH),
+        ('Devices_Expanded', mame_catalog_key_Devices_Expanded, machines, True, False,
+            cfg.CATALOG_DEVICE_EXPANDED_PARENT_PATH, cfg.CATALOG_DEVICE_EXPANDED_ALL_PATH),
+        ('Devices_Compact', mame_catalog_key_Devices_Compact, machines, True, False,
+            cfg.CATALOG_DEVICE_COMPACT_PARENT_PATH, cfg.CATALOG_DEVICE_COMPACT_ALL_PATH),
+        ('Display_Type', mame_catalog_key_Display_Type, machines, True, False,
+            cfg.CATALOG_DISPLAY_TYPE_PARENT_PATH, cfg.CATALOG_DISPLAY_TYPE_ALL_PATH),
+        ('Display_VSync', mame_catalog_key_Display_VSync, machines, True, False,
+            cfg.CATALOG_DISPLAY_VSYNC_PARENT_PATH, cfg.CATALOG_DISPLAY_VSYNC_ALL_PATH),
+        ('Display_Resolution', mame_catalog_key_Display_Resolution, machines, True, False,
+            cfg.CATALOG_DISPLAY_RES_PARENT_PATH, cfg.CATALOG_DISPLAY_RES_ALL_PATH),
+        ('CPU', mame_catalog_key_CPU, machines, True, False,
+            cfg.CATALOG_CPU_PARENT_PATH, cfg.CATALOG_CPU_ALL_PATH),
+        ('Driver', catalog_key_Driver, machines, True, False,
+            cfg.CATALOG_DRIVER_PARENT_PATH, cfg.CATALOG_DRIVER_ALL_PATH),
+        ('Manufacturer', mame_catalog_key_Manufacturer, machines, True, False,
+            cfg.CATALOG_MANUFACTURER_PARENT_PATH, cfg.CATALOG_MANUFACTURER_ALL_PATH),
+        ('ShortName', mame_catalog_key_ShortName, machines, True, True,
+            cfg.CATALOG_SHORTNAME_PARENT_PATH, cfg.CATALOG_SHORTNAME_ALL_PATH),
+        ('LongName', mame_catalog_key_LongName, machines, True, False,
+            cfg.CATALOG_LONGNAME_PARENT_PATH, cfg.CATALOG_LONGNAME_ALL_PATH),
+        ('BySL', catalog_key_BySL, machines, True, False,
+            cfg.CATALOG_SL_PARENT_PATH, cfg.CATALOG_SL_ALL_PATH),
+        ('Year', mame_catalog_key_Year, machines, True, False,
+            cfg.CATALOG_YEAR_PARENT_PATH, cfg.CATALOG_YEAR_ALL_PATH),
+    ]
+    log_info('Making {} catalogs in a single pass ...'.format(len(catalog_list)))
+    catalogs_dic = mame_build_catalogs_single_pass(
+        [c_tuple[0:5] for c_tuple in catalog_list], renderdb_dic, main_pclone_dic)
+
+    # Main and Binary filters always have all the categories, even if empty.
+    for cat_key in ['Normal', 'Unusual', 'NoCoin', 'Mechanical', 'Dead', 'Devices']:
+        catalogs_dic['Main'][0].setdefault(cat_key, {})
+        catalogs_dic['Main'][1].setdefault(cat_key, {})
+    for cat_key in ['CHD', 'Samples', 'SoftwareLists', 'BIOS']:
+        catalogs_dic['Binary'][0].setdefault(cat_key, {})
+        catalogs_dic['Binary'][1].setdefault(cat_key, {})
     # Add orphaned Software Lists (SL that do not have an associated machine).
     for sl_name in SL_names_dic:
-        catalog_key = sl_name
-        if catalog_key in SL_names_dic: catalog_key = SL_names_dic[catalog_key]
-        if catalog_key in catalog_parents: continue
-        catalog_parents[catalog_key] = {}
-        catalog_all[catalog_key] = {}
-    mame_cache_index_builder('BySL', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_SL_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_SL_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
-
-    # --- Year catalog ---
-    pDialog.updateProgress(processed_filters, '{}\n{}'.format(diag_line1, 'Year catalog'))
-    log_info('Making Year catalog ...')
-    catalog_parents, catalog_all = {}, {}
-    mame_build_catalog_helper(catalog_parents, catalog_all,
-        machines, renderdb_dic, main_pclone_dic, mame_catalog_key_Year)
-    mame_cache_index_builder('Year', cache_index_dic, catalog_all, catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_YEAR_PARENT_PATH.getPath(), catalog_parents)
-    utils_write_JSON_file(cfg.CATALOG_YEAR_ALL_PATH.getPath(), catalog_all)
-    processed_filters += 1
+        catalog_key = SL_names_dic[sl_name]
+        if catalog_key in catalogs_dic['BySL'][0]: continue
+        catalogs_dic['BySL'][0][catalog_key] = {}
+        catalogs_dic['BySL'][1][catalog_key] = {}
+    main_catalog_parents, main_catalog_all = catalogs_dic['Main']
+
+    # --- Build cache index and catalog order and save catalog JSON files ---
+    # Files are written in parallel by utils_write_JSON_files_threaded().
+    pDialog.resetProgress('{}\n{}'.format(diag_line1, 'Building cache index'), len(catalog_list))
+    order_rank = mame_catalog_order_rank(renderdb_dic)
+    catalog_files = []
+    for c_tuple in catalog_list:
+        catalog_name, name_in_desc = c_tuple[0], c_tuple[4]
+        catalog_parents_FN, catalog_all_FN = c_tuple[5], c_tuple[6]
+        pDialog.updateProgressInc('{}\n{} catalog'.format(diag_line1, catalog_name))
+        catalog_parents, catalog_all = catalogs_dic[catalog_name]
+        mame_cache_index_builder(catalog_name, cache_index_dic, catalog_all, catalog_parents)
+        utils_write_JSON_pack(db_get_catalog_order_FN(cfg, catalog_name).getPath(),
+            mame_catalog_order_builder(cache_index_dic[catalog_name], catalog_all, catalog_parents,
+                None if name_in_desc else order_rank), verbose = False)
+        catalog_files.append((catalog_parents_FN.getPath(), catalog_parents))
+        catalog_files.append((catalog_all_FN.getPath(), catalog_all))
+    pDialog.resetProgress('{}\n{}'.format(diag_line1, 'Saving catalogs'))
+    utils_write_JSON_files_threaded(catalog_files)
+
+    # --- Search index ---
+    pDialog.resetProgress('{}\n{}'.format(diag_line1, 'Search index'))
+    log_info('Making MAME search index ...')
+    search_item_list = []
+    for machine_name in sorted(renderdb_dic):
+        machine_render = renderdb_dic[machine_name]
+        search_item_list.append((machine_name, [machine_name, machine_render['description'],
+            machine_render['manufacturer'], machine_render['year'], machine_render['genre']]))
+    utils_write_JSON_file(cfg.MAME_SEARCH_INDEX_PATH.getPath(), db_build_search_index(search_item_list))
 
     # Close progress dialog.
     pDialog.endProgress()
@@ -6621,6 +6195,8 @@ def _mame_load_SL_XML(xml_filename):
                 #     raise TypeError('DEBUG')
 
         # --- Finished processing of <software> element ---
+        # The History flag is set later, when the History DAT index is available.
+        SL_item['plot_facts'] = [num_roms, num_disks, False]
         SLData['num_items'] += 1
         if SL_item['cloneof']: SLData['num_clones'] += 1
         else:                  SLData['num_parents'] += 1
@@ -6733,6 +6309,31 @@ def _get_SL_CHD_location(chd_set, SL_name, SL_item_name, disk_dic, SL_Items):
     return location
 
 # -------------------------------------------------------------------------------------------------
+#
+# SL launch database (32x_launch.json). Has everything run_SL_machine() needs to build the MAME
+# command line, so the SL item database and the SL machines database of all the Software Lists
+# are not loaded when a SL item is launched.
+#
+# SL_launch_dic = {
+#     'machines' : [ [machine_name, description, [[interface, media_name], ...]], ... ],
+#     'items' : { item_name : [part_interface, ...], ... },
+# }
+#
+# Machines are sorted by description, as shown in the select machine dialog. media_name is the
+# name of the <instance> of the machine <device> with that interface.
+#
+def mame_build_SL_launch_dic(SL_machine_list, SL_roms):
+    launch_machine_list = []
+    for SL_machine in sorted(SL_machine_list, key = lambda x: x['description'].lower()):
+        device_list = [[device['att_interface'], device['instance']['name']]
+            for device in SL_machine['devices']]
+        launch_machine_list.append([SL_machine['machine'], SL_machine['description'], device_list])
+    launch_item_dic = {}
+    for rom_name, SL_ROM in SL_roms.items():
+        launch_item_dic[rom_name] = [part['interface'] for part in SL_ROM['parts']]
+
+    return {'machines' : launch_machine_list, 'items' : launch_item_dic}
+
 #
 # Checks for errors before scanning for SL ROMs.
 # Display a Kodi dialog if an error is found.
@@ -6777,6 +6378,7 @@ def mame_check_before_build_SL_databases(cfg, st_dic, control_dic):
 # per-SL database                       (32x_ROMs.json)
 # per-SL ROM audit database             (32x_ROM_audit.json)
 # per-SL item archives (ROMs and CHDs)  (32x_ROM_archives.json)
+# per-SL launch database                (32x_launch.json)
 #
 def mame_build_SoftwareLists_databases(cfg, st_dic, db_dic_in):
     control_dic = db_dic_in['control_dic']
@@ -6795,7 +6397,10 @@ def mame_build_SoftwareLists_databases(cfg, st_dic, db_dic_in):
     num_SL_with_ROMs = 0
     num_SL_with_CHDs = 0
     SL_catalog_dic = {}
+    SL_search_item_list = []
     processed_files = 0
+    # History DAT index is used in the SL item plots.
+    History_idx_dic = utils_load_JSON_file_dic(cfg.HISTORY_IDX_PATH.getPath())
     diag_line = 'Building Sofware Lists item databases...'
     pDialog = KodiProgressDialog()
     pDialog.startProgress(diag_line, total_SL_files)
@@ -6809,6 +6414,10 @@ def mame_build_SoftwareLists_databases(cfg, st_dic, db_dic_in):
         # log_debug('mame_build_SoftwareLists_databases() Processing "{}"'.format(file))
         SL_path_FN = FileName(file)
         SLData = _mame_load_SL_XML(SL_path_FN.getPath())
+        if FN.getBase_noext() in History_idx_dic:
+            History_SL_dic = History_idx_dic[FN.getBase_noext()]['machines']
+            for rom_name, SL_item in SLData['items'].items():
+                if rom_name in History_SL_dic: SL_item['plot_facts'][2] = True
         utils_write_JSON_file(cfg.SL_DB_DIR.pjoin(FN.getBase_noext() + '_items.json').getPath(),
             SLData['items'], verbose = False)
         utils_write_JSON_file(cfg.SL_DB_DIR.pjoin(FN.getBase_noext() + '_ROMs.json').getPath(),
@@ -6828,6 +6437,12 @@ def mame_build_SoftwareLists_databases(cfg, st_dic, db_dic_in):
         }
         SL_catalog_dic[FN.getBase_noext()] = SL
 
+        # Add SL items to the search index.
+        for rom_name in sorted(SLData['items']):
+            ROM = SLData['items'][rom_name]
+            SL_search_item_list.append(('{}/{}'.format(FN.getBase_noext(), rom_name),
+                [rom_name, ROM['description'], ROM['publisher'], ROM['year'], SLData['display_name']]))
+
         # Update progress
         processed_files += 1
     pDialog.endProgress()
@@ -7003,11 +6618,11 @@ def mame_build_SoftwareLists_databases(cfg, st_dic, db_dic_in):
         processed_SL += 1
     pDialog.endProgress()
 
-    # --- Empty SL asset DB ---
-    log_info('Making Software List (empty) asset databases...')
+    # --- Empty SL asset DB and SL launch DB ---
+    log_info('Making Software List (empty) asset and launch databases...')
     total_SL = len(SL_catalog_dic)
     processed_SL = 0
-    diag_line = 'Building Software List (empty) asset databases...'
+    diag_line = 'Building Software List (empty) asset and launch databases...'
     pDialog.startProgress(diag_line, total_SL)
     for SL_name in sorted(SL_catalog_dic):
         pDialog.updateProgress(processed_SL, '{}\nSoftware List [COLOR orange]{}[/COLOR]'.format(
@@ -7027,6 +6642,11 @@ def mame_build_SoftwareLists_databases(cfg, st_dic, db_dic_in):
 
         # --- Write SL asset JSON ---
         utils_write_JSON_file(SL_asset_DB_FN.getPath(), SL_assets_dic, verbose = False)
+
+        # --- Write SL launch JSON ---
+        SL_launch_dic = mame_build_SL_launch_dic(SL_machines_dic[SL_name], SL_roms)
+        SL_launch_DB_FN = cfg.SL_DB_DIR.pjoin(SL_catalog_dic[SL_name]['rom_DB_noext'] + '_launch.json')
+        utils_write_JSON_file(SL_launch_DB_FN.getPath(), SL_launch_dic, verbose = False)
         processed_SL += 1
     pDialog.endProgress()
 
@@ -7083,6 +6703,8 @@ def mame_build_SoftwareLists_databases(cfg, st_dic, db_dic_in):
         [SL_catalog_dic, 'Software Lists index', cfg.SL_INDEX_PATH.getPath()],
         [SL_PClone_dic, 'Software Lists P/Clone', cfg.SL_PCLONE_DIC_PATH.getPath()],
         [SL_machines_dic, 'Software Lists machines', cfg.SL_MACHINES_PATH.getPath()],
+        [db_build_search_index(SL_search_item_list), 'Software Lists search index',
+            cfg.SL_SEARCH_INDEX_PATH.getPath()],
         # Save control_dic after everything is saved.
         [control_dic, 'Control dictionary', cfg.MAIN_CONTROL_PATH.getPath()],
     ]
@@ -21,6 +21,8 @@
 
 # --- Python standard library ---
 import hashlib
+import itertools
+import operator
 
 # -------------------------------------------------------------------------------------------------
 # Functions
@@ -34,7 +36,7 @@ def misc_build_db_str_3(str1, str2, str3):
 
     return '{}|{}|{}'.format(str1, str2, str3)
 
-# Used in mame_build_MAME_plots()
+# Used in mame_MAME_plot()
 def misc_get_mame_control_str(control_type_list):
     control_set = set()
     improved_c_type_list = misc_improve_mame_control_type_list(control_type_list)
@@ -54,7 +56,7 @@ def misc_get_mame_screen_rotation_str(display_rotate):
 
     return screen_str
 
-# Used in mame_build_MAME_plots()
+# Used in mame_MAME_plot()
 def misc_get_mame_screen_str(machine_name, machine):
     d_list = machine['display_type']
     if d_list:
@@ -238,14 +240,96 @@ def misc_compress_mame_item_list_compact(item_list):
     return reduced_list_sorted
 
 # -------------------------------------------------------------------------------------------------
-# Helper functions to build catalogs.
+# MAME and SL plots
+# Plots are generated when rendering from a few compact facts: MAME machines facts are stored
+# in the render database and SL item facts in the SL item databases. The asset flags used in
+# the plot are taken from the assets so scanning the assets does not change the facts.
+# Old Favourites and missing machines have a 'plot' field that is used as it is.
 # -------------------------------------------------------------------------------------------------
-# Add clones to the all catalog dictionary catalog_all_dic.
-# catalog_all_dic is modified by refence.
-def mame_catalog_add_clones(parent_name, main_pclone_dic, machines_render, catalog_all_dic):
-    for clone_name in main_pclone_dic[parent_name]:
-        catalog_all_dic[clone_name] = machines_render[clone_name]['description']
+# MAME machine plot facts, computed when building the MAME main database. Only the raw data
+# from the MAME XML is stored, strings are formatted when rendering by mame_MAME_plot().
+# plot_facts = [control_type_list, display_list, flags, sourcefile, num_coins, SL_list]
+# control_type_list are the unique control types, display_list is [[type, rotate], ...] and
+# flags has the MAME_PLOT_FLAG_* bits.
+MAME_PLOT_FLAG_MECHANICAL = 0x01
+MAME_PLOT_FLAG_LIST = [
+    (0x02, 'History'),
+    (0x04, 'Info'),
+    (0x08, 'Gameinit'),
+    (0x10, 'Command'),
+]
+
+def mame_MAME_plot_facts(mname, m,
+    history_info_set, mameinfo_info_set, gameinit_idx_dic, command_idx_dic):
+    flags = MAME_PLOT_FLAG_MECHANICAL if m['isMechanical'] else 0
+    for (flag_bit, flag_name), info_set in zip(MAME_PLOT_FLAG_LIST,
+        [history_info_set, mameinfo_info_set, gameinit_idx_dic, command_idx_dic]):
+        if mname in info_set: flags |= flag_bit
+    if m['input']:
+        control_type_list = sorted(set(ctrl_dic['type'] for ctrl_dic in m['input']['control_list']))
+    else:
+        control_type_list = []
+    display_list = [list(d_tuple) for d_tuple in zip(m['display_type'], m['display_rotate'])]
+    n_coins = m['input']['att_coins'] if m['input'] else 0
+
+    return [control_type_list, display_list, flags, m['sourcefile'], n_coins, m['softwarelists']]
+
+# Generate plot for MAME machines.
+# Line 1) Controls are {Joystick}
+# Line 2) {One Vertical Raster screen}
+# Line 3) Machine [is|is not] mechanical and driver is neogeo.hpp
+# Line 4) Machine has [no coin slots| N coin slots]
+# Line 5) Artwork, Manual, History, Info, Gameinit, Command
+# Line 6) Machine [supports|does not support] a Software List.
+def mame_MAME_plot(machine, assets):
+    if 'plot' in assets: return assets['plot']
+    # Facts of databases built by older versions have a different shape.
+    if len(machine.get('plot_facts', [])) != 6: return ''
+    control_type_list, display_list, flags, sourcefile, n_coins, SL_list = machine['plot_facts']
+    controls_str = misc_get_mame_control_str(control_type_list) if control_type_list else ''
+    screen_str = misc_get_mame_screen_str('', {
+        'display_type' : [d_type for d_type, d_rotate in display_list],
+        'display_rotate' : [d_rotate for d_type, d_rotate in display_list],
+    })
+    Flag_list = []
+    if assets['artwork']: Flag_list.append('Artwork')
+    if assets['manual']: Flag_list.append('Manual')
+    Flag_list.extend([flag_name for flag_bit, flag_name in MAME_PLOT_FLAG_LIST if flags & flag_bit])
+    plot_str_list = [
+        'Controls {}'.format(controls_str) if controls_str else 'No controls',
+        screen_str,
+        '{} / Driver is {}'.format(
+            'Mechanical' if flags & MAME_PLOT_FLAG_MECHANICAL else 'Non-mechanical', sourcefile),
+        'Machine has {} coin slots'.format(n_coins) if n_coins > 0 else 'Machine has no coin slots',
+    ]
+    if Flag_list: plot_str_list.append(', '.join(Flag_list))
+    if SL_list: plot_str_list.append('SL {}'.format(', '.join(SL_list)))
+
+    return '\n'.join(plot_str_list)
+
+# Generate plot for Software List items.
+# Line 1) SL item has {} parts
+# Line 2) {} ROMs and {} disks
+# Line 3) Manual, History
+def mame_SL_plot(SL_ROM, assets):
+    if 'plot' in SL_ROM: return SL_ROM['plot']
+    num_ROMs, num_disks, has_History = SL_ROM['plot_facts']
+    num_parts = len(SL_ROM['parts'])
+    if num_parts == 0:   parts_str = 'SL item has no parts'
+    elif num_parts == 1: parts_str = 'SL item has {} part'.format(num_parts)
+    else:                parts_str = 'SL item has {} parts'.format(num_parts)
+    ROM_str = 'ROM' if num_ROMs == 1 else 'ROMs'
+    disk_str = 'disk' if num_disks == 1 else 'disks'
+    roms_str = '{} {} and {} {}'.format(num_ROMs, ROM_str, num_disks, disk_str)
+    Flag_list = []
+    if assets['manual']: Flag_list.append('Manual')
+    if has_History: Flag_list.append('History')
+
+    return '\n'.join([parts_str, roms_str, ', '.join(Flag_list)])
 
+# -------------------------------------------------------------------------------------------------
+# Helper functions to build catalogs.
+# -------------------------------------------------------------------------------------------------
 # Do not store the number of categories in a catalog. If necessary, calculate it on the fly.
 # I think Python len() on dictionaries is very fast.
 # [August 2020] Why???
@@ -259,7 +343,124 @@ def mame_cache_index_builder(cat_name, cache_index_dic, catalog_all, catalog_par
             'hash'         : hashlib.md5(key_str.encode('utf-8')).hexdigest(),
         }
 
+# Precomputed sorted order of the machines of every category, used to render big categories
+# in pages. Machines are sorted by description. The letter lists contain the index of the first
+# machine starting with each letter, used for the jump-to-letter index.
+# The order of a catalog is stored in a JSON pack (see utils_write_JSON_pack()). The sorted lists
+# are split in chunks of MAME_CATALOG_ORDER_CHUNK_SIZE machines, each one a pack document, so
+# rendering a page reads only the chunks of the page. Categories smaller than the minimum page
+# size are never rendered in pages and are not included.
+# catalog_index_dic is the cache index of the catalog, see mame_cache_index_builder().
+# order_rank is the output of mame_catalog_order_rank(). If present machines are sorted with
+# the global rank instead of sorting the descriptions of every category again. Use it only
+# if the catalog text is the plain machine description.
+# Returns catalog_order_dic = {
+#     'cat_hash' : {
+#         'parents' : num_parents, 'parents_letters' : [ ['A', 0], ... ],
+#         'all' : num_machines, 'all_letters' : [ ['A', 0], ... ],
+#     },
+#     'cat_hash-parents-0' : [ machine1, machine2, ... ], See mame_catalog_order_chunk_key().
+#     'cat_hash-all-0' : [ machine1, machine2, ... ], ...
+# }
+# Make sure this is the same as the minimum of setting display_page_size.
+MAME_CATALOG_ORDER_CHUNK_SIZE = 100
+
+def mame_catalog_order_chunk_key(hash_str, order_key, chunk_index):
+    return '{}-{}-{}'.format(hash_str, order_key, chunk_index)
+
+def mame_catalog_order_builder(catalog_index_dic, catalog_all, catalog_parents, order_rank = None):
+    catalog_order_dic = {}
+    for cat_key in catalog_all:
+        if len(catalog_all[cat_key]) <= MAME_CATALOG_ORDER_CHUNK_SIZE: continue
+        hash_str = catalog_index_dic[cat_key]['hash']
+        category_order_dic = catalog_order_dic[hash_str] = {}
+        for order_key, machine_dic in [('parents', catalog_parents[cat_key]), ('all', catalog_all[cat_key])]:
+            if order_rank:
+                rank_dic, letter_dic = order_rank
+                machine_list = sorted(machine_dic, key = rank_dic.__getitem__)
+                letter_iter = map(letter_dic.__getitem__, machine_list)
+            else:
+                machine_list = sorted(machine_dic, key = lambda m: (machine_dic[m].lower(), m))
+                letter_iter = (mame_catalog_order_letter(machine_dic[m]) for m in machine_list)
+            letter_list = [[letter, next(group)[0]] for letter, group in
+                itertools.groupby(enumerate(letter_iter), key = operator.itemgetter(1))]
+            category_order_dic[order_key] = len(machine_list)
+            category_order_dic[order_key + '_letters'] = letter_list
+            for i in range(0, len(machine_list), MAME_CATALOG_ORDER_CHUNK_SIZE):
+                chunk_key = mame_catalog_order_chunk_key(hash_str, order_key, i // MAME_CATALOG_ORDER_CHUNK_SIZE)
+                catalog_order_dic[chunk_key] = machine_list[i:i + MAME_CATALOG_ORDER_CHUNK_SIZE]
+
+    return catalog_order_dic
+
+# Sorts all the machines by description once.
+# Returns order_rank = (rank_dic, letter_dic)
+# rank_dic = { 'machine_name' : int, ... }, letter_dic = { 'machine_name' : 'A', ... }
+def mame_catalog_order_rank(machines_render):
+    desc_dic = {m_name : machines_render[m_name]['description'] for m_name in machines_render}
+    machine_list = sorted(desc_dic, key = lambda m: (desc_dic[m].lower(), m))
+    rank_dic = {m_name : i for i, m_name in enumerate(machine_list)}
+    letter_dic = {m_name : mame_catalog_order_letter(desc) for m_name, desc in desc_dic.items()}
+
+    return (rank_dic, letter_dic)
+
+# Descriptions not starting with a letter go into the '#' group.
+def mame_catalog_order_letter(description):
+    letter = description[0:1].upper()
+
+    return letter if letter.isalpha() else '#'
+
 # Helper functions to get the catalog key.
+MAME_NORMAL_DRIVER_SET = {
+    '88games.cpp',
+    'asteroid.cpp',
+    'cball.cpp',
+}
+MAME_UNUSUAL_DRIVER_SET = {
+    'aristmk5.cpp',
+    'adp.cpp',
+    'cubo.cpp',
+    'mpu4vid.cpp',
+    'peplus.cpp',
+    'sfbonus.cpp',
+}
+
+# Main filters. Device machines must not be skipped in this catalog.
+# Dead device machines are both in the Dead and Devices categories.
+def mame_catalog_key_Main(parent_name, machines, machines_render):
+    machine = machines[parent_name]
+    is_device = machines_render[parent_name]['isDevice']
+    catalog_key_list = []
+    if not machine['isDead'] and not is_device:
+        n_coins = machine['input']['att_coins'] if machine['input'] else 0
+        if machine['isMechanical']:
+            catalog_key_list.append('Mechanical')
+        elif n_coins == 0:
+            catalog_key_list.append('NoCoin')
+        else:
+            # Make list of machine controls.
+            if machine['input']:
+                control_list = [ctrl_dic['type'] for ctrl_dic in machine['input']['control_list']]
+            else:
+                control_list = []
+            # Standard machines.
+            if ('only_buttons' in control_list and len(control_list) > 1) \
+                or machine['sourcefile'] in MAME_NORMAL_DRIVER_SET:
+                catalog_key_list.append('Normal')
+            # Unusual machines. Most of them you don't wanna play.
+            # No controls or control_type has "only_buttons" or "gambling" or "hanafuda" or "mahjong"
+            elif not control_list \
+                or 'only_buttons' in control_list or 'gambling' in control_list \
+                or 'hanafuda' in control_list or 'mahjong' in control_list \
+                or machine['sourcefile'] in MAME_UNUSUAL_DRIVER_SET:
+                catalog_key_list.append('Unusual')
+            # What remains go to the Normal/Standard list.
+            else:
+                catalog_key_list.append('Normal')
+    if machine['isDead']: catalog_key_list.append('Dead')
+    if is_device: catalog_key_list.append('Devices')
+
+    return catalog_key_list
+
 def mame_catalog_key_Catver(parent_name, machines, machines_render):
     return [ machines[parent_name]['catver'] ]
 
@@ -399,9 +600,9 @@ def mame_catalog_key_CPU(parent_name, machines, machines_render):
 def mame_catalog_key_Manufacturer(parent_name, machines, machines_render):
     return [machines_render[parent_name]['manufacturer']]
 
-# This is a special catalog, not easy to automatise.
-# def mame_catalog_key_ShortName(parent_name, machines, machines_render):
-#     return [machines_render[parent_name]['year']]
+# Use name_in_description in the catalog specification of this catalog.
+def mame_catalog_key_ShortName(parent_name, machines, machines_render):
+    return [parent_name[0]]
 
 def mame_catalog_key_LongName(parent_name, machines, machines_render):
     return [machines_render[parent_name]['description'][0]]
@@ -413,22 +614,56 @@ def mame_catalog_key_LongName(parent_name, machines, machines_render):
 def mame_catalog_key_Year(parent_name, machines, machines_render):
     return [machines_render[parent_name]['year']]
 
-# Uses a "function pointer" to obtain the catalog_key.
+# Single pass catalog engine. Every parent machine is visited once and all the catalog key
+# functions are evaluated for it, instead of walking all the machines once per catalog.
+# Uses "function pointers" to obtain the catalog_key.
 # catalog_key is a list that has one element for most catalogs.
 # In some catalogs (Controls_Compact) this list has sometimes more than one item, for example
-# one parent machine may have more than one control.
-def mame_build_catalog_helper(catalog_parents, catalog_all,
-    machines, machines_render, main_pclone_dic, catalog_key_function):
-    for parent_name in main_pclone_dic:
+# one parent machine may have more than one control. An empty list means the machine is not
+# in the catalog.
+#
+# catalog_spec_list = [
+#     (catalog_name, catalog_key_function, machines, skip_devices, name_in_description),
+#     ...
+# ]
+# machines is the database passed to catalog_key_function, usually the main machine database.
+# If skip_devices is True device machines are not added to the catalog.
+# If name_in_description is True the catalog text is 'machine_name "description"'.
+#
+# Returns catalogs_dic = {
+#     'catalog_name' : (catalog_parents, catalog_all), ...
+# }
+def mame_build_catalogs_single_pass(catalog_spec_list, machines_render, main_pclone_dic):
+    catalogs_dic = {spec[0] : ({}, {}) for spec in catalog_spec_list}
+    spec_list = [(catalogs_dic[cat_name], key_function, machines, skip_devices, name_in_desc)
+        for cat_name, key_function, machines, skip_devices, name_in_desc in catalog_spec_list]
+    for parent_name, clone_list in main_pclone_dic.items():
         render = machines_render[parent_name]
-        if render['isDevice']: continue # Skip device machines in catalogs.
-        catalog_key_list = catalog_key_function(parent_name, machines, machines_render)
-        for catalog_key in catalog_key_list:
-            if catalog_key in catalog_parents:
-                catalog_parents[catalog_key][parent_name] = render['description']
-                catalog_all[catalog_key][parent_name] = render['description']
+        is_device = render['isDevice']
+        # Clone descriptions are computed only once per parent.
+        clone_desc = {c_name : machines_render[c_name]['description'] for c_name in clone_list}
+        clone_name_desc = None
+        for catalogs, key_function, machines, skip_devices, name_in_desc in spec_list:
+            if skip_devices and is_device: continue
+            catalog_key_list = key_function(parent_name, machines, machines_render)
+            if not catalog_key_list: continue
+            if name_in_desc:
+                description = '{} "{}"'.format(parent_name, render['description'])
+                if clone_name_desc is None:
+                    clone_name_desc = {c_name : '{} "{}"'.format(c_name, c_desc)
+                        for c_name, c_desc in clone_desc.items()}
+                clones = clone_name_desc
             else:
-                catalog_parents[catalog_key] = { parent_name : render['description'] }
-                catalog_all[catalog_key] = { parent_name : render['description'] }
-            for clone_name in main_pclone_dic[parent_name]:
-                catalog_all[catalog_key][clone_name] = machines_render[clone_name]['description']
+                description = render['description']
+                clones = clone_desc
+            catalog_parents, catalog_all = catalogs
+            for catalog_key in catalog_key_list:
+                if catalog_key in catalog_parents:
+                    catalog_parents[catalog_key][parent_name] = description
+                    catalog_all[catalog_key][parent_name] = description
+                else:
+                    catalog_parents[catalog_key] = { parent_name : description }
+                    catalog_all[catalog_key] = { parent_name : description }
+                catalog_all[catalog_key].update(clones)
+
+    return catalogs_dic
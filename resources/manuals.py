@@ -19,6 +19,7 @@ from .db import *
 
 # --- Kodi stuff ---
 import xbmcaddon
+import xbmcgui
 
 # --- Load pdfrw module ---
 import sys
@@ -27,16 +28,26 @@ sys.path.insert(0, FileName('special://home/addons').pjoin(__addon_id__).pjoin('
 from pdfrw import PdfReader
 from pdfrw.objects.pdfarray import PdfArray
 from pdfrw.objects.pdfname import BasePdfName
+from pdfrw.py23_diffs import convert_store
+from pdfrw.uncompress import flate_png
 
 # --- Python standard library ---
 # NOTE String literals are needed in this file so unicode_literals cannot be defined.
 #      Is this because of the PDF library???
 import io
+import os
 import pprint
+import re
 import struct
+import threading
 import time
 import types
+import zipfile
 import zlib
+if ADDON_RUNNING_PYTHON_3:
+    from urllib.parse import quote as url_quote
+else:
+    from urllib import quote as url_quote
 try:
     from PIL import Image
     PYTHON_PIL_AVAILABLE = True
@@ -56,31 +67,68 @@ Links:
   Extract images coded with CCITTFaxDecode in .net: http://stackoverflow.com/questions/2641770/extracting-image-from-pdf-with-ccittfaxdecode-filter
   TIFF format and tags: http://www.awaresystems.be/imaging/tiff/faq.html
 """
-def _tiff_header_for_CCITT(width, height, img_size, CCITT_group = 4):
-    tiff_header_struct = '<' + '2s' + 'H' + 'L' + 'H' + 'HHLL' * 8 + 'H'
+def _tiff_header_for_CCITT(width, height, img_size, CCITT_group = 4, invert = False, K = -1):
+    tiff_header_struct = '<' + '2s' + 'H' + 'L' + 'H' + 'HHLL' * 9 + 'L'
 
+    # T4Options/T6Options: bit 0 of T4Options is set for 2-D Group 3 encoding (K > 0).
+    if CCITT_group == 4: options_tag, options = 293, 0
+    else:                options_tag, options = 292, 1 if K > 0 else 0
     return struct.pack(
        tiff_header_struct,
-       'II',  # Byte order indication: Little endian
+       b'II',  # Byte order indication: Little endian
        42,  # Version number (always 42)
        8,  # Offset to first IFD
-       8,  # Number of tags in IFD
+       9,  # Number of tags in IFD
        256, 4, 1, width,  # ImageWidth, LONG, 1, width
        257, 4, 1, height,  # ImageLength, LONG, 1, lenght
        258, 3, 1, 1,  # BitsPerSample, SHORT, 1, 1
-       259, 3, 1, CCITT_group,  # Compression, SHORT, 1, 4 = CCITT Group 4 fax encoding
-       262, 3, 1, 0,  # Threshholding, SHORT, 1, 0 = WhiteIsZero
+       259, 3, 1, CCITT_group,  # Compression, SHORT, 1, 3 = CCITT Group 3, 4 = CCITT Group 4
+       262, 3, 1, 1 if invert else 0,  # Threshholding, SHORT, 1, 0 = WhiteIsZero, 1 = BlackIsZero
        273, 4, 1, struct.calcsize(tiff_header_struct),  # StripOffsets, LONG, 1, len of header
        278, 4, 1, height,  # RowsPerStrip, LONG, 1, lenght
        279, 4, 1, img_size,  # StripByteCounts, LONG, 1, size of image
+       options_tag, 4, 1, options,  # T4Options or T6Options, LONG, 1, options
        0  # last IFD
    )
 
+# PNG compression level of the images decoded with PIL. Level 1 is several times faster than
+# the default level 6 and the scanned pages of manuals are only a bit bigger.
+MANUALS_PNG_COMPRESS_LEVEL = 1
+
+# PIL image modes of the /FlateDecode images, key is (/ColorSpace, /BitsPerComponent).
+MANUALS_FLATE_IMAGE_MODES = {
+    ('/DeviceRGB', 8) : 'RGB',
+    ('/DeviceGray', 8) : 'L',
+    ('/DeviceGray', 1) : '1',
+}
+
+# Returns the raw (undecoded) stream of an XObject as bytes.
+# pdfrw keeps streams as str, in Python 2 this is not a copy.
+def _get_XObject_stream(xobj_dic):
+    return convert_store(xobj_dic.stream)
+
+# Returns the /DecodeParms dictionary of the first filter, or an empty dictionary.
+def _get_XObject_decode_parms(xobj_dic):
+    decode_parms = xobj_dic['/DecodeParms']
+    if type(decode_parms) is PdfArray: decode_parms = decode_parms[0]
+    return decode_parms if decode_parms else {}
+
+# Writes a JPEG stream straight to disk, without decoding and encoding it again.
+# memoryview slices do not copy the stream. Data after the JPEG EOI marker is not written.
+def _save_JPEG_stream(stream, img_path_str):
+    eoi_index = stream.rfind(b'\xff\xd9')
+    stream_view = memoryview(stream)
+    if eoi_index > 0: stream_view = stream_view[:eoi_index + 2]
+    with io.open(img_path_str, 'wb') as img_file:
+        img_file.write(stream_view)
+
 #
-# Extracs an image from an xobj_dic object.
-# Returns a PIL image object or None
+# Extracts an image from an xobj_dic object and saves it in img_dir_FN.
+# img_basename_noext is the image file name without extension. JPEG images are saved as they
+# are stored in the PDF, other images are decoded with PIL and saved as PNG.
+# Returns the file name of the saved image or None.
 #
-def _extract_image_from_XObject(xobj_dic):
+def _extract_image_from_XObject(xobj_dic, img_dir_FN, img_basename_noext):
     log_debug('extract_image_from_XObject() Initialising ...')
 
     # --- Get image type and parameters ---
@@ -104,9 +152,10 @@ def _extract_image_from_XObject(xobj_dic):
         log_info('Unknown type(xobj_dic[\'/Filter\']) = "{}"'.format(type(xobj_dic['/Filter'])))
         raise TypeError
     color_space = xobj_dic['/ColorSpace']
-    bits_per_component = xobj_dic['/BitsPerComponent']
+    bits_per_component = int(xobj_dic['/BitsPerComponent'] or 0)
     height = int(xobj_dic['/Height'])
     width = int(xobj_dic['/Width'])
+    stream = _get_XObject_stream(xobj_dic)
 
     # --- Print info ---
     log_debug('num_filters        {}'.format(num_filters))
@@ -116,70 +165,89 @@ def _extract_image_from_XObject(xobj_dic):
     log_debug('/BitsPerComponent  {}'.format(bits_per_component))
     log_debug('/Height            {}'.format(height))
     log_debug('/Width             {}'.format(width))
+    log_debug('Stream size        {}'.format(len(stream)))
 
     # NOTE /Filter = /FlateDecode may be PNG images. Check for magic number.
-    jpg_magic_number     = '\xff\xd8'
-    jp2_magic_number     = '\x00\x00\x00\x0C\x6A\x50\x20\x20\x0D\x0A\x87\x0A'
-    png_magic_number     = '\x89\x50\x4E\x47'
-    gif87_magic_number   = '\x47\x49\x46\x38\x37\x61'
-    gif89_magic_number   = '\x47\x49\x46\x38\x39\x61'
-    tiff_LE_magic_number = '\x49\x49\x2A\x00'
-    tiff_BE_magic_number = '\x4D\x4D\x00\x2A'
+    jpg_magic_number     = b'\xff\xd8'
+    jp2_magic_number     = b'\x00\x00\x00\x0C\x6A\x50\x20\x20\x0D\x0A\x87\x0A'
+    png_magic_number     = b'\x89\x50\x4E\x47'
+    gif87_magic_number   = b'\x47\x49\x46\x38\x37\x61'
+    gif89_magic_number   = b'\x47\x49\x46\x38\x39\x61'
+    tiff_LE_magic_number = b'\x49\x49\x2A\x00'
+    tiff_BE_magic_number = b'\x4D\x4D\x00\x2A'
 
     # --- Check for magic numbers ---
     # See https://en.wikipedia.org/wiki/Magic_number_(programming)
     #
-    if xobj_dic.stream[0:2] == jpg_magic_number:
+    if stream.startswith(jpg_magic_number):
         log_debug('JPEG magic number detected!')
-    elif xobj_dic.stream[0:12] == jp2_magic_number:
+    elif stream.startswith(jp2_magic_number):
         log_debug('JPEG 2000 magic number detected!')
-    elif xobj_dic.stream[0:4] == png_magic_number:
+    elif stream.startswith(png_magic_number):
         log_debug('PNG magic number detected!')
-    elif xobj_dic.stream[0:6] == gif87_magic_number:
+    elif stream.startswith(gif87_magic_number):
         log_debug('GIF87a magic number detected!')
-    elif xobj_dic.stream[0:6] == gif89_magic_number:
+    elif stream.startswith(gif89_magic_number):
         log_debug('GIF89a magic number detected!')
-    elif xobj_dic.stream[0:4] == tiff_LE_magic_number:
+    elif stream.startswith(tiff_LE_magic_number):
         log_debug('TIFF little endian magic number detected!')
-    elif xobj_dic.stream[0:4] == tiff_BE_magic_number:
+    elif stream.startswith(tiff_BE_magic_number):
         log_debug('TIFF big endian magic number detected!')
     else:
         log_debug('Not known image magic number')
 
     # --- JPEG and JPEG 2000 embedded images ---
+    # JPEG images are written to disk as they are. CMYK JPEGs are not supported by Kodi
+    # so they are converted to RGB with PIL.
     img = None
-    if num_filters == 1 and filter_list[0] == '/DCTDecode':
-        log_debug('extract_image_from_XObject() Converting JPG into PIL IMG (/DCTDecode)')
-        memory_f = StringIO.StringIO(xobj_dic.stream)
-        img = Image.open(memory_f)
-
-    elif num_filters == 2 and filter_list[0] == '/FlateDecode' and filter_list[1] == '/DCTDecode':
-        log_debug('extract_image_from_XObject() Converting JPG into PIL IMG (/DCTDecode)')
+    img_basename_str = img_basename_noext + '.png'
+    if num_filters == 1 and filter_list[0] == '/DCTDecode' and color_space != '/DeviceCMYK':
+        log_debug('extract_image_from_XObject() Saving JPG (/DCTDecode)')
+        img_basename_str = img_basename_noext + '.jpg'
+        _save_JPEG_stream(stream, img_dir_FN.pjoin(img_basename_str).getPath())
+        return img_basename_str
+
+    elif num_filters == 2 and filter_list[0] == '/FlateDecode' and filter_list[1] == '/DCTDecode' \
+        and color_space != '/DeviceCMYK':
+        log_debug('extract_image_from_XObject() Saving JPG (/FlateDecode and /DCTDecode)')
         # First decompress /FlateDecode
-        contents_plain = zlib.decompress(xobj_dic.stream)
-        memory_f = StringIO.StringIO(contents_plain)
-        img = Image.open(memory_f)
+        contents_plain = zlib.decompress(stream)
+        img_basename_str = img_basename_noext + '.jpg'
+        _save_JPEG_stream(contents_plain, img_dir_FN.pjoin(img_basename_str).getPath())
+        return img_basename_str
+
+    elif num_filters == 1 and filter_list[0] == '/DCTDecode':
+        log_debug('extract_image_from_XObject() Converting CMYK JPG into PIL IMG (/DCTDecode)')
+        img = Image.open(io.BytesIO(stream)).convert('RGB')
 
     elif num_filters == 1 and filter_list[0] == '/JPXDecode':
         log_debug('extract_image_from_XObject() Converting JPEG 2000 into PIL IMG (/JPXDecode)')
-        memory_f = StringIO.StringIO(xobj_dic.stream)
-        img = Image.open(memory_f)
-
-    # --- RGB images with FlateDecode ---
-    elif num_filters == 1 and color_space == '/DeviceRGB' and filter_list[0] == '/FlateDecode':
-        log_debug('extract_image_from_XObject() Saving /DeviceRGB /FlateDecode image')
-        contents_plain = zlib.decompress(xobj_dic.stream)
-        img = Image.frombytes('RGB', (width, height), contents_plain)
-
-    # --- Monochrome images, 1 bit per pixel, /Filter /FlateDecode ---
-    elif num_filters == 1 and color_space == '/DeviceGray' and filter_list[0] == '/FlateDecode':
-        log_debug('extract_image_from_XObject() Saving monochrome /FlateDecode')
-        contents_plain = zlib.decompress(xobj_dic.stream)
-        img = Image.frombytes('1', (width, height), contents_plain)
+        img = Image.open(io.BytesIO(stream))
+
+    # --- RGB and grayscale images with FlateDecode ---
+    # Image.frombuffer() uses the decoded data without copying it.
+    # Array color spaces (/ICCBased, /Indexed, ...) are not hashable and not supported.
+    elif num_filters == 1 and filter_list[0] == '/FlateDecode' and \
+        isinstance(color_space, BasePdfName) and \
+        (color_space, bits_per_component) in MANUALS_FLATE_IMAGE_MODES:
+        log_debug('extract_image_from_XObject() Saving {} {} bpc /FlateDecode image'.format(
+            color_space, bits_per_component))
+        img_mode = MANUALS_FLATE_IMAGE_MODES[(color_space, bits_per_component)]
+        contents_plain = zlib.decompress(stream)
+        decode_parms = _get_XObject_decode_parms(xobj_dic)
+        predictor = int(decode_parms.get('/Predictor') or 1)
+        if predictor >= 10:
+            colors = 3 if color_space == '/DeviceRGB' else 1
+            contents_plain, error = flate_png(contents_plain, predictor, width, colors, bits_per_component)
+            if error:
+                log_warning('extract_image_from_XObject() {}'.format(error))
+                return None
+        elif predictor > 1:
+            log_debug('Unsupported /Predictor {}. Skipping.'.format(predictor))
+            return None
+        img = Image.frombuffer(img_mode, (width, height), contents_plain, 'raw', img_mode, 0, 1)
 
     # --- Monochrome images, 1 bit per pixel, /Filter /CCITTFaxDecode (TIFF) ---
-    # WARNING FOR SOME REASON THIS CODEC DOES NOT WORK OK YET.
-    #         For example, avsp.pdf from ArcadeDB images do not decompress correctly
     elif num_filters == 1 and color_space == '/DeviceGray' and filter_list[0] == '/CCITTFaxDecode':
         """
         The  CCITTFaxDecode filter decodes image data that has been encoded using
@@ -193,29 +261,51 @@ def _extract_image_from_XObject(xobj_dic):
         K > 0 --- Mixed one- and two-dimensional encoding (Group 3, 2-D)
         """
         log_debug('extract_image_from_XObject() Saving monochrome /CCITTFaxDecode')
+        decode_parms = _get_XObject_decode_parms(xobj_dic)
         log_debug('/DecodeParms =')
-        log_debug('{}'.format(pprint.pformat(xobj_dic['/DecodeParms'])))
-        K = int(xobj_dic['/DecodeParms']['/K'])
-        if K == -1: CCITT_group = 4
-        else:       CCITT_group = 3
-        img_size = len(xobj_dic.stream)
-        tiff_header = _tiff_header_for_CCITT(width, height, img_size, CCITT_group)
+        log_debug('{}'.format(pprint.pformat(decode_parms)))
+        K = int(decode_parms.get('/K') or 0)
+        # Black runs are black pixels unless /BlackIs1 or a /Decode [1 0] array invert them.
+        decode_array = xobj_dic['/Decode']
+        decode_inverted = bool(decode_array) and int(decode_array[0]) == 1
+        invert = (decode_parms.get('/BlackIs1') == 'true') != decode_inverted
+        if K < 0: CCITT_group = 4
+        else:     CCITT_group = 3
+        img_size = len(stream)
+        tiff_header = _tiff_header_for_CCITT(width, height, img_size, CCITT_group, invert, K)
         log_debug('img_size = {0:d}'.format(img_size))
         log_debug('CCITT_group = {0:d}'.format(CCITT_group))
-        log_debug('type(tiff_header) = {}'.format(type(tiff_header)))
-        log_debug('type(xobj_dic.stream) = {}'.format(type(xobj_dic.stream)))
-
-        # DEBUG file write
-        # with io.open('test.tiff', 'wb') as img_file:
-        #     img_file.write(tiff_header + xobj_dic.stream)
 
-        # Open memory file with PIL
-        # img = Image.open(StringIO.StringIO(tiff_header + xobj_dic.stream))
+        # Memory TIFF file decoded by PIL (libtiff). Image.open() does not decode the image,
+        # load() does. The PIL build may have no CCITT decoder or the stream may be broken.
+        memory_f = io.BytesIO()
+        memory_f.write(tiff_header)
+        memory_f.write(memoryview(stream))
+        memory_f.seek(0)
+        try:
+            img = Image.open(memory_f)
+            img.load()
+        except (IOError, OSError, ValueError) as ex:
+            log_warning('extract_image_from_XObject() Cannot decode /CCITTFaxDecode image. Skipping.')
+            log_warning('{}'.format(ex))
+            return None
 
     else:
         log_debug('Unrecognised image type/filter. It cannot be extracted. Skipping.')
+        return None
 
-    return img
+    # --- Save PIL image as PNG ---
+    # A partly written PNG is deleted so the image is extracted again next time.
+    img_path_str = img_dir_FN.pjoin(img_basename_str).getPath()
+    try:
+        img.save(img_path_str, 'PNG', compress_level = MANUALS_PNG_COMPRESS_LEVEL)
+    except (IOError, OSError, ValueError) as ex:
+        log_warning('extract_image_from_XObject() Cannot save image "{}". Skipping.'.format(img_path_str))
+        log_warning('{}'.format(ex))
+        if os.path.exists(img_path_str): os.remove(img_path_str)
+        return None
+
+    return img_basename_str
 
 # OLD CODE (extracts all pages).
 # Keep this function for future reference.
@@ -266,16 +356,12 @@ def manuals_extract_pages_pdfrw(status_dic, PDF_file_FN, img_dir_FN):
                 # log_debug(pprint.pformat(xobj_dic))
                 # log_debug('----------------')
 
-                # --- Extract image ---
-                # Returns a PIL image object or None
-                img = _extract_image_from_XObject(xobj_dic)
-
-                # --- Save image ---
-                if img:
-                    img_basename_str = 'Image_page{0:02d}_img{1:02d}.png'.format(i, img_index)
-                    img_path_str = img_dir_FN.pjoin(img_basename_str).getPath()
-                    log_debug('Saving IMG "{}"'.format(img_path_str))
-                    img.save(img_path_str, 'PNG')
+                # --- Extract and save image ---
+                # Returns the image file name or None
+                img_basename_noext = 'Image_page{0:02d}_img{1:02d}'.format(page_index, img_index)
+                img_basename_str = _extract_image_from_XObject(xobj_dic, img_dir_FN, img_basename_noext)
+                if img_basename_str:
+                    log_debug('Saved IMG "{}"'.format(img_basename_str))
                     image_counter += 1
                     img_index += 1
                 else:
@@ -293,7 +379,9 @@ def manuals_extract_pages_pdfrw(status_dic, PDF_file_FN, img_dir_FN):
 # Creates status_dic.
 # If JSON INFO files does not exists then rendering is needed.
 # If JSON INFO file exists, then compare manual mtime with image extraction time.
-# Returns True if extraction is needed, False otherwise.
+# status_dic['pageImages'] has one entry per page, None if the page has not been extracted yet
+# or the list of image file names extracted from the page. Pages are extracted on demand by
+# the manual viewer, extraction is needed if at least one page has not been extracted.
 #
 def manuals_check_img_extraction_needed(PDF_file_FN, img_dir_FN):
     log_debug('manuals_check_img_extraction_needed() Starting ...')
@@ -304,6 +392,7 @@ def manuals_check_img_extraction_needed(PDF_file_FN, img_dir_FN):
         'numImages' : 0,
         # This is a list of lists because each image can have more than 1 filter.
         'imgFilterList' : [],
+        'pageImages' : [],
     }
 
     # Does the JSON INFO file exists?
@@ -315,21 +404,27 @@ def manuals_check_img_extraction_needed(PDF_file_FN, img_dir_FN):
         return status_dic
 
     # JSON INFO file exists. Open JSON file and check timestamps.
+    # INFO files created by old versions of AML do not have the page cache. Extract again.
     info_dic = utils_load_JSON_file_dic(info_FN.getPath())
     man_file_mtime = PDF_file_FN.getmtime()
-    if man_file_mtime > info_dic['IMG_timestamp']:
+    status_dic['manFormat'] = info_dic['manFormat']
+    status_dic['numPages'] = info_dic['numPages']
+    status_dic['numImages'] = info_dic['numImages']
+    status_dic['imgFilterList'] = info_dic['imgFilterList']
+    if man_file_mtime > info_dic['IMG_timestamp'] or 'pageImages' not in info_dic:
         status_dic['extraction_needed'] = True
-        status_dic['manFormat'] = info_dic['manFormat']
-        status_dic['numPages'] = info_dic['numPages']
-        status_dic['numImages'] = info_dic['numImages']
-        status_dic['imgFilterList'] = info_dic['imgFilterList']
     else:
-        status_dic['extraction_needed'] = False
+        status_dic['pageImages'] = info_dic['pageImages']
+        status_dic['extraction_needed'] = None in status_dic['pageImages']
+    log_debug('manuals_check_img_extraction_needed() extraction_needed {}'.format(
+        status_dic['extraction_needed']))
 
     return status_dic
 
 # Global variables for the PDF manual reader.
+# PDF_lock serialises the access to PDF_reader of the viewer and the prefetch thread.
 PDF_reader = None
+PDF_lock = threading.Lock()
 
 # This function receives a PDF file in man_file_FN.
 # Directory img_dir_FN must exist when calling this function.
@@ -339,31 +434,41 @@ PDF_reader = None
 #   status_dic['manFormat'] = string  ['PDF', 'CBZ', 'CBR']
 #   status_dic['numPages'] = int
 #   status_dic['numImages'] = int
-#
-# Creates a JSON file with the timestamp of the extraction and timestamp of the manual file.
+#   status_dic['pageImages'] = list  Reset if the page cache does not match the PDF file.
 #
 def manuals_open_PDF_file(status_dic, PDF_file_FN, img_dir_FN):
     global PDF_reader
     log_debug('manuals_open_PDF_file() Starting ...')
 
     # --- Load and parse PDF ---
+    # In lazy mode only the objects of the pages extracted are parsed.
     log_info('PDF file "{}"'.format(PDF_file_FN.getPath()))
-    PDF_reader = PdfReader(PDF_file_FN.getPath())
+    PDF_reader = PdfReader(PDF_file_FN.getPath(), lazy = True)
     log_info('PDF has {} pages'.format(PDF_reader.numPages))
 
     # --- Update status_dic ---
     status_dic['abort_extraction'] = False
+    manuals_init_page_cache(status_dic, PDF_reader)
+
+# Pages already extracted are kept unless the PDF changed.
+def manuals_init_page_cache(status_dic, reader):
     status_dic['manFormat'] = 'PDF'
-    status_dic['numPages'] = PDF_reader.numPages
-    status_dic['numImages'] = 0
+    status_dic['numPages'] = reader.numPages
+    if len(status_dic['pageImages']) != reader.numPages:
+        status_dic['numImages'] = 0
+        status_dic['imgFilterList'] = []
+        status_dic['pageImages'] = [None] * reader.numPages
 
+# Waits for the page being extracted by a prefetch thread, if any.
 def manuals_close_PDF_file():
     global PDF_reader
 
-    PDF_reader = None
+    with PDF_lock:
+        PDF_reader = None
 
 #
 # Create JSON INFO file. Call this function after the PDF images have been extracted.
+# The page cache is saved so pages already extracted are not extracted again.
 #
 def manuals_create_INFO_file(status_dic, PDF_file_FN, img_dir_FN):
     rom_name = PDF_file_FN.getBase_noext()
@@ -378,6 +483,7 @@ def manuals_create_INFO_file(status_dic, PDF_file_FN, img_dir_FN):
         'numPages' : status_dic['numPages'],
         'numImages' : status_dic['numImages'],
         'imgFilterList' : status_dic['imgFilterList'],
+        'pageImages' : status_dic['pageImages'],
         # Fields only in JSON INFO file
         'PDF_path' : PDF_file_FN.getPath(),
         'IMG_path' : img_dir_FN.getPath(),
@@ -462,13 +568,17 @@ def manuals_get_PDF_filter_list(status_dic, man_file_FN, img_dir_FN):
 
 #
 # Extracts images in a PDF page.
+# The names of the extracted images are stored in status_dic['pageImages'][page_index].
+# reader is the PdfReader object, by default the PDF opened with manuals_open_PDF_file().
 #
-def manuals_extract_PDF_page(status_dic, man_file_FN, img_dir_FN, page_index):
+def manuals_extract_PDF_page(status_dic, man_file_FN, img_dir_FN, page_index, reader = None):
     # --- Get page object ---
-    page = PDF_reader.pages[page_index]
+    if reader is None: reader = PDF_reader
+    page = reader.pages[page_index]
 
     # --- Iterate /Resources in page ---
     image_counter = 0
+    page_image_list = []
     log_debug('###### Processing page {} ######'.format(page_index))
     resource_dic = page['/Resources']
     for resource_name, resource in resource_dic.items():
@@ -495,20 +605,292 @@ def manuals_extract_PDF_page(status_dic, man_file_FN, img_dir_FN, page_index):
             log_debug('xobj_type     {}'.format(xobj_type))
             log_debug('xobj_subtype  {}'.format(xobj_subtype))
 
-            # --- Extract image ---
-            # Returns a PIL image object or None
-            img = _extract_image_from_XObject(xobj_dic)
-
-            # --- Save image ---
-            if img:
-                img_basename_str = 'Image_page{0:02d}_img{1:02d}.png'.format(page_index, img_index)
-                img_path_str = img_dir_FN.pjoin(img_basename_str).getPath()
-                log_debug('Saving IMG "{}"'.format(img_path_str))
-                img.save(img_path_str, 'PNG')
+            # --- Extract and save image ---
+            # Returns the image file name or None
+            img_basename_noext = 'Image_page{0:02d}_img{1:02d}'.format(page_index, img_index)
+            img_basename_str = _extract_image_from_XObject(xobj_dic, img_dir_FN, img_basename_noext)
+            if img_basename_str:
+                log_debug('Saved IMG "{}"'.format(img_basename_str))
+                page_image_list.append(img_basename_str)
                 image_counter += 1
                 img_index += 1
             else:
                 log_warning('Error extracting image from /XObject')
     # --- Update info ---
     status_dic['numImages'] += image_counter
+    status_dic['pageImages'][page_index] = page_image_list
     log_info('PDF page {} extracted {} images'.format(page_index, image_counter))
+
+#
+# Extracts all the pages of a PDF manual not extracted yet and creates the JSON INFO file.
+# status_dic is created by manuals_check_img_extraction_needed().
+# This function is called by several worker threads at the same time by the batch extraction
+# utility so it uses its own PdfReader object. If stop_event is set the extraction stops after
+# the current page and the pages extracted so far are saved in the INFO file.
+# Returns the number of pages extracted.
+#
+def manuals_extract_PDF_file(status_dic, PDF_file_FN, img_dir_FN, stop_event):
+    log_debug('manuals_extract_PDF_file() PDF file "{}"'.format(PDF_file_FN.getPath()))
+    if not img_dir_FN.exists():
+        log_info('Creating DIR "{}"'.format(img_dir_FN.getPath()))
+        img_dir_FN.makedirs()
+    reader = PdfReader(PDF_file_FN.getPath(), lazy = True)
+    manuals_init_page_cache(status_dic, reader)
+    num_extracted_pages = 0
+    for page_index in range(status_dic['numPages']):
+        if stop_event.is_set(): break
+        if status_dic['pageImages'][page_index] is not None: continue
+        manuals_extract_PDF_page(status_dic, PDF_file_FN, img_dir_FN, page_index, reader)
+        num_extracted_pages += 1
+    manuals_create_INFO_file(status_dic, PDF_file_FN, img_dir_FN)
+
+    return num_extracted_pages
+
+# -------------------------------------------------------------------------------------------------
+# CBZ manuals
+# -------------------------------------------------------------------------------------------------
+# CBZ manuals are ZIP files with one image per page. Images are not extracted, Kodi reads them
+# directly from the ZIP file with the zip:// VFS, so opening a CBZ manual only reads the ZIP
+# central directory and nothing is written to disk. CBR files are RAR files and are supported
+# only if they are ZIP files with the wrong extension, which is common.
+MANUALS_CBZ_IMAGE_EXTS = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']
+
+# Cache of the CBZ member index, key is (path, mtime, size) of the ZIP file.
+CBZ_index_cache = {}
+
+# Sorts page2.jpg before page10.jpg.
+def _natural_sort_key(name):
+    return [int(s) if s.isdigit() else s.lower() for s in re.split(r'(\d+)', name)]
+
+#
+# Returns the list of images in a CBZ file in page order.
+# Directories, hidden files and the __MACOSX metadata of ZIP files created on a Mac are skipped.
+#
+def manuals_get_CBZ_index(man_file_FN):
+    stat_output = man_file_FN.stat()
+    cache_key = (man_file_FN.getPath(), stat_output.st_mtime, stat_output.st_size)
+    if cache_key in CBZ_index_cache: return CBZ_index_cache[cache_key]
+
+    with zipfile.ZipFile(man_file_FN.getPath(), 'r') as zip_f:
+        name_list = zip_f.namelist()
+    img_list = []
+    for name in name_list:
+        if name.endswith('/') or name.startswith('__MACOSX/'): continue
+        if os.path.basename(name).startswith('.'): continue
+        if os.path.splitext(name)[1].lower() not in MANUALS_CBZ_IMAGE_EXTS: continue
+        img_list.append(name)
+    img_list.sort(key = _natural_sort_key)
+    CBZ_index_cache[cache_key] = img_list
+
+    return img_list
+
+#
+# Opens a CBZ manual and creates status_dic. Every image in the ZIP file is a page.
+# status_dic['abort_extraction'] is True if the file is not a ZIP file or cannot be read.
+#
+def manuals_open_CBZ_file(man_file_FN):
+    log_debug('manuals_open_CBZ_file() CBZ file "{}"'.format(man_file_FN.getPath()))
+    status_dic = {
+        'extraction_needed' : False,
+        'abort_extraction' : False,
+        'manFormat' : 'CBZ',
+        'numPages' : 0,
+        'numImages' : 0,
+        'imgFilterList' : [],
+        'pageImages' : [],
+    }
+    try:
+        img_list = manuals_get_CBZ_index(man_file_FN)
+    except (zipfile.BadZipfile, IOError, OSError) as ex:
+        log_error('manuals_open_CBZ_file() Cannot read ZIP file "{}"'.format(man_file_FN.getPath()))
+        log_error('{}'.format(ex))
+        status_dic['abort_extraction'] = True
+        return status_dic
+    status_dic['numPages'] = len(img_list)
+    status_dic['numImages'] = len(img_list)
+    status_dic['pageImages'] = [[name] for name in img_list]
+    log_info('manuals_open_CBZ_file() CBZ has {} pages'.format(status_dic['numPages']))
+
+    return status_dic
+
+#
+# Returns the path of an image of a manual to be displayed by Kodi.
+# Images of CBZ manuals are read from the ZIP file, the path of the ZIP file is URL encoded.
+# See URIUtils::CreateArchivePath() in the Kodi source.
+#
+def manuals_get_image_path(status_dic, man_file_FN, img_dir_FN, img_name):
+    if status_dic['manFormat'] == 'CBZ':
+        ZIP_path = man_file_FN.getPath()
+        if ADDON_RUNNING_PYTHON_2 and isinstance(ZIP_path, text_type):
+            ZIP_path = ZIP_path.encode('utf-8')
+        return 'zip://{}/{}'.format(url_quote(ZIP_path, safe = ''), img_name)
+
+    return img_dir_FN.pjoin(img_name).getPath()
+
+# -------------------------------------------------------------------------------------------------
+# Manual viewer
+# -------------------------------------------------------------------------------------------------
+# Pages are extracted when the viewer needs them instead of extracting the whole manual before
+# showing the first page. While a page is displayed the next MANUALS_PREFETCH_PAGES pages are
+# extracted in a background thread so turning pages is instant. CBZ manuals are not extracted.
+MANUALS_PREFETCH_PAGES = 3
+
+# Kodi action IDs used by the viewer.
+ACTION_MOVE_LEFT     = 1
+ACTION_MOVE_RIGHT    = 2
+ACTION_MOVE_UP       = 3
+ACTION_MOVE_DOWN     = 4
+ACTION_PAGE_UP       = 5
+ACTION_PAGE_DOWN     = 6
+ACTION_SELECT_ITEM   = 7
+ACTION_PREVIOUS_MENU = 10
+ACTION_STOP          = 13
+ACTION_NAV_BACK      = 92
+
+# Global variables of the prefetch threads.
+# Incrementing prefetch_generation stops the running prefetch threads. A thread stops after the
+# page it is extracting, so the threads of previous pages may still be running.
+prefetch_generation = 0
+prefetch_thread_list = []
+
+#
+# Returns the list of image file names of a page, extracting the page if needed.
+#
+def manuals_get_PDF_page(status_dic, man_file_FN, img_dir_FN, page_index):
+    with PDF_lock:
+        if status_dic['pageImages'][page_index] is None:
+            manuals_extract_PDF_page(status_dic, man_file_FN, img_dir_FN, page_index)
+
+    return status_dic['pageImages'][page_index]
+
+#
+# Extracts pages page_index + 1 to page_index + MANUALS_PREFETCH_PAGES in a background thread.
+# A previous prefetch thread stops after the page it is extracting now.
+#
+def manuals_prefetch_PDF_pages(status_dic, man_file_FN, img_dir_FN, page_index):
+    global prefetch_generation
+    global prefetch_thread_list
+
+    prefetch_generation += 1
+    generation = prefetch_generation
+    last_page = min(page_index + MANUALS_PREFETCH_PAGES, status_dic['numPages'] - 1)
+    def prefetch_worker():
+        for p_index in range(page_index + 1, last_page + 1):
+            if generation != prefetch_generation: return
+            if status_dic['pageImages'][p_index] is not None: continue
+            log_debug('manuals_prefetch_PDF_pages() Prefetching page {}'.format(p_index))
+            try:
+                manuals_get_PDF_page(status_dic, man_file_FN, img_dir_FN, p_index)
+            except Exception as ex:
+                # The page is extracted again, and the error reported, when the viewer needs it.
+                log_error('manuals_prefetch_PDF_pages() Exception extracting page {}'.format(p_index))
+                log_error('{}'.format(ex))
+                return
+
+    prefetch_thread_list = [t for t in prefetch_thread_list if t.is_alive()]
+    prefetch_thread = threading.Thread(target = prefetch_worker)
+    prefetch_thread.daemon = True
+    prefetch_thread.start()
+    prefetch_thread_list.append(prefetch_thread)
+
+#
+# Stops all the prefetch threads. Waits until the pages being extracted are finished so the
+# page cache is consistent with the images on disk.
+#
+def manuals_stop_prefetch():
+    global prefetch_generation
+    global prefetch_thread_list
+
+    prefetch_generation += 1
+    for prefetch_thread in prefetch_thread_list:
+        prefetch_thread.join()
+    prefetch_thread_list = []
+
+#
+# Full screen window that displays the pages of a manual. Left/Up/Page Up show the previous
+# image and Right/Down/Page Down/Select show the next image. Back closes the viewer.
+#
+class ManualViewer(xbmcgui.WindowDialog):
+    def __init__(self, status_dic, man_file_FN, img_dir_FN):
+        self.status_dic = status_dic
+        self.man_file_FN = man_file_FN
+        self.img_dir_FN = img_dir_FN
+        self.page_index = 0
+        self.img_index = 0
+        # WindowDialog coordinates are always in a 1280x720 grid.
+        self.background = xbmcgui.ControlImage(0, 0, 1280, 720, '')
+        self.background.setColorDiffuse('0xFF000000')
+        self.image = xbmcgui.ControlImage(0, 0, 1280, 720, '', aspectRatio = 2)
+        self.label = xbmcgui.ControlLabel(20, 680, 1240, 30, '', alignment = 1)
+        self.addControls([self.background, self.image, self.label])
+
+    # Returns the index of the first page with images starting at page_index in the
+    # direction step or -1 if there are no more pages with images.
+    def find_page(self, page_index, step):
+        while 0 <= page_index < self.status_dic['numPages']:
+            page_image_list = manuals_get_PDF_page(self.status_dic, self.man_file_FN, self.img_dir_FN, page_index)
+            if page_image_list: return page_index
+            page_index += step
+        return -1
+
+    def show_image(self, page_index, img_index):
+        self.page_index = page_index
+        self.img_index = img_index
+        page_image_list = self.status_dic['pageImages'][page_index]
+        img_path = manuals_get_image_path(self.status_dic, self.man_file_FN, self.img_dir_FN,
+            page_image_list[img_index])
+        log_debug('ManualViewer() Page {} image {} "{}"'.format(page_index, img_index, img_path))
+        self.image.setImage(img_path, False)
+        self.label.setLabel('Page {} of {}'.format(page_index + 1, self.status_dic['numPages']))
+        if self.status_dic['manFormat'] == 'PDF':
+            manuals_prefetch_PDF_pages(self.status_dic, self.man_file_FN, self.img_dir_FN, page_index)
+
+    # Returns False if the manual has no images.
+    def show_first_image(self):
+        page_index = self.find_page(0, 1)
+        if page_index < 0: return False
+        self.show_image(page_index, 0)
+        return True
+
+    def show_next_image(self):
+        if self.img_index + 1 < len(self.status_dic['pageImages'][self.page_index]):
+            self.show_image(self.page_index, self.img_index + 1)
+            return
+        page_index = self.find_page(self.page_index + 1, 1)
+        if page_index >= 0: self.show_image(page_index, 0)
+
+    def show_previous_image(self):
+        if self.img_index > 0:
+            self.show_image(self.page_index, self.img_index - 1)
+            return
+        page_index = self.find_page(self.page_index - 1, -1)
+        if page_index >= 0:
+            self.show_image(page_index, len(self.status_dic['pageImages'][page_index]) - 1)
+
+    def onAction(self, action):
+        action_id = action.getId()
+        if action_id in (ACTION_PREVIOUS_MENU, ACTION_NAV_BACK, ACTION_STOP):
+            self.close()
+        elif action_id in (ACTION_MOVE_RIGHT, ACTION_MOVE_DOWN, ACTION_PAGE_DOWN, ACTION_SELECT_ITEM):
+            self.show_next_image()
+        elif action_id in (ACTION_MOVE_LEFT, ACTION_MOVE_UP, ACTION_PAGE_UP):
+            self.show_previous_image()
+
+#
+# Displays a manual with the viewer. The PDF file must be open if there are pages not
+# extracted yet. img_dir_FN is not used with CBZ manuals.
+# Returns False if the manual has no images.
+#
+def manuals_view_manual(status_dic, man_file_FN, img_dir_FN):
+    viewer = ManualViewer(status_dic, man_file_FN, img_dir_FN)
+    try:
+        if not viewer.show_first_image(): return False
+        viewer.doModal()
+    finally:
+        manuals_stop_prefetch()
+        del viewer
+    if status_dic['manFormat'] == 'PDF':
+        log_info('manuals_view_manual() {} of {} pages extracted'.format(
+            status_dic['numPages'] - status_dic['pageImages'].count(None), status_dic['numPages']))
+
+    return True
@@ -44,6 +44,7 @@ except:
 # --- Python standard library ---
 # Check what modules are really used and remove not used ones.
 import fnmatch
+import gzip
 import io
 import json
 import math
@@ -51,6 +52,16 @@ import os
 import sys
 import threading
 import time
+import zlib
+if ADDON_RUNNING_PYTHON_3:
+    from collections.abc import MutableMapping
+else:
+    from collections import MutableMapping
+try:
+    import lzma
+    UTILS_LZMA_AVAILABLE = True
+except ImportError:
+    UTILS_LZMA_AVAILABLE = False
 
 # --- Determine interpreter running platform ---
 # Cache all possible platform values in global variables for maximum speed.
@@ -277,6 +288,234 @@ def utils_load_file_to_slist(filename):
         slist = f.readlines()
     return slist
 
+# -------------------------------------------------------------------------------------------------
+# Transparent compression of JSON files.
+# Big databases can be optionally compressed to reduce the I/O on slow storage (SD cards,
+# network shares). The compression method and level are set once with
+# utils_set_JSON_compression() when the addon starts. Readers detect the format using the
+# magic bytes at the beginning of the file, so compressed and uncompressed files can be mixed
+# and changing the setting does not require a database rebuild.
+#
+# Python 2 does not have the lzma module. In that case LZMA falls back to gzip.
+# -------------------------------------------------------------------------------------------------
+# Make sure these match setting json_compression in settings.xml.
+JSON_COMPRESSION_NONE = 0
+JSON_COMPRESSION_ZLIB = 1
+JSON_COMPRESSION_GZIP = 2
+JSON_COMPRESSION_LZMA = 3
+
+# Internal globals
+json_compression_method = JSON_COMPRESSION_NONE
+json_compression_level = 6
+
+def utils_set_JSON_compression(method, level):
+    global json_compression_method
+    global json_compression_level
+
+    if method == JSON_COMPRESSION_LZMA and not UTILS_LZMA_AVAILABLE:
+        method = JSON_COMPRESSION_GZIP
+    json_compression_method = method
+    # zlib and gzip levels are 1 to 9, LZMA presets are 0 to 9.
+    json_compression_level = min(max(int(level), 1), 9)
+
+# Returns one of the JSON_COMPRESSION_* constants.
+def utils_detect_JSON_compression(header):
+    if header[0:2] == b'\x1f\x8b':
+        return JSON_COMPRESSION_GZIP
+    elif header[0:6] == b'\xfd7zXZ\x00':
+        return JSON_COMPRESSION_LZMA
+    # zlib header: CMF 0x78 (deflate, 32K window) and FLG with (CMF * 256 + FLG) % 31 == 0.
+    # JSON files always start with '{', '[' or whitespace so there is no ambiguity.
+    elif len(header) >= 2 and header[0:1] == b'\x78' and \
+        (ord(header[0:1]) * 256 + ord(header[1:2])) % 31 == 0:
+        return JSON_COMPRESSION_ZLIB
+
+    return JSON_COMPRESSION_NONE
+
+# Minimal write-only file object that deflates data with a zlib stream.
+class Zlib_File_Writer(io.RawIOBase):
+    def __init__(self, filename, level):
+        self.file = io.open(filename, 'wb')
+        self.compressor = zlib.compressobj(level)
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.file.write(self.compressor.compress(bytes(b)))
+        return len(b)
+
+    def close(self):
+        if not self.closed:
+            self.file.write(self.compressor.flush())
+            self.file.close()
+        io.RawIOBase.close(self)
+
+# Opens a JSON file for reading as text, decompressing it if necessary.
+def utils_open_JSON_file_read(json_filename):
+    with io.open(json_filename, 'rb') as f:
+        header = f.read(6)
+    method = utils_detect_JSON_compression(header)
+    if method == JSON_COMPRESSION_GZIP:
+        return io.TextIOWrapper(gzip.GzipFile(json_filename, 'rb'), encoding = 'utf-8')
+    elif method == JSON_COMPRESSION_LZMA:
+        return io.TextIOWrapper(lzma.LZMAFile(json_filename, 'rb'), encoding = 'utf-8')
+    elif method == JSON_COMPRESSION_ZLIB:
+        with io.open(json_filename, 'rb') as f:
+            data = zlib.decompress(f.read())
+        return io.StringIO(data.decode('utf-8'))
+
+    return io.open(json_filename, 'rt', encoding = 'utf-8')
+
+# Opens a JSON file for writing as text, compressing it if configured so.
+def utils_open_JSON_file_write(json_filename):
+    if json_compression_method == JSON_COMPRESSION_GZIP:
+        raw = gzip.GzipFile(json_filename, 'wb', compresslevel = json_compression_level)
+    elif json_compression_method == JSON_COMPRESSION_LZMA:
+        raw = lzma.LZMAFile(json_filename, 'wb', preset = json_compression_level)
+    elif json_compression_method == JSON_COMPRESSION_ZLIB:
+        raw = io.BufferedWriter(Zlib_File_Writer(json_filename, json_compression_level))
+    else:
+        return io.open(json_filename, 'wt', encoding = 'utf-8')
+
+    return io.TextIOWrapper(raw, encoding = 'utf-8')
+
+# -------------------------------------------------------------------------------------------------
+# Schema-based JSON tables.
+# Big databases like MAME_renderdb.json and MAME_assetdb.json are dictionaries of dictionaries
+# where all the rows have the same keys. Repeating the key strings in every row wastes a lot of
+# space and JSON decoding time, so these databases are stored with the schema (the list of
+# fields) written only once and every row as a positional list of values.
+#
+# Fields that store file paths are further compacted. Every path is stored as a list
+# [directory_id, file_name] where directory_id is the index of the directory prefix in the
+# dirs list. Empty paths are stored as the empty string.
+#
+# On disk:
+# {
+#   '__JSON_table__' : 1,
+#   'fields' : ['field_1', 'field_2', ...],
+#   'path_fields' : ['field_2', ...],
+#   'dirs' : ['/home/kodi/assets/snaps/', ...],
+#   'rows' : { 'row_key' : [value_1, [0, 'file.png'], ...], ... },
+# }
+#
+# utils_load_JSON_file_dic() returns a JSON_Table object that behaves like a dictionary and
+# restores the dictionary shape of every row the first time it is accessed. The JSON writers
+# encode JSON_Table objects back into the table format transparently.
+# -------------------------------------------------------------------------------------------------
+JSON_TABLE_MARKER = '__JSON_table__'
+JSON_TABLE_VERSION = 1
+
+class JSON_Table(MutableMapping):
+    # Creates an empty table. Use JSON_Table.from_dict() or JSON_Table.from_JSON().
+    def __init__(self, fields = None, path_fields = None, dirs = None):
+        self.fields = fields if fields is not None else []
+        self.path_fields = path_fields if path_fields is not None else []
+        self.dirs = dirs if dirs is not None else []
+        # Values are raw rows (lists) until accessed, then decoded dictionaries.
+        self.data = {}
+
+    # path_fields is the list of fields that contain file paths.
+    @classmethod
+    def from_dict(cls, data_dic, path_fields = ()):
+        fields = set()
+        for row in data_dic.values(): fields.update(row)
+        table = cls(sorted(fields), [f for f in path_fields if f in fields])
+        for key, row in data_dic.items():
+            table.data[key] = row
+        return table
+
+    @classmethod
+    def from_JSON(cls, json_dic):
+        if json_dic['__JSON_table__'] != JSON_TABLE_VERSION:
+            raise TypeError('Unsupported JSON table version {}'.format(json_dic['__JSON_table__']))
+        table = cls(json_dic['fields'], json_dic['path_fields'], json_dic['dirs'])
+        table.data = json_dic['rows']
+        return table
+
+    def _decode_row(self, row):
+        row_dic = dict(zip(self.fields, row))
+        dirs = self.dirs
+        for field in self.path_fields:
+            value = row_dic[field]
+            if value.__class__ is list: row_dic[field] = dirs[value[0]] + value[1]
+        return row_dic
+
+    # Returns a dictionary that can be serialised to JSON.
+    def encode(self):
+        fields = self.fields
+        field_set = set(fields)
+        path_fields = self.path_fields
+        path_idx = [fields.index(f) for f in path_fields]
+        dirs, dir_index = [], {}
+        rows = {}
+        for key, row in self.data.items():
+            # The directory list is rebuilt so rows not accessed yet must be decoded first.
+            if row.__class__ is list:
+                row = self._decode_row(row)
+            # Rows with a different shape are stored as dictionaries.
+            if len(row) != len(fields) or not field_set.issuperset(row):
+                rows[key] = row
+                continue
+            row_list = [row[f] for f in fields]
+            for i in path_idx:
+                value = row_list[i]
+                if not value: continue
+                sep_pos = max(value.rfind('/'), value.rfind('\\'))
+                prefix = value[:sep_pos + 1]
+                if prefix not in dir_index:
+                    dir_index[prefix] = len(dirs)
+                    dirs.append(prefix)
+                row_list[i] = [dir_index[prefix], value[sep_pos + 1:]]
+            rows[key] = row_list
+
+        return {
+            JSON_TABLE_MARKER : JSON_TABLE_VERSION,
+            'fields' : fields,
+            'path_fields' : path_fields,
+            'dirs' : dirs,
+            'rows' : rows,
+        }
+
+    # --- Dictionary interface ---
+    def __getitem__(self, key):
+        row = self.data[key]
+        if row.__class__ is list:
+            row = self._decode_row(row)
+            self.data[key] = row
+        return row
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+
+    def __delitem__(self, key):
+        del self.data[key]
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def keys(self):
+        return self.data.keys()
+
+# Converts the decoded JSON object into a JSON_Table if needed.
+def utils_JSON_object_hook(data):
+    if isinstance(data, dict) and JSON_TABLE_MARKER in data:
+        return JSON_Table.from_JSON(data)
+    return data
+
+# Converts a JSON_Table into a serialisable dictionary if needed.
+def utils_JSON_prepare(data):
+    if isinstance(data, JSON_Table):
+        return data.encode()
+    return data
+
 # -------------------------------------------------------------------------------------------------
 # JSON write/load
 # -------------------------------------------------------------------------------------------------
@@ -288,8 +527,8 @@ def utils_load_JSON_file_dic(json_filename, verbose = True):
         return data_dic
     if verbose:
         log_debug('utils_load_JSON_file_dic() "{}"'.format(json_filename))
-    with io.open(json_filename, 'rt', encoding = 'utf-8') as file:
-        data_dic = json.load(file)
+    with utils_open_JSON_file_read(json_filename) as file:
+        data_dic = utils_JSON_object_hook(json.load(file))
 
     return data_dic
 
@@ -301,7 +540,7 @@ def utils_load_JSON_file_list(json_filename, verbose = True):
         return data_list
     if verbose:
         log_debug('utils_load_JSON_file_list() "{}"'.format(json_filename))
-    with io.open(json_filename, 'rt', encoding = 'utf-8') as file:
+    with utils_open_JSON_file_read(json_filename) as file:
         data_list = json.load(file)
 
     return data_list
@@ -312,8 +551,9 @@ def utils_write_JSON_file(json_filename, json_data, verbose = True):
     l_start = time.time()
     if verbose:
         log_debug('utils_write_JSON_file() "{}"'.format(json_filename))
+    json_data = utils_JSON_prepare(json_data)
     try:
-        with io.open(json_filename, 'wt', encoding = 'utf-8') as file:
+        with utils_open_JSON_file_write(json_filename) as file:
             if OPTION_COMPACT_JSON:
                 file.write(json.dumps(json_data, ensure_ascii = False, sort_keys = True))
             else:
@@ -353,6 +593,7 @@ def utils_write_JSON_file_lowmem(json_filename, json_data, verbose = True):
     l_start = time.time()
     if verbose:
         log_debug('utils_write_JSON_file_lowmem() "{}"'.format(json_filename))
+    json_data = utils_JSON_prepare(json_data)
     try:
         if OPTION_COMPACT_JSON:
             jobj = json.JSONEncoder(ensure_ascii = False, sort_keys = True)
@@ -360,7 +601,7 @@ def utils_write_JSON_file_lowmem(json_filename, json_data, verbose = True):
             jobj = json.JSONEncoder(ensure_ascii = False, sort_keys = True,
                 indent = 1, separators = (',', ':'))
         # --- Chunk by chunk JSON writer ---
-        with io.open(json_filename, 'wt', encoding = 'utf-8') as file:
+        with utils_open_JSON_file_write(json_filename) as file:
             for chunk in jobj.iterencode(json_data):
                 file.write(text_type(chunk))
     except OSError:
@@ -374,6 +615,338 @@ def utils_write_JSON_file_lowmem(json_filename, json_data, verbose = True):
         write_time_s = l_end - l_start
         log_debug('utils_write_JSON_file_lowmem() Writing time {:f} s'.format(write_time_s))
 
+# -------------------------------------------------------------------------------------------------
+# JSON journal
+# Append-only file with one compact JSON object per line. Appending a record does not read or
+# rewrite the file so the cost is the same no matter how many records the journal has.
+# A line truncated by a crash is ignored when the journal is loaded.
+# -------------------------------------------------------------------------------------------------
+# Returns the size of the journal in bytes after appending the record.
+def utils_append_JSON_journal(filename, record):
+    line = json.dumps(record, ensure_ascii = False, sort_keys = True, separators = (',', ':'))
+    with io.open(filename, 'ab') as file:
+        file.write(line.encode('utf-8') + b'\n')
+        journal_size = file.tell()
+
+    return journal_size
+
+def utils_load_JSON_journal(filename):
+    record_list = []
+    if not os.path.isfile(filename): return record_list
+    log_debug('utils_load_JSON_journal() "{}"'.format(filename))
+    with io.open(filename, 'rb') as file:
+        for line in file:
+            try:
+                record_list.append(json.loads(line.decode('utf-8')))
+            except ValueError:
+                log_warning('utils_load_JSON_journal() Skipping broken line')
+
+    return record_list
+
+def utils_remove_JSON_journal(filename):
+    if os.path.isfile(filename):
+        log_debug('utils_remove_JSON_journal() "{}"'.format(filename))
+        os.remove(filename)
+
+# -------------------------------------------------------------------------------------------------
+# Text store
+# Random access database of text entries, used for the big DAT databases.
+# The first line of the file is a JSON list with the [offset, size] of every bucket. Buckets are
+# JSON dictionaries { key : [offset, size], ... } with the location of the entries of the
+# bucket. Offsets are in bytes from the end of the first line and entries are UTF-8 encoded.
+# Getting an entry only decodes the first line and one small bucket, then seeks and reads
+# the entry text. The big DAT databases are never fully read.
+#
+# Dictionaries of dictionaries of text are supported, the key of the entries is then
+# 'key|subkey'.
+# -------------------------------------------------------------------------------------------------
+TEXT_STORE_NUM_BUCKETS = 256
+
+def utils_text_store_bucket(key, num_buckets):
+    return (zlib.crc32(key.encode('utf-8')) & 0xffffffff) % num_buckets
+
+def utils_write_text_store(filename, text_dic, verbose = True):
+    l_start = time.time()
+    if verbose:
+        log_debug('utils_write_text_store() "{}"'.format(filename))
+    entry_list = []
+    for key in sorted(text_dic):
+        if isinstance(text_dic[key], dict):
+            for subkey in sorted(text_dic[key]):
+                entry_list.append(('{}|{}'.format(key, subkey), text_dic[key][subkey]))
+        else:
+            entry_list.append((key, text_dic[key]))
+
+    # Entries first, then the buckets.
+    bucket_list = [{} for i in range(TEXT_STORE_NUM_BUCKETS)]
+    chunk_list = []
+    offset = 0
+    for key, text in entry_list:
+        data = text.encode('utf-8')
+        bucket_list[utils_text_store_bucket(key, TEXT_STORE_NUM_BUCKETS)][key] = [offset, len(data)]
+        chunk_list.append(data)
+        offset += len(data)
+    header_list = []
+    for bucket_dic in bucket_list:
+        data = json.dumps(bucket_dic, ensure_ascii = False, sort_keys = True,
+            separators = (',', ':')).encode('utf-8')
+        header_list.append([offset, len(data)])
+        chunk_list.append(data)
+        offset += len(data)
+    try:
+        with io.open(filename, 'wb') as file:
+            file.write((json.dumps(header_list, separators = (',', ':')) + '\n').encode('utf-8'))
+            for data in chunk_list: file.write(data)
+    except OSError:
+        kodi_notify('Advanced MAME Launcher',
+                    'Cannot write {} file (OSError)'.format(filename))
+    except IOError:
+        kodi_notify('Advanced MAME Launcher',
+                    'Cannot write {} file (IOError)'.format(filename))
+    l_end = time.time()
+    if verbose:
+        write_time_s = l_end - l_start
+        log_debug('utils_write_text_store() Writing time {:f} s'.format(write_time_s))
+
+# Returns the text of the entry or None if the entry or the file is not found.
+# Call examples:
+#  1) text = utils_load_text_store_entry(cfg.GAMEINIT_DB_PATH.getPath(), '88games')
+#  2) text = utils_load_text_store_entry(cfg.HISTORY_DB_PATH.getPath(), 'mame', '88games')
+def utils_load_text_store_entry(filename, *key_list):
+    if not os.path.isfile(filename):
+        log_warning('utils_load_text_store_entry() Not found "{}"'.format(filename))
+        return None
+    key = '|'.join(key_list)
+    log_debug('utils_load_text_store_entry() "{}" key "{}"'.format(filename, key))
+    with io.open(filename, 'rb') as file:
+        header_list = json.loads(file.readline().decode('utf-8'))
+        data_start = file.tell()
+        offset, size = header_list[utils_text_store_bucket(key, len(header_list))]
+        file.seek(data_start + offset)
+        bucket_dic = json.loads(file.read(size).decode('utf-8'))
+        if key not in bucket_dic: return None
+        offset, size = bucket_dic[key]
+        file.seek(data_start + offset)
+        text = file.read(size).decode('utf-8')
+
+    return text
+
+# -------------------------------------------------------------------------------------------------
+# JSON pack
+# Container of many small JSON documents in one file, used for the MAME render and asset caches.
+# Having one file per catalog instead of one file per category avoids the per-file overhead of
+# FAT/exFAT SD cards and network shares.
+# The first line of the file is a JSON dictionary { key : [offset, size], ... } with the location
+# of every document. Offsets are in bytes from the end of the first line. Documents are
+# compressed if JSON compression is enabled and readers detect the compression using the
+# magic bytes. Getting a document decodes the first line, then seeks and decodes that
+# document only.
+# Packs are written to a temporary file that replaces the old pack atomically.
+# -------------------------------------------------------------------------------------------------
+def utils_encode_JSON_pack_document(json_data):
+    data = json.dumps(utils_JSON_prepare(json_data), ensure_ascii = False, sort_keys = True,
+        separators = (',', ':')).encode('utf-8')
+    if json_compression_method == JSON_COMPRESSION_GZIP:
+        data = gzip.compress(data, json_compression_level)
+    elif json_compression_method == JSON_COMPRESSION_LZMA:
+        data = lzma.compress(data, preset = json_compression_level)
+    elif json_compression_method == JSON_COMPRESSION_ZLIB:
+        data = zlib.compress(data, json_compression_level)
+
+    return data
+
+def utils_decode_JSON_pack_document(data):
+    method = utils_detect_JSON_compression(data[0:6])
+    if method == JSON_COMPRESSION_GZIP:
+        data = gzip.decompress(data)
+    elif method == JSON_COMPRESSION_LZMA:
+        data = lzma.decompress(data)
+    elif method == JSON_COMPRESSION_ZLIB:
+        data = zlib.decompress(data)
+
+    return utils_JSON_object_hook(json.loads(data.decode('utf-8')))
+
+# json_dic = { key : json_data, ... }
+def utils_write_JSON_pack(filename, json_dic, verbose = True):
+    l_start = time.time()
+    if verbose:
+        log_debug('utils_write_JSON_pack() "{}"'.format(filename))
+    offset_dic = {}
+    chunk_list = []
+    offset = 0
+    for key in sorted(json_dic):
+        data = utils_encode_JSON_pack_document(json_dic[key])
+        offset_dic[key] = [offset, len(data)]
+        chunk_list.append(data)
+        offset += len(data)
+    temp_filename = filename + '.tmp'
+    try:
+        with io.open(temp_filename, 'wb') as file:
+            file.write((json.dumps(offset_dic, ensure_ascii = False, sort_keys = True,
+                separators = (',', ':')) + '\n').encode('utf-8'))
+            for data in chunk_list: file.write(data)
+        os.replace(temp_filename, filename)
+    except OSError:
+        kodi_notify('Advanced MAME Launcher',
+                    'Cannot write {} file (OSError)'.format(filename))
+    except IOError:
+        kodi_notify('Advanced MAME Launcher',
+                    'Cannot write {} file (IOError)'.format(filename))
+    l_end = time.time()
+    if verbose:
+        write_time_s = l_end - l_start
+        log_debug('utils_write_JSON_pack() Writing time {:f} s'.format(write_time_s))
+
+# Returns the document or an empty dictionary if the document or the file is not found.
+def utils_load_JSON_pack_document(filename, key):
+    return utils_load_JSON_pack_documents(filename, [key])[0]
+
+# Returns the list of documents of key_list. Documents not found are empty dictionaries.
+# The offset table is decoded once and documents are read in file order.
+def utils_load_JSON_pack_documents(filename, key_list):
+    if not os.path.isfile(filename):
+        log_warning('utils_load_JSON_pack_documents() Not found "{}"'.format(filename))
+        return [{} for key in key_list]
+    log_debug('utils_load_JSON_pack_documents() "{}" keys "{}"'.format(filename, ', '.join(key_list)))
+    data_dic = {}
+    with io.open(filename, 'rb') as file:
+        offset_dic = json.loads(file.readline().decode('utf-8'))
+        data_start = file.tell()
+        for key in sorted(set(key_list), key = lambda k: offset_dic.get(k, [-1])[0]):
+            if key not in offset_dic:
+                log_warning('utils_load_JSON_pack_documents() Key not found "{}"'.format(key))
+                continue
+            offset, size = offset_dic[key]
+            file.seek(data_start + offset)
+            data_dic[key] = file.read(size)
+
+    return [utils_decode_JSON_pack_document(data_dic[key]) if key in data_dic else {} for key in key_list]
+
+# Returns all the documents of the pack { key : json_data, ... }
+def utils_load_JSON_pack(filename, verbose = True):
+    if not os.path.isfile(filename):
+        log_warning('utils_load_JSON_pack() Not found "{}"'.format(filename))
+        return {}
+    if verbose:
+        log_debug('utils_load_JSON_pack() "{}"'.format(filename))
+    with io.open(filename, 'rb') as file:
+        offset_dic = json.loads(file.readline().decode('utf-8'))
+        data = file.read()
+
+    return {key : utils_decode_JSON_pack_document(data[offset:offset + size])
+        for key, (offset, size) in offset_dic.items()}
+
+# -------------------------------------------------------------------------------------------------
+# JSON record store
+# Stores every row of a JSON_Table once so many subsets of the table (the categories of the
+# MAME catalogs) can reference the same rows instead of copying them.
+# The first line of the file is the table header { 'store' : id, 'fields' : [...],
+# 'path_fields' : [...], 'dirs' : [...] }. Then there is one line [ key, row ] per row, rows
+# are stored in the order given by the caller so rows read together should be stored together.
+# A subset of rows is described by a list of spans [offset, size, keep]. A span is a block of
+# consecutive lines that is read with one seek. Small gaps between the rows of the subset are
+# read too and discarded: keep is the list of line indices of the span that belong to the
+# subset or None if all lines belong to it. Offsets are in bytes from the end of the first line.
+# Record stores are not compressed even if JSON compression is enabled. Rows are read with
+# seeks to byte offsets and a compressed stream can only be read from the beginning. Rows are
+# too small to be compressed one by one.
+# -------------------------------------------------------------------------------------------------
+# Reading a few unneeded KB is faster than an additional seek on SD cards and network shares.
+JSON_RECORD_STORE_MAX_GAP = 32 * 1024
+
+# key_list is the list of rows to store, in storage order.
+# Returns the store id and a dictionary { key : [offset, size, line] } with the location of
+# every row. line is the row number in the store.
+def utils_write_JSON_record_store(filename, table, key_list, verbose = True):
+    l_start = time.time()
+    if verbose:
+        log_debug('utils_write_JSON_record_store() "{}"'.format(filename))
+    table_dic = table.encode()
+    rows = table_dic['rows']
+    store_id = '{:x}'.format(int(l_start * 1000))
+    header_dic = {
+        'store' : store_id,
+        'fields' : table_dic['fields'],
+        'path_fields' : table_dic['path_fields'],
+        'dirs' : table_dic['dirs'],
+    }
+    location_dic = {}
+    chunk_list = []
+    offset = 0
+    for key in key_list:
+        data = (json.dumps([key, rows[key]], ensure_ascii = False,
+            separators = (',', ':')) + '\n').encode('utf-8')
+        location_dic[key] = [offset, len(data), len(chunk_list)]
+        chunk_list.append(data)
+        offset += len(data)
+    temp_filename = filename + '.tmp'
+    try:
+        with io.open(temp_filename, 'wb') as file:
+            file.write((json.dumps(header_dic, ensure_ascii = False, sort_keys = True,
+                separators = (',', ':')) + '\n').encode('utf-8'))
+            file.write(b''.join(chunk_list))
+        os.replace(temp_filename, filename)
+    except OSError:
+        kodi_notify('Advanced MAME Launcher',
+                    'Cannot write {} file (OSError)'.format(filename))
+    except IOError:
+        kodi_notify('Advanced MAME Launcher',
+                    'Cannot write {} file (IOError)'.format(filename))
+    l_end = time.time()
+    if verbose:
+        write_time_s = l_end - l_start
+        log_debug('utils_write_JSON_record_store() Writing time {:f} s'.format(write_time_s))
+
+    return store_id, location_dic
+
+# Returns the span list of a subset of the rows of a record store.
+# location_dic is the dictionary returned by utils_write_JSON_record_store().
+def utils_JSON_record_store_spans(location_dic, key_list, max_gap = JSON_RECORD_STORE_MAX_GAP):
+    span_list = []
+    span = None
+    for offset, size, line in sorted(location_dic[key] for key in key_list):
+        if span is not None and offset - span_end <= max_gap:
+            # Lines between the end of the span and this row are read and discarded.
+            if line != span_last_line + 1 and span[2] is None:
+                span[2] = list(range(span_last_line - span_first_line + 1))
+            if span[2] is not None: span[2].append(line - span_first_line)
+            span_end = offset + size
+            span[1] = span_end - span[0]
+        else:
+            span = [offset, size, None]
+            span_list.append(span)
+            span_first_line = line
+            span_end = offset + size
+        span_last_line = line
+
+    return span_list
+
+# Returns a JSON_Table with the rows of the span list or None if the record store is not found
+# or store_id does not match (the store was rebuilt).
+def utils_load_JSON_record_store(filename, store_id, span_list):
+    if not os.path.isfile(filename):
+        log_warning('utils_load_JSON_record_store() Not found "{}"'.format(filename))
+        return None
+    log_debug('utils_load_JSON_record_store() "{}" {} spans'.format(filename, len(span_list)))
+    line_list = []
+    with io.open(filename, 'rb') as file:
+        header_dic = json.loads(file.readline().decode('utf-8'))
+        if header_dic['store'] != store_id:
+            log_warning('utils_load_JSON_record_store() Store id mismatch "{}"'.format(filename))
+            return None
+        data_start = file.tell()
+        for offset, size, keep in span_list:
+            file.seek(data_start + offset)
+            lines = file.read(size).split(b'\n')
+            if keep is None:
+                line_list.extend(lines[:-1])
+            else:
+                line_list.extend(lines[i] for i in keep)
+    table = JSON_Table(header_dic['fields'], header_dic['path_fields'], header_dic['dirs'])
+    table.data = dict(json.loads((b'[' + b','.join(line_list) + b']').decode('utf-8')))
+
+    return table
+
 # -------------------------------------------------------------------------------------------------
 # Threaded JSON loader
 # -------------------------------------------------------------------------------------------------
@@ -394,6 +967,34 @@ class Threaded_Load_JSON(threading.Thread):
     def run(self): 
         self.output_dic = utils_load_JSON_file_dic(self.json_filename)
 
+# -------------------------------------------------------------------------------------------------
+# Threaded JSON writer
+# -------------------------------------------------------------------------------------------------
+# Writes a list of JSON files using a pool of threads. JSON encoding holds the GIL but
+# compression and file writing do not, so files are written while others are being encoded.
+# file_list = [ (json_filename, json_data), ... ]
+def utils_write_JSON_files_threaded(file_list, num_threads = 4, json_write_func = utils_write_JSON_file):
+    l_start = time.time()
+    log_debug('utils_write_JSON_files_threaded() Writing {} files...'.format(len(file_list)))
+    file_iter = iter(file_list)
+    iter_lock = threading.Lock()
+    exception_list = []
+    def write_worker():
+        while not exception_list:
+            with iter_lock:
+                f_item = next(file_iter, None)
+            if f_item is None: return
+            try:
+                json_write_func(f_item[0], f_item[1], verbose = False)
+            except Exception as ex:
+                exception_list.append(ex)
+    thread_list = [threading.Thread(target = write_worker) for i in range(min(num_threads, len(file_list)))]
+    for w_thread in thread_list: w_thread.start()
+    for w_thread in thread_list: w_thread.join()
+    # Errors in the worker threads are raised in the caller thread.
+    if exception_list: raise exception_list[0]
+    log_debug('utils_write_JSON_files_threaded() Writing time {:f} s'.format(time.time() - l_start))
+
 # -------------------------------------------------------------------------------------------------
 # File cache functions.
 # Depends on the FileName class.
@@ -561,6 +1162,14 @@ def kodi_dialog_OK(text, title = 'Advanced MAME Launcher'):
 def kodi_dialog_yesno(text, title = 'Advanced MAME Launcher'):
     return xbmcgui.Dialog().yesno(title, text)
 
+# Returns the text entered or None if dialog was canceled.
+def kodi_dialog_keyboard(title = 'Advanced MAME Launcher', default_text = ''):
+    keyboard = xbmc.Keyboard(default_text, title)
+    keyboard.doModal()
+    if not keyboard.isConfirmed(): return None
+
+    return keyboard.getText()
+
 # Returns a directory.
 def kodi_dialog_get_directory(dialog_heading):
     return xbmcgui.Dialog().browse(0, dialog_heading, '')